@@ -0,0 +1,60 @@
+"""
+Benchmark: merging a large ``definitions:`` overlay onto _definitions.yaml.
+
+Compares the copy-on-write ``generation._deep_merge`` with the deep-copying
+merge it replaced, on an overlay of many custom enums - the shape of input a
+repository with a large controlled vocabulary carries.
+
+    python benchmarks/merge_definitions.py --enums 5000 --values 30
+"""
+
+import argparse
+import copy
+import timeit
+
+from gen3schemadev.generation import _deep_merge
+from gen3schemadev.schema.gen3_template import generate_def_template
+
+
+def full_copy_merge(base, overlay):
+    """The merge as it was before: deep-copy base at every level."""
+    result = copy.deepcopy(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = full_copy_merge(result[key], value)
+        else:
+            result[key] = copy.deepcopy(value)
+    return result
+
+
+def make_overlay(enums, values):
+    """Build an overlay of ``enums`` custom enums, plus one edit to a shared block."""
+    overlay = {
+        f"custom_enum_{i}": {
+            "description": f"Custom vocabulary {i}",
+            "enum": [f"term_{i}_{j}" for j in range(values)],
+        }
+        for i in range(enums)
+    }
+    overlay["ubiquitous_properties"] = {"state": {"default": "validated"}}
+    return overlay
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--enums", type=int, default=5000, help="Custom enums in the overlay")
+    parser.add_argument("--values", type=int, default=30, help="Values per enum")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs; the best is reported")
+    args = parser.parse_args()
+
+    base = generate_def_template()
+    overlay = make_overlay(args.enums, args.values)
+    assert _deep_merge(base, overlay) == full_copy_merge(base, overlay)
+
+    for label, merge in (("deepcopy merge", full_copy_merge), ("copy-on-write merge", _deep_merge)):
+        best = min(timeit.repeat(lambda: merge(base, overlay), number=1, repeat=args.repeat))
+        print(f"{label:>20}: {best * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
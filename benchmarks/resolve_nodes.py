@@ -0,0 +1,61 @@
+"""
+Benchmark: serial against parallel node resolution.
+
+Resolves the official Gen3 dictionary shipped in the tests directory (29 nodes)
+serially and across process pools of several sizes. ``--scale`` clones every
+node that many times under new ids, to see where a pool starts to pay for its
+start-up cost on a larger dictionary.
+
+    python benchmarks/resolve_nodes.py --workers 2 4 --scale 20
+"""
+
+import argparse
+import copy
+import os
+import timeit
+
+from gen3schemadev.utils import read_json, resolve_bundle
+
+OFFICIAL_DICTIONARY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "tests/gen3_schema/examples/json/gen3_develop_schema.json",
+)
+
+
+def scaled(bundle, scale):
+    """Return ``bundle`` with each node cloned ``scale`` times under new ids."""
+    if scale <= 1:
+        return bundle
+    result = dict(bundle)
+    for name, schema in bundle.items():
+        if name.startswith("_") or not isinstance(schema, dict) or "id" not in schema:
+            continue
+        for copy_number in range(1, scale):
+            clone = copy.deepcopy(schema)
+            clone["id"] = f"{schema['id']}_{copy_number}"
+            result[f"{clone['id']}.yaml"] = clone
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4], help="Pool sizes to time")
+    parser.add_argument("--scale", type=int, default=1, help="Copies of each node")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs; the best is reported")
+    args = parser.parse_args()
+
+    bundle = scaled(read_json(OFFICIAL_DICTIONARY), args.scale)
+    serial = resolve_bundle(bundle)
+    print(f"{len(serial)} nodes, {os.cpu_count()} CPUs")
+
+    for workers in [1, *args.workers]:
+        assert resolve_bundle(bundle, workers=workers) == serial
+        best = min(timeit.repeat(
+            lambda: resolve_bundle(bundle, workers=workers), number=1, repeat=args.repeat
+        ))
+        label = "serial" if workers == 1 else f"{workers} workers"
+        print(f"{label:>12}: {best * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
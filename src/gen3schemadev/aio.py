@@ -0,0 +1,298 @@
+"""
+Asyncio counterparts of :mod:`gen3schemadev.api`, for services built on an event loop.
+
+The functions in :mod:`gen3schemadev.api` are thread-safe but blocking: on a
+large dictionary ``generate`` and ``resolve`` hold the calling thread for
+seconds, and the metaschema check waits on one ``check-jsonschema`` process
+per node. Called from a coroutine, that stalls every other request on the
+loop. The coroutines here do the same work without blocking it:
+
+- CPU work - building nodes, linting, resolving - runs in an executor. By
+  default that is the loop's default thread pool; pass any
+  :class:`concurrent.futures.Executor` to use your own.
+- Resolution is scheduled one node at a time, so the loop gets the thread
+  back between nodes and a cancelled request stops after the nodes already
+  running rather than after the whole dictionary.
+- Files are read in the executor, all at once, and ``check-jsonschema`` runs
+  through :func:`asyncio.create_subprocess_exec`, several at a time.
+- :func:`iter_resolved` and :func:`iter_metaschema_checks` yield per-node
+  results as they complete, for a service that streams progress.
+
+Cancellation: cancelling the task awaiting any coroutine here, or closing one
+of the iterators early, cancels the work not yet started, kills any
+``check-jsonschema`` process still running and removes its temporary files.
+A node already being resolved in a thread finishes, since a thread cannot be
+interrupted, but its result is discarded.
+
+Results are the same as :mod:`gen3schemadev.api` returns for the same input.
+
+Typical usage::
+
+    from gen3schemadev import aio
+
+    files = await aio.generate(input_data)
+    report = await aio.validate(aio.bundle(files))
+"""
+
+import asyncio
+import functools
+import os
+import shutil
+import tempfile
+
+from gen3schemadev import api
+from gen3schemadev.schema.gen3_template import get_metaschema
+from gen3schemadev.utils import SchemaResolutionError, load_yaml, prepare_resolution
+from gen3schemadev.validators.metaschema_validator import (
+    _check_arguments,
+    _raise_for_check_result,
+    _write_check_files,
+)
+from gen3schemadev.validators.rule_validator import EXCLUDED_SCHEMAS
+
+# How many nodes are resolved, or checked against the metaschema, at once.
+DEFAULT_CONCURRENCY = max(1, min(8, os.cpu_count() or 1))
+
+# Bundling is cheap and does no I/O; it is here so callers need one module.
+bundle = api.bundle
+
+
+def _run(executor, func, *args, **kwargs):
+    """Run ``func`` in ``executor`` and return an awaitable for its result."""
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+async def _bounded_as_completed(jobs, limit):
+    """
+    Run coroutines with at most ``limit`` in flight, yielding each as it finishes.
+
+    Args:
+        jobs: An iterable of ``(key, coroutine_function)`` pairs. Each function
+            is only called when there is room for it, so work that has not
+            started costs nothing to cancel.
+        limit: The most jobs running at once.
+
+    Yields:
+        ``(key, task)`` for each finished job. ``task.result()`` returns or
+        raises the job's outcome.
+
+    Tasks still running when the generator is closed or cancelled are
+    cancelled and awaited before it exits.
+    """
+    jobs = iter(jobs)
+    pending = {}
+    try:
+        while True:
+            for key, start in jobs:
+                pending[asyncio.ensure_future(start())] = key
+                if len(pending) >= limit:
+                    break
+            if not pending:
+                return
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield pending.pop(task), task
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def generate(input_data: dict, only=None, keep_going: bool = False, executor=None) -> dict:
+    """
+    Build a dictionary's files from an input data model, off the event loop.
+
+    See :func:`gen3schemadev.api.generate` for the arguments, result and errors.
+
+    Args:
+        executor: The executor to build in; the loop's default when None.
+    """
+    return await _run(executor, api.generate, input_data, only=only, keep_going=keep_going)
+
+
+async def bundle_directory(input_dir: str, executor=None) -> dict:
+    """
+    Bundle a directory of YAML schemas, reading its files concurrently.
+
+    The async counterpart of :func:`gen3schemadev.utils.bundle_yamls`, with the
+    same sorted key order.
+
+    Args:
+        input_dir: The dictionary directory.
+        executor: The executor the files are read and parsed in.
+
+    Returns:
+        The bundled dictionary, keyed by filename.
+
+    Raises:
+        FileNotFoundError: If ``input_dir`` does not exist.
+        Exception: If it contains no YAML files.
+    """
+    names = sorted(
+        name for name in await _run(executor, os.listdir, input_dir)
+        if name.endswith('.yaml') or name.endswith('.yml')
+    )
+    if not names:
+        raise Exception(f"No YAML files found in directory: {input_dir}")
+    reads = [_run(executor, load_yaml, os.path.join(input_dir, name)) for name in names]
+    try:
+        schemas = await asyncio.gather(*reads)
+    except BaseException:
+        for read in reads:
+            read.cancel()
+        raise
+    return dict(zip(names, schemas))
+
+
+async def iter_resolved(bundled: dict, dangling: list = None, executor=None, concurrency: int = None):
+    """
+    Resolve a bundle node by node, yielding each node as it is resolved.
+
+    Args:
+        bundled: The bundled dictionary, keyed by filename.
+        dangling: The bundle's dangling references, if already collected.
+        executor: The executor nodes are resolved in.
+        concurrency: The most nodes resolving at once; DEFAULT_CONCURRENCY
+            when None.
+
+    Yields:
+        ``("<id>.yaml", resolved_schema)`` pairs, in completion order. Nodes
+        without an id are skipped, as :func:`gen3schemadev.utils.resolve_bundle`
+        skips them.
+
+    Raises:
+        SchemaResolutionError: If a non-documentation reference cannot be
+            resolved. The nodes not yet resolved are cancelled.
+    """
+    resolver, schemas, references = await _run(executor, prepare_resolution, bundled, dangling)
+
+    def job(schema):
+        return lambda: _run(executor, resolver.resolve_references, schema, references)
+
+    jobs = ((index, job(schema)) for index, schema in enumerate(schemas))
+    async for _, task in _bounded_as_completed(jobs, concurrency or DEFAULT_CONCURRENCY):
+        try:
+            resolved = task.result()
+        except KeyError as exc:
+            raise SchemaResolutionError(str(exc).strip("'")) from exc
+        if resolved.get('id'):
+            yield f"{resolved['id']}.yaml", resolved
+
+
+async def resolve(bundled: dict, dangling: list = None, executor=None, concurrency: int = None) -> dict:
+    """
+    Resolve a bundle's references into standalone node schemas, off the event loop.
+
+    Arguments are as for :func:`iter_resolved`.
+
+    Returns:
+        Resolved node schemas keyed by ``"<id>.yaml"``, in bundle order - the
+        same dict :func:`gen3schemadev.api.resolve` returns.
+
+    Raises:
+        SchemaResolutionError: If a non-documentation reference cannot be resolved.
+    """
+    resolved = {}
+    async for name, schema in iter_resolved(bundled, dangling, executor, concurrency):
+        resolved[name] = schema
+    order = [f"{schema['id']}.yaml" for schema in bundled.values() if isinstance(schema, dict) and schema.get('id')]
+    return {name: resolved[name] for name in order if name in resolved}
+
+
+async def check_metaschema(schema: dict, metaschema: dict, verbose: bool = False) -> None:
+    """
+    Check one resolved node against the Gen3 metaschema without blocking the loop.
+
+    The async counterpart of
+    :func:`gen3schemadev.validators.metaschema_validator.validate_schema_with_metaschema`.
+    If cancelled, the ``check-jsonschema`` process is killed and its
+    temporary files removed.
+
+    Raises:
+        RuntimeError: If check-jsonschema is not installed or reports errors.
+        ValueError: If the schema or metaschema is not a dictionary.
+    """
+    _check_arguments(schema, metaschema)
+    tmp_dir = await asyncio.to_thread(tempfile.mkdtemp, prefix="gen3schemadev-metaschema-")
+    try:
+        cmd = await asyncio.to_thread(_write_check_files, tmp_dir, schema, metaschema, verbose)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError as exc:
+            raise RuntimeError("check-jsonschema tool not found.") from exc
+        try:
+            stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+    finally:
+        await asyncio.to_thread(shutil.rmtree, tmp_dir, ignore_errors=True)
+    _raise_for_check_result(schema, process.returncode, stdout.decode(), stderr.decode())
+
+
+async def iter_metaschema_checks(resolved: dict, metaschema: dict = None, concurrency: int = None):
+    """
+    Check resolved nodes against the metaschema, yielding each result as it completes.
+
+    Args:
+        resolved: Resolved node schemas keyed by ``"<id>.yaml"``.
+        metaschema: The metaschema; the packaged Gen3 metaschema when None.
+        concurrency: The most ``check-jsonschema`` processes at once;
+            DEFAULT_CONCURRENCY when None.
+
+    Yields:
+        ``(name, error)`` pairs, in completion order; ``error`` is None when
+        the node passes, and the failure message otherwise.
+    """
+    if metaschema is None:
+        metaschema = await asyncio.to_thread(get_metaschema)
+
+    def job(schema):
+        return lambda: check_metaschema(schema, metaschema)
+
+    jobs = ((name, job(schema)) for name, schema in resolved.items())
+    async for name, task in _bounded_as_completed(jobs, concurrency or DEFAULT_CONCURRENCY):
+        try:
+            task.result()
+        except RuntimeError as exc:
+            yield name, str(exc)
+        else:
+            yield name, None
+
+
+async def validate(
+    bundled: dict, rules=None, exclude=EXCLUDED_SCHEMAS, metaschema: bool = True,
+    executor=None, concurrency: int = None,
+) -> dict:
+    """
+    Run every check :func:`gen3schemadev.api.validate` runs, without blocking the loop.
+
+    Arguments and the report are as for :func:`gen3schemadev.api.validate`,
+    except that ``executor`` and ``concurrency`` replace ``workers`` and
+    ``use_cache``. The report's ``metaschema_errors`` are in bundle order
+    whatever order the checks finished in.
+    """
+    report, dangling = await _run(executor, api._static_checks, bundled, rules, exclude)
+
+    try:
+        resolved = await resolve(bundled, dangling, executor, concurrency)
+    except SchemaResolutionError as exc:
+        report['resolution_error'] = str(exc)
+        resolved = None
+
+    if resolved is not None:
+        api._record_resolution(report, bundled, resolved)
+        if metaschema:
+            errors = {}
+            async for name, error in iter_metaschema_checks(resolved, concurrency=concurrency):
+                if error is not None:
+                    errors[name] = error
+            report['metaschema_errors'] = {name: errors[name] for name in resolved if name in errors}
+
+    return api._conclude(report)
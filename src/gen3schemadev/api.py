@@ -0,0 +1,220 @@
+"""
+A library API for embedding gen3schemadev in other programs.
+
+The command line prints, exits and reads and writes files; a web service or a
+notebook wants none of that. These functions take and return plain dicts:
+
+- :func:`generate` - an input data model to the dictionary's files
+- :func:`bundle` - those files to a bundled dictionary
+- :func:`resolve` - a bundle to its resolved node schemas
+- :func:`validate` - a bundle to a report of everything wrong with it
+
+Every function here is safe to call from several threads at once:
+
+- Nothing changes the process's working directory or environment, and
+  nothing is written relative to the working directory.
+- Nothing is written to disk at all, except by :func:`validate` when the
+  metaschema check runs, which uses a temporary directory private to each
+  call. The resolution cache is off unless asked for; its entries are written
+  under unique names and renamed into place, so concurrent runs never see a
+  half-written entry.
+- Logging is not configured. Messages go to module loggers, and what happens
+  to them is up to the embedding program.
+- Inputs are not modified, and no two calls share mutable state: each result
+  is built from templates and presets loaded for that call.
+
+Typical usage::
+
+    from gen3schemadev import api
+
+    files = api.generate(yaml.safe_load(open("input.yaml")))
+    report = api.validate(api.bundle(files))
+    if not report["valid"]:
+        ...
+"""
+
+import os
+
+from gen3schemadev.generation import build_dictionary, bundle_files
+from gen3schemadev.lint import lint_bundle
+from gen3schemadev.resolve_cache import resolve_bundle_cached
+from gen3schemadev.schema.gen3_template import generate_gen3_template, get_metaschema
+from gen3schemadev.schema.input_schema import DataModel
+from gen3schemadev.utils import SchemaResolutionError, is_documentation_ref, resolve_bundle
+from gen3schemadev.validators.metaschema_validator import validate_schema_with_metaschema
+from gen3schemadev.validators.rule_validator import EXCLUDED_SCHEMAS, RuleValidator
+
+
+def generate(input_data: dict, only=None, keep_going: bool = False) -> dict:
+    """
+    Build a dictionary's files from an input data model.
+
+    Args:
+        input_data: The input YAML, parsed - the same content ``generate -i``
+            reads - or an already validated ``DataModel``.
+        only: Optional collection of node names to build; framework and
+            preset files are skipped when set.
+        keep_going: Build every node even after one fails, and raise all the
+            failures together.
+
+    Returns:
+        The dictionary's files, keyed by filename (``subject.yaml``,
+        ``_definitions.yaml``...), exactly as ``generate`` would write them.
+
+    Raises:
+        pydantic.ValidationError: If the input does not describe a valid model.
+        ValueError: If ``only`` names nodes the input does not define.
+        gen3schemadev.generation.NodeBuildError: With ``keep_going``, if any
+            node failed to build; its ``failures`` name each node and its error.
+    """
+    model = input_data if isinstance(input_data, DataModel) else DataModel.model_validate(input_data)
+    files, _ = build_dictionary(model, generate_gen3_template(get_metaschema()), only=only, keep_going=keep_going)
+    return files
+
+
+def bundle(files: dict) -> dict:
+    """
+    Bundle a dictionary's files, as ``bundle`` does for a directory.
+
+    Args:
+        files: Schemas keyed by filename, from :func:`generate` or read from
+            a dictionary directory.
+
+    Returns:
+        The bundled dictionary, keyed by filename in sorted order.
+    """
+    return bundle_files(files)
+
+
+def resolve(bundled: dict, workers: int = None, use_cache: bool = False) -> dict:
+    """
+    Resolve a bundle's references into standalone node schemas.
+
+    Args:
+        bundled: The bundled dictionary, keyed by filename.
+        workers: Resolve nodes across this many processes.
+        use_cache: Reuse, and store, resolutions in the on-disk cache shared
+            with the command line. Off by default so a call touches no files.
+
+    Returns:
+        Resolved node schemas keyed by ``"<id>.yaml"``.
+
+    Raises:
+        SchemaResolutionError: If a non-documentation reference cannot be resolved.
+    """
+    if use_cache:
+        return resolve_bundle_cached(bundled, use_cache=True, workers=workers)
+    return resolve_bundle(bundled, workers=workers)
+
+
+def validate(
+    bundled: dict, rules=None, exclude=EXCLUDED_SCHEMAS, metaschema: bool = True,
+    workers: int = None, use_cache: bool = False,
+) -> dict:
+    """
+    Run every check ``validate`` runs and report the results instead of printing them.
+
+    Unlike the command, this does not stop at the first failing stage: rule
+    violations do not prevent resolution, so one call reports everything that
+    can be found. Only the metaschema check depends on resolution succeeding.
+
+    Args:
+        bundled: The bundled dictionary, keyed by filename.
+        rules: Rule names to run, as from
+            :func:`gen3schemadev.validators.rule_validator.select_rules`. All
+            rules when None.
+        exclude: Schema names, without extension, the rule checks skip.
+        metaschema: Check each resolved node against the Gen3 metaschema.
+            This runs ``check-jsonschema`` once per node, which dominates the
+            run time; pass False for the in-process checks only.
+        workers: Resolve nodes across this many processes.
+        use_cache: Passed on to :func:`resolve`.
+
+    Returns:
+        A dict with:
+
+        - ``valid``: True when nothing below is an error.
+        - ``null_descriptions``: ``(source, path)`` of each ``description: null``.
+          A warning, not an error.
+        - ``documentation_refs``: dangling ``$ref``s inside ``term`` blocks, as
+          ``(source, path, ref)``. A warning, not an error.
+        - ``rule_violations``: ``{'schema', 'rule', 'message', 'source'}`` dicts.
+        - ``resolution_error``: why resolution failed, or None.
+        - ``unresolved``: node files that went into resolution but did not
+          come out.
+        - ``metaschema_errors``: ``{"<id>.yaml": message}`` for nodes failing
+          the metaschema check.
+        - ``resolved``: the resolved node schemas, or None if resolution failed.
+    """
+    report, dangling = _static_checks(bundled, rules, exclude)
+
+    try:
+        if use_cache:
+            resolved = resolve_bundle_cached(bundled, use_cache=True, dangling=dangling, workers=workers)
+        else:
+            resolved = resolve_bundle(bundled, dangling=dangling, workers=workers)
+    except SchemaResolutionError as exc:
+        report['resolution_error'] = str(exc)
+        resolved = None
+
+    if resolved is not None:
+        _record_resolution(report, bundled, resolved)
+        if metaschema:
+            gen3_metaschema = get_metaschema()
+            for name, schema in resolved.items():
+                try:
+                    validate_schema_with_metaschema(schema, metaschema=gen3_metaschema)
+                except RuntimeError as exc:
+                    report['metaschema_errors'][name] = str(exc)
+
+    return _conclude(report)
+
+
+def _static_checks(bundled: dict, rules, exclude):
+    """
+    Run the lint and rule stages of :func:`validate`.
+
+    Returns:
+        A tuple ``(report, dangling)``: the report with every stage before
+        resolution filled in, and the bundle's dangling references, for
+        resolution to reuse.
+    """
+    findings = lint_bundle(bundled)
+    dangling = findings['dangling_refs']
+    report = {
+        'valid': True,
+        'null_descriptions': findings['null_descriptions'],
+        'documentation_refs': [hit for hit in dangling if is_documentation_ref(hit[1])],
+        'rule_violations': [],
+        'resolution_error': None,
+        'unresolved': [],
+        'metaschema_errors': {},
+        'resolved': None,
+    }
+
+    for schema_name, schema in bundled.items():
+        source = os.path.splitext(schema_name)[0]
+        if source in exclude:
+            continue
+        for violation in RuleValidator(schema, rules=rules).validate():
+            violation['source'] = source
+            report['rule_violations'].append(violation)
+    return report, dangling
+
+
+def _record_resolution(report: dict, bundled: dict, resolved: dict) -> None:
+    """Store a successful resolution, and the node files it did not produce, in ``report``."""
+    report['resolved'] = resolved
+    expected = {
+        os.path.splitext(name)[0] for name in bundled
+        if not os.path.basename(name).startswith('_')
+    }
+    report['unresolved'] = sorted(expected - {os.path.splitext(name)[0] for name in resolved})
+
+
+def _conclude(report: dict) -> dict:
+    report['valid'] = not (
+        report['rule_violations'] or report['resolution_error']
+        or report['unresolved'] or report['metaschema_errors']
+    )
+    return report
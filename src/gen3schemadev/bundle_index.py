@@ -0,0 +1,305 @@
+"""
+Reading single nodes from a bundle without parsing all of it.
+
+``read_json`` parses the whole bundle, which is most of the cost of a command
+that only needs one or two nodes - templates for one node, say. A bundle
+*index* records the byte range of each top-level entry of the bundle, and of
+each entry of ``_definitions.yaml`` and ``_terms.yaml`` within it.
+:class:`BundleReader` memory-maps the bundle and parses only the entries asked
+for, plus the definitions they reference, so the cost follows the size of the
+nodes rather than of the dictionary.
+
+``bundle --index`` writes the index beside the bundle, ``schema.json`` getting
+``schema.index.json``. Without one, or with one recorded for a file of another
+size, the reader scans the bundle once itself. Each entry read is checked
+against the key the index names, so a bundle rewritten to the same size is
+caught rather than misread.
+"""
+
+import json
+import logging
+import mmap
+import os
+
+from gen3schemadev import jsonio
+from gen3schemadev.refs import _REFERENCE_FILES, referenced_keys
+from gen3schemadev.utils import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 'gen3schemadev-bundle-index'
+INDEX_VERSION = 1
+
+_WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+
+
+class BundleIndexError(ValueError):
+    """Raised when a bundle cannot be indexed, or no longer matches its index."""
+
+
+def index_path(bundle_path: str) -> str:
+    """Return where the index of the bundle at ``bundle_path`` lives."""
+    root, _ = os.path.splitext(bundle_path)
+    return f"{root}.index.json"
+
+
+def _skip(text, pos):
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def _scan_object(text, pos, nested=()):
+    """
+    Scan the JSON object starting at ``pos``.
+
+    Returns:
+        ``(entries, inner, end)``: ``entries`` maps each key to the character
+        range of its ``"key": value`` member; ``inner`` maps each key in
+        ``nested`` whose value is an object to that object's own entries;
+        ``end`` is the position after the closing brace.
+    """
+    if text[pos:pos + 1] != '{':
+        raise BundleIndexError(f"expected an object at character {pos}")
+    entries, inner = {}, {}
+    pos = _skip(text, pos + 1)
+    if text[pos:pos + 1] == '}':
+        return entries, inner, pos + 1
+    while True:
+        if text[pos:pos + 1] != '"':
+            raise BundleIndexError(f"expected a key at character {pos}")
+        start = pos
+        key, pos = json.decoder.scanstring(text, pos + 1)
+        pos = _skip(text, pos)
+        if text[pos:pos + 1] != ':':
+            raise BundleIndexError(f"expected ':' at character {pos}")
+        pos = _skip(text, pos + 1)
+        if key in nested and text[pos:pos + 1] == '{':
+            inner[key], _, pos = _scan_object(text, pos)
+        else:
+            try:
+                _, pos = _decoder.raw_decode(text, pos)
+            except json.JSONDecodeError as exc:
+                raise BundleIndexError(str(exc)) from exc
+        entries[key] = (start, pos)
+        pos = _skip(text, pos)
+        if text[pos:pos + 1] == '}':
+            return entries, inner, pos + 1
+        if text[pos:pos + 1] != ',':
+            raise BundleIndexError(f"expected ',' or '}}' at character {pos}")
+        pos = _skip(text, pos + 1)
+
+
+def _to_bytes(text, ranges):
+    """Convert character ranges of ``text`` to byte ranges of its UTF-8 encoding."""
+    if text.isascii():
+        return {key: list(span) for key, span in ranges.items()}
+    positions = sorted({pos for span in ranges.values() for pos in span})
+    offsets, char, byte = {}, 0, 0
+    for pos in positions:
+        byte += len(text[char:pos].encode('utf-8'))
+        char = pos
+        offsets[pos] = byte
+    return {key: [offsets[start], offsets[end]] for key, (start, end) in ranges.items()}
+
+
+def scan_bundle(data: bytes) -> dict:
+    """
+    Index a bundle's bytes.
+
+    Args:
+        data: The bundle file's content.
+
+    Returns:
+        The index: ``size``, ``entries`` (filename to byte range) and
+        ``nested`` (reference file to entry key to byte range). Each range
+        covers a whole ``"key": value`` member.
+
+    Raises:
+        BundleIndexError: If ``data`` is not a JSON object.
+    """
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError as exc:
+        raise BundleIndexError(str(exc)) from exc
+    entries, inner, end = _scan_object(text, _skip(text, 0), nested=_REFERENCE_FILES)
+    if _skip(text, end) != len(text):
+        raise BundleIndexError(f"unexpected data after the bundle at character {end}")
+    return {
+        'format': INDEX_FORMAT,
+        'version': INDEX_VERSION,
+        'size': len(data),
+        'entries': _to_bytes(text, entries),
+        'nested': {name: _to_bytes(text, ranges) for name, ranges in inner.items()},
+    }
+
+
+def build_index(bundle_path: str) -> dict:
+    """Read and index the bundle at ``bundle_path``."""
+    with open(bundle_path, 'rb') as handle:
+        return scan_bundle(handle.read())
+
+
+def write_index(index: dict, file_path: str) -> None:
+    """Write a bundle index to ``file_path``."""
+    write_json(index, file_path)
+
+
+def read_index(bundle_path: str, size: int) -> tuple:
+    """
+    Return the index beside ``bundle_path`` if it was made for a file of ``size`` bytes.
+
+    A missing index is the usual case and a stale one only a lost shortcut,
+    so neither is an error.
+
+    Returns:
+        A tuple of (index, problem). ``index`` is the index, or None.
+        ``problem`` says why an index beside the bundle was not used, and is
+        None when it was used or there is none.
+    """
+    path = index_path(bundle_path)
+    if not os.path.exists(path):
+        return None, None
+    try:
+        index = read_json(path)
+    except (OSError, ValueError) as exc:
+        return None, f"it cannot be read: {exc}"
+    if not isinstance(index, dict) or index.get('format') != INDEX_FORMAT \
+            or index.get('version') != INDEX_VERSION:
+        return None, "it is not a bundle index this version of gen3schemadev can read"
+    if index.get('size') != size:
+        return None, "it indexes a different version of the bundle"
+    return index, None
+
+
+class BundleReader:
+    """
+    Read entries of a bundle one at a time, parsing only what is asked for.
+
+    Use as a context manager, or call :meth:`close`::
+
+        with BundleReader("schema.json") as reader:
+            sub_bundle = reader.sub_bundle(["subject.yaml"])
+
+    Args:
+        bundle_path: A bundle written by ``bundle``, or any JSON object.
+
+    Attributes:
+        index_problem: Why the index beside the bundle was not used, or None
+            when it was used or there is none.
+
+    Raises:
+        BundleIndexError: If the bundle is compressed, or has no usable
+            index and cannot be scanned for one.
+    """
+
+    def __init__(self, bundle_path: str):
+        if jsonio.is_compressed(bundle_path):
+            raise BundleIndexError(f"{bundle_path} is compressed, so it cannot be read in place")
+        self.path = bundle_path
+        self._handle = open(bundle_path, 'rb')
+        try:
+            size = os.fstat(self._handle.fileno()).st_size
+            # mmap cannot map an empty file; scanning it reports the error.
+            self._data = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+            index, self.index_problem = read_index(bundle_path, size)
+            if index is None:
+                logger.info("No usable index for %s; scanning it", bundle_path)
+                index = scan_bundle(bytes(self._data))
+        except BaseException:
+            self.close()
+            raise
+        self.index = index
+
+    def close(self) -> None:
+        """Release the mapping and the file."""
+        if isinstance(getattr(self, '_data', None), mmap.mmap):
+            self._data.close()
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def names(self) -> list:
+        """Return the bundle's filenames, in bundle order."""
+        return list(self.index['entries'])
+
+    def __contains__(self, name) -> bool:
+        return name in self.index['entries']
+
+    def _member(self, name, span):
+        start, end = span
+        try:
+            member = json.loads(b'{' + self._data[start:end] + b'}')
+        except ValueError:
+            member = {}
+        if list(member) != [name]:
+            raise BundleIndexError(
+                f"{self.path} no longer matches its index at {name!r}; write the index again"
+            )
+        return member[name]
+
+    def get(self, name: str):
+        """
+        Parse and return one top-level entry.
+
+        Raises:
+            KeyError: If the bundle has no entry ``name``.
+        """
+        return self._member(name, self.index['entries'][name])
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def sub_bundle(self, files) -> dict:
+        """
+        Parse the entries ``files`` need in order to be resolved.
+
+        The same as :func:`gen3schemadev.refs.definition_closure` of the whole
+        bundle, but parsing only the named files, the reference-file entries
+        they use, and every other file starting with ``_``.
+
+        Args:
+            files: Filenames of the schemas to keep.
+
+        Returns:
+            A bundle with the same key order as the file.
+
+        Raises:
+            KeyError: If a name in ``files`` is not in the bundle.
+        """
+        files = set(files)
+        missing = files - set(self.index['entries'])
+        if missing:
+            raise KeyError(', '.join(sorted(missing)))
+        parsed = {name: self.get(name) for name in self.names() if name in files}
+
+        nested = self.index['nested']
+        pools = {name: {} for name in _REFERENCE_FILES if name in nested}
+        needed = set()
+        for schema in parsed.values():
+            needed |= referenced_keys(schema, local=False)
+        pending = list(needed)
+        while pending:
+            key = pending.pop()
+            for name, pool in pools.items():
+                if key in nested[name] and key not in pool:
+                    pool[key] = self._member(key, nested[name][key])
+                    for found in referenced_keys(pool[key], local=True) - needed:
+                        needed.add(found)
+                        pending.append(found)
+
+        closure = {}
+        for name in self.names():
+            if name in pools:
+                order = nested[name]
+                closure[name] = {key: pools[name][key] for key in order if key in pools[name]}
+            elif name in parsed:
+                closure[name] = parsed[name]
+            elif name.startswith('_'):
+                closure[name] = self.get(name)
+        return closure
@@ -0,0 +1,182 @@
+"""
+Narrowing validation to what a change can affect.
+
+``validate -y schema/`` checks every node, which in a pre-commit hook means a
+one-line edit costs as much as the whole dictionary. ``--changed-since REV``
+and ``--staged`` ask git which YAML files changed and validate only what
+those changes can affect:
+
+- a changed node, and every node linking to it - a renamed or deleted node
+  breaks its children's links;
+- for ``_definitions.yaml`` and ``_terms.yaml``, the top-level entries whose
+  content changed, found by comparing against the file at ``REV``; then every
+  entry referencing one of those, transitively; then every node referencing
+  any of them.
+
+The result is a smaller bundle - those nodes, and only the definitions they
+use (:func:`gen3schemadev.refs.definition_closure`) plus the changed ones -
+that goes through the usual rule, dangling-reference and metaschema checks.
+
+Git reports which files changed; their content is read from the working
+tree. Under ``--staged`` that is the content being committed whenever the
+unstaged changes are stashed, which is what pre-commit does.
+"""
+
+import os
+import subprocess
+
+import yaml
+
+from gen3schemadev.diff import flatten_links
+from gen3schemadev.refs import _REFERENCE_FILES, definition_closure, referenced_keys
+
+
+class GitError(RuntimeError):
+    """Raised when git cannot say what changed."""
+
+
+def _git(directory, *args) -> str:
+    try:
+        result = subprocess.run(
+            ['git', '-C', directory, *args], capture_output=True, text=True, check=False
+        )
+    except FileNotFoundError as exc:
+        raise GitError("git is not installed or not on PATH") from exc
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip() or f"git {' '.join(args)} exited {result.returncode}")
+    return result.stdout
+
+
+def _is_schema(name):
+    # bundle_yamls reads the top level of the directory only.
+    return '/' not in name and name.endswith(('.yaml', '.yml'))
+
+
+def changed_files(directory: str, since: str = None, staged: bool = False) -> list:
+    """
+    List the dictionary files in ``directory`` that changed.
+
+    Args:
+        directory: The dictionary directory, inside a git work tree.
+        since: A revision; files differing between it and the working tree,
+            plus untracked files, are changed.
+        staged: Instead, files whose staged content differs from HEAD.
+
+    Returns:
+        Sorted filenames, relative to ``directory``. Deleted files are
+        included; they exist at the baseline but not on disk.
+
+    Raises:
+        GitError: If ``directory`` is not in a work tree or ``since`` is not
+            a revision.
+    """
+    if not staged and (not since or since.startswith('-')):
+        raise GitError(f"not a revision: {since!r}")
+    if staged:
+        names = _git(directory, 'diff', '--cached', '--name-only', '--relative', '--', '.').split('\n')
+    else:
+        names = _git(directory, 'diff', '--name-only', '--relative', since, '--', '.').split('\n')
+        names += _git(directory, 'ls-files', '--others', '--exclude-standard', '--', '.').split('\n')
+    return sorted({name for name in names if name and _is_schema(name)})
+
+
+def previous_version(directory: str, name: str, rev: str):
+    """
+    Return a file as it was at ``rev``, parsed, or None if it did not exist.
+
+    Raises:
+        GitError: If ``rev`` is not a revision.
+    """
+    try:
+        text = _git(directory, 'show', f"{rev}:./{name}")
+    except GitError:
+        # Absent at rev, or rev itself is bad; tell the two apart.
+        _git(directory, 'rev-parse', '--verify', '--quiet', f"{rev}^{{commit}}")
+        return None
+    return yaml.safe_load(text)
+
+
+def changed_keys(old, new) -> set:
+    """Return the top-level keys added, removed or changed between two versions of a file."""
+    old = old if isinstance(old, dict) else {}
+    new = new if isinstance(new, dict) else {}
+    return {key for key in old.keys() | new.keys() if old.get(key, object()) != new.get(key, object())}
+
+
+def affected_nodes(bundle: dict, files, keys) -> list:
+    """
+    Expand changed files and definition keys to the nodes they can affect.
+
+    Args:
+        bundle: The whole bundled dictionary, as it is now.
+        files: Changed filenames, including deleted ones.
+        keys: Changed top-level keys of ``_definitions.yaml`` and ``_terms.yaml``.
+
+    Returns:
+        Node filenames of ``bundle`` to validate, in bundle order.
+    """
+    nodes = [name for name in bundle if not name.startswith('_')]
+
+    # Definitions referencing a changed definition have changed in effect.
+    pools = [bundle[name] for name in _REFERENCE_FILES if isinstance(bundle.get(name), dict)]
+    uses = {}
+    for pool in pools:
+        for key, value in pool.items():
+            for target in referenced_keys(value, local=True):
+                uses.setdefault(target, set()).add(key)
+    keys = set(keys)
+    pending = list(keys)
+    while pending:
+        for user in uses.get(pending.pop(), ()):
+            if user not in keys:
+                keys.add(user)
+                pending.append(user)
+
+    edited = [name for name in files if name in bundle and not name.startswith('_')]
+    affected = set(edited)
+    if keys:
+        affected.update(name for name in nodes if referenced_keys(bundle[name], local=False) & keys)
+
+    # Children of an edited node: anything linking to it, under its id now
+    # or, for a deleted or renamed node, under its filename. A definition
+    # change cannot rename a node, so it does not reach the children.
+    targets = {os.path.splitext(name)[0] for name in files if not name.startswith('_')}
+    targets.update(bundle[name].get('id') for name in edited if isinstance(bundle[name], dict))
+    for name in nodes:
+        if name in affected or not isinstance(bundle[name], dict):
+            continue
+        links = flatten_links(bundle[name].get('links')).values()
+        if any(link.get('target_type') in targets for link in links):
+            affected.add(name)
+
+    return [name for name in nodes if name in affected]
+
+
+def changed_bundle(bundle: dict, directory: str, since: str = None, staged: bool = False):
+    """
+    Return the part of ``bundle`` a change can affect, ready for validation.
+
+    Args:
+        bundle: The bundle of ``directory`` as it is now.
+        directory: The dictionary directory.
+        since: Compare against this revision, as for :func:`changed_files`.
+        staged: Compare the staged files against HEAD instead.
+
+    Returns:
+        A tuple ``(sub_bundle, files, nodes)``: the bundle to validate - the
+        affected nodes, the definitions they use and the changed definitions
+        - the changed files, and the affected node filenames.
+
+    Raises:
+        GitError: If git cannot say what changed.
+    """
+    files = changed_files(directory, since=since, staged=staged)
+    baseline = 'HEAD' if staged else since
+    changed = set()
+    for name in _REFERENCE_FILES:
+        if name in files:
+            changed |= changed_keys(previous_version(directory, name, baseline), bundle.get(name))
+
+    nodes = affected_nodes(bundle, files, changed)
+    # Changed definitions are checked even if no node uses them any more.
+    return definition_closure(bundle, nodes, keys=changed), files, nodes
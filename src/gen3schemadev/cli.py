@@ -1,9 +1,9 @@
 import argparse
+import json
 import logging
 import sys
 import os
 
-import yaml
 from pydantic import ValidationError
 
 from gen3schemadev.schema.gen3_template import (
@@ -18,27 +18,57 @@ from gen3schemadev.schema.gen3_template import (
     get_input_example_text
 )
 from gen3schemadev.utils import (
-    write_yaml, load_yaml, bundle_yamls, write_json, resolve_schema, read_json,
+    write_yaml, bundle_yamls, write_json,
     create_dir_if_not_exists, is_documentation_ref, SchemaResolutionError,
 )
+from gen3schemadev.resolve_cache import resolve_bundle_cached
 from gen3schemadev.schema.input_schema import DataModel
+from gen3schemadev.inputs import load_input, InputFileError, InputLayoutError
+from gen3schemadev.diff import diff_bundles, format_diff
+from gen3schemadev.bundle_index import BundleIndexError, BundleReader, build_index, index_path, write_index
+from gen3schemadev.compiled import (
+    COMPILED_FORMAT, compile_bundle, write_compiled, load_bundle, CompiledArtefactError,
+    resolved_sidecar, sidecar_path, write_sidecar,
+)
 from gen3schemadev.converter import get_node_names, populate_template
 from gen3schemadev.validators.metaschema_validator import validate_schema_with_metaschema
 from importlib.metadata import version
 from gen3schemadev.ddvis import visualise_with_docker
-from gen3schemadev.validators.rule_validator import RuleValidator
-from gen3schemadev.refs import find_null_descriptions, find_dangling_refs
-from gen3schemadev import messages
+from gen3schemadev.staticvis import write_static_visualisation
+from gen3schemadev.validators.data_validator import (
+    DEFAULT_MAX_ERRORS, find_data_files, validate_data,
+)
+from gen3schemadev.simulator import DEFAULT_BATCH_SIZE, SimulationError, simulate
+from gen3schemadev.templates import render_templates, write_templates
+from gen3schemadev.hoist import hoist_properties
+from gen3schemadev.changes import GitError, changed_bundle
+from gen3schemadev.sharding import (
+    ShardReportError, load_report, merge_reports, parse_shard, run_shard, write_report,
+)
+from gen3schemadev.validators.rule_validator import (
+    EXCLUDED_SCHEMAS,
+    RuleValidator,
+    RuleSelectionError,
+    load_plugin_rules,
+    load_rules_module,
+    select_rules,
+)
+from gen3schemadev.refs import find_dangling_refs, prune_bundle
+from gen3schemadev.lint import lint_bundle
+from gen3schemadev import jsonio, messages, tracing
 from gen3schemadev.generation import (
+    NodeBuildError,
     build_dictionary,
     plan_write,
     find_orphans,
     diff_against_disk,
     write_dictionary,
     find_shadowed_properties,
+    bundle_files,
 )
 
 
+
 def print_null_description_warning(hits):
     """
     Print a warning block listing every null-valued 'description' key found
@@ -57,6 +87,605 @@ def print_null_description_warning(hits):
         print(f"  - {hit}")
 
 
+def resolve_or_exit(bundle, target, use_cache=True):
+    """
+    Resolve a bundle, exiting non-zero if it cannot be resolved.
+
+    An unresolvable dictionary is reported the way validate reports it. In
+    particular an artefact whose resolved schemas are missing is of no use to
+    the commands that load it, so it is not written half-compiled.
+    """
+    try:
+        return resolve_bundle_cached(bundle, use_cache)
+    except SchemaResolutionError as exc:
+        dangling = find_dangling_refs(bundle)
+        print()
+        print(messages.unresolvable_dictionary(
+            target, str(exc),
+            [hit for hit in dangling if not is_documentation_ref(hit[1])],
+        ))
+        sys.exit(1)
+
+
+def write_compiled_or_exit(bundle, path, target, use_cache=True, resolved=None):
+    """Compile a bundle and write the artefact, exiting non-zero if it cannot be resolved."""
+    if resolved is None:
+        resolved = resolve_or_exit(bundle, target, use_cache)
+    write_compiled(compile_bundle(bundle, resolved=resolved), path)
+    print(f"Wrote compiled artefact to: {path}")
+
+
+def select_rules_or_exit(args):
+    """
+    Load custom rules and apply --enable/--disable, exiting non-zero on failure.
+
+    Installed plugins are loaded first, then each --rules-module in order.
+
+    Returns:
+        The rule names to run.
+    """
+    try:
+        load_plugin_rules()
+    except Exception as exc:
+        print(messages.unloadable_rules("installed rule plugins", exc))
+        sys.exit(1)
+    for spec in args.rules_modules or []:
+        try:
+            load_rules_module(spec)
+        except Exception as exc:
+            print(messages.unloadable_rules(spec, exc))
+            sys.exit(1)
+
+    def names(value):
+        return [n.strip() for n in value.split(',') if n.strip()] if value else None
+
+    try:
+        return select_rules(enable=names(args.enable), disable=names(args.disable))
+    except RuleSelectionError as exc:
+        print(messages.rule_selection_error(exc))
+        sys.exit(1)
+
+
+def print_rule_timings(timings):
+    """Print how long each rule took across the bundle, slowest first."""
+    total = sum(timings.values()) or 1.0
+    width = max([len("rule")] + [len(rule) for rule in timings])
+    print()
+    print(f"{'rule':<{width}}  {'total ms':>10}  {'share':>6}")
+    for rule, seconds in sorted(timings.items(), key=lambda item: item[1], reverse=True):
+        print(f"{rule:<{width}}  {seconds * 1000:>10.2f}  {seconds / total:>6.1%}")
+
+
+def add_jobs_argument(parser):
+    """Add the --jobs option shared by validate and build."""
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Resolve nodes across this many processes; worthwhile for large dictionaries on multi-core machines"
+    )
+
+
+def add_trace_argument(parser):
+    """Add the --trace option every subcommand takes."""
+    parser.add_argument(
+        "--trace",
+        metavar="OUT.json",
+        help="Record where the run spends its time and write it as a Chrome trace-event file, "
+             "for chrome://tracing or https://ui.perfetto.dev"
+    )
+
+
+def write_trace(tracer, path):
+    """Write a recorded trace, warning rather than failing if it cannot be written."""
+    try:
+        tracer.write(path)
+    except OSError as exc:
+        print(messages.cannot_write_trace(path, exc))
+        return
+    print(f"Wrote trace of {len(tracer.events)} spans to: {path}")
+
+
+def add_rule_arguments(parser):
+    """Add the rule selection and timing options shared by validate and build."""
+    parser.add_argument(
+        "--rules-module",
+        action="append",
+        dest="rules_modules",
+        metavar="MODULE",
+        help="Import custom rules from a module name or .py file; may be given more than once"
+    )
+    parser.add_argument(
+        "--enable",
+        help="Comma-separated rule names to run; all rules run when omitted"
+    )
+    parser.add_argument(
+        "--disable",
+        help="Comma-separated rule names to skip"
+    )
+    parser.add_argument(
+        "--rule-timings",
+        action="store_true",
+        dest="rule_timings",
+        help="Print how long each rule took across the whole dictionary"
+    )
+
+
+def load_resolved_or_exit(path, use_cache=True):
+    """
+    Load a bundle or compiled artefact and return its resolved node schemas.
+
+    A compiled artefact already carries them; a plain bundle is resolved (or
+    read back from the resolution cache). Either failure is reported with its
+    help message and exits, as every command that needs resolved schemas
+    handles them the same way.
+    """
+    try:
+        bundle, resolved, _, problem = load_bundle(path, with_source=True)
+    except CompiledArtefactError as exc:
+        print(messages.unusable_compiled_artefact(path, exc))
+        sys.exit(1)
+    if problem:
+        print(messages.ignored_sidecar(sidecar_path(path), problem))
+    if resolved is None:
+        resolved = resolve_or_exit(bundle, path, use_cache=use_cache)
+    return resolved
+
+
+def load_node_schemas_or_exit(path, nodes, use_cache=True):
+    """
+    Return the resolved schemas of only the named nodes of a bundle.
+
+    A plain bundle is read through a BundleReader, which parses the nodes and
+    the definitions they reference and nothing else; with the bundle's index
+    beside it, the rest of the file is never read. A compiled artefact, or a
+    bundle that cannot be read that way, is loaded whole.
+    """
+    bundle = None
+    try:
+        with BundleReader(path) as reader:
+            if reader.index_problem:
+                print(messages.ignored_index(index_path(path), reader.index_problem))
+            if not ('format' in reader and reader.get('format') == COMPILED_FORMAT):
+                known = [os.path.splitext(name)[0] for name in reader.names() if not name.startswith('_')]
+                unknown = set(nodes) - set(known)
+                if unknown:
+                    print(messages.only_unknown_nodes(unknown, known))
+                    sys.exit(1)
+                bundle = reader.sub_bundle(f"{node}.yaml" for node in nodes)
+    except BundleIndexError:
+        # Not a JSON object, or no longer matching its index: load_bundle
+        # below reads it whole and reports a broken file as usual.
+        pass
+    if bundle is None:
+        resolved = load_resolved_or_exit(path, use_cache=use_cache)
+        known = [schema.get('id') for schema in resolved.values()]
+        unknown = set(nodes) - set(known)
+        if unknown:
+            print(messages.only_unknown_nodes(unknown, known))
+            sys.exit(1)
+        return {name: schema for name, schema in resolved.items() if schema.get('id') in nodes}
+    return resolve_or_exit(bundle, path, use_cache=use_cache)
+
+
+def record_count(text):
+    """argparse type for a record count given as ``1000`` or ``1e6``."""
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {text!r}")
+    try:
+        whole = int(value)
+    except (OverflowError, ValueError):
+        # inf and nan have no integer value.
+        raise argparse.ArgumentTypeError(f"not a whole, non-negative number: {text!r}")
+    if value < 0 or value != whole:
+        raise argparse.ArgumentTypeError(f"not a whole, non-negative number: {text!r}")
+    return whole
+
+
+def batch_size(text):
+    """argparse type for a batch size: a whole number of at least 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a whole number: {text!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {text!r}")
+    return value
+
+
+def shard_spec(text):
+    """argparse type for a shard given as ``i/N``."""
+    try:
+        return parse_shard(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc))
+
+
+def load_model_or_exit(input_path, use_cache=True):
+    """
+    Load and validate the input data model, exiting non-zero with a readable
+    message if it cannot be parsed or does not describe a valid model.
+
+    Args:
+        input_path: An input YAML file or input directory.
+        use_cache: Set False to bypass the input parse cache.
+
+    Returns:
+        The validated DataModel.
+    """
+    print(f"Loading input YAML from: {input_path}")
+    try:
+        data = load_input(input_path, use_cache=use_cache)
+    except InputFileError as exc:
+        # A punctuation slip in the input used to surface as a raw parser
+        # traceback. One consumer repo shipped an unparseable input for
+        # weeks without anyone realising generation had stopped working.
+        # The path is the failing file, which in a split input is not
+        # input_path itself.
+        print()
+        print(messages.unparseable_input(exc.path, exc.error))
+        sys.exit(1)
+    except InputLayoutError as exc:
+        print()
+        print(messages.invalid_input_directory(input_path, exc))
+        sys.exit(1)
+    print("Validating input data model...")
+    try:
+        return DataModel.model_validate(data)
+    except ValidationError as exc:
+        print()
+        print(messages.invalid_input(input_path, exc))
+        sys.exit(1)
+
+
+def print_build_report(validated_model, merge_summaries):
+    """Print what each preset merge did, and any shadowed-property warning."""
+    for summary in merge_summaries:
+        print(messages.extends_summary(
+            summary['node'], summary['preset'],
+            summary['inherited'], summary['overridden'], summary['added'],
+            implicit=summary.get('implicit', False),
+        ))
+
+    shadowed = find_shadowed_properties(validated_model)
+    if shadowed:
+        print()
+        print(messages.shadowed_property_report(shadowed))
+
+
+def build_dictionary_or_exit(validated_model, converter_template, input_path, only=None, keep_going=False):
+    """
+    Build the dictionary in memory, exiting with every failing node under --keep-going.
+
+    Without ``keep_going`` the first failure propagates exactly as before.
+    """
+    try:
+        return build_dictionary(validated_model, converter_template, only=only, keep_going=keep_going)
+    except NodeBuildError as exc:
+        print(messages.node_build_failures(input_path, exc.failures))
+        sys.exit(1)
+
+
+def print_hoist_report(report):
+    """Print what generate --hoist moved, and what it saved."""
+    entries = report['entries']
+    if not entries:
+        print("No property definition is repeated often enough to be worth hoisting.")
+        return
+    (bytes_before, bytes_after), (parse_before, parse_after) = report['bundle_bytes'], report['parse_seconds']
+    print(
+        f"Hoisted {len(entries)} property definitions, used by {sum(entries.values())} properties, "
+        f"into _definitions.yaml: {', '.join(sorted(entries))}"
+    )
+    print(
+        f"  bundle {bytes_before:,} -> {bytes_after:,} bytes ({bytes_after - bytes_before:+,}), "
+        f"JSON parse {parse_before * 1000:.2f} -> {parse_after * 1000:.2f} ms"
+    )
+
+
+def prune_or_report(bundle):
+    """Prune unused reference-file entries from a bundle, printing what went."""
+    pruned, removed = prune_bundle(bundle)
+    for name, keys in removed.items():
+        print(f"Removed {len(keys)} of {len(bundle[name])} entries of {name} that nothing references"
+              + (f": {', '.join(keys)}" if keys else "."))
+    before, after = len(json.dumps(bundle)), len(json.dumps(pruned))
+    print(f"  bundle {before:,} -> {after:,} bytes ({after - before:+,})")
+    return pruned
+
+
+def check_write_or_exit(files, output_dir, input_path, may_overwrite, input_driven, check_orphans=True):
+    """
+    Refuse, before anything is written, a write the user has not consented to.
+
+    Args:
+        files: The in-memory dictionary from build_dictionary.
+        output_dir: Target directory.
+        input_path: The input, named in the refusal's suggested commands.
+        may_overwrite: True when existing files may be replaced.
+        input_driven: True under --input-driven, where an orphan is an error.
+        check_orphans: False when only some nodes are being written.
+    """
+    plan = plan_write(files, output_dir)
+    if plan['overwrite'] and not may_overwrite:
+        print()
+        print(messages.overwrite_refusal(
+            output_dir, plan['overwrite'], plan['create'], input_path
+        ))
+        sys.exit(1)
+
+    orphans = find_orphans(files, output_dir) if check_orphans else []
+    if orphans:
+        print()
+        print(messages.orphan_report(output_dir, orphans, as_error=input_driven))
+        if input_driven:
+            sys.exit(1)
+
+
+def write_dictionary_or_exit(files, output_dir):
+    """Write the dictionary, exiting non-zero with the cannot-write message on failure."""
+    try:
+        written = write_dictionary(files, output_dir)
+    except OSError as exc:
+        print()
+        print(messages.cannot_write(output_dir, exc))
+        sys.exit(1)
+    print(f"Wrote {len(written)} files to {output_dir}")
+
+
+def validate_bundle(
+    schema_dict, target, metaschema, exclude_schema_list, precompiled=None, use_cache=True,
+    rules=None, rule_timings=False, jobs=None, precompiled_source=None,
+):
+    """
+    Run every validate check on a bundled dictionary, exiting non-zero on failure.
+
+    Shared by validate, which loads the bundle from disk, and build, which
+    hands over the dictionary it has just generated in memory.
+
+    Args:
+        schema_dict: The bundled dictionary, keyed by filename.
+        target: The file or directory the bundle came from, for messages.
+        metaschema: The Gen3 metaschema.
+        exclude_schema_list: Schema names (without extension) skipped by the rule checks.
+        precompiled: Resolved node schemas from a compiled artefact or a
+            resolved sidecar, if any. Resolution is skipped when given.
+        use_cache: Set False to resolve afresh instead of reusing a cached
+            resolution of an identical bundle.
+        rules: Rule names to run, from select_rules. All rules when None.
+        rule_timings: Print each rule's total time across the bundle.
+        jobs: Resolve nodes across this many processes.
+        precompiled_source: Which file ``precompiled`` came from, for messages.
+
+    Returns:
+        The resolved node schemas, keyed by ``"<id>.yaml"``.
+    """
+    # Null descriptions and dangling refs are collected in one walk of the
+    # bundle; the dangling refs are reported after the rule checks below.
+    with tracing.span('lint'):
+        findings = lint_bundle(schema_dict)
+
+    # Pre-resolution diagnostic: report every null 'description' up front,
+    # because the metaschema stage fails on the first resolved node schema,
+    # far away from the definition that carries the null.
+    print_null_description_warning(
+        [f"{schema_name}: {hit}" for schema_name, hit in findings['null_descriptions']]
+    )
+
+    # Every schema is checked before anything is reported. Stopping at the
+    # first violation meant a dictionary with six problems took six runs.
+    violations = []
+    checked = []
+    timings = {}
+    for schema_name, schema in schema_dict.items():
+
+        if '.' in schema_name:
+            schema_name = os.path.splitext(schema_name)[0]
+
+        if schema_name in exclude_schema_list:
+            continue
+
+        checked.append(schema_name)
+        with tracing.span('validate', 'node', node=schema_name):
+            for violation in RuleValidator(schema, rules=rules, timings=timings).validate():
+                # A schema's 'id' can differ from its filename, and the reader
+                # is looking for the file, so carry both.
+                violation['source'] = schema_name
+                violations.append(violation)
+
+    # Printed before any failure exits, since a slow rule is worth knowing
+    # about on a failing run too.
+    if rule_timings:
+        print_rule_timings(timings)
+
+    exit_on_rule_violations(violations, len(checked))
+
+    # A reference into a 'term' block is documentation, so a missing one is
+    # reported and stepped over rather than being fatal. Anything else that
+    # dangles stops resolution below.
+    dangling = findings['dangling_refs']
+    print_documentation_refs([hit for hit in dangling if is_documentation_ref(hit[1])])
+
+    # Resolving bundled schema which is required for metaschema validation
+    try:
+        if precompiled is not None:
+            source = precompiled_source or f"compiled artefact: {target}"
+            print(f"Using resolved schemas from {source}")
+            resolved_schema_dict = precompiled
+        else:
+            # The bundle is already in memory, so it is resolved directly
+            # rather than being read back from disk. An unchanged bundle is
+            # not resolved again at all.
+            print(f"Resolving schemas from: {target}")
+            resolved_schema_dict = resolve_bundle_cached(
+                schema_dict, use_cache, dangling=dangling, workers=jobs
+            )
+    except SchemaResolutionError as exc:
+        exit_on_unresolvable(
+            target, str(exc), [hit for hit in dangling if not is_documentation_ref(hit[1])]
+        )
+
+    # Anything that went into resolution but did not come out was never
+    # checked. validate used to print SUCCESS for the schemas that resolved
+    # and say nothing at all about the rest.
+    expected = {
+        os.path.splitext(name)[0] for name in schema_dict
+        if not os.path.basename(name).startswith('_')
+    }
+    resolved_ids = {os.path.splitext(name)[0] for name in resolved_schema_dict}
+    exit_on_unresolved(target, sorted(expected - resolved_ids), len(resolved_ids))
+
+    # Every node is checked before anything is reported, as the rules are.
+    metaschema_errors = {}
+    for schema_name, schema in resolved_schema_dict.items():
+        with tracing.span('metaschema', 'node', node=schema_name):
+            try:
+                validate_schema_with_metaschema(
+                    schema,
+                    metaschema=metaschema,
+                    verbose=True
+                )
+            except RuntimeError as exc:
+                metaschema_errors[schema_name] = str(exc)
+                continue
+        print(f"SUCCESS: Metaschema validation complete for: {schema_name}")
+
+    exit_on_metaschema_errors(metaschema_errors, len(resolved_schema_dict))
+    print("Validation process complete.")
+    return resolved_schema_dict
+
+
+def changed_bundle_or_exit(schema_dict, args):
+    """
+    Narrow a bundle to what --changed-since or --staged says changed,
+    exiting with a readable message if git cannot say.
+    """
+    if not args.yamls:
+        print(messages.changes_unavailable(
+            args.bundled, "a bundled file has no per-file history; pass the dictionary directory with -y"
+        ))
+        sys.exit(1)
+    try:
+        sub_bundle, changed, nodes = changed_bundle(
+            schema_dict, args.yamls, since=args.changed_since, staged=args.staged
+        )
+    except GitError as exc:
+        print(messages.changes_unavailable(args.yamls, exc))
+        sys.exit(1)
+    since = "staged for commit" if args.staged else f"changed since {args.changed_since}"
+    if not changed:
+        print(f"No dictionary files {since}; nothing to validate.")
+        sys.exit(0)
+    total = sum(1 for name in schema_dict if not name.startswith('_'))
+    print(f"{len(changed)} files {since}, affecting {len(nodes)} of {total} nodes: {', '.join(changed)}")
+    return sub_bundle
+
+
+def validate_shard(
+    schema_dict, target, metaschema, exclude_schema_list, precompiled, shard,
+    report_path=None, use_cache=True, rules=None, jobs=None,
+):
+    """
+    Run validate --shard: check one shard, write its partial report, and
+    exit non-zero if the shard found anything wrong.
+
+    The shard's findings are not printed in full; the merged report does that
+    once for every shard.
+    """
+    index, count = shard
+    report_path = report_path or f"validate-shard-{index}-of-{count}.json"
+    print(f"Validating shard {index}/{count} of: {target}")
+    report = run_shard(
+        schema_dict, index, count, target, rules=rules, exclude=exclude_schema_list,
+        metaschema=metaschema, precompiled=precompiled, use_cache=use_cache, workers=jobs,
+    )
+    write_report(report, report_path)
+    failures = (
+        len(report['violations']) + len(report['metaschema_errors'])
+        + bool(report['resolution_error'])
+    )
+    print(
+        f"Shard {index}/{count}: {len(report['checked'])} schemas rule-checked, "
+        f"{len(report['resolved'])} resolved and checked against the metaschema, "
+        f"{failures} problem{'s' if failures != 1 else ''}."
+    )
+    print(f"Wrote shard report to: {report_path}")
+    if failures:
+        sys.exit(1)
+
+
+def merge_reports_or_exit(paths):
+    """
+    Run validate --merge-reports: print what a single validate run would have
+    printed for the shards' bundle, and exit as it would have.
+    """
+    try:
+        merged = merge_reports([load_report(path) for path in paths])
+    except ShardReportError as exc:
+        print(messages.unmergeable_shard_reports(paths, exc))
+        sys.exit(1)
+
+    target = merged['target']
+    print(f"Merging {merged['shards']} shard reports for: {target}")
+    print_null_description_warning(
+        [f"{schema_name}: {hit}" for schema_name, hit in merged['null_descriptions']]
+    )
+    exit_on_rule_violations(merged['violations'], merged['checked'])
+    print_documentation_refs(merged['documentation_refs'])
+    if merged['resolution_error']:
+        exit_on_unresolvable(target, merged['resolution_error'], merged['fatal_refs'])
+    exit_on_unresolved(target, merged['unresolved'], len(merged['resolved']))
+    for schema_name in merged['resolved']:
+        if schema_name not in merged['metaschema_errors']:
+            print(f"SUCCESS: Metaschema validation complete for: {schema_name}")
+    exit_on_metaschema_errors(merged['metaschema_errors'], len(merged['resolved']))
+    print("Validation process complete.")
+
+
+# The stages of validate's output, shared with --merge-reports so that merged
+# shard reports print exactly what a single run prints.
+
+def exit_on_rule_violations(violations, checked_count):
+    """Report the rule checks' outcome, exiting non-zero if anything failed."""
+    if violations:
+        print()
+        print(messages.rule_violation_report(violations, checked_count))
+        sys.exit(1)
+    print(f"SUCCESS: rule validation passed for {checked_count} schemas.")
+
+
+def print_documentation_refs(documentation_refs):
+    """Warn about dangling references inside term blocks, if there are any."""
+    if documentation_refs:
+        print()
+        print(messages.dangling_term_warning(documentation_refs))
+
+
+def exit_on_unresolvable(target, detail, fatal_refs):
+    """Report a dictionary that could not be resolved, and exit non-zero."""
+    print()
+    print(messages.unresolvable_dictionary(target, detail, fatal_refs))
+    sys.exit(1)
+
+
+def exit_on_unresolved(target, unresolved, resolved_count):
+    """Exit non-zero if any node went into resolution and did not come out."""
+    if unresolved:
+        print()
+        print(messages.unresolved_nodes(target, unresolved, resolved_count))
+        sys.exit(1)
+
+
+def exit_on_metaschema_errors(errors, checked_count):
+    """Exit non-zero, listing every failure, if any node failed the metaschema."""
+    if errors:
+        print()
+        print(messages.metaschema_violation_report(errors, checked_count))
+        sys.exit(1)
+
+
 def main():
     version_parser = argparse.ArgumentParser(add_help=False)
     version_parser.add_argument(
@@ -86,7 +715,7 @@ def main():
     generate_parser.add_argument(
         "-i", "--input",
         required=True,
-        help="Input YAML file"
+        help="Input YAML file, or a directory holding dictionary.yaml, nodes/*.yaml, links.yaml and definitions.yaml"
     )
     generate_parser.add_argument(
         "-o", "--output",
@@ -107,21 +736,119 @@ def main():
             "and fail if the output directory contains files the input cannot produce"
         )
     )
-    generate_parser.add_argument(
+    # Hoisting rewrites _definitions.yaml, which --only leaves untouched.
+    generate_scope = generate_parser.add_mutually_exclusive_group()
+    generate_scope.add_argument(
         "--only",
         help="Comma-separated node names to regenerate, leaving all other files untouched"
     )
+    generate_scope.add_argument(
+        "--hoist",
+        nargs="?",
+        type=int,
+        const=2,
+        metavar="N",
+        help=(
+            "Move property definitions repeated in N or more places (default 2) into "
+            "_definitions.yaml, replacing the copies with $refs"
+        )
+    )
     generate_parser.add_argument(
         "--check",
         action="store_true",
         help="Report whether the output directory matches the input; write nothing. Exits non-zero on drift"
     )
+    generate_parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        dest="keep_going",
+        help=(
+            "Build every node even after one fails and report all the failures together; "
+            "nothing is written unless every node builds"
+        )
+    )
+    generate_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        dest="no_cache",
+        help="Parse and resolve afresh instead of reusing cached input parses and resolved schemas"
+    )
+    generate_parser.add_argument(
+        "--compiled",
+        help="Also write a compiled artefact (bundle, resolved schemas, ref graph, hashes) to this path"
+    )
     generate_parser.add_argument(
         "--debug",
         action="store_true",
         help="Set logging level to DEBUG"
     )
 
+    # Create 'build' subcommand
+    build_parser = subparsers.add_parser(
+        "build",
+        help="Generate, bundle and validate in one pass, writing only if everything passes"
+    )
+    build_parser.add_argument(
+        "-i", "--input",
+        required=True,
+        help="Input YAML file, or a directory holding dictionary.yaml, nodes/*.yaml, links.yaml and definitions.yaml"
+    )
+    build_parser.add_argument(
+        "-o", "--output",
+        required=True,
+        help="Output directory for the Gen3 YAML files"
+    )
+    build_parser.add_argument(
+        "--bundle",
+        required=True,
+        help="Output filename for the bundled schema"
+    )
+    build_parser.add_argument(
+        "--compiled",
+        help="Also write a compiled artefact (bundle, resolved schemas, ref graph, hashes) to this path"
+    )
+    build_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Overwrite existing files, discarding any hand edits in them"
+    )
+    build_parser.add_argument(
+        "--input-driven",
+        action="store_true",
+        dest="input_driven",
+        help=(
+            "Treat the input file as the source of truth: regenerate everything, "
+            "and fail if the output directory contains files the input cannot produce"
+        )
+    )
+    build_parser.add_argument(
+        "--no-exclude",
+        action="store_true",
+        help="Disables the exclusion of specific schema from the validation"
+    )
+    build_parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        dest="keep_going",
+        help=(
+            "Build every node even after one fails and report all the failures together; "
+            "nothing is written unless every node builds"
+        )
+    )
+    build_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        dest="no_cache",
+        help="Parse and resolve afresh instead of reusing cached input parses and resolved schemas"
+    )
+    add_rule_arguments(build_parser)
+    add_jobs_argument(build_parser)
+    build_parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Set logging level to DEBUG"
+    )
+
     # Create 'bundle' subcommand
     bundle_parser = subparsers.add_parser(
         "bundle",
@@ -135,7 +862,34 @@ def main():
     bundle_parser.add_argument(
         "-f", "--filename",
         required=True,
-        help="Output Filename"
+        help="Output Filename; a name ending .json.gz or .json.xz is written compressed"
+    )
+    bundle_parser.add_argument(
+        "--compiled",
+        help="Also write a compiled artefact (bundle, resolved schemas, ref graph, hashes) to this path"
+    )
+    bundle_parser.add_argument(
+        "--resolved",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help=(
+            "Also write the resolved node schemas to a sidecar file, by default beside the "
+            "bundle as <name>.resolved.json; validate -b uses it while it matches the bundle"
+        )
+    )
+    bundle_parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Leave out the _definitions.yaml and _terms.yaml entries no node references"
+    )
+    bundle_parser.add_argument(
+        "--index",
+        action="store_true",
+        help=(
+            "Also write an index of where each node and definition lies in the bundle, as "
+            "<name>.index.json, so commands needing a few nodes read only those"
+        )
     )
     bundle_parser.add_argument(
         "--debug",
@@ -151,7 +905,10 @@ def main():
     validate_parser.add_argument(
         "-b", "--bundled",
         required=False,
-        help="Bundled JsonSchema file"
+        help=(
+            "Bundled JsonSchema file (.json, .json.gz or .json.xz), or a compiled artefact "
+            "from generate/bundle --compiled. A matching sidecar from bundle --resolved is used instead of resolving"
+        )
     )
     validate_parser.add_argument(
         "-y", "--yamls",
@@ -168,6 +925,208 @@ def main():
         action="store_true",
         help="Disables the exclusion of specific schema from the validation"
     )
+    validate_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        dest="no_cache",
+        help="Resolve afresh instead of reusing the cached resolution of an unchanged bundle"
+    )
+    changes = validate_parser.add_mutually_exclusive_group()
+    changes.add_argument(
+        "--changed-since",
+        dest="changed_since",
+        metavar="REV",
+        help="Validate only the files changed since git revision REV, and the nodes those changes affect"
+    )
+    changes.add_argument(
+        "--staged",
+        action="store_true",
+        help="Validate only the files staged for commit, and the nodes those changes affect"
+    )
+    validate_parser.add_argument(
+        "--shard",
+        type=shard_spec,
+        metavar="I/N",
+        help="Validate only shard I of N of the nodes and write a partial report; "
+             "combine the N reports with --merge-reports"
+    )
+    validate_parser.add_argument(
+        "--report",
+        metavar="PATH",
+        help="Where --shard writes its partial report (default: validate-shard-I-of-N.json)"
+    )
+    validate_parser.add_argument(
+        "--merge-reports",
+        nargs="+",
+        dest="merge_reports",
+        metavar="REPORT",
+        help="Merge the partial reports of every --shard run and report as a single validate would"
+    )
+    add_rule_arguments(validate_parser)
+    add_jobs_argument(validate_parser)
+
+    # Create 'validate-data' subcommand
+    validate_data_parser = subparsers.add_parser(
+        "validate-data",
+        help="Validate submission records (TSV, JSON lines, JSON) against a bundled dictionary"
+    )
+    validate_data_parser.add_argument(
+        "--schema",
+        required=True,
+        help="Bundled schema file, or a compiled artefact"
+    )
+    validate_data_parser.add_argument(
+        "paths",
+        nargs="+",
+        help="Data files, or directories searched recursively for .tsv, .jsonl, .ndjson and .json"
+    )
+    validate_data_parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Validate files across this many processes"
+    )
+    validate_data_parser.add_argument(
+        "--max-errors",
+        type=int,
+        default=DEFAULT_MAX_ERRORS,
+        dest="max_errors",
+        help=f"Errors listed per file; further errors are counted only (default {DEFAULT_MAX_ERRORS})"
+    )
+    validate_data_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        dest="no_cache",
+        help="Resolve afresh instead of reusing the cached resolution of an unchanged bundle"
+    )
+    validate_data_parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Set logging level to DEBUG"
+    )
+
+    # Create 'simulate' subcommand
+    simulate_parser = subparsers.add_parser(
+        "simulate",
+        help="Write synthetic, linked submission TSVs for every node of a bundled dictionary"
+    )
+    simulate_parser.add_argument(
+        "--schema",
+        required=True,
+        help="Bundled schema file, or a compiled artefact"
+    )
+    simulate_parser.add_argument(
+        "--records",
+        type=record_count,
+        required=True,
+        help="Records per node; scientific notation such as 1e6 is accepted"
+    )
+    simulate_parser.add_argument(
+        "-o", "--output",
+        default="simulated",
+        help="Directory to write one <node>.tsv into (default: simulated)"
+    )
+    simulate_parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for reproducible output"
+    )
+    simulate_parser.add_argument(
+        "--project-code",
+        default="simulated",
+        dest="project_code",
+        help="Code of the existing project the records link to (default: simulated)"
+    )
+    simulate_parser.add_argument(
+        "--required-only",
+        action="store_true",
+        dest="required_only",
+        help="Generate only required properties"
+    )
+    simulate_parser.add_argument(
+        "--batch-size",
+        type=batch_size,
+        default=DEFAULT_BATCH_SIZE,
+        dest="batch_size",
+        help=f"Records generated and written at a time (default {DEFAULT_BATCH_SIZE})"
+    )
+    simulate_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        dest="no_cache",
+        help="Resolve afresh instead of reusing the cached resolution of an unchanged bundle"
+    )
+    simulate_parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Set logging level to DEBUG"
+    )
+
+    # Create 'templates' subcommand
+    templates_parser = subparsers.add_parser(
+        "templates",
+        help="Write a submission TSV template, and a hints file, for every node of a bundled dictionary"
+    )
+    templates_parser.add_argument(
+        "--schema",
+        required=True,
+        help="Bundled schema file, or a compiled artefact"
+    )
+    templates_parser.add_argument(
+        "-o", "--output",
+        default="templates",
+        help="Directory to write <node>.tsv and <node>.hints.tsv into (default: templates)"
+    )
+    templates_parser.add_argument(
+        "--only",
+        help=(
+            "Comma-separated node names to write templates for. Reads only those nodes and the "
+            "definitions they use from the bundle"
+        )
+    )
+    templates_parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Write templates with this many threads"
+    )
+    templates_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        dest="no_cache",
+        help="Resolve afresh instead of reusing the cached resolution of an unchanged bundle"
+    )
+    templates_parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Set logging level to DEBUG"
+    )
+
+    # Create 'diff' subcommand
+    diff_parser = subparsers.add_parser(
+        "diff",
+        help="Report added, removed and changed nodes, properties, enums, links and definitions between two bundles"
+    )
+    diff_parser.add_argument(
+        "old",
+        help="The earlier bundled schema (or compiled artefact)"
+    )
+    diff_parser.add_argument(
+        "new",
+        help="The later bundled schema (or compiled artefact)"
+    )
+    diff_parser.add_argument(
+        "--json",
+        action="store_true",
+        dest="as_json",
+        help="Print the diff as JSON instead of text"
+    )
+    diff_parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Set logging level to DEBUG"
+    )
 
     # Create 'visualise' subcomand
     visualise_parser = subparsers.add_parser(
@@ -177,7 +1136,21 @@ def main():
     visualise_parser.add_argument(
         "-i", "--input",
         required=True,
-        help="Path to Bundled Gen3 JsonSchema file"
+        help="Path to Bundled Gen3 JsonSchema file (.json, .json.gz or .json.xz)"
+    )
+    # --watch copies the bundle into DDVis; a static rendering has no viewer
+    # to copy it into.
+    visualise_mode = visualise_parser.add_mutually_exclusive_group()
+    visualise_mode.add_argument(
+        "--static",
+        metavar="OUT.html",
+        default=None,
+        help="Write a self-contained HTML/SVG rendering of the node graph here instead of starting DDVis in Docker"
+    )
+    visualise_mode.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and copy the bundle into DDVis whenever it changes"
     )
     visualise_parser.add_argument(
         "--debug",
@@ -201,6 +1174,9 @@ def main():
         help="Set logging level to DEBUG"
     )
 
+    for subparser in subparsers.choices.values():
+        add_trace_argument(subparser)
+
     args = parser.parse_args()
     
     # Handle case where no command is provided
@@ -217,29 +1193,27 @@ def main():
         level=log_level,
         format="%(asctime)s [%(levelname)s] %(message)s"
     )
-    logger = logging.getLogger(__name__)
 
+    if args.trace:
+        # Written on the way out whatever the outcome: a trace of a failing
+        # run is as useful as one of a passing run, and sys.exit raises.
+        with tracing.recording() as tracer:
+            try:
+                with tracing.span(args.command, 'command'):
+                    run_command(args)
+            finally:
+                write_trace(tracer, args.trace)
+    else:
+        run_command(args)
+
+
+def run_command(args):
+    """Run the subcommand named by ``args.command``."""
     if args.command == "generate":
         print("Starting schema generation process...")
         metaschema = get_metaschema()
         converter_template = generate_gen3_template(metaschema)
-        print(f"Loading input YAML from: {args.input}")
-        try:
-            data = load_yaml(args.input)
-        except yaml.YAMLError as exc:
-            # A punctuation slip in the input used to surface as a raw parser
-            # traceback. One consumer repo shipped an unparseable input for
-            # weeks without anyone realising generation had stopped working.
-            print()
-            print(messages.unparseable_input(args.input, exc))
-            sys.exit(1)
-        print("Validating input data model...")
-        try:
-            validated_model = DataModel.model_validate(data)
-        except ValidationError as exc:
-            print()
-            print(messages.invalid_input(args.input, exc))
-            sys.exit(1)
+        validated_model = load_model_or_exit(args.input, use_cache=not args.no_cache)
         node_names = get_node_names(validated_model)
         print(f"Found nodes: {node_names}")
 
@@ -255,20 +1229,15 @@ def main():
         # malformed we fail here, with the existing dictionary untouched,
         # rather than leaving a half-written directory behind.
         print("Building dictionary...")
-        files, merge_summaries = build_dictionary(validated_model, converter_template, only=only)
-        for summary in merge_summaries:
-            print(messages.extends_summary(
-                summary['node'], summary['preset'],
-                summary['inherited'], summary['overridden'], summary['added'],
-                implicit=summary.get('implicit', False),
-            ))
-
+        files, merge_summaries = build_dictionary_or_exit(
+            validated_model, converter_template, args.input, only=only, keep_going=args.keep_going
+        )
         # Printed before the --check branch returns, so continuous integration
         # sees the same warning a developer does.
-        shadowed = find_shadowed_properties(validated_model)
-        if shadowed:
-            print()
-            print(messages.shadowed_property_report(shadowed))
+        print_build_report(validated_model, merge_summaries)
+        if args.hoist is not None:
+            files, hoist_report = hoist_properties(files, min_count=args.hoist)
+            print_hoist_report(hoist_report)
 
         if args.check:
             diff = diff_against_disk(files, args.output)
@@ -282,59 +1251,110 @@ def main():
             print(f"OK: {args.output} matches {args.input}. {len(files)} files checked.")
             sys.exit(0)
 
-        plan = plan_write(files, args.output)
         # --only names exactly which nodes to rewrite, so it carries its own
         # consent; refusing it would make the flag useless. --force and
         # --input-driven are the blanket permissions.
-        may_overwrite = args.force or args.input_driven or only is not None
-        if plan['overwrite'] and not may_overwrite:
-            print()
-            print(messages.overwrite_refusal(
-                args.output, plan['overwrite'], plan['create'], args.input
-            ))
-            sys.exit(1)
+        check_write_or_exit(
+            files, args.output, args.input,
+            may_overwrite=args.force or args.input_driven or only is not None,
+            input_driven=args.input_driven,
+            check_orphans=only is None,
+        )
+        write_dictionary_or_exit(files, args.output)
+        if args.compiled:
+            # Compiled from the directory rather than from `files`, so the
+            # artefact matches what bundle would produce - including any
+            # hand-written nodes, and every node under --only.
+            write_compiled_or_exit(
+                bundle_yamls(args.output), args.compiled, args.output, use_cache=not args.no_cache
+            )
+        print("Schema generation process complete.")
 
-        orphans = find_orphans(files, args.output) if only is None else []
-        if orphans:
-            print()
-            print(messages.orphan_report(args.output, orphans, as_error=args.input_driven))
-            if args.input_driven:
-                sys.exit(1)
+    elif args.command == "build":
+        # generate, bundle and validate -b in one interpreter. The dictionary
+        # is handed from stage to stage in memory and nothing is written until
+        # every check has passed, so a failing build leaves disk untouched.
+        print("Starting build...")
+        rules = select_rules_or_exit(args)
+        metaschema = get_metaschema()
+        converter_template = generate_gen3_template(metaschema)
+        validated_model = load_model_or_exit(args.input, use_cache=not args.no_cache)
+        print(f"Found nodes: {get_node_names(validated_model)}")
 
-        try:
-            written = write_dictionary(files, args.output)
-        except OSError as exc:
-            print()
-            print(messages.cannot_write(args.output, exc))
-            sys.exit(1)
-        print(f"Wrote {len(written)} files to {args.output}")
-        print("Schema generation process complete.")
+        print("Building dictionary...")
+        files, merge_summaries = build_dictionary_or_exit(
+            validated_model, converter_template, args.input, keep_going=args.keep_going
+        )
+        print_build_report(validated_model, merge_summaries)
+
+        check_write_or_exit(
+            files, args.output, args.input,
+            may_overwrite=args.force or args.input_driven,
+            input_driven=args.input_driven,
+        )
+
+        bundle_dict = bundle_files(files, args.output)
+        exclude_schema_list = [] if args.no_exclude else list(EXCLUDED_SCHEMAS)
+        resolved = validate_bundle(
+            bundle_dict, args.input, metaschema, exclude_schema_list, use_cache=not args.no_cache,
+            rules=rules, rule_timings=args.rule_timings, jobs=args.jobs,
+        )
+
+        write_dictionary_or_exit(files, args.output)
+        print(f"Writing bundled schema to file: {args.bundle}")
+        write_json(bundle_dict, args.bundle)
+        if args.compiled:
+            write_compiled(compile_bundle(bundle_dict, resolved=resolved), args.compiled)
+            print(f"Wrote compiled artefact to: {args.compiled}")
+        print("Build complete.")
 
     elif args.command == "bundle":
         print(f"Bundling YAML files from directory: {args.input}")
         bundle_dict = bundle_yamls(args.input)
+        if args.prune:
+            bundle_dict = prune_or_report(bundle_dict)
         print(f"Writing bundled schema to file: {args.filename}")
         write_json(bundle_dict, args.filename)
+        if args.index and jsonio.is_compressed(args.filename):
+            print(f"Not writing an index: {args.filename} is compressed, so it cannot be read in place.")
+        elif args.index:
+            write_index(build_index(args.filename), index_path(args.filename))
+            print(f"Wrote bundle index to: {index_path(args.filename)}")
+        resolved = None
+        if args.resolved is not None:
+            resolved = resolve_or_exit(bundle_dict, args.input)
+            path = args.resolved or sidecar_path(args.filename)
+            write_sidecar(resolved_sidecar(bundle_dict, resolved), path)
+            print(f"Wrote resolved schemas to: {path}")
+        if args.compiled:
+            write_compiled_or_exit(bundle_dict, args.compiled, args.input, resolved=resolved)
         print("Bundling process complete.")
 
     elif args.command == "validate":
+        if args.merge_reports:
+            merge_reports_or_exit(args.merge_reports)
+            return
         print("Starting validation process...")
+        rules = select_rules_or_exit(args)
         metaschema = get_metaschema()
 
-        # Exclusion list
-        exclude_schema_list = [
-            '_definitions',
-            '_settings',
-            '_terms',
-            'core_metadata_collection',
-        ]
+        exclude_schema_list = list(EXCLUDED_SCHEMAS)
         if args.no_exclude:
             print(f"Validation now includes: {exclude_schema_list}")
             exclude_schema_list = []
 
-        # Conducting business rule validation
+        # Conducting business rule validation. A compiled artefact, or a
+        # bundle with a matching resolved sidecar, carries its resolved
+        # schemas, which lets resolution below be skipped.
+        precompiled = precompiled_source = None
         if args.bundled:
-            schema_dict = read_json(args.bundled)
+            try:
+                schema_dict, precompiled, precompiled_source, problem = load_bundle(args.bundled, with_source=True)
+            except CompiledArtefactError as exc:
+                print(messages.unusable_compiled_artefact(args.bundled, exc))
+                sys.exit(1)
+            if problem:
+                print(messages.ignored_sidecar(sidecar_path(args.bundled), problem))
         elif args.yamls:
             schema_dict = bundle_yamls(args.yamls)
         else:
@@ -343,93 +1363,97 @@ def main():
             print(messages.validate_needs_a_target())
             sys.exit(1)
 
-        # Pre-resolution diagnostic: report every null 'description' up front,
-        # because the metaschema stage fails on the first resolved node schema,
-        # far away from the definition that carries the null.
-        null_hits = []
-        for schema_name, schema in schema_dict.items():
-            for hit in find_null_descriptions(schema):
-                null_hits.append(f"{schema_name}: {hit}")
-        print_null_description_warning(null_hits)
-
-        # Every schema is checked before anything is reported. Stopping at the
-        # first violation meant a dictionary with six problems took six runs.
-        violations = []
-        checked = []
-        for schema_name, schema in schema_dict.items():
-
-            if '.' in schema_name:
-                schema_name = os.path.splitext(schema_name)[0]
-
-            if schema_name in exclude_schema_list:
-                continue
-
-            checked.append(schema_name)
-            for violation in RuleValidator(schema).validate():
-                # A schema's 'id' can differ from its filename, and the reader
-                # is looking for the file, so carry both.
-                violation['source'] = schema_name
-                violations.append(violation)
+        target = args.bundled or args.yamls
+        if args.changed_since or args.staged:
+            schema_dict = changed_bundle_or_exit(schema_dict, args)
+        if args.shard:
+            validate_shard(
+                schema_dict, target, metaschema, exclude_schema_list, precompiled, args.shard,
+                report_path=args.report, use_cache=not args.no_cache, rules=rules, jobs=args.jobs,
+            )
+            return
+        validate_bundle(
+            schema_dict, target, metaschema, exclude_schema_list, precompiled,
+            use_cache=not args.no_cache, rules=rules, rule_timings=args.rule_timings,
+            jobs=args.jobs, precompiled_source=precompiled_source,
+        )
 
-        if violations:
-            print()
-            print(messages.rule_violation_report(violations, len(checked)))
+    elif args.command == "validate-data":
+        resolved = load_resolved_or_exit(args.schema, use_cache=not args.no_cache)
+        files = find_data_files(args.paths)
+        if not files:
+            print(messages.no_data_files(args.paths))
             sys.exit(1)
-        print(f"SUCCESS: rule validation passed for {len(checked)} schemas.")
-
-        # A reference into a 'term' block is documentation, so a missing one is
-        # reported and stepped over rather than being fatal. Anything else that
-        # dangles stops resolution below.
-        dangling = find_dangling_refs(schema_dict)
-        documentation_refs = [hit for hit in dangling if is_documentation_ref(hit[1])]
-        if documentation_refs:
+        print(f"Validating {len(files)} data files against {args.schema}")
+        results = validate_data(resolved, files, workers=args.jobs, max_errors=args.max_errors)
+        if any(result['error_count'] for result in results):
             print()
-            print(messages.dangling_term_warning(documentation_refs))
+            print(messages.data_violation_report(results))
+            sys.exit(1)
+        records = sum(result['records'] for result in results)
+        print(f"SUCCESS: {records} records in {len(files)} files match the dictionary.")
 
-        # Resolving bundled schema which is required for metaschema validation
-        target = args.bundled or args.yamls
+    elif args.command == "simulate":
+        resolved = load_resolved_or_exit(args.schema, use_cache=not args.no_cache)
+        print(f"Simulating {args.records} records per node from {args.schema}")
         try:
-            if args.bundled:
-                print(f"Resolving schema from bundled file: {args.bundled}")
-                resolved_schema_dict = resolve_schema(schema_path=args.bundled)
-            else:
-                print(f"Bundling and resolving schemas from directory: {args.yamls}")
-                resolved_schema_dict = resolve_schema(schema_dir=args.yamls)
-        except SchemaResolutionError as exc:
-            print()
-            print(messages.unresolvable_dictionary(
-                target, str(exc),
-                [hit for hit in dangling if not is_documentation_ref(hit[1])],
-            ))
+            written = simulate(
+                resolved, args.output, args.records, project_code=args.project_code,
+                seed=args.seed, required_only=args.required_only, batch_size=args.batch_size,
+            )
+        except SimulationError as exc:
+            print(messages.unsimulatable_dictionary(args.schema, exc))
             sys.exit(1)
+        for node, count in written.items():
+            print(f"  {os.path.join(args.output, node + '.tsv')}: {count} records")
+        print(f"Wrote {len(written)} node files to: {args.output}")
 
-        # Anything that went into resolution but did not come out was never
-        # checked. validate used to print SUCCESS for the schemas that resolved
-        # and say nothing at all about the rest.
-        expected = {
-            os.path.splitext(name)[0] for name in schema_dict
-            if not os.path.basename(name).startswith('_')
-        }
-        resolved_ids = {os.path.splitext(name)[0] for name in resolved_schema_dict}
-        unresolved = sorted(expected - resolved_ids)
-        if unresolved:
-            print()
-            print(messages.unresolved_nodes(target, unresolved, len(resolved_ids)))
+    elif args.command == "templates":
+        if args.only:
+            only = [n.strip() for n in args.only.split(',') if n.strip()]
+            resolved = load_node_schemas_or_exit(args.schema, only, use_cache=not args.no_cache)
+        else:
+            resolved = load_resolved_or_exit(args.schema, use_cache=not args.no_cache)
+        rendered = render_templates(resolved)
+        try:
+            result = write_templates(rendered, args.output, workers=args.jobs)
+        except OSError as exc:
+            print(messages.cannot_write_templates(args.output, exc))
             sys.exit(1)
+        for name in result['written']:
+            print(f"  wrote {os.path.join(args.output, name)}")
+        print(
+            f"Wrote {len(result['written'])} template files to {args.output} "
+            f"({len(result['unchanged'])} unchanged)"
+        )
 
-        for schema_name, schema in resolved_schema_dict.items():
-            validate_schema_with_metaschema(
-                schema,
-                metaschema=metaschema,
-                verbose=True
-            )
-            print(f"SUCCESS: Metaschema validation complete for: {schema_name}")
-
-        print("Validation process complete.")
+    elif args.command == "diff":
+        bundles = []
+        for path in (args.old, args.new):
+            try:
+                bundles.append(load_bundle(path)[0])
+            except CompiledArtefactError as exc:
+                print(messages.unusable_compiled_artefact(path, exc))
+                sys.exit(1)
+        old_bundle, new_bundle = bundles
+        result = diff_bundles(old_bundle, new_bundle)
+        if args.as_json:
+            print(json.dumps(result, indent=2))
+        else:
+            print(format_diff(result, args.old, args.new))
 
     elif args.command == "visualise":
         print(f"Visualising schema from file: {args.input}")
-        visualise_with_docker(args.input)
+        if args.static:
+            try:
+                bundle_dict = load_bundle(args.input)[0]
+            except CompiledArtefactError as exc:
+                print(messages.unusable_compiled_artefact(args.input, exc))
+                sys.exit(1)
+            write_static_visualisation(bundle_dict, args.static, title=jsonio.plain_name(os.path.basename(args.input)))
+            print(f"Wrote static visualisation to: {args.static}")
+        else:
+            visualise_with_docker(args.input, watch=args.watch)
     
     
     elif args.command == "init":
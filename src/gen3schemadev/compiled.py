@@ -0,0 +1,226 @@
+"""
+The compiled dictionary: one versioned file holding everything the expensive
+steps produce.
+
+Every command used to rebuild its picture of the dictionary from text -
+``generate`` from the input, ``bundle`` from the YAML directory, ``validate`` by
+bundling again and then resolving. A compiled artefact lets a pipeline do that
+work once per commit and have every later step load the result:
+
+- ``bundle``: the bundled dictionary, exactly as ``bundle`` writes it
+- ``resolved``: the resolved node schemas, keyed by ``"<id>.yaml"``
+- ``ref_graph``: which ``file#/pointer`` targets each file references
+- ``hashes``: a content hash per file, and ``bundle_hash`` for the whole bundle
+
+``format`` and ``version`` identify the layout. A reader refuses any other
+version rather than guessing at it, because a stale artefact that half-loads is
+worse than one that is rebuilt.
+
+Consumers that read the plain bundle file cannot take the artefact in its
+place, so ``bundle --resolved`` writes the resolved schemas to a *sidecar*
+beside the bundle instead - ``schema.json`` gets ``schema.resolved.json`` -
+holding ``resolved`` and the ``bundle_hash`` it was resolved from. The bundle
+itself is unchanged. :func:`load_bundle` uses a sidecar only while that hash
+matches the bundle next to it.
+"""
+
+import logging
+import os
+from importlib.metadata import version, PackageNotFoundError
+
+from gen3schemadev import jsonio
+from gen3schemadev.refs import ref_graph
+from gen3schemadev.utils import content_hash, ordered_hash, read_json, resolve_bundle, write_json
+
+logger = logging.getLogger(__name__)
+
+COMPILED_FORMAT = 'gen3schemadev-compiled'
+COMPILED_VERSION = 1
+
+SIDECAR_FORMAT = 'gen3schemadev-resolved'
+# 2: bundle_hash includes key order.
+SIDECAR_VERSION = 2
+
+
+class CompiledArtefactError(Exception):
+    """Raised when a file is not a compiled artefact this version can read."""
+
+
+def _generator():
+    try:
+        return f"gen3schemadev {version('gen3schemadev')}"
+    except PackageNotFoundError:
+        return "gen3schemadev unknown"
+
+
+def compile_bundle(bundle: dict, resolved: dict = None) -> dict:
+    """
+    Compile a bundled dictionary into the artefact described above.
+
+    Args:
+        bundle: The bundled dictionary, keyed by filename.
+        resolved: Already-resolved node schemas, if the caller has them.
+            Resolved here otherwise.
+
+    Returns:
+        The compiled artefact as a dict.
+
+    Raises:
+        SchemaResolutionError: If the bundle cannot be resolved.
+    """
+    if resolved is None:
+        resolved = resolve_bundle(bundle)
+    return {
+        'format': COMPILED_FORMAT,
+        'version': COMPILED_VERSION,
+        'generator': _generator(),
+        'bundle_hash': content_hash(bundle),
+        'hashes': {name: content_hash(schema) for name, schema in bundle.items()},
+        'ref_graph': ref_graph(bundle),
+        'bundle': bundle,
+        'resolved': resolved,
+    }
+
+
+def is_compiled(data) -> bool:
+    """Return True if ``data`` is shaped like a compiled artefact of any version."""
+    return isinstance(data, dict) and data.get('format') == COMPILED_FORMAT
+
+
+def check_compiled(data, source='<compiled>') -> dict:
+    """
+    Confirm ``data`` is a compiled artefact this version can use, and return it.
+
+    The bundle is re-hashed against ``bundle_hash``. An artefact edited by hand
+    after compilation would otherwise pair a changed bundle with resolved
+    schemas describing the old one, and validate would pass the old dictionary.
+
+    Raises:
+        CompiledArtefactError: If the format, version or bundle hash is wrong.
+    """
+    if not is_compiled(data):
+        raise CompiledArtefactError(f"{source} is not a compiled gen3schemadev artefact")
+    if data.get('version') != COMPILED_VERSION:
+        raise CompiledArtefactError(
+            f"{source} is compiled artefact version {data.get('version')}; this gen3schemadev "
+            f"reads version {COMPILED_VERSION}. Compile it again."
+        )
+    if content_hash(data['bundle']) != data.get('bundle_hash'):
+        raise CompiledArtefactError(
+            f"{source} has been modified since it was compiled: its bundle no longer matches "
+            f"its recorded hash. Compile it again."
+        )
+    return data
+
+
+def write_compiled(compiled: dict, file_path: str) -> None:
+    """Write a compiled artefact to ``file_path``."""
+    write_json(compiled, file_path)
+
+
+def read_compiled(file_path: str) -> dict:
+    """
+    Read and check a compiled artefact.
+
+    Raises:
+        CompiledArtefactError: If the file is not a usable compiled artefact.
+    """
+    return check_compiled(read_json(file_path), source=file_path)
+
+
+def sidecar_path(bundle_path: str) -> str:
+    """Return where the resolved sidecar of the bundle at ``bundle_path`` lives."""
+    root, ext = jsonio.split_ext(bundle_path)
+    return f"{root}.resolved{ext or '.json'}"
+
+
+def resolved_sidecar(bundle: dict, resolved: dict) -> dict:
+    """
+    Build the resolved sidecar of a bundle.
+
+    Args:
+        bundle: The bundled dictionary, exactly as written beside the sidecar.
+        resolved: Its resolved node schemas, keyed by ``"<id>.yaml"``.
+
+    Returns:
+        The sidecar as a dict.
+    """
+    return {
+        'format': SIDECAR_FORMAT,
+        'version': SIDECAR_VERSION,
+        'generator': _generator(),
+        # Key order included: a bundle with its properties reordered resolves
+        # to differently ordered schemas, so the old ones are stale.
+        'bundle_hash': ordered_hash(bundle),
+        'resolved': resolved,
+    }
+
+
+def write_sidecar(sidecar: dict, file_path: str) -> None:
+    """Write a resolved sidecar to ``file_path``."""
+    write_json(sidecar, file_path)
+
+
+def read_sidecar(bundle: dict, path: str) -> tuple:
+    """
+    Return the resolved schemas from the sidecar at ``path``, if it matches ``bundle``.
+
+    A missing sidecar is the usual case, and a stale or unreadable one is only a
+    lost shortcut, so none of them is an error: the caller resolves instead.
+    The caller is told why a sidecar that exists was not used, because a user
+    who shipped one to skip resolution needs to know it no longer does.
+
+    Returns:
+        A tuple of (resolved, problem). ``resolved`` is the resolved node
+        schemas, or None. ``problem`` says why a sidecar at ``path`` was not
+        used, and is None when it was used or there is none.
+    """
+    if not os.path.exists(path):
+        return None, None
+    try:
+        data = read_json(path)
+    except (OSError, ValueError) as exc:
+        return None, f"it cannot be read: {exc}"
+    if not isinstance(data, dict) or data.get('format') != SIDECAR_FORMAT \
+            or data.get('version') != SIDECAR_VERSION:
+        return None, "it is not a resolved sidecar this version of gen3schemadev can read"
+    if data.get('bundle_hash') != ordered_hash(bundle):
+        return None, "it was resolved from a different version of the bundle"
+    logger.info("Loaded resolved sidecar %s", path)
+    return data['resolved'], None
+
+
+def load_bundle(file_path: str, with_source: bool = False):
+    """
+    Read either a plain bundle or a compiled artefact.
+
+    For commands that take "a bundle" and can use pre-resolved schemas when they
+    happen to be given a compiled artefact, or a bundle with a matching resolved
+    sidecar, instead.
+
+    Args:
+        file_path: The bundle or compiled artefact.
+        with_source: Also return which file the resolved schemas came from,
+            and why a sidecar beside the bundle was not used.
+
+    Returns:
+        A tuple of (bundle, resolved), or (bundle, resolved, source, problem)
+        with ``with_source``. ``resolved`` and ``source`` are None for a plain
+        bundle without a matching sidecar; ``problem`` is as
+        :func:`read_sidecar` returns it.
+
+    Raises:
+        CompiledArtefactError: If the file is a compiled artefact that cannot be used.
+    """
+    data = read_json(file_path)
+    problem = None
+    if is_compiled(data):
+        check_compiled(data, source=file_path)
+        logger.info("Loaded compiled artefact %s", file_path)
+        bundle, resolved, source = data['bundle'], data['resolved'], f"compiled artefact: {file_path}"
+    else:
+        path = sidecar_path(file_path)
+        resolved, problem = read_sidecar(data, path)
+        bundle = data
+        source = f"resolved sidecar: {path}" if resolved is not None else None
+    return (bundle, resolved, source, problem) if with_source else (bundle, resolved)
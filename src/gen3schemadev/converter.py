@@ -299,14 +299,14 @@ def format_multiplicity(multiplicity: str) -> str:
     """
     # Map all *_to_one to "to_one", all *_to_many to "to_many"
     if not isinstance(multiplicity, str):
-        logger.error(f"Multiplicity must be a string, got {type(multiplicity)}")
+        logger.error("Multiplicity must be a string, got %s", type(multiplicity))
         raise ValueError(f"Multiplicity must be a string, got {type(multiplicity)}")
     if multiplicity.endswith("_to_one"):
         return "to_one"
     elif multiplicity.endswith("_to_many"):
         return "to_many"
     else:
-        logger.error(f"Invalid multiplicity: {multiplicity}")
+        logger.error("Invalid multiplicity: %s", multiplicity)
         raise ValueError(f"Invalid multiplicity: {multiplicity}")
 
 def create_link_prop(target_node: str, multiplicity: str) -> dict:
@@ -371,7 +371,7 @@ def get_properties(node_name: str, data: DataSourceProtocol) -> list[dict]:
             output.append(pdict)
             
     else:
-        logger.debug(f"No properties found for node '{node_name}'")
+        logger.debug("No properties found for node '%s'", node_name)
     
     return output
 
@@ -784,7 +784,7 @@ def populate_template(node_name: str, input_data: DataSourceProtocol, template:
         elif key in output_schema:
             output_schema[key] = value
         else:
-            logger.debug(f"Key '{key}' from node '{node_name}' not found in template")
+            logger.debug("Key '%s' from node '%s' not found in template", key, node_name)
 
     # Required properties. An explicit node-level `required` list wins; falling
     # back to per-property `required: true` flags preserves the older input
@@ -1,13 +1,27 @@
 import subprocess
 import os
 import shutil
+import threading
 import webbrowser
 import logging
+import lzma
 import sys
 
+from gen3schemadev import jsonio
+
+logger = logging.getLogger(__name__)
+
+DDVIS_IMAGE = "quay.io/umccr/ddvis"
+
+# Where the compose file mounts ./schema inside the container.
+DDVIS_SCHEMA_MOUNT = "/usr/share/nginx/html/schema"
+
+# Seconds between checks of the bundle in --watch mode.
+WATCH_INTERVAL = 0.5
+
 def stop_existing_ddvis_container():
     """Checks for a running container named 'ddvis' and stops/removes it."""
-    logging.info("Checking for existing 'ddvis' container...")
+    logger.info("Checking for existing 'ddvis' container...")
 
     # Command to find the container ID of a container named 'ddvis'
     container_id_cmd = ["docker", "ps", "-q", "--filter", "name=ddvis"]
@@ -18,35 +32,155 @@ def stop_existing_ddvis_container():
         container_id = result.stdout.strip()
 
         if container_id:
-            logging.info(f"Found running 'ddvis' container with ID: {container_id}. Stopping it...")
+            logger.info("Found running 'ddvis' container with ID: %s. Stopping it...", container_id)
             # Stop the container
             subprocess.run(["docker", "stop", container_id], check=True)
             # Remove the container
             subprocess.run(["docker", "rm", container_id], check=True)
-            logging.info("Container stopped and removed successfully.")
+            logger.info("Container stopped and removed successfully.")
         else:
-            logging.info("No existing 'ddvis' container found.")
+            logger.info("No existing 'ddvis' container found.")
 
     except FileNotFoundError:
-        logging.error("Error: 'docker' command not found. Please ensure Docker is installed and in your PATH.")
+        logger.error("Error: 'docker' command not found. Please ensure Docker is installed and in your PATH.")
         sys.exit(1)
     except subprocess.CalledProcessError as e:
-        logging.error(f"Error during Docker operation: {e}")
+        logger.error("Error during Docker operation: %s", e)
         sys.exit(1)
 
 
-def visualise_with_docker(schema_path):
+def ddvis_is_current(schema_dir):
+    """
+    Check whether a running 'ddvis' container can serve a re-copied schema as is.
+
+    It can when it is running, was started from the DDVis image, and mounts
+    ``schema_dir`` as its schema volume: a schema copied into that directory is
+    then served on the next page load, with no pull and no restart. A container
+    started from another directory, or not running, needs the full start-up.
+
+    Args:
+        schema_dir (str): The host directory the compose file mounts.
+
+    Returns:
+        bool: True if the running container is current.
+    """
+    inspect_cmd = [
+        "docker", "inspect", "--format",
+        "{{.State.Running}}|{{.Config.Image}}|"
+        '{{range .Mounts}}{{if eq .Destination "' + DDVIS_SCHEMA_MOUNT + '"}}{{.Source}}{{end}}{{end}}',
+        "ddvis",
+    ]
+    try:
+        result = subprocess.run(inspect_cmd, capture_output=True, text=True, check=False)
+    except OSError:
+        return False
+    if result.returncode != 0 or not isinstance(result.stdout, str):
+        return False
+    running, _, rest = result.stdout.strip().partition("|")
+    image, _, mount = rest.partition("|")
+    return (
+        running == "true"
+        and image.split("@")[0] in (DDVIS_IMAGE, f"{DDVIS_IMAGE}:latest")
+        and os.path.realpath(mount) == os.path.realpath(schema_dir)
+    )
+
+
+def copy_schema(schema_path, schema_dir):
+    """
+    Copy the bundle into the mounted schema directory without exposing a partial file.
+
+    The copy is made under a temporary name and renamed over the old one, so
+    nginx - which may be serving the file at that moment - only ever sees the
+    old bundle or the new one. If the copy fails, the temporary file is
+    removed and the old bundle stays in place.
+
+    Raises:
+        OSError: If the bundle cannot be read or the copy written.
+        EOFError, lzma.LZMAError: If a compressed bundle is truncated or
+            corrupt, as it is while still being written.
+    """
+    name = jsonio.plain_name(os.path.basename(schema_path))
+    temp = os.path.join(schema_dir, f".{name}.tmp")
+    try:
+        if jsonio.is_compressed(schema_path):
+            # The viewer fetches plain JSON, so a compressed bundle is
+            # decompressed on the way in.
+            with jsonio.open_for_reading(schema_path) as source, open(temp, 'wb') as target:
+                shutil.copyfileobj(source, target)
+        else:
+            shutil.copy(schema_path, temp)
+        os.replace(temp, os.path.join(schema_dir, name))
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+def watch_schema(schema_path, schema_dir, interval=WATCH_INTERVAL, stop=None):
+    """
+    Re-copy the bundle into the schema directory whenever it changes.
+
+    Polls the bundle's modification time and size rather than depending on a
+    file-watching library; a bundle is a single file, so polling it is cheap.
+    A bundle that cannot be copied - typically one caught while it is still
+    being written - is reported and tried again on the next poll. Runs until
+    ``stop`` is set, or until interrupted with Ctrl-C.
+
+    Args:
+        schema_path (str): The bundle being edited.
+        schema_dir (str): The mounted schema directory to copy it into.
+        interval (float): Seconds between checks.
+        stop (threading.Event): Set to end the watch.
+    """
+    stop = stop or threading.Event()
+
+    def signature():
+        try:
+            stat = os.stat(schema_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    last = signature()
+    failed = None
+    try:
+        while not stop.wait(interval):
+            current = signature()
+            if current is None or current == last:
+                continue
+            try:
+                copy_schema(schema_path, schema_dir)
+            except (OSError, EOFError, lzma.LZMAError) as e:
+                # Leave last as it was, so the next poll tries again; report
+                # each version of the file once rather than on every poll.
+                if current != failed:
+                    logger.error("Error copying changed schema: %s", e)
+                failed = current
+                continue
+            last, failed = current, None
+            print(f"Schema changed; copied {schema_path}. Reload the page to see it.")
+    except KeyboardInterrupt:
+        print("Stopped watching the schema.")
+
+
+def visualise_with_docker(schema_path, watch=False):
     """
     Launch the DDVis Docker container for visualizing a Gen3 schema file.
 
-    This function creates a temporary directory `.ddvis`, changes to it,
+    This function creates a temporary directory `.ddvis`,
     checks for docker-compose installation, validates the existence
     of the provided schema file, writes the necessary docker-compose.yml file,
     copies the schema into a ./schema directory, starts the DDVis container, and
     attempts to open the DDVis URL in the default web browser.
 
+    When a DDVis container started from this directory is already running, the
+    pull and restart are skipped: the container serves the mounted ./schema
+    directory, so copying the new bundle into it is all an update needs.
+
     Args:
         schema_path (str): Path to the schema file to be visualized.
+        watch (bool): After starting, keep copying the schema into the
+            container's volume whenever it changes, until interrupted.
 
     Returns:
         None
@@ -54,35 +188,31 @@ def visualise_with_docker(schema_path):
     Prints user-friendly error messages if prerequisites are missing, if Docker 
     operations fail, or if the web browser could not be opened.
     """
-    import os
-
     if not shutil.which("docker"):
-        logging.error("Error: docker is not installed. Please install it to continue.")
+        logger.error("Error: docker is not installed. Please install it to continue.")
         return
 
     if not os.path.exists(schema_path):
-        logging.error(f"Error: Schema file '{schema_path}' does not exist.")
+        logger.error("Error: Schema file '%s' does not exist.", schema_path)
         return
 
-    # Work in temp directory
+    # Work in a .ddvis directory under the current one. Every path below is
+    # absolute and docker compose is run with cwd= rather than after an
+    # os.chdir, which would move the working directory of every thread in the
+    # process, not just this one.
     temp_dir = os.path.join(os.getcwd(), ".ddvis")
+    schema_dir = os.path.join(temp_dir, "schema")
     try:
         os.makedirs(temp_dir, exist_ok=True)
-        logging.info(f"Created .ddvis directory: {temp_dir}")
+        logger.info("Created .ddvis directory: %s", temp_dir)
     except Exception as e:
-        logging.error(f"Error creating .ddvis directory: {e}")
+        logger.error("Error creating .ddvis directory: %s", e)
         return
 
-    try:
-        os.chdir(temp_dir)
-    except Exception as e:
-        logging.error(f"Error changing directory to .ddvis: {e}")
-        return
-
-    schema_filename = os.path.basename(schema_path)
-    logging.debug(f"Schema filename: {schema_filename}")
-    schema_path = f"../{schema_path}"
-    logging.debug(f"Schema path: {schema_path}")
+    schema_filename = jsonio.plain_name(os.path.basename(schema_path))
+    logger.debug("Schema filename: %s", schema_filename)
+    schema_path = os.path.abspath(schema_path)
+    logger.debug("Schema path: %s", schema_path)
 
     # Docker compose configuration as a string
     docker_compose_content = (
@@ -99,43 +229,49 @@ def visualise_with_docker(schema_path):
 
     try:
         # Write the docker-compose.yml file
-        with open("docker-compose.yml", "w") as f:
+        with open(os.path.join(temp_dir, "docker-compose.yml"), "w") as f:
             f.write(docker_compose_content)
     except Exception as e:
-        logging.error(f"Error writing docker-compose.yml: {e}")
+        logger.error("Error writing docker-compose.yml: %s", e)
         return
 
     try:
         # Create schema directory and copy the file
-        os.makedirs("schema", exist_ok=True)
-        shutil.copy(schema_path, "schema/")
+        os.makedirs(schema_dir, exist_ok=True)
+        copy_schema(schema_path, schema_dir)
     except Exception as e:
-        logging.error(f"Error preparing schema directory or copying file: {e}")
+        logger.error("Error preparing schema directory or copying file: %s", e)
         return
 
-    try:
-        stop_existing_ddvis_container()
-    except Exception as e:
-        logging.error(f"Error stopping existing ddvis container: {e}")
-        return
+    if ddvis_is_current(schema_dir):
+        logger.info("DDVis is already running on this schema directory; reusing it.")
+    else:
+        try:
+            stop_existing_ddvis_container()
+        except Exception as e:
+            logger.error("Error stopping existing ddvis container: %s", e)
+            return
 
-    try:
-        # Run docker-compose commands
-        logging.info("Pulling Docker image and starting container...")
-        subprocess.run(["docker", "compose", "pull"], check=True)
-        subprocess.run(["docker", "compose", "up", "-d"], check=True)
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error running docker-compose command: {e}")
-        return
-    except Exception as e:
-        logging.error(f"Unexpected error during docker-compose execution: {e}")
-        return
+        try:
+            # Run docker-compose commands
+            logger.info("Pulling Docker image and starting container...")
+            subprocess.run(["docker", "compose", "pull"], check=True, cwd=temp_dir)
+            subprocess.run(["docker", "compose", "up", "-d"], check=True, cwd=temp_dir)
+        except subprocess.CalledProcessError as e:
+            logger.error("Error running docker-compose command: %s", e)
+            return
+        except Exception as e:
+            logger.error("Unexpected error during docker-compose execution: %s", e)
+            return
 
     # Open the browser
     url = f"http://localhost:8080/#schema/{schema_filename}"
-    logging.info(f"Attempting to open DDVis at {url}")
+    logger.info("Attempting to open DDVis at %s", url)
     try:
         webbrowser.open(url)
     except Exception as e:
-        logging.warning(f"Error opening web browser: {e}")
+        logger.warning("Error opening web browser: %s", e)
 
+    if watch:
+        print(f"Watching {schema_path} for changes; press Ctrl-C to stop.")
+        watch_schema(schema_path, schema_dir)
@@ -0,0 +1,248 @@
+"""
+Semantic diff between two bundled dictionaries.
+
+A textual diff of a multi-megabyte bundle is unreviewable: one renamed enum
+value shows up as a line change buried in a single enormous line of JSON. This
+module compares two bundles the way a reviewer thinks about them - nodes,
+properties, enum values, links, definitions and terms that were added, removed
+or changed.
+
+Every subtree is given a Merkle-style hash: a mapping hashes its sorted
+``(key, child hash)`` pairs, a list hashes its children in order, and a scalar
+hashes its JSON text. Two subtrees with equal hashes are equal, so an unchanged
+node or definition is dismissed with one comparison instead of a walk, and only
+the parts that actually changed are descended into. Hashes are memoised per
+object for the duration of one diff, so each subtree is hashed once however
+often it is compared.
+
+The comparison is made on the bundles as written, before resolution, so a
+change to a shared definition is reported once against the definition rather
+than once per node that uses it.
+"""
+
+import hashlib
+import json
+
+_DEFINITIONS = '_definitions.yaml'
+_TERMS = '_terms.yaml'
+
+
+class MerkleHasher:
+    """Hash subtrees of JSON-compatible data, remembering each result."""
+
+    def __init__(self):
+        # Keyed by id(). Each entry holds the object itself as well as its
+        # hash, so the object stays alive and its id cannot be reused by
+        # another one while the hasher exists.
+        self._memo = {}
+
+    def __call__(self, value) -> bytes:
+        if isinstance(value, (dict, list)):
+            cached = self._memo.get(id(value))
+            if cached is not None:
+                return cached[1]
+        digest = hashlib.sha256()
+        if isinstance(value, dict):
+            digest.update(b'{')
+            for child_key in sorted(value):
+                digest.update(json.dumps(child_key).encode('utf-8'))
+                digest.update(self(value[child_key]))
+        elif isinstance(value, list):
+            digest.update(b'[')
+            for item in value:
+                digest.update(self(item))
+        else:
+            digest.update(b'=')
+            digest.update(json.dumps(value, sort_keys=True).encode('utf-8'))
+        result = digest.digest()
+        if isinstance(value, (dict, list)):
+            self._memo[id(value)] = (value, result)
+        return result
+
+    def same(self, left, right) -> bool:
+        """Return True if two subtrees are equal, by hash."""
+        return left is right or self(left) == self(right)
+
+
+def _keyed_diff(old: dict, new: dict, same) -> dict:
+    """Compare two mappings key by key: added, removed and changed keys, sorted."""
+    old = old if isinstance(old, dict) else {}
+    new = new if isinstance(new, dict) else {}
+    return {
+        'added': sorted(set(new) - set(old)),
+        'removed': sorted(set(old) - set(new)),
+        'changed': sorted(k for k in set(old) & set(new) if not same(old[k], new[k])),
+    }
+
+
+def flatten_links(links) -> dict:
+    """
+    Return a node's links keyed by name, with subgroups unwrapped.
+
+    Every member of a subgroup is included, exclusive or not: each one is a
+    link property the node has, whichever of them a record uses. Links are
+    in the order the schema lists them.
+    """
+    found = {}
+    for link in links or []:
+        if not isinstance(link, dict):
+            continue
+        if 'subgroup' in link:
+            found.update(flatten_links(link['subgroup']))
+        elif 'name' in link:
+            found.setdefault(link['name'], link)
+    return found
+
+
+def _enum_changes(old_props: dict, new_props: dict, changed: list) -> dict:
+    """For changed properties carrying an enum on both sides, the values added and removed."""
+    result = {}
+    for name in changed:
+        old_enum = old_props[name].get('enum') if isinstance(old_props[name], dict) else None
+        new_enum = new_props[name].get('enum') if isinstance(new_props[name], dict) else None
+        if not isinstance(old_enum, list) or not isinstance(new_enum, list):
+            continue
+        added = [v for v in new_enum if v not in old_enum]
+        removed = [v for v in old_enum if v not in new_enum]
+        if added or removed:
+            result[name] = {'added': added, 'removed': removed}
+    return result
+
+
+def _node_diff(old: dict, new: dict, same) -> dict:
+    """Describe how one node schema changed."""
+    old_props = old.get('properties') or {}
+    new_props = new.get('properties') or {}
+    properties = _keyed_diff(old_props, new_props, same)
+    links = _keyed_diff(flatten_links(old.get('links')), flatten_links(new.get('links')), same)
+    # Links compared by name miss a change to how they are arranged - wrapped
+    # in a subgroup, reordered, or a subgroup's exclusive or required flag -
+    # which still changes what a record may link to.
+    links['regrouped'] = (
+        not (links['added'] or links['removed'] or links['changed'])
+        and not same(old.get('links'), new.get('links'))
+    )
+    fields = _keyed_diff(
+        {k: v for k, v in old.items() if k not in ('properties', 'links')},
+        {k: v for k, v in new.items() if k not in ('properties', 'links')},
+        same,
+    )
+    return {
+        'properties': properties,
+        'enums': _enum_changes(old_props, new_props, properties['changed']),
+        'links': links,
+        'fields': sorted(fields['added'] + fields['removed'] + fields['changed']),
+    }
+
+
+def is_node_file(name: str) -> bool:
+    """Return True for a bundle entry that is a node rather than a framework file."""
+    return not name.startswith('_')
+
+
+def diff_bundles(old: dict, new: dict) -> dict:
+    """
+    Compare two bundled dictionaries.
+
+    Args:
+        old: The earlier bundle, keyed by filename.
+        new: The later bundle, keyed by filename.
+
+    Returns:
+        A dict with:
+
+        - ``nodes``: ``added`` and ``removed`` node files, and ``changed``
+          mapping each changed node file to its ``properties``, ``enums``,
+          ``links`` and ``fields`` (other top-level keys) changes. ``links``
+          also holds ``regrouped``, True when the links changed only in how
+          they are arranged into subgroups or ordered.
+        - ``definitions`` and ``terms``: ``added``, ``removed`` and
+          ``changed`` entry names.
+        - ``files``: ``added``, ``removed`` and ``changed`` framework files
+          other than definitions and terms, such as ``_settings.yaml``.
+    """
+    hasher = MerkleHasher()
+    same = hasher.same
+
+    old_nodes = {k: v for k, v in old.items() if is_node_file(k)}
+    new_nodes = {k: v for k, v in new.items() if is_node_file(k)}
+    nodes = _keyed_diff(old_nodes, new_nodes, same)
+    nodes['changed'] = {
+        name: _node_diff(old_nodes[name], new_nodes[name], same)
+        for name in nodes['changed']
+    }
+
+    framework_old = {k: v for k, v in old.items() if not is_node_file(k) and k not in (_DEFINITIONS, _TERMS)}
+    framework_new = {k: v for k, v in new.items() if not is_node_file(k) and k not in (_DEFINITIONS, _TERMS)}
+
+    return {
+        'nodes': nodes,
+        'definitions': _keyed_diff(old.get(_DEFINITIONS), new.get(_DEFINITIONS), same),
+        'terms': _keyed_diff(old.get(_TERMS), new.get(_TERMS), same),
+        'files': _keyed_diff(framework_old, framework_new, same),
+    }
+
+
+def is_empty(diff: dict) -> bool:
+    """Return True if a diff from diff_bundles records no change at all."""
+    nodes = diff['nodes']
+    if nodes['added'] or nodes['removed'] or nodes['changed']:
+        return False
+    return not any(
+        diff[section][kind]
+        for section in ('definitions', 'terms', 'files')
+        for kind in ('added', 'removed', 'changed')
+    )
+
+
+def format_diff(diff: dict, old_label: str = 'old', new_label: str = 'new') -> str:
+    """
+    Render a diff from diff_bundles as text for a reviewer.
+
+    Returns:
+        The formatted report, ending without a trailing newline.
+    """
+    if is_empty(diff):
+        return f"No semantic differences between {old_label} and {new_label}."
+
+    lines = [f"Semantic diff: {old_label} -> {new_label}", ""]
+    nodes = diff['nodes']
+    for name in nodes['added']:
+        lines.append(f"  + node {name}")
+    for name in nodes['removed']:
+        lines.append(f"  - node {name}")
+    for name, change in nodes['changed'].items():
+        lines.append(f"  ~ node {name}")
+        for prop in change['properties']['added']:
+            lines.append(f"      + property {prop}")
+        for prop in change['properties']['removed']:
+            lines.append(f"      - property {prop}")
+        for prop in change['properties']['changed']:
+            enum = change['enums'].get(prop)
+            if enum:
+                lines.append(f"      ~ property {prop}: enum values")
+                lines += [f"          + {value}" for value in enum['added']]
+                lines += [f"          - {value}" for value in enum['removed']]
+            else:
+                lines.append(f"      ~ property {prop}")
+        for link in change['links']['added']:
+            lines.append(f"      + link {link}")
+        for link in change['links']['removed']:
+            lines.append(f"      - link {link}")
+        for link in change['links']['changed']:
+            lines.append(f"      ~ link {link}")
+        if change['links']['regrouped']:
+            lines.append("      ~ links regrouped")
+        if change['fields']:
+            lines.append(f"      ~ {', '.join(change['fields'])}")
+
+    for section, label in (('definitions', 'definition'), ('terms', 'term'), ('files', 'file')):
+        part = diff[section]
+        if not (part['added'] or part['removed'] or part['changed']):
+            continue
+        lines.append("")
+        lines += [f"  + {label} {name}" for name in part['added']]
+        lines += [f"  - {label} {name}" for name in part['removed']]
+        lines += [f"  ~ {label} {name}" for name in part['changed']]
+
+    return "\n".join(lines)
@@ -3,12 +3,12 @@ Dictionary generation: planning, preset merging, drift detection, and writing.
 
 The central design decision here is that generation happens entirely in memory
 before a single file is touched. `build_dictionary` either returns a complete
-set of files or raises, so a malformed node cannot leave half a dictionary on
-disk. Everything else in this module - refusing to overwrite, `--check`, orphan
-detection - is built on top of that complete in-memory picture.
+set of files or raises - with every failing node at once, when asked to keep
+going - so a malformed node cannot leave half a dictionary on disk. Everything
+else in this module - refusing to overwrite, `--check`, orphan detection - is
+built on top of that complete in-memory picture.
 """
 
-import copy
 import logging
 import os
 import shutil
@@ -26,7 +26,8 @@ from gen3schemadev.schema.gen3_template import (
     generate_program_template,
     shared_property_names,
 )
-from gen3schemadev.utils import write_yaml
+from gen3schemadev import tracing
+from gen3schemadev.utils import load_yaml, write_yaml
 
 logger = logging.getLogger(__name__)
 
@@ -58,7 +59,9 @@ def load_preset(name):
         name: One of the keys in PRESET_LOADERS.
 
     Returns:
-        A deep copy of the preset, safe for the caller to mutate.
+        A freshly parsed preset, owned by the caller and safe to mutate. The
+        loaders parse the packaged YAML on every call, so no copy is made here;
+        copying a document nobody else holds only doubled the work.
 
     Raises:
         ValueError: If the preset is not one gen3schemadev ships.
@@ -67,7 +70,7 @@ def load_preset(name):
         raise ValueError(
             f"Unknown preset '{name}'. Available presets: {', '.join(sorted(PRESET_LOADERS))}"
         )
-    return copy.deepcopy(PRESET_LOADERS[name]())
+    return PRESET_LOADERS[name]()
 
 
 def merge_onto_preset(node_model, node_name, validated_model, preset=None):
@@ -206,13 +209,46 @@ def find_shadowed_properties(validated_model):
     return sorted(shadowed, key=lambda entry: entry['node'])
 
 
-def build_dictionary(validated_model, converter_template, only=None):
+class NodeBuildError(Exception):
+    """
+    Raised by ``build_dictionary(keep_going=True)`` when any node failed to build.
+
+    Attributes:
+        failures: ``(node name, exception)`` pairs, in input order.
+    """
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        super().__init__(
+            f"{len(self.failures)} node(s) failed to build: "
+            f"{', '.join(name for name, _ in self.failures)}"
+        )
+
+
+def _build_node(name, nodes_by_name, validated_model, converter_template):
+    """Build one node's schema, returning ``(schema, merge summary or None)``."""
+    node_model = nodes_by_name.get(name)
+    preset_name, implicit = _preset_for(node_model, name)
+    if not preset_name:
+        return populate_template(name, validated_model, converter_template), None
+    merged, summary = merge_onto_preset(node_model, name, validated_model, preset=preset_name)
+    summary['node'] = name
+    summary['implicit'] = implicit
+    return merged, summary
+
+
+def build_dictionary(validated_model, converter_template, only=None, keep_going=False):
     """
     Build every file the dictionary consists of, in memory.
 
     Nothing is written here. If any node fails to build, the caller still has
     whatever was on disk before, untouched.
 
+    By default the first node to fail stops the build, with its own exception.
+    With ``keep_going`` every node is built regardless and the failures are
+    raised together, so an input with several broken nodes takes one run to
+    diagnose rather than one run per node.
+
     Args:
         validated_model: The validated input data model.
         converter_template: Node template derived from the metaschema.
@@ -225,6 +261,7 @@ def build_dictionary(validated_model, converter_template, only=None):
 
     Raises:
         ValueError: If `only` names nodes the input does not define.
+        NodeBuildError: With ``keep_going``, if any node failed to build.
     """
     node_names = get_node_names(validated_model)
     nodes_by_name = {n.name: n for n in validated_model.nodes}
@@ -242,22 +279,24 @@ def build_dictionary(validated_model, converter_template, only=None):
     files = {}
     summaries = []
 
-    for name in targets:
-        node_model = nodes_by_name.get(name)
-        preset_name, implicit = _preset_for(node_model, name)
+    failures = []
 
-        if preset_name:
-            merged, summary = merge_onto_preset(
-                node_model, name, validated_model, preset=preset_name
-            )
-            summary['node'] = name
-            summary['implicit'] = implicit
+    for name in targets:
+        try:
+            with tracing.span('build', 'node', node=name):
+                schema, summary = _build_node(name, nodes_by_name, validated_model, converter_template)
+        except Exception as exc:
+            if not keep_going:
+                raise
+            logger.debug("Node %s failed to build", name, exc_info=True)
+            failures.append((name, exc))
+            continue
+        files[f"{name}.yaml"] = schema
+        if summary is not None:
             summaries.append(summary)
-            files[f"{name}.yaml"] = merged
-        else:
-            files[f"{name}.yaml"] = populate_template(
-                name, validated_model, converter_template
-            )
+
+    if failures:
+        raise NodeBuildError(failures)
 
     # A targeted regeneration deliberately stops here: rewriting the framework
     # files would defeat the point of --only.
@@ -287,23 +326,46 @@ def build_dictionary(validated_model, converter_template, only=None):
     return files, summaries
 
 
+def _copy_tree(value):
+    """Copy the mappings and lists of a parsed YAML or JSON value; scalars are immutable."""
+    if isinstance(value, dict):
+        return {key: _copy_tree(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_tree(item) for item in value]
+    return value
+
+
 def _deep_merge(base, overlay):
     """
-    Recursively merge overlay into a copy of base; overlay wins on conflict.
+    Recursively merge overlay onto base; overlay wins on conflict.
+
+    The merge is copy-on-write with respect to ``base``: only the mappings on
+    a path the overlay actually modifies are copied, and every other subtree
+    is shared with it. The previous version deep-copied the whole of ``base``
+    at every level of recursion - quadratic in nesting depth - so layering one
+    custom enum onto _definitions.yaml copied the entire template several
+    times over.
+
+    Values taken from ``overlay`` are copied. The overlay is the caller's -
+    the input model's definitions - and sharing them would let a change to
+    one generated dictionary show up in the input and in every later one.
 
     Args:
-        base: The starting mapping.
+        base: The starting mapping, owned by the caller.
         overlay: Values to layer on top.
 
     Returns:
-        A new merged dict; neither input is mutated.
+        A new merged dict. Neither input is mutated. The result shares
+        untouched subtrees with ``base``, so copy any part of it that came from
+        ``base`` before mutating ``base`` again; it shares nothing with
+        ``overlay``.
     """
-    result = copy.deepcopy(base)
+    result = dict(base)
     for key, value in overlay.items():
         if isinstance(value, dict) and isinstance(result.get(key), dict):
             result[key] = _deep_merge(result[key], value)
         else:
-            result[key] = copy.deepcopy(value)
+            result[key] = _copy_tree(value)
     return result
 
 
@@ -418,6 +480,29 @@ def diff_against_disk(files, output_dir):
     }
 
 
+def bundle_files(files, output_dir=None):
+    """
+    Bundle an in-memory dictionary exactly as ``bundle`` would bundle it on disk.
+
+    Keys are sorted, as in utils.bundle_yamls. When ``output_dir`` is given,
+    the orphans already in it are read in too: bundle ships every YAML file in
+    the directory, so a bundle built without them would not be the one that
+    gets deployed.
+
+    Args:
+        files: The in-memory dictionary from build_dictionary.
+        output_dir: The directory the dictionary is being written to, if any.
+
+    Returns:
+        The bundled dictionary, keyed by filename.
+    """
+    bundle = dict(files)
+    if output_dir is not None:
+        for filename in find_orphans(files, output_dir):
+            bundle[filename] = load_yaml(os.path.join(output_dir, filename))
+    return {name: bundle[name] for name in sorted(bundle)}
+
+
 def unwritable_targets(files, output_dir):
     """
     Find existing files that could not be replaced.
@@ -476,7 +561,8 @@ def write_dictionary(files, output_dir):
     staging = tempfile.mkdtemp(prefix='.gen3schemadev-', dir=output_dir)
     try:
         for filename, content in sorted(files.items()):
-            write_yaml(content, os.path.join(staging, filename))
+            with tracing.span('serialise', 'node', file=filename):
+                write_yaml(content, os.path.join(staging, filename))
         for filename in sorted(files):
             os.replace(
                 os.path.join(staging, filename),
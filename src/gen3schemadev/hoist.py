@@ -0,0 +1,160 @@
+"""
+Hoisting repeated property definitions into ``_definitions.yaml``.
+
+``construct_props`` writes every property inline, so the same body - the same
+enum list, description and pattern - is repeated in every node declaring it.
+``generate --hoist`` moves each body that occurs often enough into
+``_definitions.yaml`` as a named entry and replaces every copy with a
+``$ref`` to it. Resolution expands the references back into the same bodies,
+so the resolved dictionary is unchanged; the YAML and the bundle are smaller.
+
+A body is hoisted only when it is a mapping occurring at least ``min_count``
+times and replacing it saves bytes. Bodies containing a ``$ref`` are left
+alone, since a reference means something different once moved into another
+file, and a body identical to an existing definition is pointed at that
+definition rather than copied.
+"""
+
+import json
+import time
+
+from gen3schemadev.refs import collect_refs
+from gen3schemadev.utils import content_hash
+
+DEFINITIONS_FILE = '_definitions.yaml'
+TERMS_FILE = '_terms.yaml'
+
+
+def _size(value) -> int:
+    # Sizes are of the bundle as write_json writes it.
+    return len(json.dumps(value))
+
+
+def _saving(group, name, new_entry) -> int:
+    """Return the bytes hoisting ``group`` under ``name`` saves."""
+    ref_size = _size({'$ref': f"{DEFINITIONS_FILE}#/{name}"})
+    saved = len(group['uses']) * (_size(group['body']) - ref_size)
+    if new_entry:
+        # The entry itself: '"name": body, '.
+        saved -= _size(name) + 4 + _size(group['body'])
+    return saved
+
+
+def _hoistable(body) -> bool:
+    return isinstance(body, dict) and bool(body) and not collect_refs(body)
+
+
+def _parse_seconds(bundle) -> float:
+    """Return the best of three times to parse ``bundle`` serialised as JSON."""
+    text = json.dumps(bundle)
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        json.loads(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def find_duplicates(files: dict, min_count: int = 2) -> list:
+    """
+    Find the property bodies repeated at least ``min_count`` times.
+
+    Args:
+        files: The dictionary, keyed by filename.
+        min_count: The fewest copies a body must have.
+
+    Returns:
+        One dict per body, most repeated bytes first: ``body``, ``digest``
+        and the ``uses`` as ``(filename, property)`` pairs.
+    """
+    groups = {}
+    for filename, schema in files.items():
+        if filename.startswith('_') or not isinstance(schema, dict):
+            continue
+        properties = schema.get('properties')
+        if not isinstance(properties, dict):
+            continue
+        for prop, body in properties.items():
+            if _hoistable(body):
+                group = groups.setdefault(content_hash(body), {'body': body, 'uses': []})
+                group['uses'].append((filename, prop))
+
+    duplicates = [
+        {'digest': digest, **group} for digest, group in groups.items() if len(group['uses']) >= min_count
+    ]
+    return sorted(
+        duplicates, key=lambda group: (-len(group['uses']) * _size(group['body']), group['digest'])
+    )
+
+
+def _entry_name(group, reserved, taken):
+    """
+    Name a hoisted entry after its properties, unless that name is in use.
+
+    ``reserved`` must hold the keys of ``_terms.yaml`` as well as those of
+    ``_definitions.yaml``: the resolver looks a reference up in both files
+    merged, definitions winning, so an entry named after a term would take
+    the place of that term in every reference to it.
+    """
+    counts = {}
+    for _, prop in group['uses']:
+        counts[prop] = counts.get(prop, 0) + 1
+    name = min(counts, key=lambda prop: (-counts[prop], prop))
+    if name in taken or name in reserved:
+        name = f"{name}_{group['digest'][:8]}"
+    return name
+
+
+def hoist_properties(files: dict, min_count: int = 2):
+    """
+    Move repeated property bodies into ``_definitions.yaml``.
+
+    Args:
+        files: The whole dictionary, keyed by filename, as build_dictionary
+            returns it. Not modified.
+        min_count: The fewest copies a body must have to be hoisted.
+
+    Returns:
+        A tuple ``(files, report)``. ``files`` is the hoisted dictionary;
+        every schema it changed is a new dict, the rest are shared with the
+        input. ``report`` holds ``entries`` (entry name to the number of
+        properties now referencing it), ``bundle_bytes`` and
+        ``parse_seconds``, each a ``(before, after)`` pair.
+
+    Raises:
+        ValueError: If ``files`` has no ``_definitions.yaml`` to hoist into.
+    """
+    if not isinstance(files.get(DEFINITIONS_FILE), dict):
+        raise ValueError(f"hoisting needs the whole dictionary, including {DEFINITIONS_FILE}")
+    definitions = dict(files[DEFINITIONS_FILE])
+    existing = {content_hash(value): key for key, value in definitions.items()}
+    terms = files.get(TERMS_FILE)
+    reserved = set(definitions) | (set(terms) if isinstance(terms, dict) else set())
+
+    hoisted = dict(files)
+    entries = {}
+    for group in find_duplicates(files, min_count=min_count):
+        name = existing.get(group['digest'])
+        new_entry = name is None
+        if new_entry:
+            name = _entry_name(group, reserved, entries)
+        # A $ref line is not free, so small bodies such as {type: string}
+        # stay where they are.
+        if _saving(group, name, new_entry) <= 0:
+            continue
+        if new_entry:
+            definitions[name] = group['body']
+        entries[name] = len(group['uses'])
+        ref = {'$ref': f"{DEFINITIONS_FILE}#/{name}"}
+        for filename, prop in group['uses']:
+            if hoisted[filename] is files[filename]:
+                hoisted[filename] = {**files[filename], 'properties': dict(files[filename]['properties'])}
+            hoisted[filename]['properties'][prop] = dict(ref)
+    hoisted[DEFINITIONS_FILE] = definitions
+
+    report = {
+        'entries': entries,
+        'bundle_bytes': (_size(files), _size(hoisted)),
+        'parse_seconds': (_parse_seconds(files), _parse_seconds(hoisted)),
+    }
+    return hoisted, report
@@ -0,0 +1,251 @@
+"""
+Loading the input data model from a single file or from a directory of files.
+
+A large model kept in one ``input.yaml`` is slow to parse and a merge-conflict
+hotspot: every change to every node lands in the same file. A model may instead
+be split across a directory::
+
+    input/
+      dictionary.yaml     # version and url (may also carry nodes/links/definitions)
+      nodes/*.yaml        # one node per file, or a list of nodes per file
+      links.yaml          # the list of links
+      definitions.yaml    # extra shared definitions, optional
+
+The pieces are parsed concurrently and assembled into the same mapping a
+single-file input produces, so everything downstream - ``DataModel`` validation,
+``build_dictionary``, ``--check`` - is unaware of the split.
+
+Each file's parse is cached by the SHA-256 of its bytes, so after editing one
+node only that node's file is parsed again. The cache stores the parsed result
+as JSON, which reads back far faster than YAML parses.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from gen3schemadev.utils import cache_dir
+
+logger = logging.getLogger(__name__)
+
+# The file holding version and url in a directory input.
+DICTIONARY_FILE = 'dictionary.yaml'
+NODES_DIR = 'nodes'
+LINKS_FILE = 'links.yaml'
+DEFINITIONS_FILE = 'definitions.yaml'
+
+# Bumped whenever the shape of a cache entry changes, so stale entries are
+# never read back as if they were current.
+_CACHE_FORMAT = '1'
+
+# libyaml's loader is several times faster than the pure-Python one and parses
+# identically for safe_load's purposes; fall back when PyYAML was built without it.
+_Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class InputFileError(Exception):
+    """
+    Raised when one file of an input cannot be parsed.
+
+    Carries the file's path alongside the underlying ``yaml.YAMLError``, because
+    in a directory input "not valid YAML" is useless without knowing which of
+    forty files it is about.
+    """
+
+    def __init__(self, path, error):
+        super().__init__(f"{path}: {error}")
+        self.path = path
+        self.error = error
+
+
+class InputLayoutError(ValueError):
+    """Raised when an input directory is not laid out as described above."""
+
+
+def _parse_cached(path, use_cache=True):
+    """
+    Parse one YAML file, reusing a previous parse of identical bytes.
+
+    Args:
+        path: The file to parse.
+        use_cache: Set False to always parse and never touch the cache.
+
+    Returns:
+        The parsed document.
+
+    Raises:
+        InputFileError: If the file is not valid YAML.
+    """
+    with open(path, 'rb') as handle:
+        raw = handle.read()
+
+    entry = None
+    if use_cache:
+        digest = hashlib.sha256(raw).hexdigest()
+        try:
+            entry = os.path.join(cache_dir('inputs'), f"{_CACHE_FORMAT}-{digest}.json")
+        except OSError as exc:
+            # An unwritable or read-only cache location only costs the
+            # shortcut; the file is parsed as if caching were off.
+            logger.debug("Not caching the parse of %s: cannot use the cache directory (%s)", path, exc)
+    if entry is not None:
+        try:
+            with open(entry, 'r') as handle:
+                logger.debug("Input cache hit for %s", path)
+                return json.load(handle)
+        except (OSError, ValueError):
+            pass
+
+    try:
+        data = yaml.load(raw, Loader=_Loader)
+    except yaml.YAMLError as exc:
+        raise InputFileError(path, exc) from exc
+
+    if entry is not None:
+        _store(entry, data, path)
+    return data
+
+
+def _store(entry, data, path):
+    """
+    Write a cache entry, skipping documents JSON would not give back unchanged.
+
+    A YAML timestamp cannot be represented at all, and an integer mapping key
+    would come back as a string - a silent change to the input - so anything
+    that does not survive the round trip is simply not cached.
+
+    The entry is written to a temporary name and renamed, so two concurrent runs
+    never observe a half-written file.
+    """
+    try:
+        text = json.dumps(data)
+        if json.loads(text) != data:
+            logger.debug("Not caching parse of %s: not JSON round-trippable", path)
+            return
+    except (TypeError, ValueError):
+        logger.debug("Not caching parse of %s: not JSON representable", path)
+        return
+    temp = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp, 'w') as handle:
+            handle.write(text)
+        os.replace(temp, entry)
+    except OSError as exc:
+        logger.debug("Could not write input cache entry for %s: %s", path, exc)
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def _yaml_files(directory):
+    """Return the YAML files directly inside a directory, in sorted order."""
+    return [
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if name.endswith(('.yaml', '.yml'))
+    ]
+
+
+def _as_list(document, key, path):
+    """
+    Read a list-valued document that may also be wrapped in ``{key: [...]}``.
+
+    Both ``links.yaml`` containing a bare list and one containing ``links:``
+    are natural ways to write it, so both are accepted.
+    """
+    if document is None:
+        return []
+    if isinstance(document, dict) and key in document:
+        document = document[key]
+    if isinstance(document, dict):
+        return [document]
+    if not isinstance(document, list):
+        raise InputLayoutError(f"{path} must contain a list of {key}")
+    return document
+
+
+def load_input_dir(input_dir, use_cache=True, max_workers=None):
+    """
+    Load a directory input and assemble it into a single data-model mapping.
+
+    Nodes are taken in sorted filename order, so node order - and with it the
+    generated output - does not depend on the filesystem.
+
+    Args:
+        input_dir: The input directory.
+        use_cache: Set False to bypass the parse cache.
+        max_workers: Thread pool size for parsing. Defaults to the executor's own.
+
+    Returns:
+        A dict with the same shape as a single-file input.
+
+    Raises:
+        InputLayoutError: If ``dictionary.yaml`` is missing or a file has the wrong shape.
+        InputFileError: If any file is not valid YAML.
+    """
+    dictionary_path = os.path.join(input_dir, DICTIONARY_FILE)
+    if not os.path.isfile(dictionary_path):
+        raise InputLayoutError(
+            f"{input_dir} has no {DICTIONARY_FILE}; it must hold at least 'version' and 'url'"
+        )
+    nodes_dir = os.path.join(input_dir, NODES_DIR)
+    node_paths = _yaml_files(nodes_dir) if os.path.isdir(nodes_dir) else []
+    links_path = os.path.join(input_dir, LINKS_FILE)
+    definitions_path = os.path.join(input_dir, DEFINITIONS_FILE)
+
+    paths = [dictionary_path, *node_paths]
+    paths += [p for p in (links_path, definitions_path) if os.path.isfile(p)]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        parsed = dict(zip(paths, pool.map(lambda p: _parse_cached(p, use_cache), paths)))
+
+    data = parsed[dictionary_path] or {}
+    if not isinstance(data, dict):
+        raise InputLayoutError(f"{dictionary_path} must be a mapping")
+    data = dict(data)
+
+    nodes = list(data.get('nodes') or [])
+    for path in node_paths:
+        nodes.extend(_as_list(parsed[path], 'nodes', path))
+    data['nodes'] = nodes
+
+    links = list(data.get('links') or [])
+    if links_path in parsed:
+        links.extend(_as_list(parsed[links_path], 'links', links_path))
+    data['links'] = links
+
+    if definitions_path in parsed:
+        extra = parsed[definitions_path] or {}
+        if not isinstance(extra, dict):
+            raise InputLayoutError(f"{definitions_path} must be a mapping")
+        data['definitions'] = {**(data.get('definitions') or {}), **extra}
+
+    logger.info(
+        "Loaded input directory %s: %d node files, %d links",
+        input_dir, len(node_paths), len(links),
+    )
+    return data
+
+
+def load_input(path, use_cache=True):
+    """
+    Load the input data model from a single YAML file or an input directory.
+
+    Args:
+        path: An input YAML file, or a directory laid out as in this module's docstring.
+        use_cache: Set False to bypass the parse cache.
+
+    Returns:
+        The parsed data-model mapping, ready for ``DataModel.model_validate``.
+
+    Raises:
+        InputFileError: If a file is not valid YAML.
+        InputLayoutError: If a directory input is laid out wrongly.
+    """
+    if os.path.isdir(path):
+        return load_input_dir(path, use_cache=use_cache)
+    return _parse_cached(path, use_cache=use_cache)
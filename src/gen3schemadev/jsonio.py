@@ -0,0 +1,167 @@
+"""
+The JSON layer under ``read_json`` and ``write_json``: the decoder, and compression.
+
+Bundles of several megabytes are read and written on every pipeline run, and
+travel through artifact stores in between.
+
+- Decoding goes through a pluggable backend. ``orjson`` is used when it is
+  installed, and the standard library otherwise; ``GEN3SCHEMADEV_JSON_BACKEND``
+  names one explicitly. A document a backend rejects (``NaN``, an integer too
+  large for it) is decoded again by the standard library, so the backend
+  changes only the speed, never what a file means.
+- Encoding always uses the standard library, so a bundle is byte-identical
+  whatever is installed; no faster encoder writes the same bytes. Each
+  top-level entry is encoded by one call to the C encoder and written before
+  the next is encoded, where ``json.dump`` to a file runs the pure Python
+  encoder - several times slower, for the same output. Memory while writing
+  is bounded by the largest entry (a node schema), not by the bundle.
+- A path ending ``.json.gz`` or ``.json.xz`` is compressed and decompressed
+  by its suffix; writing feeds the compressor entry by entry, so compression
+  adds nothing to that bound. gzip output carries no timestamp or filename,
+  so it is as reproducible as the plain file.
+"""
+
+import gzip
+import json
+import logging
+import lzma
+import os
+
+logger = logging.getLogger(__name__)
+
+COMPRESSED_SUFFIXES = ('.gz', '.xz')
+
+
+def _stdlib_loads(data):
+    return json.loads(data)
+
+
+def _orjson_loads():
+    import orjson
+    return orjson.loads
+
+
+# Backends in order of preference. Each entry returns the backend's loads
+# function, or raises ImportError when it is not installed.
+_BACKENDS = {
+    'orjson': _orjson_loads,
+    'json': lambda: _stdlib_loads,
+}
+
+_selected = None
+
+
+def backend() -> tuple:
+    """
+    Return the decoding backend in use, choosing it on first call.
+
+    Returns:
+        ``(name, loads)``.
+    """
+    global _selected
+    if _selected is None:
+        wanted = os.environ.get('GEN3SCHEMADEV_JSON_BACKEND')
+        names = list(_BACKENDS)
+        if wanted:
+            if wanted in _BACKENDS:
+                names = [wanted, 'json']
+            else:
+                logger.warning(
+                    "Ignoring GEN3SCHEMADEV_JSON_BACKEND=%r: not one of %s", wanted, ', '.join(_BACKENDS)
+                )
+        for name in names:
+            try:
+                _selected = (name, _BACKENDS[name]())
+                break
+            except ImportError:
+                continue
+        logger.debug("Decoding JSON with %s", _selected[0])
+    return _selected
+
+
+def loads(data):
+    """
+    Decode a JSON document from ``str`` or UTF-8 ``bytes``.
+
+    Raises:
+        json.JSONDecodeError: If ``data`` is not valid JSON.
+    """
+    name, decode = backend()
+    if name == 'json':
+        return decode(data)
+    try:
+        return decode(data)
+    except ValueError:
+        # The standard library accepts what some backends refuse, and
+        # otherwise raises its own, familiar error.
+        return _stdlib_loads(data)
+
+
+def dumps(data, **options) -> str:
+    """Encode ``data`` exactly as ``json.dump`` with ``options`` would write it."""
+    return json.dumps(data, **options)
+
+
+def is_compressed(path: str) -> bool:
+    """Return True if ``path`` is read and written compressed."""
+    return path.endswith(COMPRESSED_SUFFIXES)
+
+
+def plain_name(path: str) -> str:
+    """Return ``path`` without a compression suffix."""
+    return os.path.splitext(path)[0] if is_compressed(path) else path
+
+
+def split_ext(path: str) -> tuple:
+    """Split ``path`` into a root and its extension, ``.json.gz`` counting as one."""
+    root, ext = os.path.splitext(plain_name(path))
+    return root, ext + path[len(plain_name(path)):]
+
+
+def open_for_reading(path: str):
+    """Open ``path`` for binary reading, decompressing by its suffix."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.xz'):
+        return lzma.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def read_file(path: str):
+    """Read and decode the JSON file at ``path``, decompressing by its suffix."""
+    with open_for_reading(path) as handle:
+        return loads(handle.read())
+
+
+def _encode_entries(data):
+    """
+    Yield ``json.dumps(data)`` in pieces, one per top-level entry of a dict.
+
+    The pieces join to exactly what ``json.dumps`` returns. Anything other
+    than a dict with string keys, whose keys ``json.dumps`` would convert, is
+    yielded whole.
+    """
+    if not isinstance(data, dict) or not all(isinstance(key, str) for key in data):
+        yield dumps(data)
+        return
+    separator = '{'
+    for key, value in data.items():
+        yield separator + dumps(key) + ': ' + dumps(value)
+        separator = ', '
+    yield '}' if data else '{}'
+
+
+def write_file(data, path: str) -> None:
+    """Encode ``data`` and write it to ``path``, compressing by its suffix."""
+    with open(path, 'wb') as raw:
+        if path.endswith('.gz'):
+            stream = gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0)
+        elif path.endswith('.xz'):
+            stream = lzma.LZMAFile(raw, 'wb')
+        else:
+            stream = raw
+        for piece in _encode_entries(data):
+            stream.write(piece.encode('utf-8'))
+        if stream is not raw:
+            # Flushes the compressor; the raw file is closed by the with.
+            stream.close()
@@ -0,0 +1,188 @@
+"""
+Bundle diagnostics collected in a single walk.
+
+``validate`` used to walk the bundle once per diagnostic - every schema for
+``description: null`` placeholders, then the whole bundle again for dangling
+``$ref``s - and each walk built a path string for every node it passed and
+concatenated result lists on the way back up. On a large dictionary that is
+most of the time spent before resolution even starts.
+
+A :class:`LintPass` walks each schema once, iteratively, and hands each value
+to the registered :class:`Check`s that asked for values of its type. Paths are
+kept as cheap parent-linked tuples and only rendered to text for a value that
+is actually reported, so a clean dictionary renders none at all. Scalars no
+check asked for - most of a dictionary - are never even pushed onto the walk.
+
+Every check reports exactly what the function it replaces reports, in the same
+order, so callers can switch without a visible change:
+
+- :class:`NullDescriptionCheck` - :func:`gen3schemadev.refs.find_null_descriptions`
+- :class:`DanglingRefCheck` - :func:`gen3schemadev.refs.find_dangling_refs`
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+from gen3schemadev.refs import _ref_target_exists
+
+
+def format_path(path) -> str:
+    """
+    Render a walk path in ``.key`` / ``[i]`` notation.
+
+    A path is ``None`` at the root of a schema, and ``(parent, key, is_index)``
+    below it.
+    """
+    segments = []
+    while path is not None:
+        path, key, is_index = path
+        segments.append((key, is_index))
+    rendered = ""
+    for key, is_index in reversed(segments):
+        if is_index:
+            rendered = f"{rendered}[{key}]"
+        else:
+            rendered = f"{rendered}.{key}" if rendered else str(key)
+    return rendered
+
+
+class Check(ABC):
+    """
+    One diagnostic run by a :class:`LintPass`.
+
+    Subclasses set :attr:`types` and implement :meth:`visit`, which is called
+    for every value of one of those types in every schema, in document order,
+    parents before children, and :meth:`results`. A subclass missing either
+    cannot be instantiated, so it fails before the walk rather than partway
+    through it. Types are matched exactly, as parsed YAML and JSON only ever
+    produce the built-in ones.
+    """
+
+    #: The value types this check is shown.
+    types = ()
+
+    def begin(self, bundle: dict) -> None:
+        """Called once before the walk with the whole bundle."""
+
+    @abstractmethod
+    def visit(self, value, path, source: str) -> None:
+        """
+        Inspect one value.
+
+        Args:
+            value: The value reached.
+            path: Its lazily built path; render with :func:`format_path`.
+            source: The filename of the schema being walked.
+        """
+
+    @abstractmethod
+    def results(self) -> list:
+        """Return what the check found."""
+
+
+class NullDescriptionCheck(Check):
+    """Report every ``description`` key whose value is null, as ``(source, path)``."""
+
+    types = (type(None),)
+
+    def __init__(self):
+        self.hits = []
+
+    def visit(self, value, path, source):
+        if path is not None and not path[2] and path[1] == "description":
+            self.hits.append((source, format_path(path)))
+
+    def results(self):
+        return self.hits
+
+
+class DanglingRefCheck(Check):
+    """Report every ``$ref`` whose target is missing, as ``(source, path, ref)``."""
+
+    types = (dict,)
+
+    def __init__(self):
+        self.bundle = {}
+        self.hits = []
+
+    def begin(self, bundle):
+        self.bundle = bundle
+
+    def visit(self, value, path, source):
+        ref = value.get("$ref")
+        if isinstance(ref, str) and not _ref_target_exists(ref, self.bundle, source):
+            self.hits.append((source, format_path(path).lstrip("."), ref))
+
+    def results(self):
+        return self.hits
+
+
+class LintPass:
+    """Walk a bundle once, dispatching each value to the checks that want its type."""
+
+    def __init__(self, checks):
+        self.checks = list(checks)
+        self._dispatch = {}
+        for check in self.checks:
+            for value_type in check.types:
+                self._dispatch.setdefault(value_type, []).append(check.visit)
+
+    def run(self, bundle: dict) -> "LintPass":
+        """
+        Run every check over every schema in ``bundle``.
+
+        Returns:
+            This pass, so results can be read straight from the checks.
+        """
+        for check in self.checks:
+            check.begin(bundle)
+        for source, schema in bundle.items():
+            self._walk(schema, source)
+        return self
+
+    def _walk(self, node, source):
+        # An explicit stack rather than recursion: no depth limit, and no
+        # per-level result lists to concatenate. Children are pushed in
+        # reverse so they are popped in document order.
+        dispatch = self._dispatch
+        wanted = set(dispatch) | {dict, list}
+        stack = [(node, None)]
+        while stack:
+            value, path = stack.pop()
+            value_type = type(value)
+            for visit in dispatch.get(value_type, ()):
+                visit(value, path, source)
+            if value_type is dict:
+                stack.extend(
+                    (child, (path, key, False))
+                    for key, child in reversed(value.items())
+                    if type(child) in wanted
+                )
+            elif value_type is list:
+                stack.extend(
+                    (value[i], (path, i, True))
+                    for i in range(len(value) - 1, -1, -1)
+                    if type(value[i]) in wanted
+                )
+
+
+def lint_bundle(bundle: dict) -> dict:
+    """
+    Collect the pre-resolution diagnostics for a bundle in one walk.
+
+    Args:
+        bundle: The whole bundled dictionary, keyed by filename.
+
+    Returns:
+        A dict with ``null_descriptions``, a list of ``(source, path)`` tuples,
+        and ``dangling_refs``, a list of ``(source, path, ref)`` tuples - the
+        same tuples :func:`gen3schemadev.refs.find_dangling_refs` returns.
+    """
+    nulls = NullDescriptionCheck()
+    dangling = DanglingRefCheck()
+    LintPass([nulls, dangling]).run(bundle)
+    return {
+        "null_descriptions": nulls.results(),
+        "dangling_refs": dangling.results(),
+    }
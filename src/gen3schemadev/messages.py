@@ -318,6 +318,31 @@ def invalid_input(input_path, error):
     return "\n".join(lines)
 
 
+def invalid_input_directory(input_path, error):
+    """
+    Build the error for an input directory that is not laid out as expected.
+
+    Args:
+        input_path: The input directory.
+        error: The InputLayoutError describing what is wrong.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        f"{input_path} is not a usable input directory.",
+        "",
+        f"  {error}",
+        "",
+        "  A split input needs dictionary.yaml (version and url) at its top level.",
+        "  Nodes go in nodes/*.yaml, one node or a list of nodes per file; links go",
+        "  in links.yaml and extra definitions in definitions.yaml.",
+        "",
+        "  Nothing was written.",
+        f"  See: {DOCS_DICTIONARY_REPO}",
+    ])
+
+
 def cannot_write(output_dir, error):
     """
     Build the error for a dictionary that could not be written.
@@ -531,6 +556,79 @@ def unresolved_nodes(target, unresolved, resolved_count):
     ])
 
 
+def unusable_compiled_artefact(path, error):
+    """
+    Build the error for a compiled artefact that cannot be used.
+
+    Args:
+        path: The artefact given to the command.
+        error: The CompiledArtefactError explaining why.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        f"{path} cannot be used as a compiled artefact.",
+        "",
+        f"  {error}",
+        "",
+        "  A compiled artefact is build output: it is only valid for the version of",
+        "  gen3schemadev that wrote it and the exact bundle it was compiled from.",
+        "  Rebuild it from the dictionary rather than editing it:",
+        "      gen3schemadev bundle -i dictionary/ -f schema.json --compiled schema.compiled.json",
+        "",
+        f"  See: {DOCS_DICTIONARY_REPO}",
+    ])
+
+
+def ignored_sidecar(path, problem):
+    """
+    Build the warning for a resolved sidecar that exists but was not used.
+
+    Args:
+        path: The sidecar.
+        problem: Why it was not used, as read_sidecar returns it.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        f"WARNING: ignoring the resolved sidecar {path}: {problem}.",
+        "",
+        "  The bundle is being resolved from scratch instead, so this run is correct",
+        "  but does not get the speed-up the sidecar was written for.",
+        "",
+        "  Write the sidecar again whenever the bundle is rebuilt:",
+        "      gen3schemadev bundle -i dictionary/ -f schema.json --resolved",
+        "",
+        f"  See: {DOCS_DICTIONARY_REPO}",
+    ])
+
+
+def ignored_index(path, problem):
+    """
+    Build the warning for a bundle index that exists but was not used.
+
+    Args:
+        path: The index.
+        problem: Why it was not used, as read_index returns it.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        f"WARNING: ignoring the bundle index {path}: {problem}.",
+        "",
+        "  The bundle is being scanned instead, so this run is correct but reads",
+        "  the whole file the index was written to spare it.",
+        "",
+        "  Write the index again whenever the bundle is rebuilt:",
+        "      gen3schemadev bundle -i dictionary/ -f schema.json --index",
+        "",
+        f"  See: {DOCS_DICTIONARY_REPO}",
+    ])
+
+
 def validate_needs_a_target():
     """
     Build the usage error for `validate` with neither -b nor -y.
@@ -552,3 +650,311 @@ def validate_needs_a_target():
         "",
         f"  See: {DOCS_TROUBLESHOOTING}",
     ])
+
+
+def unloadable_rules(source, error):
+    """
+    Build the error for a rules module or rule plugin that fails to load.
+
+    Args:
+        source: The --rules-module value, or a description of the plugins.
+        error: The exception raised while loading.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        f"Could not load custom rules from {source}",
+        "",
+        f"  {type(error).__name__}: {error}",
+        "",
+        "  Validation stopped rather than run without rules you asked for, which",
+        "  would pass a dictionary those rules exist to reject.",
+        "",
+        "  Fix the module, or run without it:",
+        "      gen3schemadev validate -y dictionary/",
+        "",
+        f"  See: {DOCS_DICTIONARY_REPO}",
+    ])
+
+
+def rule_selection_error(error):
+    """
+    Build the error for --enable or --disable naming a rule that does not exist.
+
+    Args:
+        error: The RuleSelectionError, which lists the available rules.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        "Cannot select the rules to run.",
+        "",
+        f"  {error}",
+        "",
+        "  A misspelt --disable would otherwise leave the rule running, and a",
+        "  misspelt --enable would silently check nothing, so nothing was validated.",
+        "",
+        f"  See: {DOCS_DICTIONARY_REPO}",
+    ])
+
+
+def no_data_files(paths):
+    """
+    Build the error for validate-data finding nothing to validate.
+
+    Args:
+        paths: The paths given on the command line.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        f"No data files found in: {', '.join(paths)}",
+        "",
+        "  validate-data reads .tsv, .jsonl, .ndjson and .json files, searching",
+        "  directories recursively. Reporting success on no records would let an",
+        "  empty or mistyped path pass a pre-submission check.",
+        "",
+        "  Point it at the exported records:",
+        "      gen3schemadev validate-data --schema schema.json data/",
+        "",
+        f"  See: {DOCS_TROUBLESHOOTING}",
+    ])
+
+
+def data_violation_report(results):
+    """
+    Build the report of records that do not match the dictionary.
+
+    Args:
+        results: validate_file results: dicts with 'path', 'records',
+            'error_count' and 'errors' ((location, node, message) tuples).
+
+    Returns:
+        The formatted message string.
+    """
+    failing = [r for r in results if r['error_count']]
+    total = sum(r['error_count'] for r in results)
+    records = sum(r['records'] for r in results)
+    lines = [
+        f"FAILED: {total} error{'s' if total != 1 else ''} in {len(failing)} of "
+        f"{len(results)} files ({records} records checked)",
+        "",
+    ]
+    for result in failing:
+        lines.append(f"  {result['path']}")
+        for location, node, message in result['errors']:
+            prefix = f"[{node}] " if node else ""
+            lines.append(f"    {result['path']}:{location}: {prefix}{message}")
+        hidden = result['error_count'] - len(result['errors'])
+        if hidden:
+            lines.append(f"    ... (+{hidden} more in this file; raise --max-errors to see them)")
+        lines.append("")
+    lines += [
+        "  Gen3 rejects a submission containing any of these records, so they are",
+        "  reported here rather than one rejected batch at a time.",
+        "",
+        "  Fix the records, or the dictionary if it is the dictionary that is wrong,",
+        "  and run validate-data again.",
+        "",
+        f"  See: {DOCS_TROUBLESHOOTING}",
+    ]
+    return "\n".join(lines)
+
+
+def unsimulatable_dictionary(path, error):
+    """
+    Build the error for a dictionary simulate cannot generate records for.
+
+    Args:
+        path: The bundle given to the command.
+        error: The SimulationError explaining why.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        f"Cannot simulate records for {path}.",
+        "",
+        f"  {error}",
+        "",
+        "  simulate writes parents before children so every link names a record",
+        "  that exists, and only writes values the schema accepts. A link cycle, a",
+        "  link to a node the dictionary does not define, a pattern using regex",
+        "  features it cannot generate (lookarounds, backreferences), or a minimum",
+        "  and maximum that no value lies between stops it.",
+        "  Check the dictionary first:",
+        "      gen3schemadev validate -b schema.json",
+        "",
+        f"  See: {DOCS_DICTIONARY_REPO}",
+    ])
+
+
+def cannot_write_templates(output_dir, error):
+    """
+    Build the error for submission templates that could not be written.
+
+    Args:
+        output_dir: The directory being written to.
+        error: The underlying OSError.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        f"Could not write submission templates to {output_dir}.",
+        "",
+        f"  {error}",
+        "",
+        "  Each template is written to a temporary name and renamed, so no file is",
+        "  left half written, but templates written before the failure are already",
+        "  updated. Templates are derived entirely from the dictionary, so running",
+        "  the same command again once the problem is fixed brings them all up to",
+        "  date.",
+        "",
+        f"  See: {DOCS_TROUBLESHOOTING}",
+    ])
+
+
+def cannot_write_trace(path, error):
+    """
+    Build the warning for a --trace file that could not be written.
+
+    Args:
+        path: The trace file requested.
+        error: The underlying OSError.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        f"Warning: could not write the trace to {path}.",
+        "",
+        f"  {error}",
+        "",
+        "  The command itself ran as reported above; only the timing record is",
+        "  missing. Pass --trace a path in a writable directory to keep it.",
+        "",
+        f"  See: {DOCS_TROUBLESHOOTING}",
+    ])
+
+
+def metaschema_violation_report(errors, schemas_checked):
+    """
+    Build the report listing every resolved node that fails the Gen3 metaschema.
+
+    Args:
+        errors: ``{"<id>.yaml": message}`` for each failing node.
+        schemas_checked: How many resolved nodes were checked in total.
+
+    Returns:
+        The formatted message string.
+    """
+    lines = [
+        f"FAILED: {len(errors)} of {schemas_checked} resolved schema"
+        f"{'s' if schemas_checked != 1 else ''} failed the Gen3 metaschema",
+        "",
+    ]
+    for name, error in errors.items():
+        lines.append(f"  {name}")
+        lines += [f"    {line}" for line in str(error).splitlines()]
+        lines.append("")
+    lines += [
+        "  These are checked after resolution, so a failure may come from a shared",
+        "  definition the node references rather than the node's own file. A",
+        "  'description: null' in _definitions.yaml is the usual cause.",
+        "",
+        "  Fix the definitions or nodes above and run validate again.",
+        "",
+        f"  See: {DOCS_TROUBLESHOOTING}",
+    ]
+    return "\n".join(lines)
+
+
+def unmergeable_shard_reports(paths, error):
+    """
+    Build the error for shard reports that cannot be merged.
+
+    Args:
+        paths: The report files given to --merge-reports.
+        error: Why they cannot be merged.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        f"Could not merge {len(paths)} shard report{'s' if len(paths) != 1 else ''}.",
+        "",
+        f"  {error}",
+        "",
+        "  A merged result is only the result of a single validate run when it",
+        "  covers every shard of the same bundle exactly once, so nothing was",
+        "  reported rather than a partial or mixed result.",
+        "",
+        "  Pass one report from each of validate --shard 1/N to N/N, all run on",
+        "  the same commit.",
+        "",
+        f"  See: {DOCS_DICTIONARY_REPO}",
+    ])
+
+
+def changes_unavailable(target, error):
+    """
+    Build the error for --changed-since or --staged when git cannot say what changed.
+
+    Args:
+        target: The dictionary being validated.
+        error: Why the changed files could not be listed.
+
+    Returns:
+        The formatted message string.
+    """
+    return "\n".join([
+        f"Could not work out which files changed in {target}.",
+        "",
+        f"  {error}",
+        "",
+        "  --changed-since and --staged validate only what a change can affect, and",
+        "  need git to say what changed. Guessing would risk skipping a node the",
+        "  change broke, so nothing was validated.",
+        "",
+        "  Pass a dictionary directory inside a git work tree with -y, and a",
+        "  revision that exists there (such as HEAD or origin/main), or drop the",
+        "  option to validate everything.",
+        "",
+        f"  See: {DOCS_DICTIONARY_REPO}",
+    ])
+
+
+def node_build_failures(input_path, failures):
+    """
+    Build the error for `--keep-going` when one or more nodes failed to build.
+
+    Args:
+        input_path: The input the nodes were built from.
+        failures: ``(node name, exception)`` pairs, in input order.
+
+    Returns:
+        The formatted message string.
+    """
+    lines = [
+        f"{len(failures)} node{'s' if len(failures) != 1 else ''} in {input_path} "
+        f"failed to build: {', '.join(name for name, _ in failures)}",
+        "",
+    ]
+    for name, error in failures:
+        detail = str(error).strip().splitlines()
+        lines.append(f"  {name}: {type(error).__name__}: {detail[0] if detail else '(no detail)'}")
+    lines += [
+        "",
+        "  Nothing was written, because the dictionary is written only once every",
+        "  node has built; the output directory is as it was.",
+        "",
+        f"  Fix these nodes in {input_path} and run the same command again. Add --debug",
+        "  to see the full traceback of each failure.",
+        "",
+        f"  See: {DOCS_DICTIONARY_REPO}",
+    ]
+    return "\n".join(lines)
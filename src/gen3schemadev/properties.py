@@ -0,0 +1,87 @@
+"""
+Reading what a resolved property schema accepts.
+
+validate-data converts TSV cells by a property's type, simulate generates
+values for it, and templates describe it to submitters. All three ask the
+same questions of a resolved property - what types it takes, what its array
+items are, what enum or pattern constrains it - and must answer them the same
+way, or templates would describe values that validate-data rejects. The
+answers live here.
+
+A resolved property often spreads its constraints over ``oneOf``, ``anyOf``
+and ``allOf`` (a nullable enum is ``oneOf: [{enum: ...}, {type: null}]``), so
+every lookup searches the combinators too.
+"""
+
+COMBINATORS = ('oneOf', 'anyOf', 'allOf')
+
+# Properties Gen3 sets itself and a submission must not carry.
+SYSTEM_PROPERTIES = ('id', 'state', 'created_datetime', 'updated_datetime', 'project_id', 'file_state', 'error_type')
+
+
+def find_keyword(prop, key):
+    """
+    Return the first value of ``key`` in ``prop`` or its combinators.
+
+    The property itself is searched first, then its combinators breadth
+    first, so a top-level keyword wins over one nested in a branch.
+
+    Returns:
+        The value, or None if ``key`` appears nowhere.
+    """
+    queue = [prop]
+    while queue:
+        current = queue.pop(0)
+        if not isinstance(current, dict):
+            continue
+        if key in current:
+            return current[key]
+        for combinator in COMBINATORS:
+            queue.extend(current.get(combinator) or [])
+    return None
+
+
+def accepted_types(prop) -> set:
+    """
+    Collect the JSON types a property accepts, looking inside combinators and enums.
+
+    An enum without a declared type contributes the types of its values.
+    """
+    types = set()
+    stack = [prop]
+    while stack:
+        current = stack.pop()
+        if not isinstance(current, dict):
+            continue
+        declared = current.get('type')
+        if isinstance(declared, str):
+            types.add(declared)
+        elif isinstance(declared, list):
+            types.update(t for t in declared if isinstance(t, str))
+        if 'enum' in current and not declared:
+            for value in current['enum'] or []:
+                if isinstance(value, bool):
+                    types.add('boolean')
+                elif isinstance(value, (int, float)):
+                    types.add('number')
+                elif value is None:
+                    types.add('null')
+                else:
+                    types.add('string')
+        for combinator in COMBINATORS:
+            stack.extend(current.get(combinator) or [])
+    return types
+
+
+def item_schema(prop) -> dict:
+    """Return the ``items`` schema of an array property, wherever it is declared, or ``{}``."""
+    stack = [prop]
+    while stack:
+        current = stack.pop()
+        if not isinstance(current, dict):
+            continue
+        if isinstance(current.get('items'), dict):
+            return current['items']
+        for combinator in COMBINATORS:
+            stack.extend(current.get(combinator) or [])
+    return {}
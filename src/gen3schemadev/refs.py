@@ -132,3 +132,152 @@ def find_null_descriptions(node, path: str = "") -> list:
         for i, item in enumerate(node):
             hits.extend(find_null_descriptions(item, f"{path}[{i}]"))
     return hits
+
+
+def qualify_ref(ref: str, source: str) -> str:
+    """
+    Return ``ref`` with its file made explicit.
+
+    A bare ``#/a/b`` means "inside the schema carrying it", so it is rewritten
+    as ``source#/a/b``. Whitespace around the file part, which the resolver
+    tolerates, is dropped.
+    """
+    file_part, _, key_part = ref.partition("#")
+    file_part = file_part.strip() or source
+    return f"{file_part}#/{key_part.strip('/')}"
+
+
+def collect_refs(node) -> list:
+    """Return every ``$ref`` string under ``node``, in document order."""
+    found = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str):
+                found.append(ref)
+            stack.extend(reversed(list(current.values())))
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+    return found
+
+
+def ref_graph(bundle: dict) -> dict:
+    """
+    Build the reference-dependency graph of a bundled dictionary.
+
+    Args:
+        bundle: The whole bundled dictionary, keyed by filename.
+
+    Returns:
+        A dict mapping each filename to the sorted, de-duplicated list of
+        ``file#/pointer`` targets its ``$ref``s point at, qualified with
+        :func:`qualify_ref` so a bare ref names the file it lives in.
+    """
+    return {
+        name: sorted({qualify_ref(ref, name) for ref in collect_refs(schema)})
+        for name, schema in bundle.items()
+    }
+
+
+# The files a node's references are resolved against. The resolver looks every
+# file-qualified reference up in one namespace - the terms overlaid with the
+# definitions - whichever file the reference names.
+_REFERENCE_FILES = ("_definitions.yaml", "_terms.yaml")
+
+
+def referenced_keys(value, local: bool) -> set:
+    """
+    Return the top-level reference-file entries the ``$ref``s under ``value`` point at.
+
+    Args:
+        value: A schema, or an entry of a reference file.
+        local: True when ``value`` lives in a reference file, where a bare
+            ``#/key`` names another entry; in a node it names part of the
+            node itself and is not counted.
+    """
+    keys = set()
+    for ref in collect_refs(value):
+        file_part, _, pointer = ref.partition("#")
+        if not file_part.strip() and not local:
+            continue
+        key = pointer.strip("/").split("/")[0]
+        if key:
+            keys.add(key)
+    return keys
+
+
+def definition_closure(bundle: dict, files, keys=()) -> dict:
+    """
+    Return the part of a bundle that ``files`` need in order to be resolved.
+
+    That is the named files themselves, and of ``_definitions.yaml`` and
+    ``_terms.yaml`` only the top-level entries they reference, directly or
+    through other entries. A dictionary's definitions are mostly shared
+    blocks and enums any one node uses a handful of, so resolving a few nodes
+    against the closure skips resolving the rest of the definitions.
+
+    Every other file starting with ``_`` (``_settings.yaml``) is kept whole.
+
+    Args:
+        bundle: The whole bundled dictionary, keyed by filename.
+        files: Filenames of the schemas to keep.
+        keys: Reference-file entries to keep, with what they reference,
+            whether or not ``files`` use them.
+
+    Returns:
+        A bundle with the same key order as ``bundle``. An entry referenced
+        from either reference file is kept in both, because the resolver
+        does not distinguish them.
+    """
+    files = set(files)
+    pools = [bundle[name] for name in _REFERENCE_FILES if isinstance(bundle.get(name), dict)]
+
+    needed = set(keys)
+    for name in bundle:
+        if name in files:
+            needed |= referenced_keys(bundle[name], local=False)
+    pending = list(needed)
+    while pending:
+        key = pending.pop()
+        for pool in pools:
+            if key in pool:
+                for found in referenced_keys(pool[key], local=True) - needed:
+                    needed.add(found)
+                    pending.append(found)
+
+    closure = {}
+    for name, schema in bundle.items():
+        if name in _REFERENCE_FILES and isinstance(schema, dict):
+            closure[name] = {key: value for key, value in schema.items() if key in needed}
+        elif name in files or name.startswith("_"):
+            closure[name] = schema
+    return closure
+
+
+def prune_bundle(bundle: dict):
+    """
+    Drop the ``_definitions.yaml`` and ``_terms.yaml`` entries nothing uses.
+
+    Reachability starts from every node and from ``_settings.yaml``, and
+    follows ``$ref``s through the reference files themselves, as
+    :func:`definition_closure` does. The packaged reference files carry many
+    entries a given dictionary never references. Each one is shipped in the
+    bundle and resolved on every load.
+
+    Args:
+        bundle: The bundled dictionary, keyed by filename.
+
+    Returns:
+        A tuple ``(pruned, removed)``: the bundle without the unused entries,
+        and for each reference file the keys removed from it, in file order.
+    """
+    roots = [name for name in bundle if name not in _REFERENCE_FILES]
+    pruned = definition_closure(bundle, roots)
+    removed = {
+        name: [key for key in bundle[name] if key not in pruned[name]]
+        for name in _REFERENCE_FILES
+        if isinstance(bundle.get(name), dict)
+    }
+    return pruned, removed
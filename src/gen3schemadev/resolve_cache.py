@@ -0,0 +1,204 @@
+"""
+An on-disk cache of resolved node schemas.
+
+Resolution is the most expensive step of ``validate``, and pipelines run it over
+and over on bundles that have not changed: validate on every push, again for
+a compiled artefact, again in the next job. The resolved ``"<id>.yaml"`` ->
+schema mapping depends only on the bundle and on the code doing the resolving,
+so it is cached under a key made of exactly those two things:
+
+- a hash of the bundle that includes key order (see
+  :func:`gen3schemadev.utils.ordered_hash`), since reordering a node's
+  properties reorders its resolved properties
+- the installed versions of gen3schemadev and gen3_validator, whose code
+  together decides what a resolved schema looks like
+
+Entries are stored as gzip-compressed compact JSON - resolved schemas repeat
+the same definitions in every node and compress well - in
+``cache_dir('resolved')``. When the entries together exceed a size limit the
+least recently used are deleted; a cache hit refreshes an entry's mtime, which
+is what "recently used" means here.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import zlib
+from importlib.metadata import version, PackageNotFoundError
+
+from gen3schemadev import jsonio, tracing
+from gen3schemadev.utils import cache_dir, ordered_hash, resolve_bundle
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the shape of a cache entry changes, so stale entries are
+# never read back as if they were current.
+_CACHE_FORMAT = '1'
+
+# Size limit for all entries together, in megabytes. Override with
+# GEN3SCHEMADEV_RESOLVED_CACHE_MB; 0 disables eviction.
+DEFAULT_MAX_MB = 200
+
+_SUFFIX = '.json.gz'
+
+
+def _package_version(name):
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+def resolver_version() -> str:
+    """Return the versions of the code that decides what a resolved schema looks like."""
+    return f"gen3schemadev {_package_version('gen3schemadev')}; gen3_validator {_package_version('gen3_validator')}"
+
+
+def cache_key(bundle: dict) -> str:
+    """Return the cache key for a bundle under the installed resolver."""
+    material = f"{_CACHE_FORMAT}\n{resolver_version()}\n{ordered_hash(bundle)}"
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def max_cache_bytes() -> int:
+    """Return the configured size limit in bytes, from the environment or the default."""
+    raw = os.environ.get('GEN3SCHEMADEV_RESOLVED_CACHE_MB')
+    try:
+        megabytes = float(raw) if raw else DEFAULT_MAX_MB
+    except ValueError:
+        logger.warning("Ignoring GEN3SCHEMADEV_RESOLVED_CACHE_MB=%r: not a number", raw)
+        megabytes = DEFAULT_MAX_MB
+    return int(megabytes * 1024 * 1024)
+
+
+def _read(entry):
+    """Return a cached resolution, or None if there is no usable entry."""
+    try:
+        with gzip.open(entry, 'rb') as handle:
+            data = jsonio.loads(handle.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, zlib.error) as exc:
+        # A truncated or corrupt entry is a miss, not an error; it is
+        # overwritten by the fresh resolution.
+        logger.debug("Ignoring unreadable resolved cache entry %s: %s", entry, exc)
+        return None
+    try:
+        os.utime(entry)
+    except OSError:
+        pass
+    return data
+
+
+def _store(entry, resolved):
+    """
+    Write a cache entry.
+
+    The entry is written to a temporary name and renamed, so two concurrent runs
+    never observe a half-written file.
+    """
+    temp = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with gzip.open(temp, 'wt', encoding='utf-8') as handle:
+            handle.write(jsonio.dumps(resolved, separators=(',', ':')))
+        os.replace(temp, entry)
+    except OSError as exc:
+        logger.debug("Could not write resolved cache entry %s: %s", entry, exc)
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def evict(max_bytes: int = None) -> list:
+    """
+    Delete the least recently used entries until the cache fits in ``max_bytes``.
+
+    Args:
+        max_bytes: The size limit. Defaults to :func:`max_cache_bytes`. A limit
+            of 0 or less keeps everything.
+
+    Returns:
+        The paths that were deleted, oldest first.
+    """
+    if max_bytes is None:
+        max_bytes = max_cache_bytes()
+    if max_bytes <= 0:
+        return []
+
+    try:
+        directory = cache_dir('resolved')
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    entries = []
+    for name in names:
+        if not name.endswith(_SUFFIX):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = []
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed.append(path)
+    if removed:
+        logger.debug("Evicted %d resolved cache entries", len(removed))
+    return removed
+
+
+def resolve_bundle_cached(
+    bundle: dict, use_cache: bool = True, dangling: list = None, workers: int = None
+) -> dict:
+    """
+    Resolve a bundle, reusing an earlier resolution of identical content.
+
+    Args:
+        bundle: The bundled dictionary, keyed by filename.
+        use_cache: Set False to always resolve and never touch the cache.
+        dangling: Passed on to :func:`gen3schemadev.utils.resolve_bundle`.
+        workers: Passed on to :func:`gen3schemadev.utils.resolve_bundle`.
+
+    Returns:
+        dict: Resolved node schemas keyed by ``"<id>.yaml"``, as
+        :func:`gen3schemadev.utils.resolve_bundle` returns them.
+
+    Raises:
+        SchemaResolutionError: If a non-documentation reference cannot be
+            resolved. Failures are not cached.
+    """
+    with tracing.span('resolve', nodes=len(bundle)) as span:
+        directory = None
+        if use_cache:
+            try:
+                directory = cache_dir('resolved')
+            except OSError as exc:
+                # An unusable cache location only costs the shortcut.
+                logger.warning("Not caching resolved schemas: cannot use the cache directory (%s)", exc)
+        if directory is None:
+            span.set(cache='off')
+            return resolve_bundle(bundle, dangling=dangling, workers=workers)
+
+        entry = os.path.join(directory, cache_key(bundle) + _SUFFIX)
+        cached = _read(entry)
+        if cached is not None:
+            logger.info("Resolved schema cache hit: %s", entry)
+            span.set(cache='hit')
+            return cached
+
+        span.set(cache='miss')
+        resolved = resolve_bundle(bundle, dangling=dangling, workers=workers)
+        _store(entry, resolved)
+        evict()
+        return resolved
@@ -43,18 +43,18 @@ def generate_gen3_template(metaschema: dict) -> dict:
         out_template = {}
         properties = metaschema_data.get('properties', {})
         out_template['$schema'] = metaschema_data.get('$schema')
-        logger.info(f"Generating Gen3 template from metaschema with {len(properties)} properties.")
+        logger.info("Generating Gen3 template from metaschema with %s properties.", len(properties))
         for k, v in properties.items():
             if 'default' in v:
                 out_template[k] = v['default']
-                logger.debug(f"Set default for property '{k}': {v['default']}")
+                logger.debug("Set default for property '%s': %s", k, v['default'])
             else:
                 out_template[k] = None
-                logger.debug(f"No default for property '{k}', set to None.")
+                logger.debug("No default for property '%s', set to None.", k)
         logger.info("Gen3 template generation completed successfully.")
         return out_template
     except Exception as e:
-        logger.error(f"An error occurred while generating the Gen3 template: {e}")
+        logger.error("An error occurred while generating the Gen3 template: %s", e)
         raise
 
 
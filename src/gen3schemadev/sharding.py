@@ -0,0 +1,286 @@
+"""
+Splitting ``validate`` across CI machines, and merging the results.
+
+A large combined dictionary takes minutes to validate, nearly all of it in
+resolution and the per-node metaschema check. ``validate --shard i/N`` checks
+one of N deterministic slices of the nodes and writes a partial report;
+``validate --merge-reports`` combines the N reports and prints what a single
+``validate`` run would have printed.
+
+- Nodes are dealt to shards by estimated cost, largest first, each to the
+  least loaded shard (ties broken by name), so every machine computes the
+  same partition from the same bundle and the shards finish at about the
+  same time.
+- Each shard resolves its nodes against only the definitions they reference
+  (:func:`gen3schemadev.refs.definition_closure`), not all of them.
+- Bundle-wide checks - null descriptions and dangling references, a single
+  cheap walk - run on every shard so each knows whether resolution can
+  proceed, but only shard 1 reports them, as do the rule checks of the
+  framework files, so nothing is reported twice.
+- Each report carries a hash of the bundle, so reports from shards run on
+  different commits are refused rather than merged.
+"""
+
+import json
+import os
+
+from gen3schemadev.lint import lint_bundle
+from gen3schemadev.refs import definition_closure
+from gen3schemadev.resolve_cache import resolve_bundle_cached
+from gen3schemadev.utils import (
+    SchemaResolutionError, content_hash, describe_dangling, find_dangling_refs, is_documentation_ref,
+)
+from gen3schemadev.validators.metaschema_validator import validate_schema_with_metaschema
+from gen3schemadev.validators.rule_validator import RuleValidator
+
+REPORT_FORMAT = 'gen3schemadev-validate-shard'
+REPORT_VERSION = 1
+
+# A node's estimated cost is this plus the size of its JSON. The metaschema
+# check starts a process per node, which costs about as much as resolving and
+# checking a node this many bytes long, whatever the node's size.
+NODE_OVERHEAD = 20_000
+
+# Files only shard 1 rule-checks; they are resolution inputs, not nodes.
+_FRAMEWORK_FILES = ('_definitions.yaml', '_terms.yaml', '_settings.yaml')
+
+
+class ShardReportError(ValueError):
+    """Raised when shard reports cannot be merged into one result."""
+
+
+def parse_shard(text: str):
+    """
+    Parse a shard given as ``i/N``, with ``1 <= i <= N``.
+
+    Returns:
+        ``(i, N)``.
+
+    Raises:
+        ValueError: If ``text`` is not of that form.
+    """
+    index, sep, count = text.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        index = count = 0
+    if not sep or count < 1 or not 1 <= index <= count:
+        raise ValueError(f"expected i/N with 1 <= i <= N, such as 2/4, not {text!r}")
+    return index, count
+
+
+def estimated_cost(schema) -> int:
+    """Estimate the relative cost of validating one node."""
+    return NODE_OVERHEAD + len(json.dumps(schema, default=str))
+
+
+def partition(bundle: dict, count: int) -> list:
+    """
+    Deal a bundle's nodes to ``count`` shards, balancing estimated cost.
+
+    Args:
+        bundle: The bundled dictionary, keyed by filename.
+        count: The number of shards.
+
+    Returns:
+        ``count`` lists of filenames, each in bundle order. The framework
+        files are in none of them.
+    """
+    names = [name for name in bundle if name not in _FRAMEWORK_FILES]
+    costs = {name: estimated_cost(bundle[name]) for name in names}
+    loads = [0] * count
+    assigned = [set() for _ in range(count)]
+    for name in sorted(names, key=lambda name: (-costs[name], name)):
+        shard = min(range(count), key=lambda index: (loads[index], index))
+        loads[shard] += costs[name]
+        assigned[shard].add(name)
+    return [[name for name in names if name in members] for members in assigned]
+
+
+def _source(name):
+    return os.path.splitext(name)[0]
+
+
+def run_shard(
+    bundle: dict, index: int, count: int, target: str, rules=None, exclude=(),
+    metaschema: dict = None, precompiled: dict = None, use_cache: bool = True, workers: int = None,
+) -> dict:
+    """
+    Validate one shard of a bundle and return its partial report.
+
+    Every stage runs, whatever the earlier stages found, so the merged report
+    holds everything a single run could have reported.
+
+    Args:
+        bundle: The whole bundled dictionary, keyed by filename.
+        index: This shard, from 1.
+        count: The number of shards.
+        target: The file or directory the bundle came from, for messages.
+        rules: Rule names to run. All rules when None.
+        exclude: Schema names, without extension, the rule checks skip.
+        metaschema: The Gen3 metaschema; the metaschema check is skipped when
+            None.
+        precompiled: Resolved node schemas from a compiled artefact, used
+            instead of resolving.
+        use_cache: Passed on to the resolution cache.
+        workers: Resolve nodes across this many processes.
+
+    Returns:
+        A JSON-serialisable partial report, for :func:`merge_reports`.
+    """
+    nodes = partition(bundle, count)[index - 1]
+    first = index == 1
+    rule_targets = [name for name in bundle if name in nodes or (first and name in _FRAMEWORK_FILES)]
+
+    checked = []
+    violations = []
+    for name in rule_targets:
+        source = _source(name)
+        if source in exclude:
+            continue
+        checked.append(source)
+        for violation in RuleValidator(bundle[name], rules=rules).validate():
+            violation['source'] = source
+            violations.append(violation)
+
+    findings = lint_bundle(bundle)
+    fatal = [hit for hit in findings['dangling_refs'] if not is_documentation_ref(hit[1])]
+    expected = [_source(name) for name in nodes if not os.path.basename(name).startswith('_')]
+
+    resolution_error = describe_dangling(fatal) if fatal else None
+    resolved = {}
+    if not fatal:
+        if precompiled is not None:
+            ids = {bundle[name].get('id') for name in nodes if isinstance(bundle[name], dict)}
+            resolved = {name: schema for name, schema in precompiled.items() if _source(name) in ids}
+        else:
+            sub_bundle = definition_closure(bundle, nodes)
+            try:
+                resolved = resolve_bundle_cached(
+                    sub_bundle, use_cache, dangling=find_dangling_refs(sub_bundle), workers=workers
+                )
+            except SchemaResolutionError as exc:
+                resolution_error = str(exc)
+
+    metaschema_errors = {}
+    if metaschema is not None:
+        for name, schema in resolved.items():
+            try:
+                validate_schema_with_metaschema(schema, metaschema=metaschema)
+            except RuntimeError as exc:
+                metaschema_errors[name] = str(exc)
+
+    return {
+        'format': REPORT_FORMAT,
+        'version': REPORT_VERSION,
+        'bundle_hash': content_hash(bundle),
+        'target': target,
+        'shard': [index, count],
+        'bundle_order': [_source(name) for name in bundle],
+        'checked': checked,
+        'violations': violations,
+        'null_descriptions': findings['null_descriptions'] if first else [],
+        'documentation_refs': (
+            [hit for hit in findings['dangling_refs'] if is_documentation_ref(hit[1])] if first else []
+        ),
+        'fatal_refs': fatal if first else [],
+        'resolution_error': resolution_error,
+        'expected': expected,
+        'resolved': list(resolved),
+        'metaschema_errors': metaschema_errors,
+    }
+
+
+def write_report(report: dict, path: str) -> None:
+    """Write a partial report as JSON, creating its directory if needed."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as handle:
+        json.dump(report, handle, indent=1)
+
+
+def load_report(path: str) -> dict:
+    """
+    Read a partial report written by :func:`write_report`.
+
+    Raises:
+        ShardReportError: If the file cannot be read or is not a shard report.
+    """
+    try:
+        with open(path) as handle:
+            report = json.load(handle)
+    except (OSError, ValueError) as exc:
+        raise ShardReportError(f"{path}: {exc}") from exc
+    if not isinstance(report, dict) or report.get('format') != REPORT_FORMAT:
+        raise ShardReportError(f"{path}: not a validate --shard report")
+    if report.get('version') != REPORT_VERSION:
+        raise ShardReportError(
+            f"{path}: report version {report.get('version')} is not {REPORT_VERSION}; "
+            f"written by a different gen3schemadev"
+        )
+    return report
+
+
+def merge_reports(reports) -> dict:
+    """
+    Combine every shard's partial report into the result of a single run.
+
+    Args:
+        reports: One partial report per shard, in any order.
+
+    Returns:
+        A dict with ``target``, ``shards``, ``checked`` (a count),
+        ``violations``, ``null_descriptions``, ``documentation_refs``,
+        ``fatal_refs``, ``resolution_error``, ``unresolved``, ``resolved``
+        (names, in bundle order) and ``metaschema_errors`` (in bundle
+        order). Reference hits are tuples, as the linter returns them.
+
+    Raises:
+        ShardReportError: If the reports are not exactly the shards 1..N of
+            one bundle.
+    """
+    reports = list(reports)
+    if not reports:
+        raise ShardReportError("no reports given")
+    hashes = {report['bundle_hash'] for report in reports}
+    if len(hashes) > 1:
+        raise ShardReportError(
+            "the reports are of different bundles; every shard must validate the same commit"
+        )
+    count = reports[0]['shard'][1]
+    indexes = sorted(report['shard'][0] for report in reports)
+    if any(report['shard'][1] != count for report in reports) or indexes != list(range(1, count + 1)):
+        raise ShardReportError(
+            f"expected one report for each of shards 1 to {count}, got shards {indexes}"
+        )
+
+    reports.sort(key=lambda report: report['shard'][0])
+    first = reports[0]
+    position = {source: index for index, source in enumerate(first['bundle_order'])}
+
+    violations = sorted(
+        (violation for report in reports for violation in report['violations']),
+        key=lambda violation: position.get(violation['source'], len(position)),
+    )
+    resolved = sorted(
+        (name for report in reports for name in report['resolved']),
+        key=lambda name: position.get(_source(name), len(position)),
+    )
+    errors = {name: error for report in reports for name, error in report['metaschema_errors'].items()}
+    expected = {source for report in reports for source in report['expected']}
+    shard_errors = [report['resolution_error'] for report in reports if report['resolution_error']]
+
+    return {
+        'target': first['target'],
+        'shards': count,
+        'checked': sum(len(report['checked']) for report in reports),
+        'violations': violations,
+        'null_descriptions': [tuple(hit) for hit in first['null_descriptions']],
+        'documentation_refs': [tuple(hit) for hit in first['documentation_refs']],
+        'fatal_refs': [tuple(hit) for hit in first['fatal_refs']],
+        'resolution_error': '; '.join(dict.fromkeys(shard_errors)) or None,
+        'unresolved': sorted(expected - {_source(name) for name in resolved}),
+        'resolved': resolved,
+        'metaschema_errors': {name: errors[name] for name in resolved if name in errors},
+    }
@@ -0,0 +1,439 @@
+"""
+Synthetic submission data for a dictionary, at load-test volume.
+
+``simulate`` writes one Gen3 submission TSV per node, with every record linked
+to a real record of each parent node, so the output can be loaded into a Gen3
+instance - or fed to an ETL - to see how it copes with a realistic graph at
+scale.
+
+- Nodes are generated in topological order of the link graph, parents first.
+  Submitter ids are a function of the node and the record number
+  (``subject_000042``), so a child can link to any parent record knowing only
+  how many there are; nothing generated earlier is held in memory.
+- Values satisfy the resolved schemas: enum members, ``pattern`` regexes,
+  ``minimum``/``maximum`` and their exclusive forms, date-times for Gen3's
+  ``datetime`` definition, and the right JSON type otherwise.
+  ``validate-data`` accepts the output.
+- Values are generated a column at a time for a batch of records and written
+  straight out, so memory depends on the batch size, not the record count.
+
+Program and project are taken to exist already - in Gen3 they are created by
+an administrator, not submitted - so they are not generated, and records link
+to the project through a ``projects.code`` column.
+
+Only the standard library is used. ``random.Random`` with batched
+``choices``/``randrange`` calls stands in for NumPy's vectorised generators,
+which this project does not depend on.
+"""
+
+import csv
+import datetime
+import math
+import os
+import random
+import re
+import string
+
+try:  # Python 3.11 moved the regex parser; the old names still work but warn.
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from gen3schemadev.diff import flatten_links
+from gen3schemadev.properties import SYSTEM_PROPERTIES, accepted_types, find_keyword, item_schema
+
+# Nodes that exist before any submission and are never generated.
+PREEXISTING_NODES = ('program', 'project')
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Unbounded regex repeats (``*``, ``+``, ``{n,}``) generate at most this many
+# extra characters.
+_MAX_EXTRA_REPEAT = 4
+
+_DATETIME_START = datetime.datetime(2000, 1, 1)
+_DATETIME_SPAN_SECONDS = 25 * 365 * 24 * 3600
+
+
+class SimulationError(ValueError):
+    """Raised when a dictionary cannot be simulated, such as one with a link cycle."""
+
+
+def _parent_links(links):
+    """
+    Return the links a generated record fills in, one from each exclusive subgroup.
+
+    This decides which parents a record points at, not which properties are
+    links: the other members of an exclusive subgroup are still link
+    properties, and :func:`gen3schemadev.diff.flatten_links` names them all.
+    """
+    found = []
+    for link in links or []:
+        if not isinstance(link, dict):
+            continue
+        if 'subgroup' in link:
+            members = _parent_links(link['subgroup'])
+            # An exclusive subgroup means "exactly one of these parents".
+            found.extend(members[:1] if link.get('exclusive') else members)
+        elif link.get('name') and link.get('target_type'):
+            found.append(link)
+    return found
+
+
+def link_graph(resolved: dict) -> dict:
+    """
+    Return each generated node's links, as ``{node: [(link_name, parent), ...]}``.
+
+    Args:
+        resolved: Resolved node schemas keyed by ``"<id>.yaml"``.
+    """
+    graph = {}
+    for schema in resolved.values():
+        node = schema.get('id')
+        if not node or node in PREEXISTING_NODES:
+            continue
+        graph[node] = [(link['name'], link['target_type']) for link in _parent_links(schema.get('links'))]
+    return graph
+
+
+def topological_order(graph: dict) -> list:
+    """
+    Order nodes so every parent comes before its children.
+
+    Ties are broken alphabetically, so the order - and therefore the output -
+    is the same on every run.
+
+    Raises:
+        SimulationError: If the links form a cycle, or name a parent the
+            dictionary does not define.
+    """
+    parents = {}
+    for node, links in graph.items():
+        wanted = set()
+        for _, parent in links:
+            if parent in PREEXISTING_NODES:
+                continue
+            if parent not in graph:
+                raise SimulationError(f"Node '{node}' links to '{parent}', which is not in the dictionary.")
+            wanted.add(parent)
+        parents[node] = wanted
+
+    order = []
+    ready = sorted(node for node, wanted in parents.items() if not wanted)
+    children = {node: [] for node in graph}
+    for node, wanted in parents.items():
+        for parent in wanted:
+            children[parent].append(node)
+    remaining = {node: len(wanted) for node, wanted in parents.items()}
+    while ready:
+        node = ready.pop(0)
+        order.append(node)
+        for child in sorted(children[node]):
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+        ready.sort()
+    if len(order) != len(graph):
+        cyclic = sorted(set(graph) - set(order))
+        raise SimulationError(f"The links between these nodes form a cycle: {', '.join(cyclic)}")
+    return order
+
+
+def submitter_id(node, index, width):
+    """Return the submitter id of a node's ``index``-th record, zero-padded to ``width``."""
+    return f"{node}_{index:0{width}d}"
+
+
+class RegexGenerator:
+    """Generate strings matching a regular expression, from its parsed form."""
+
+    _CATEGORIES = {
+        sre_constants.CATEGORY_DIGIT: string.digits,
+        sre_constants.CATEGORY_WORD: string.ascii_letters + string.digits + '_',
+        sre_constants.CATEGORY_SPACE: ' ',
+        sre_constants.CATEGORY_NOT_DIGIT: string.ascii_letters,
+        sre_constants.CATEGORY_NOT_WORD: '-',
+        sre_constants.CATEGORY_NOT_SPACE: string.ascii_letters + string.digits,
+    }
+    _PRINTABLE = string.ascii_letters + string.digits
+
+    def __init__(self, pattern):
+        self.pattern = re.compile(pattern)
+        self.parsed = sre_parse.parse(pattern)
+
+    def __call__(self, rng) -> str:
+        return ''.join(self._emit(self.parsed, rng))
+
+    def _emit(self, items, rng):
+        out = []
+        for op, arg in items:
+            if op is sre_constants.LITERAL:
+                out.append(chr(arg))
+            elif op is sre_constants.NOT_LITERAL:
+                out.append(rng.choice([c for c in self._PRINTABLE if ord(c) != arg]))
+            elif op is sre_constants.ANY:
+                out.append(rng.choice(self._PRINTABLE))
+            elif op is sre_constants.IN:
+                out.append(rng.choice(self._charset(arg)))
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+                low, high, sub = arg
+                if high is sre_constants.MAXREPEAT or high > low + _MAX_EXTRA_REPEAT:
+                    high = low + _MAX_EXTRA_REPEAT
+                for _ in range(rng.randint(low, high)):
+                    out.extend(self._emit(sub, rng))
+            elif op is sre_constants.SUBPATTERN:
+                out.extend(self._emit(arg[-1], rng))
+            elif op is sre_constants.BRANCH:
+                out.extend(self._emit(rng.choice(arg[1]), rng))
+            elif op is sre_constants.AT:
+                continue
+            else:
+                raise SimulationError(f"Cannot generate values for the pattern {self.pattern.pattern!r}")
+        return out
+
+    def _charset(self, items):
+        chars = []
+        negated = False
+        for op, arg in items:
+            if op is sre_constants.NEGATE:
+                negated = True
+            elif op is sre_constants.LITERAL:
+                chars.append(chr(arg))
+            elif op is sre_constants.RANGE:
+                low, high = arg
+                chars.extend(chr(c) for c in range(low, min(high, low + 255) + 1))
+            elif op is sre_constants.CATEGORY:
+                chars.extend(self._CATEGORIES.get(arg, self._PRINTABLE))
+        if negated:
+            excluded = set(chars)
+            chars = [c for c in self._PRINTABLE if c not in excluded]
+        return chars or list(self._PRINTABLE)
+
+
+def _cell(value) -> str:
+    """Format a value as Gen3 submission TSV writes it."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, list):
+        return ','.join(_cell(item) for item in value)
+    return str(value)
+
+
+def _bound(prop, key, exclusive_key, tighter):
+    """
+    Return one side of a numeric range as ``(value, exclusive)``, or ``(None, False)``.
+
+    Draft 4 schemas, as Gen3 writes them, give ``exclusiveMinimum`` as a flag on
+    ``minimum``; later drafts give it as a bound of its own. Both are read, and
+    where both bounds are given the tighter one wins.
+    """
+    value = find_keyword(prop, key)
+    exclusive = find_keyword(prop, exclusive_key)
+    if isinstance(exclusive, bool):
+        return value, exclusive and value is not None
+    if isinstance(exclusive, (int, float)) and (value is None or not tighter(value, exclusive)):
+        return exclusive, True
+    return value, False
+
+
+def _numeric_generator(name, prop, integer):
+    """
+    Return a generator of integers, or of numbers to two decimal places, within a property's bounds.
+
+    Without a minimum the range starts at zero, or 1000 below a negative
+    maximum; without a maximum it ends 1000 above the minimum.
+
+    Raises:
+        SimulationError: If no value satisfies the bounds.
+    """
+    low, low_exclusive = _bound(prop, 'minimum', 'exclusiveMinimum', lambda a, b: a > b)
+    high, high_exclusive = _bound(prop, 'maximum', 'exclusiveMaximum', lambda a, b: a < b)
+
+    def above_low(value):
+        return low is None or (value > low if low_exclusive else value >= low)
+
+    def below_high(value):
+        return high is None or (value < high if high_exclusive else value <= high)
+
+    # Values are whole multiples of a step: 1 for integers, 0.01 for numbers,
+    # so a number is written with at most two decimal places. Steps are
+    # counted as integers and the first and last checked against the bounds
+    # themselves, so rounding can never step outside them.
+    scale = 1 if integer else 100
+    first = last = None
+    if low is not None:
+        first = math.floor(low * scale) - 1
+        while not above_low(first / scale):
+            first += 1
+    if high is not None:
+        last = math.ceil(high * scale) + 1
+        while not below_high(last / scale):
+            last -= 1
+    if first is None:
+        first = min(0, last - 1000 * scale) if last is not None else 0
+    if last is None:
+        last = first + 1000 * scale
+
+    if first <= last:
+        if integer:
+            return lambda rng, start, count: [str(rng.randint(first, last)) for _ in range(count)]
+        return lambda rng, start, count: [str(rng.randint(first, last) / scale) for _ in range(count)]
+    if not integer and (low < high or (low == high and not (low_exclusive or high_exclusive))):
+        # A range narrower than the step still holds its midpoint.
+        middle = str((low + high) / 2)
+        return lambda rng, start, count: [middle] * count
+    limits = [
+        f"{'>' if low_exclusive else '>='} {low}" if low is not None else None,
+        f"{'<' if high_exclusive else '<='} {high}" if high is not None else None,
+    ]
+    raise SimulationError(
+        f"no {'integer' if integer else 'number'} is {' and '.join(x for x in limits if x)}, "
+        f"so no value can be generated"
+    )
+
+
+def column_generator(name, prop):
+    """
+    Return ``generate(rng, start, count) -> list of cells`` for one property.
+
+    Raises:
+        SimulationError: If the property has a pattern that cannot be
+            generated, or bounds no value satisfies.
+    """
+    enum = find_keyword(prop, 'enum')
+    if enum:
+        choices = [_cell(value) for value in enum]
+        return lambda rng, start, count: rng.choices(choices, k=count)
+
+    types = accepted_types(prop)
+    pattern = find_keyword(prop, 'pattern')
+    if pattern and 'string' in types:
+        regex = RegexGenerator(pattern)
+        return lambda rng, start, count: [regex(rng) for _ in range(count)]
+
+    if find_keyword(prop, 'format') == 'date-time':
+        def datetimes(rng, start, count):
+            return [
+                (_DATETIME_START + datetime.timedelta(seconds=rng.randrange(_DATETIME_SPAN_SECONDS)))
+                .strftime('%Y-%m-%dT%H:%M:%S')
+                for _ in range(count)
+            ]
+        return datetimes
+
+    if 'integer' in types or 'number' in types:
+        return _numeric_generator(name, prop, 'integer' in types)
+
+    if 'boolean' in types:
+        return lambda rng, start, count: rng.choices(('true', 'false'), k=count)
+
+    if 'array' in types:
+        item = column_generator(name, item_schema(prop))
+
+        def arrays(rng, start, count):
+            sizes = [rng.randint(1, 3) for _ in range(count)]
+            values = item(rng, start, sum(sizes))
+            cells, position = [], 0
+            for size in sizes:
+                cells.append(','.join(values[position:position + size]))
+                position += size
+            return cells
+        return arrays
+
+    if types == {'null'}:
+        return lambda rng, start, count: [''] * count
+
+    return lambda rng, start, count: [f"{name}_{start + i}" for i in range(count)]
+
+
+def node_columns(schema, required_only=False):
+    """
+    Return the ``(column, generator)`` pairs for a node's own properties.
+
+    System properties and link properties are left out; links are written
+    separately. Every member of a subgroup is a link property, including
+    those of an exclusive subgroup the record does not link through.
+
+    Raises:
+        SimulationError: If a property's values cannot be generated, naming
+            the node and the property.
+    """
+    link_names = set(flatten_links(schema.get('links')))
+    skipped = set(SYSTEM_PROPERTIES) | set(schema.get('systemProperties') or []) | link_names
+    skipped |= {'type', 'submitter_id'}
+    required = set(schema.get('required') or [])
+    columns = []
+    for name, prop in (schema.get('properties') or {}).items():
+        if name in skipped or (required_only and name not in required):
+            continue
+        try:
+            columns.append((name, column_generator(name, prop)))
+        except SimulationError as exc:
+            raise SimulationError(f"Node '{schema.get('id')}' property '{name}': {exc}") from exc
+    return columns
+
+
+def simulate(resolved: dict, output_dir: str, records: int, project_code='simulated',
+             seed=None, required_only=False, batch_size=DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Write ``records`` linked records for every node to ``<output_dir>/<node>.tsv``.
+
+    Args:
+        resolved: Resolved node schemas keyed by ``"<id>.yaml"``.
+        output_dir: Directory for the TSV files; created if needed.
+        records: Records per node.
+        project_code: The existing project every record belongs to.
+        seed: Seed for reproducible output.
+        required_only: Generate only required properties.
+        batch_size: Records generated and written at a time.
+
+    Returns:
+        ``{node: records written}``, in the order the nodes were written.
+
+    Raises:
+        ValueError: If ``batch_size`` is not positive.
+        SimulationError: If the link graph has a cycle or a value cannot be generated.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, not {batch_size}")
+    schemas = {schema.get('id'): schema for schema in resolved.values()}
+    graph = link_graph(resolved)
+    order = topological_order(graph)
+    rng = random.Random(seed)
+    width = len(str(max(records - 1, 0)))
+    os.makedirs(output_dir, exist_ok=True)
+
+    written = {}
+    for node in order:
+        links = graph[node]
+        columns = node_columns(schemas[node], required_only)
+        header = ['type', 'submitter_id']
+        header += [
+            f"{name}.code" if parent == 'project' else f"{name}.submitter_id"
+            for name, parent in links if parent != 'program'
+        ]
+        header += [name for name, _ in columns]
+
+        with open(os.path.join(output_dir, f"{node}.tsv"), 'w', newline='', encoding='utf-8') as handle:
+            writer = csv.writer(handle, delimiter='\t', lineterminator='\n')
+            writer.writerow(header)
+            for start in range(0, records, batch_size):
+                count = min(batch_size, records - start)
+                cells = [[node] * count, [submitter_id(node, start + i, width) for i in range(count)]]
+                for _, parent in links:
+                    if parent == 'program':
+                        continue
+                    if parent == 'project':
+                        cells.append([project_code] * count)
+                    else:
+                        cells.append([
+                            submitter_id(parent, rng.randrange(records), width) for _ in range(count)
+                        ])
+                for _, generate in columns:
+                    cells.append(generate(rng, start, count))
+                writer.writerows(zip(*cells))
+        written[node] = records
+    return written
@@ -0,0 +1,257 @@
+"""
+A Docker-free, self-contained HTML rendering of a dictionary's node graph.
+
+``visualise`` runs DDVis in Docker, which takes tens of seconds, needs a Docker
+daemon and cannot run in a locked-down CI. ``visualise --static out.html``
+instead lays the graph out here and writes one HTML file with an inline SVG:
+no scripts or stylesheets are fetched, so it can be attached to a pull request
+or uploaded as a build artefact and opened anywhere.
+
+The layout is layered, as a dictionary is drawn on paper: program at the top,
+every node below all of its parents.
+
+- Layers come from a topological walk of the links - a node's layer is one
+  more than its deepest parent's - visiting each node and link once. Nodes
+  left over by a link cycle are placed below their placed parents.
+- Within a layer, nodes are ordered by the mean horizontal position of their
+  parents (a single barycentre sweep), which keeps most links short and
+  uncrossed. Sorting within layers is the only super-linear step.
+- Wide layers wrap onto several rows of at most :data:`MAX_PER_ROW` nodes, so
+  a dictionary of hundreds of nodes stays a readable shape rather than one
+  very long line.
+"""
+
+import html
+import os
+from collections import deque
+
+from gen3schemadev.diff import flatten_links, is_node_file
+
+MAX_PER_ROW = 12
+
+NODE_WIDTH = 180
+NODE_HEIGHT = 44
+COLUMN_GAP = 30
+ROW_GAP = 70
+MARGIN = 30
+
+# Fill colours for the standard Gen3 categories; anything else is grey.
+CATEGORY_COLOURS = {
+    'administrative': '#cfe2f3',
+    'clinical': '#d9ead3',
+    'biospecimen': '#fce5cd',
+    'data_file': '#ead1dc',
+    'analysis': '#fff2cc',
+    'metadata_file': '#d0e0e3',
+    'notation': '#e6e6e6',
+    'index_file': '#d9d2e9',
+    'experimental_methods': '#f4cccc',
+}
+_OTHER_COLOUR = '#eeeeee'
+
+# Node titles longer than this are shortened on the box; the full title is in
+# its tooltip.
+_MAX_LABEL = 24
+
+
+def build_graph(bundle: dict):
+    """
+    Collect the nodes and links of a bundle.
+
+    Args:
+        bundle: The bundled dictionary, keyed by filename.
+
+    Returns:
+        A tuple ``(nodes, links)``. ``nodes`` maps each node id to a dict with
+        ``title``, ``category`` and ``description``, in id order. ``links`` is
+        a list of ``(child, parent, name, required)`` tuples for links whose
+        parent is a node of the bundle.
+    """
+    nodes = {}
+    declared = []
+    for name, schema in bundle.items():
+        if not is_node_file(name) or not isinstance(schema, dict) or not schema.get('id'):
+            continue
+        node = schema['id']
+        nodes[node] = {
+            'title': schema.get('title') or node,
+            'category': schema.get('category') or '',
+            'description': schema.get('description') or '',
+        }
+        for link_name, link in sorted(flatten_links(schema.get('links')).items()):
+            declared.append((node, link.get('target_type'), link_name, bool(link.get('required'))))
+    links = [link for link in declared if link[1] in nodes and link[1] != link[0]]
+    return {node: nodes[node] for node in sorted(nodes)}, links
+
+
+def layered_layout(nodes, links) -> dict:
+    """
+    Place every node on a grid, parents above children.
+
+    Args:
+        nodes: Node ids, in the order ties are broken.
+        links: ``(child, parent, ...)`` tuples.
+
+    Returns:
+        ``{node: (x, y)}`` - the top-left corner of each node's box, in pixels.
+    """
+    nodes = list(nodes)
+    parents = {node: [] for node in nodes}
+    children = {node: [] for node in nodes}
+    for child, parent, *_ in links:
+        if parent not in parents[child]:
+            parents[child].append(parent)
+            children[parent].append(child)
+
+    # Layers: a topological walk, each node once and each link once.
+    layer = {}
+    waiting = {node: len(parents[node]) for node in nodes}
+    queue = deque(node for node in nodes if not waiting[node])
+    unplaced = iter(nodes)
+    while len(layer) < len(nodes):
+        if not queue:
+            # Only a link cycle leaves nodes unplaced with none ready; release
+            # the first of them, in node order, and carry on from it.
+            queue.append(next(node for node in unplaced if node not in layer))
+        current = queue.popleft()
+        if current in layer:
+            continue
+        layer[current] = 1 + max((layer[p] for p in parents[current] if p in layer), default=-1)
+        for child in children[current]:
+            waiting[child] -= 1
+            if waiting[child] == 0 and child not in layer:
+                queue.append(child)
+
+    by_layer = {}
+    for node in nodes:
+        by_layer.setdefault(layer[node], []).append(node)
+
+    # Order each layer under its parents, then wrap it onto rows.
+    column = {}
+    positions = {}
+    row = 0
+    for depth in sorted(by_layer):
+        members = by_layer[depth]
+
+        def barycentre(node):
+            placed = [column[p] for p in parents[node] if p in column]
+            return (0, sum(placed) / len(placed)) if placed else (1, 0)
+
+        members.sort(key=barycentre)
+        for start in range(0, len(members), MAX_PER_ROW):
+            chunk = members[start:start + MAX_PER_ROW]
+            offset = (MAX_PER_ROW - len(chunk)) / 2
+            for index, node in enumerate(chunk):
+                column[node] = offset + index
+                positions[node] = (offset + index, row)
+            row += 1
+
+    leftmost = min((x for x, _ in positions.values()), default=0)
+    return {
+        node: (
+            MARGIN + (x - leftmost) * (NODE_WIDTH + COLUMN_GAP),
+            MARGIN + y * (NODE_HEIGHT + ROW_GAP),
+        )
+        for node, (x, y) in positions.items()
+    }
+
+
+def _label(title):
+    return title if len(title) <= _MAX_LABEL else title[:_MAX_LABEL - 1] + '…'
+
+
+def render_svg(nodes, links, positions) -> str:
+    """Render a laid-out graph as an SVG element."""
+    width = max((x for x, _ in positions.values()), default=0) + NODE_WIDTH + MARGIN
+    height = max((y for _, y in positions.values()), default=0) + NODE_HEIGHT + MARGIN
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width:g} {height:g}" '
+        f'width="{width:g}" height="{height:g}" font-family="sans-serif" font-size="13">'
+    ]
+
+    parts.append('<g class="links" fill="none" stroke="#888">')
+    for child, parent, name, required in links:
+        cx, cy = positions[child]
+        px, py = positions[parent]
+        x1, y1 = cx + NODE_WIDTH / 2, cy
+        x2, y2 = px + NODE_WIDTH / 2, py + NODE_HEIGHT
+        bend = (y1 - y2) / 2 if y1 > y2 else ROW_GAP
+        dash = '' if required else ' stroke-dasharray="5,4"'
+        parts.append(
+            f'<path d="M{x1:g},{y1:g} C{x1:g},{y1 - bend:g} {x2:g},{y2 + bend:g} {x2:g},{y2:g}"{dash}>'
+            f'<title>{html.escape(child)} → {html.escape(parent)} ({html.escape(name)})</title></path>'
+        )
+    parts.append('</g>')
+
+    parts.append('<g class="nodes">')
+    for node, info in nodes.items():
+        x, y = positions[node]
+        fill = CATEGORY_COLOURS.get(info['category'], _OTHER_COLOUR)
+        tooltip = node if not info['description'] else f"{node}: {info['description']}"
+        parts.append(
+            f'<g id="node-{html.escape(node)}" class="node">'
+            f'<title>{html.escape(tooltip)}</title>'
+            f'<rect x="{x:g}" y="{y:g}" width="{NODE_WIDTH}" height="{NODE_HEIGHT}" rx="6" '
+            f'fill="{fill}" stroke="#555"/>'
+            f'<text x="{x + NODE_WIDTH / 2:g}" y="{y + 19:g}" text-anchor="middle" font-weight="bold">'
+            f'{html.escape(_label(info["title"]))}</text>'
+            f'<text x="{x + NODE_WIDTH / 2:g}" y="{y + 35:g}" text-anchor="middle" fill="#555" font-size="11">'
+            f'{html.escape(info["category"])}</text>'
+            '</g>'
+        )
+    parts.append('</g></svg>')
+    return ''.join(parts)
+
+
+def render_html(bundle: dict, title: str) -> str:
+    """
+    Render a bundle's node graph as a standalone HTML page.
+
+    Args:
+        bundle: The bundled dictionary, keyed by filename.
+        title: The page heading, usually the bundle's filename.
+
+    Returns:
+        The HTML text. It references no external resources.
+    """
+    nodes, links = build_graph(bundle)
+    positions = layered_layout(nodes, links)
+    categories = sorted({info['category'] for info in nodes.values()})
+    legend = ''.join(
+        f'<span class="key"><span class="swatch" style="background:{CATEGORY_COLOURS.get(c, _OTHER_COLOUR)}">'
+        f'</span>{html.escape(c or "uncategorised")}</span>'
+        for c in categories
+    )
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+        f'<title>{html.escape(title)}</title>\n'
+        '<style>\n'
+        'body{font-family:sans-serif;margin:1em}\n'
+        '.key{margin-right:1.2em;white-space:nowrap}\n'
+        '.swatch{display:inline-block;width:.9em;height:.9em;border:1px solid #555;margin-right:.3em;'
+        'vertical-align:middle}\n'
+        '.graph{overflow:auto;border:1px solid #ddd}\n'
+        '.node:hover rect{stroke:#000;stroke-width:2}\n'
+        '.links path:hover{stroke:#c00;stroke-width:2}\n'
+        '</style>\n</head>\n<body>\n'
+        f'<h1>{html.escape(title)}</h1>\n'
+        f'<p>{len(nodes)} nodes, {len(links)} links. Dashed links are optional; '
+        'hover over a node or link for details.</p>\n'
+        f'<p>{legend}</p>\n'
+        f'<div class="graph">{render_svg(nodes, links, positions)}</div>\n'
+        '</body>\n</html>\n'
+    )
+
+
+def write_static_visualisation(bundle: dict, output_path: str, title: str) -> None:
+    """
+    Write :func:`render_html` for ``bundle`` to ``output_path``.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as handle:
+        handle.write(render_html(bundle, title))
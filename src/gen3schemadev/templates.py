@@ -0,0 +1,177 @@
+"""
+Submission TSV templates for every node of a dictionary.
+
+Submitters fill in one TSV per node, and its header has to name exactly the
+columns Gen3 expects: the node's own properties and a column per link, such as
+``subjects.submitter_id``. ``templates`` derives those headers from the
+resolved schemas, so they always match the dictionary they are shipped with.
+
+For each node two files are written:
+
+- ``<node>.tsv``: the header row alone, so the file can be filled in and
+  submitted as it is. ``type``, ``submitter_id`` and the link columns come
+  first, then required properties, then the rest, each group in schema order.
+- ``<node>.hints.tsv``: one row per column of the template, saying whether it
+  is required, what type it takes and, for enums, the allowed values. Hints
+  live beside the template rather than in it: Gen3 reads every row after the
+  header as a record, so a hint row would be submitted as one.
+
+Rendering is cheap; what makes a run slow is touching every file. Templates
+whose content matches the file on disk are left alone - keeping mtimes,
+and a CI cache, intact - and the rest are written across a thread pool.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from gen3schemadev.diff import flatten_links
+from gen3schemadev.properties import SYSTEM_PROPERTIES, accepted_types, find_keyword, item_schema
+
+# The property a link column names on each kind of parent. Programs and
+# projects are created by administrators and identified by name and code.
+_LINK_KEYS = {'program': 'name', 'project': 'code'}
+
+# Enums longer than this are summarised in hints, as in validate-data errors.
+_MAX_LISTED_ENUM = 50
+
+
+def _link_column(link):
+    return f"{link['name']}.{_LINK_KEYS.get(link['target_type'], 'submitter_id')}"
+
+
+def template_columns(schema: dict) -> list:
+    """
+    Return a node's template columns in order, as ``(column, required, prop)``.
+
+    ``prop`` is the property's resolved schema or, for a link column, the link
+    itself. Every member of an exclusive subgroup gets a column, since the
+    submitter chooses which parent each record links to.
+    """
+    required = set(schema.get('required') or [])
+    properties = schema.get('properties') or {}
+    link_properties = flatten_links(schema.get('links'))
+    links = [link for link in link_properties.values() if link.get('target_type')]
+    skipped = set(SYSTEM_PROPERTIES) | set(schema.get('systemProperties') or []) | set(link_properties)
+    skipped |= {'type', 'submitter_id'}
+
+    columns = [('type', True, properties.get('type')), ('submitter_id', True, properties.get('submitter_id'))]
+    columns += sorted(
+        ((_link_column(link), link.get('required', False) or link['name'] in required, link) for link in links),
+        key=lambda column: not column[1],
+    )
+    own = [(name, name in required, prop) for name, prop in properties.items() if name not in skipped]
+    columns += [column for column in own if column[1]]
+    columns += [column for column in own if not column[1]]
+    return columns
+
+
+def _hint(prop, column):
+    """Describe what a column takes: ``(type, allowed values)``."""
+    if prop is None:
+        return '', ''
+    if 'target_type' in prop:
+        return 'link', f"the {column.rpartition('.')[2]} of an existing {prop['target_type']} record"
+    enum = find_keyword(prop, 'enum')
+    types = accepted_types(prop) - {'null'}
+    if 'array' in types:
+        enum = enum or find_keyword(item_schema(prop), 'enum')
+    if enum:
+        values = [str(value) for value in enum if value is not None]
+        if len(values) > _MAX_LISTED_ENUM:
+            return 'enum', f"one of {len(values)} values; see the dictionary"
+        return ('array of enum' if 'array' in types else 'enum'), ', '.join(values)
+    if find_keyword(prop, 'format') == 'date-time':
+        return 'date-time', 'YYYY-MM-DDThh:mm:ss'
+    allowed = ''
+    pattern = find_keyword(prop, 'pattern')
+    if pattern:
+        allowed = f"matching {pattern}"
+    else:
+        bounds = [(key, find_keyword(prop, key)) for key in ('minimum', 'maximum')]
+        allowed = ', '.join(f"{key} {value}" for key, value in bounds if value is not None)
+    if 'array' in types:
+        allowed = ', '.join(filter(None, ['comma separated', allowed]))
+    return ' or '.join(sorted(types)) or 'any', allowed
+
+
+def _clean(text) -> str:
+    # Tabs and newlines would break the TSV.
+    return ' '.join(str(text).split())
+
+
+def render_templates(resolved: dict) -> dict:
+    """
+    Render the template and hints files for every node.
+
+    Args:
+        resolved: Resolved node schemas keyed by ``"<id>.yaml"``.
+
+    Returns:
+        ``{filename: text}``, sorted by filename.
+    """
+    rendered = {}
+    for schema in resolved.values():
+        node = schema.get('id')
+        if not node:
+            continue
+        columns = template_columns(schema)
+        rendered[f"{node}.tsv"] = '\t'.join(column for column, _, _ in columns) + '\n'
+        lines = ['column\trequired\ttype\tallowed values']
+        for column, required, prop in columns:
+            if column == 'type':
+                kind, allowed = 'string', node
+            else:
+                kind, allowed = _hint(prop, column)
+            lines.append('\t'.join(_clean(cell) for cell in (column, 'yes' if required else 'no', kind, allowed)))
+        rendered[f"{node}.hints.tsv"] = '\n'.join(lines) + '\n'
+    return {name: rendered[name] for name in sorted(rendered)}
+
+
+def _write_if_changed(path, text) -> bool:
+    """Write ``text`` to ``path`` unless the file already holds it; return whether it was written."""
+    data = text.encode('utf-8')
+    try:
+        with open(path, 'rb') as handle:
+            if handle.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    # Written to a temporary name and renamed, so a reader never sees half a
+    # template.
+    temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp, 'wb') as handle:
+            handle.write(data)
+        os.replace(temp, path)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+    return True
+
+
+def write_templates(rendered: dict, output_dir: str, workers: int = None) -> dict:
+    """
+    Write rendered templates, skipping those already up to date.
+
+    Args:
+        rendered: ``{filename: text}`` from :func:`render_templates`.
+        output_dir: Target directory, created if needed.
+        workers: Threads to write with; the executor's default when None.
+
+    Returns:
+        A dict with sorted ``written`` and ``unchanged`` filename lists.
+
+    Raises:
+        OSError: If a template cannot be written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    names = list(rendered)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        changed = list(pool.map(
+            lambda name: _write_if_changed(os.path.join(output_dir, name), rendered[name]), names
+        ))
+    return {
+        'written': sorted(name for name, was_written in zip(names, changed) if was_written),
+        'unchanged': sorted(name for name, was_written in zip(names, changed) if not was_written),
+    }
@@ -0,0 +1,188 @@
+"""
+Structured tracing of where a run spends its time, exportable as a Chrome trace.
+
+``--debug`` answers "what happened" with a line of text per step; on a large
+dictionary that is tens of thousands of lines and says little about time.
+Tracing answers "where did the time go": each stage and each node is a span
+with a start, a duration and a few fields, and ``--trace out.json`` writes
+them in the Chrome trace-event format, which ``chrome://tracing``, Perfetto
+(https://ui.perfetto.dev) and speedscope open directly.
+
+Tracing costs next to nothing when it is off, which is always unless
+``--trace`` is given:
+
+- :func:`span` returns one shared no-op context manager, so an untraced span
+  is a function call and a ``with`` block.
+- Span fields are lazy. A field given as a callable is only called when the
+  span is recorded, so ``span('resolve', node=lambda: schema['id'])`` costs
+  nothing untraced, however expensive the lambda.
+
+Spans may be opened from any thread; each is recorded against the thread it
+ran on. Work done in other processes - resolution with ``-j`` - shows as the
+one span that waited for it.
+
+Typical usage::
+
+    from gen3schemadev import tracing
+
+    with tracing.span('resolve', 'node', node=lambda: schema['id']) as sp:
+        resolved = resolve(schema)
+        sp.set(properties=lambda: len(resolved['properties']))
+
+    with tracing.recording() as tracer:
+        run()
+    tracer.write('out.json')
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# The tracer spans are recorded into, or None when tracing is off.
+_active = None
+
+
+class _NullSpan:
+    """The span handed out when tracing is off: does nothing, as cheaply as possible."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'category', 'fields', 'start')
+
+    def __init__(self, tracer, name, category, fields):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.fields = fields
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.fields['error'] = exc_type.__name__
+        self.tracer.add(self.name, self.category, self.start, end, self.fields)
+        return False
+
+    def set(self, **fields):
+        """Add fields to the span, such as a count known only once its work is done."""
+        self.fields.update(fields)
+
+
+def _evaluate(value):
+    value = value() if callable(value) else value
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+class Tracer:
+    """
+    Collects finished spans and writes them out as a Chrome trace.
+
+    Created by :func:`recording`; there is rarely a reason to make one
+    directly.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter_ns()
+        self.events = []
+        self._lock = threading.Lock()
+
+    def add(self, name, category, start, end, fields):
+        """Record one finished span; times are ``perf_counter_ns`` values."""
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - self.origin) / 1000,
+            'dur': (end - start) / 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': {key: _evaluate(value) for key, value in fields.items()},
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def to_chrome(self) -> dict:
+        """Return the trace in the Chrome trace-event JSON object format."""
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event['ts'])
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path) -> None:
+        """
+        Write :meth:`to_chrome` to ``path``.
+
+        Raises:
+            OSError: If the file cannot be written.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as handle:
+            json.dump(self.to_chrome(), handle)
+
+
+def enabled() -> bool:
+    """Return True while spans are being recorded."""
+    return _active is not None
+
+
+def span(name, category='stage', **fields):
+    """
+    Return a context manager timing the enclosed block as a span.
+
+    Args:
+        name: What is being done, e.g. ``'resolve'``.
+        category: The kind of span: ``'stage'`` for a step of a command,
+            ``'node'`` for one node's share of a stage, or a rule name.
+        **fields: Values recorded with the span. A callable is called when
+            the span is recorded, and not at all when tracing is off; anything
+            other than a number, string, bool or None is recorded as its str.
+
+    Returns:
+        A context manager whose value has a ``set(**fields)`` method for fields
+        known only inside the block.
+    """
+    tracer = _active
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, category, fields)
+
+
+@contextmanager
+def recording():
+    """
+    Record every span opened, from any thread, until the block exits.
+
+    Yields:
+        The :class:`Tracer` the spans are recorded into.
+    """
+    global _active
+    previous = _active
+    tracer = Tracer()
+    _active = tracer
+    try:
+        yield tracer
+    finally:
+        _active = previous
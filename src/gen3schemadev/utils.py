@@ -1,11 +1,13 @@
+import hashlib
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 import yaml
 from jsonschema import validate
 import logging
 from gen3_validator.resolve_schema import ResolveSchema
-import tempfile
 
+from gen3schemadev import jsonio, tracing
 from gen3schemadev.refs import find_dangling_refs
 
 
@@ -15,7 +17,30 @@ def create_dir_if_not_exists(dir_path):
     base_path = os.path.dirname(dir_path)
     if not os.path.exists(base_path):
         os.makedirs(base_path)
-        logger.info(f"Created directory: {base_path}")
+        logger.info("Created directory: %s", base_path)
+
+def cache_dir(*parts) -> str:
+    """
+    Return gen3schemadev's on-disk cache directory, creating it if needed.
+
+    The location is ``$GEN3SCHEMADEV_CACHE_DIR`` when set, otherwise
+    ``gen3schemadev`` under ``$XDG_CACHE_HOME`` (``~/.cache`` by default). It
+    deliberately does not depend on the working directory, so running the tool
+    from different folders shares one cache instead of scattering several.
+
+    Args:
+        *parts: Optional subdirectory names inside the cache.
+
+    Returns:
+        The absolute path of the (sub)directory.
+    """
+    root = os.environ.get('GEN3SCHEMADEV_CACHE_DIR')
+    if not root:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        root = os.path.join(base, 'gen3schemadev')
+    path = os.path.abspath(os.path.join(root, *parts))
+    os.makedirs(path, exist_ok=True)
+    return path
 
 def load_yaml(file_path):
     """
@@ -25,16 +50,16 @@ def load_yaml(file_path):
     try:
         with open(file_path, 'r') as f:
             data = yaml.safe_load(f)
-            logger.info(f"Successfully loaded YAML file: {file_path}")
+            logger.info("Successfully loaded YAML file: %s", file_path)
             return data
     except FileNotFoundError:
-        logger.error(f"File not found: {file_path}")
+        logger.error("File not found: %s", file_path)
         raise
     except yaml.YAMLError as e:
-        logger.error(f"YAML parsing error in file {file_path}: {e}")
+        logger.error("YAML parsing error in file %s: %s", file_path, e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error loading YAML file {file_path}: {e}")
+        logger.error("Unexpected error loading YAML file %s: %s", file_path, e)
         raise
 
 def write_yaml(data, file_path):
@@ -48,45 +73,45 @@ def write_yaml(data, file_path):
             create_dir_if_not_exists(file_path)
         with open(file_path, 'w') as f:
             yaml.safe_dump(data, f, sort_keys=False, indent=2)
-            logger.info(f"Successfully wrote YAML file: {file_path}")
+            logger.info("Successfully wrote YAML file: %s", file_path)
     except Exception as e:
-        logger.error(f"Failed to write YAML file {file_path}: {e}")
+        logger.error("Failed to write YAML file %s: %s", file_path, e)
         raise
 
 def read_json(file_path):
     """
     Reads a JSON file and returns its contents.
+    A ``.json.gz`` or ``.json.xz`` file is decompressed as it is read.
     Logs success or error messages.
     """
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            logger.info(f"Successfully loaded JSON file: {file_path}")
-            return data
+        data = jsonio.read_file(file_path)
+        logger.info("Successfully loaded JSON file: %s", file_path)
+        return data
     except FileNotFoundError:
-        logger.error(f"File not found: {file_path}")
+        logger.error("File not found: %s", file_path)
         raise
     except json.JSONDecodeError as e:
-        logger.error(f"JSON parsing error in file {file_path}: {e}")
+        logger.error("JSON parsing error in file %s: %s", file_path, e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error loading JSON file {file_path}: {e}")
+        logger.error("Unexpected error loading JSON file %s: %s", file_path, e)
         raise
 
 def write_json(data, file_path):
     """
     Writes a Python object to a JSON file.
+    A ``.json.gz`` or ``.json.xz`` path is compressed as it is written.
     Logs success or error messages.
     """
     try:
         dir_path = os.path.dirname(file_path)
         if dir_path:
             create_dir_if_not_exists(file_path)
-        with open(file_path, 'w') as f:
-            json.dump(data, f)
-            logger.info(f"Successfully wrote JSON file: {file_path}")
+        jsonio.write_file(data, file_path)
+        logger.info("Successfully wrote JSON file: %s", file_path)
     except Exception as e:
-        logger.error(f"Failed to write JSON file {file_path}: {e}")
+        logger.error("Failed to write JSON file %s: %s", file_path, e)
         raise
 
 def bundle_yamls(input_dir: str) -> dict:
@@ -137,6 +162,11 @@ def is_documentation_ref(path: str) -> bool:
     return any(segment in ('term', 'terms') for segment in segments)
 
 
+def describe_dangling(dangling: list) -> str:
+    """Describe dangling references on one line, as a resolution failure names them."""
+    return "; ".join(f"{src}: {path} -> {ref}" for src, path, ref in dangling)
+
+
 def _strip_refs(node, refs: set):
     """Return a copy of ``node`` with every dict holding one of ``refs`` removed."""
     if isinstance(node, dict):
@@ -150,12 +180,92 @@ def _strip_refs(node, refs: set):
     return node
 
 
-def resolve_schema(schema_dir: str = None, schema_path: str = None) -> dict:
+def content_hash(data) -> str:
     """
-    Load and resolve a Gen3 JSON schema from either a directory of YAML files or a bundled JSON file.
+    Return a SHA-256 hex digest of a JSON-compatible value's content.
+
+    Keys are sorted before hashing, so two values that compare equal hash
+    equally regardless of the order their mappings were built in.
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def ordered_hash(data) -> str:
+    """
+    Return a SHA-256 hex digest of a JSON-compatible value, key order included.
+
+    Unlike :func:`content_hash`, two values differing only in the order of
+    their keys hash differently. Use it where order is part of the result:
+    the order of a node's properties decides the order of its resolved
+    properties, and so of its template columns.
+    """
+    serialised = json.dumps(data, separators=(',', ':'))
+    return hashlib.sha256(serialised.encode('utf-8')).hexdigest()
+
+
+def _new_resolver(bundle: dict, source: str = '<bundle>') -> ResolveSchema:
+    """
+    Return a ResolveSchema holding ``bundle`` without reading it from a file.
+
+    ResolveSchema is built around a path it reads itself. Assigning the parsed
+    bundle directly - which is all ``parse_schema`` does with the file - lets a
+    bundle that only exists in memory be resolved without a temporary file.
+    """
+    resolver = ResolveSchema(source)
+    resolver.schema = bundle
+    resolver.nodes = list(bundle)
+    return resolver
+
+
+# Per-process state for parallel resolution, set once by _init_resolve_worker.
+_WORKER_STATE = {}
+
+
+def _init_resolve_worker(references):
+    """
+    Pool initializer: receive the resolved references once per worker process.
+
+    Passing them here rather than with each node means the largest object in
+    resolution is pickled once per worker instead of once per node.
+    """
+    _WORKER_STATE['references'] = references
+    _WORKER_STATE['resolver'] = _new_resolver({})
+
+
+def _resolve_in_worker(schema):
+    return _WORKER_STATE['resolver'].resolve_references(schema, _WORKER_STATE['references'])
+
 
-    If `schema_dir` is provided, all YAML files in the directory are bundled into a temporary JSON file,
-    which is then resolved. If `schema_path` is provided, it is used directly.
+def _resolve_nodes(resolver, schemas, references, workers):
+    """
+    Resolve node schemas against ``references``, in order.
+
+    With more than one worker the nodes are spread over a process pool. They
+    are independent once ``references`` is built, and ``map`` returns results
+    in input order, so the output is identical to the serial loop.
+    """
+    if not workers or workers <= 1 or len(schemas) <= 1:
+        resolved = []
+        for schema in schemas:
+            with tracing.span('resolve', 'node', node=lambda: schema.get('id')):
+                resolved.append(resolver.resolve_references(schema, references))
+        return resolved
+    chunksize = max(1, len(schemas) // (workers * 4))
+    # The per-node work happens in other processes, so it is traced as the
+    # one span that waits for the pool.
+    with tracing.span('resolve in pool', nodes=len(schemas), workers=workers), ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_resolve_worker, initargs=(references,)
+    ) as pool:
+        return list(pool.map(_resolve_in_worker, schemas, chunksize=chunksize))
+
+
+def resolve_bundle(bundle: dict, dangling: list = None, workers: int = None) -> dict:
+    """
+    Resolve an in-memory bundled dictionary into node schemas.
+
+    This is the work behind :func:`resolve_schema`, for a caller that already
+    holds the bundle and has no reason to write it to disk and read it back.
 
     Two things are done here that the underlying resolver does not do:
 
@@ -170,55 +280,103 @@ def resolve_schema(schema_dir: str = None, schema_path: str = None) -> dict:
        reference raises :class:`SchemaResolutionError` naming it, instead of
        the bare ``KeyError`` the library raises.
 
+    Args:
+        bundle: The bundled dictionary, keyed by filename.
+        dangling: The bundle's dangling references, as
+            :func:`gen3schemadev.refs.find_dangling_refs` returns them, when the
+            caller has already collected them. Found here otherwise.
+        workers: Resolve nodes across this many processes. Serial when None or
+            1. A pool costs tens of milliseconds to start, so this pays off on
+            large dictionaries and multi-core machines only.
+
     Returns:
         dict: Resolved node schemas keyed by ``"<id>.yaml"``.
 
     Raises:
         SchemaResolutionError: If a non-documentation reference cannot be resolved.
-        Exception: If neither `schema_dir` nor `schema_path` is provided.
     """
-    temp_file_path = None
-    if schema_dir:
-        bundled_schema = bundle_yamls(schema_dir)
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", dir=".", delete=False) as tf:
-            json.dump(bundled_schema, tf)
-            temp_file_path = tf.name
-            schema_path = temp_file_path
-
+    resolver, schemas, references = prepare_resolution(bundle, dangling)
+    output = {}
     try:
-        resolver = ResolveSchema(schema_path)
-        resolver.parse_schema()
-        bundle = resolver.schema
+        for resolved in _resolve_nodes(resolver, schemas, references, workers):
+            schema_id = resolved.get('id')
+            if schema_id:
+                output[f"{schema_id}.yaml"] = resolved
+    except KeyError as exc:
+        raise SchemaResolutionError(str(exc).strip("'")) from exc
+
+    return output
+
+
+def prepare_resolution(bundle: dict, dangling: list = None):
+    """
+    Do the shared part of resolving a bundle: everything before the per-node work.
+
+    Checks the dangling references, drops documentation-only ones and resolves
+    the definitions against the terms. What is left - resolving each node
+    against the returned references - is independent per node, so a caller
+    can schedule it node by node, as :func:`resolve_bundle` does through
+    ``_resolve_nodes`` and :mod:`gen3schemadev.aio` does on an event loop.
+
+    Args:
+        bundle: The bundled dictionary, keyed by filename.
+        dangling: As for :func:`resolve_bundle`.
+
+    Returns:
+        A tuple ``(resolver, schemas, references)``: a resolver, the node
+        schemas still to resolve, in bundle order, and the references to
+        resolve them against. ``resolver.resolve_references(schema,
+        references)`` resolves one node and keeps no state between calls.
+
+    Raises:
+        SchemaResolutionError: If a non-documentation reference cannot be resolved.
+    """
+    resolver = _new_resolver(bundle)
 
+    if dangling is None:
         dangling = find_dangling_refs(bundle)
-        fatal = [hit for hit in dangling if not is_documentation_ref(hit[1])]
-        if fatal:
-            detail = "; ".join(f"{src}: {path} -> {ref}" for src, path, ref in fatal)
-            raise SchemaResolutionError(detail)
+    fatal = [hit for hit in dangling if not is_documentation_ref(hit[1])]
+    if fatal:
+        raise SchemaResolutionError(describe_dangling(fatal))
 
-        if dangling:
-            # Documentation-only, so drop the term and carry on. The caller
-            # reports these; see cli.py.
-            bundle = _strip_refs(bundle, {ref for _, _, ref in dangling})
+    if dangling:
+        # Documentation-only, so drop the term and carry on. The caller
+        # reports these; see cli.py.
+        bundle = _strip_refs(bundle, {ref for _, _, ref in dangling})
 
-        try:
+    try:
+        with tracing.span('resolve definitions'):
             definitions = resolver.resolve_references(
                 bundle['_definitions.yaml'], bundle['_terms.yaml']
             )
-            references = {**bundle['_terms.yaml'], **definitions}
-            output = {}
-            for file_name, schema in bundle.items():
-                if file_name in _NON_NODE_FILES:
-                    continue
-                resolved = resolver.resolve_references(schema, references)
-                schema_id = resolved.get('id')
-                if schema_id:
-                    output[f"{schema_id}.yaml"] = resolved
-        except KeyError as exc:
-            raise SchemaResolutionError(str(exc).strip("'")) from exc
-
-        return output
-    finally:
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+    except KeyError as exc:
+        raise SchemaResolutionError(str(exc).strip("'")) from exc
+    references = {**bundle['_terms.yaml'], **definitions}
+    schemas = [
+        schema for file_name, schema in bundle.items() if file_name not in _NON_NODE_FILES
+    ]
+    return resolver, schemas, references
+
+
+def resolve_schema(schema_dir: str = None, schema_path: str = None) -> dict:
+    """
+    Load and resolve a Gen3 JSON schema from either a directory of YAML files or a bundled JSON file.
 
+    If `schema_dir` is provided, all YAML files in the directory are bundled in
+    memory and resolved. If `schema_path` is provided, the bundle is read from
+    it. Resolution itself is :func:`resolve_bundle`.
+
+    Returns:
+        dict: Resolved node schemas keyed by ``"<id>.yaml"``.
+
+    Raises:
+        SchemaResolutionError: If a non-documentation reference cannot be resolved.
+        Exception: If neither `schema_dir` nor `schema_path` is provided.
+    """
+    if schema_dir:
+        bundle = bundle_yamls(schema_dir)
+    elif schema_path:
+        bundle = read_json(schema_path)
+    else:
+        raise Exception("resolve_schema needs either schema_dir or schema_path")
+    return resolve_bundle(bundle)
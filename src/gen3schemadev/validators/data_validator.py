@@ -0,0 +1,272 @@
+"""
+Validate submission data - TSV and JSON records - against a resolved dictionary.
+
+The dictionary is only half of what reaches Gen3: the metadata submitted
+against it is the other half, and it was being checked with ad-hoc scripts
+that each reimplemented some of the dictionary's rules. This validates records
+against the resolved node schemas themselves, so the dictionary is the single
+place those rules live.
+
+- One ``jsonschema`` validator is compiled per node, on first use, and reused
+  for every record of that node.
+- Files are read one record at a time and only a bounded number of errors is
+  kept per file, so memory stays flat however large a file is. A ``.json``
+  file holding an array is the exception: it has to be parsed whole, so prefer
+  JSON lines (``.jsonl`` / ``.ndjson``) for large exports.
+- Files are independent, so they are spread over a process pool; the resolved
+  schemas are handed to each worker once, when it starts.
+
+A record's node is its ``type`` field, or failing that the file's name when
+that names a node (``sample.tsv``). TSV cells are strings, so each is converted
+to the type its property accepts before validation, following the Gen3 TSV
+conventions: an empty cell is an absent value, an array cell is comma
+separated, and a ``<link>.submitter_id`` column (optionally ``#1``, ``#2``...
+for several parents) becomes the link object.
+"""
+
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from jsonschema import Draft4Validator
+
+from gen3schemadev.properties import accepted_types, item_schema
+
+# Data files validate-data reads when given a directory.
+DATA_SUFFIXES = ('.tsv', '.jsonl', '.ndjson', '.json')
+
+# Errors kept per file. Counting carries on past it, so the total is honest,
+# but a file with a systematic mistake cannot fill memory with copies of it.
+DEFAULT_MAX_ERRORS = 100
+
+
+def find_data_files(paths) -> list:
+    """
+    Expand files and directories into the data files to validate.
+
+    Directories are searched recursively for :data:`DATA_SUFFIXES`, in sorted
+    order so reports are stable. Files given explicitly are kept whatever their
+    suffix, in the order given.
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                found.extend(
+                    os.path.join(root, name) for name in sorted(files)
+                    if name.endswith(DATA_SUFFIXES)
+                )
+        else:
+            found.append(path)
+    return found
+
+
+def _convert_scalar(text, types):
+    """Convert one TSV cell to the first type it fits; strings are left alone."""
+    if 'string' in types or not types:
+        return text
+    if 'integer' in types or 'number' in types:
+        try:
+            return int(text)
+        except ValueError:
+            pass
+    if 'number' in types:
+        try:
+            return float(text)
+        except ValueError:
+            pass
+    if 'boolean' in types and text.lower() in ('true', 'false'):
+        return text.lower() == 'true'
+    if 'null' in types and text.lower() == 'null':
+        return None
+    return text
+
+
+def _cell_converter(prop):
+    """Return a function converting a TSV cell to the value ``prop`` expects."""
+    types = accepted_types(prop)
+    if 'array' in types and 'string' not in types:
+        item_types = accepted_types(item_schema(prop))
+        return lambda text: [_convert_scalar(part.strip(), item_types) for part in text.split(',')]
+    return lambda text: _convert_scalar(text, types)
+
+
+class NodeValidators:
+    """Compiled validators and TSV converters for each node, built on first use."""
+
+    def __init__(self, resolved: dict):
+        self.schemas = {
+            schema.get('id', os.path.splitext(name)[0]): schema
+            for name, schema in resolved.items()
+        }
+        self._validators = {}
+        self._converters = {}
+
+    def validator(self, node):
+        if node not in self._validators:
+            self._validators[node] = Draft4Validator(self.schemas[node])
+        return self._validators[node]
+
+    def convert_row(self, node, row: dict) -> dict:
+        """Turn one TSV row of strings into a typed record for ``node``."""
+        properties = self.schemas[node].get('properties') or {}
+        converters = self._converters.setdefault(node, {})
+        record = {}
+        links = {}
+        for column, text in row.items():
+            if column is None or text is None or text == '':
+                continue
+            name, dot, field = column.partition('.')
+            if dot and name in properties:
+                # A link column: cases.submitter_id, or cases.submitter_id#2
+                # for a second parent. Columns sharing a suffix describe the
+                # same parent.
+                field, _, parent = field.partition('#')
+                links.setdefault(name, {}).setdefault(parent, {})[field] = text
+                continue
+            if column not in converters:
+                converters[column] = _cell_converter(properties.get(column, {}))
+            record[column] = converters[column](text)
+        for name, parents in links.items():
+            parents = list(parents.values())
+            single = len(parents) == 1 and 'object' in accepted_types(properties[name])
+            record[name] = parents[0] if single else parents
+        return record
+
+
+def iter_records(path):
+    """
+    Yield ``(location, record)`` for each record in a data file, one at a time.
+
+    ``location`` is the line number for TSV and JSON lines, and ``[i]`` for an
+    element of a JSON array. TSV records are ``{column: text}`` rows; a record
+    that cannot be parsed is yielded as the exception instead.
+    """
+    if path.endswith('.tsv'):
+        with open(path, newline='', encoding='utf-8') as handle:
+            reader = csv.DictReader(handle, delimiter='\t')
+            for row in reader:
+                yield str(reader.line_num), row
+    elif path.endswith('.json'):
+        with open(path, encoding='utf-8') as handle:
+            data = json.load(handle)
+        for index, record in enumerate(data if isinstance(data, list) else [data]):
+            yield f"[{index}]", record
+    else:
+        with open(path, encoding='utf-8') as handle:
+            for number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield str(number), json.loads(line)
+                except ValueError as exc:
+                    yield str(number), exc
+
+
+# Enums longer than this are summarised rather than listed in an error.
+_MAX_LISTED_ENUM = 10
+
+
+def _format_error(error) -> str:
+    message = error.message
+    if error.validator == 'enum' and len(error.validator_value) > _MAX_LISTED_ENUM:
+        # jsonschema lists every allowed value; for a controlled vocabulary
+        # that is hundreds of values on every offending row.
+        message = f"{error.instance!r} is not one of the {len(error.validator_value)} allowed values"
+    location = '.'.join(str(part) for part in error.absolute_path)
+    return f"{location}: {message}" if location else message
+
+
+def validate_file(path, nodes: NodeValidators, max_errors=DEFAULT_MAX_ERRORS) -> dict:
+    """
+    Validate every record in one data file.
+
+    Args:
+        path: The data file.
+        nodes: Validators for the dictionary's nodes.
+        max_errors: How many errors to keep; further errors are only counted.
+
+    Returns:
+        A dict with ``path``, ``records`` (how many were read),
+        ``error_count`` and ``errors``, a list of ``(location, node, message)``
+        tuples in file order.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    fallback = stem if stem in nodes.schemas else None
+    is_tsv = path.endswith('.tsv')
+    result = {'path': path, 'records': 0, 'error_count': 0, 'errors': []}
+
+    def report(location, node, message):
+        result['error_count'] += 1
+        if len(result['errors']) < max_errors:
+            result['errors'].append((location, node, message))
+
+    try:
+        for location, record in iter_records(path):
+            result['records'] += 1
+            if isinstance(record, Exception):
+                report(location, None, f"not valid JSON: {record}")
+                continue
+            if not isinstance(record, dict):
+                report(location, None, "record is not an object")
+                continue
+            node = record.get('type') or fallback
+            if not isinstance(node, (str, type(None))):
+                report(location, None, "'type' must be a string")
+                continue
+            if node not in nodes.schemas:
+                report(location, node, (
+                    f"unknown node type '{node}'" if node else
+                    "no 'type' given, and the file name does not name a node"
+                ))
+                continue
+            if not record.get('type'):
+                # Typed by its file name, so the type is given, just not in
+                # the record; don't report it as missing on every row.
+                record = {**record, 'type': node}
+            if is_tsv:
+                record = nodes.convert_row(node, record)
+            errors = sorted(nodes.validator(node).iter_errors(record), key=lambda e: list(e.absolute_path))
+            for error in errors:
+                report(location, node, _format_error(error))
+    except (OSError, UnicodeDecodeError, ValueError, csv.Error) as exc:
+        report('-', None, f"cannot read file: {exc}")
+    return result
+
+
+# Per-process state for the pool, set once by _init_worker.
+_WORKER_STATE = {}
+
+
+def _init_worker(resolved):
+    _WORKER_STATE['nodes'] = NodeValidators(resolved)
+
+
+def _validate_in_worker(path, max_errors):
+    return validate_file(path, _WORKER_STATE['nodes'], max_errors)
+
+
+def validate_data(resolved: dict, files, workers=None, max_errors=DEFAULT_MAX_ERRORS) -> list:
+    """
+    Validate data files against resolved node schemas.
+
+    Args:
+        resolved: Resolved node schemas keyed by ``"<id>.yaml"``.
+        files: Data files, as :func:`find_data_files` returns them.
+        workers: Validate files across this many processes. In this process
+            when None or 1.
+        max_errors: Errors kept per file.
+
+    Returns:
+        One :func:`validate_file` result per file, in the order given.
+    """
+    files = list(files)
+    if not workers or workers <= 1 or len(files) <= 1:
+        nodes = NodeValidators(resolved)
+        return [validate_file(path, nodes, max_errors) for path in files]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(resolved,)
+    ) as pool:
+        return list(pool.map(_validate_in_worker, files, [max_errors] * len(files)))
@@ -22,16 +22,16 @@ def load_yaml(file_path):
     try:
         with open(file_path, 'r') as f:
             data = yaml.safe_load(f)
-            logger.info(f"Successfully loaded YAML file: {file_path}")
+            logger.info("Successfully loaded YAML file: %s", file_path)
             return data
     except FileNotFoundError as e:
-        logger.error(f"File not found: {file_path}")
+        logger.error("File not found: %s", file_path)
         raise
     except yaml.YAMLError as e:
-        logger.error(f"YAML parsing error in file {file_path}: {e}")
+        logger.error("YAML parsing error in file %s: %s", file_path, e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error loading YAML file {file_path}: {e}")
+        logger.error("Unexpected error loading YAML file %s: %s", file_path, e)
         raise
 
 def validate_input_yaml(file_path):
@@ -51,8 +51,8 @@ def validate_input_yaml(file_path):
     try:
         data = load_yaml(file_path)
         validated = DataModel.model_validate(data)
-        logger.info(f"Completed validation for file: {file_path}")
+        logger.info("Completed validation for file: %s", file_path)
         return validated
     except Exception as e:
-        logger.error(f"Failed to run validation for file {file_path}: {e}")
+        logger.error("Failed to run validation for file %s: %s", file_path, e)
         raise
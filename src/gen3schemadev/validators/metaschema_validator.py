@@ -15,21 +15,71 @@ Typical usage example:
 
 """
 
+import json
 import logging
+import os
 import subprocess
 import tempfile
-import json
 
 logger = logging.getLogger(__name__)
 
 
 
+def _write_check_files(tmp_dir: str, schema: dict, metaschema: dict, verbose: bool = False) -> list:
+    """Write the schema and metaschema into ``tmp_dir`` and return the check-jsonschema command."""
+    schema_path = os.path.join(tmp_dir, "schema.json")
+    metaschema_path = os.path.join(tmp_dir, "metaschema.json")
+    with open(schema_path, "w") as schema_file:
+        json.dump(schema, schema_file)
+    with open(metaschema_path, "w") as metaschema_file:
+        json.dump(metaschema, metaschema_file)
+
+    cmd = [
+        "check-jsonschema",
+        "--schemafile", metaschema_path,
+        schema_path
+    ]
+    if verbose:
+        cmd.insert(1, "--verbose")
+    return cmd
+
+
+def _raise_for_check_result(schema: dict, returncode: int, stdout: str, stderr: str) -> None:
+    """Log check-jsonschema's outcome, raising RuntimeError if it failed."""
+    if returncode != 0:
+        logger.error("check-jsonschema failed with exit code %s", returncode)
+        if stdout:
+            logger.error("STDOUT: %s", stdout)
+        if stderr:
+            logger.error("STDERR: %s", stderr)
+        # The tool's report goes in the error too, for callers that do
+        # not capture logs, such as a service using gen3schemadev.api.
+        detail = (stdout or stderr or "").strip()
+        raise RuntimeError(
+            f"check-jsonschema validation failed for schema '{schema.get('id', '<no id>')}'. "
+            f"See logs for details." + (f"\n{detail}" if detail else "")
+        )
+    logger.info("Schema '%s' successfully validated against metaschema.", schema.get('id', '<no id>'))
+
+
+def _check_arguments(schema, metaschema) -> None:
+    if not isinstance(schema, dict):
+        logger.error("Provided schema is not a dictionary.")
+        raise ValueError("Provided schema must be a dictionary.")
+    if not isinstance(metaschema, dict):
+        logger.error("Provided metaschema is not a dictionary.")
+        raise ValueError("Provided metaschema must be a dictionary.")
+    logger.info("Validating schema '%s' against the Gen3 metaschema.", schema.get('id', '<no id>'))
+
+
 def validate_schema_with_metaschema(schema: dict, metaschema: dict, verbose: bool = False) -> None:
     """
     Validate a single Gen3 resolved schema dictionary against the Gen3 metaschema using check-jsonschema.
 
     This function writes the provided schema and metaschema to temporary files and
     invokes the external `check-jsonschema` command-line tool to perform validation.
+    The files live in a temporary directory private to the call, so concurrent
+    calls from several threads never share or clobber each other's files.
 
     Args:
         schema (dict): The Gen3 resolved schema to validate.
@@ -46,70 +96,21 @@ def validate_schema_with_metaschema(schema: dict, metaschema: dict, verbose: boo
     Note:
         This function does not return a value. It will raise an error if validation fails.
     """
-    if not isinstance(schema, dict):
-        logger.error("Provided schema is not a dictionary.")
-        raise ValueError("Provided schema must be a dictionary.")
-    if not isinstance(metaschema, dict):
-        logger.error("Provided metaschema is not a dictionary.")
-        raise ValueError("Provided metaschema must be a dictionary.")
-
-    logger.info(f"Validating schema '{schema.get('id', '<no id>')}' against the Gen3 metaschema.")
-
-    import os
+    _check_arguments(schema, metaschema)
 
     try:
-        # Write temp files to a .tmp directory in the current working directory
-        tmp_dir = os.path.join(os.getcwd(), ".cache")
-        os.makedirs(tmp_dir, exist_ok=True)
-
-        schema_path = None
-        metaschema_path = None
-
-        with tempfile.NamedTemporaryFile(
-            mode='w',
-            suffix='.json',
-            dir=tmp_dir,
-            delete=False
-        ) as schema_file, tempfile.NamedTemporaryFile(
-            mode='w',
-            suffix='.json',
-            dir=tmp_dir,
-            delete=False
-        ) as metaschema_file:
-            json.dump(schema, schema_file)
-            schema_file.flush()
-            json.dump(metaschema, metaschema_file)
-            metaschema_file.flush()
-            schema_path = schema_file.name
-            metaschema_path = metaschema_file.name
-
-        cmd = [
-            "check-jsonschema",
-            "--schemafile", metaschema_path,
-            schema_path
-        ]
-        if verbose:
-            cmd.insert(1, "--verbose")
-
-        logger.debug(f"Running command: {' '.join(cmd)}")
-        completed_process = subprocess.run(cmd, capture_output=True, text=True)
-
-        if completed_process.returncode != 0:
-            logger.error(
-                f"check-jsonschema failed with exit code {completed_process.returncode}"
-            )
-            if completed_process.stdout:
-                logger.error(f"STDOUT: {completed_process.stdout}")
-            if completed_process.stderr:
-                logger.error(f"STDERR: {completed_process.stderr}")
-            raise RuntimeError(
-                f"check-jsonschema validation failed for schema '{schema.get('id', '<no id>')}'. "
-                f"See logs for details."
-            )
-        else:
-            logger.info(
-                f"Schema '{schema.get('id', '<no id>')}' successfully validated against metaschema."
-            )
+        # Each call writes into its own private temporary directory, removed
+        # afterwards. A shared directory - this used to be .cache under the
+        # working directory - left files behind and tied the function to
+        # whatever the process's working directory happened to be.
+        with tempfile.TemporaryDirectory(prefix="gen3schemadev-metaschema-") as tmp_dir:
+            cmd = _write_check_files(tmp_dir, schema, metaschema, verbose)
+            logger.debug("Running command: %s", ' '.join(cmd))
+            completed_process = subprocess.run(cmd, capture_output=True, text=True)
+
+        _raise_for_check_result(
+            schema, completed_process.returncode, completed_process.stdout, completed_process.stderr
+        )
     except FileNotFoundError as e:
         logger.error(
             "The 'check-jsonschema' tool was not found. Please ensure it is installed and in your PATH."
@@ -1,14 +1,169 @@
 # validates gen3 bundled jsonschema (.json) by testing gen3 specific business rules
+import importlib
+import importlib.util
 import logging
+import os
+import sys
+import time
+from importlib.metadata import entry_points
+
+from gen3schemadev import tracing
 from gen3schemadev.converter import link_suffix
 from gen3schemadev.refs import has_ref
 
 logger = logging.getLogger(__name__)
 
+# Entry point group through which an installed package contributes rules.
+RULES_ENTRY_POINT_GROUP = "gen3schemadev.rules"
+
+# Schemas the rule checks skip unless --no-exclude is given.
+EXCLUDED_SCHEMAS = (
+    '_definitions',
+    '_settings',
+    '_terms',
+    'core_metadata_collection',
+)
+
+# Rules added with register_rule, by name. Filled by importing a rules module
+# (--rules-module) or an installed plugin (see load_plugin_rules).
+_CUSTOM_RULES = {}
+
+
+class RuleSelectionError(ValueError):
+    """Raised when a rule is enabled, disabled or registered under a name that cannot be used."""
+
+
+def register_rule(name=None):
+    """
+    Register a custom rule, for use as a decorator in a rules module.
+
+    An organisation's own conventions - naming schemes, mandatory ``term``
+    references - are rules like any other, and should not need a fork to run.
+    A rule is a function taking one node schema. It reports a violation by
+    raising ``ValueError`` with a message naming the node and what to change,
+    exactly as the built-in rules do::
+
+        from gen3schemadev.validators.rule_validator import register_rule
+
+        @register_rule()
+        def snake_case_ids(schema):
+            if schema.get("id", "") != schema.get("id", "").lower():
+                raise ValueError(f"Node id '{schema['id']}' must be snake_case.")
+
+    Args:
+        name: The rule's name in reports and in --enable/--disable.
+            Defaults to the function's name.
+
+    Raises:
+        RuleSelectionError: If the name is already taken by a built-in rule or
+            by a different custom rule.
+    """
+    def decorator(func):
+        rule_name = name or func.__name__
+        if rule_name in RuleValidator._RULES:
+            raise RuleSelectionError(f"Custom rule '{rule_name}' has the name of a built-in rule.")
+        existing = _CUSTOM_RULES.get(rule_name)
+        # The same function registering again - its module loaded a second
+        # time - replaces itself; anything else is a genuine clash.
+        if existing is not None and _qualified_name(existing) != _qualified_name(func):
+            raise RuleSelectionError(f"Two custom rules are both named '{rule_name}'.")
+        _CUSTOM_RULES[rule_name] = func
+        return func
+    return decorator
+
+
+def _qualified_name(func):
+    return (getattr(func, "__module__", None), getattr(func, "__qualname__", repr(func)))
+
+
+def load_rules_module(spec: str):
+    """
+    Import a module of custom rules, registering every rule it decorates.
+
+    Args:
+        spec: A dotted module name on the import path, or the path of a
+            ``.py`` file.
+
+    Returns:
+        The imported module.
+    """
+    if spec.endswith(".py") or os.path.sep in spec:
+        module_name = f"gen3schemadev_rules_{os.path.splitext(os.path.basename(spec))[0]}"
+        module_spec = importlib.util.spec_from_file_location(module_name, spec)
+        if module_spec is None:
+            raise ImportError(f"Cannot load rules from {spec}")
+        module = importlib.util.module_from_spec(module_spec)
+        sys.modules[module_name] = module
+        module_spec.loader.exec_module(module)
+        return module
+    return importlib.import_module(spec)
+
+
+def load_plugin_rules() -> list:
+    """
+    Load rules contributed by installed packages through entry points.
+
+    A package declares them under the ``gen3schemadev.rules`` group. An entry
+    point may name a rule function, which is registered under the entry
+    point's name, or a module, whose ``register_rule`` decorators run on import.
+
+    Returns:
+        The names of the entry points loaded.
+    """
+    loaded = []
+    for entry_point in entry_points(group=RULES_ENTRY_POINT_GROUP):
+        target = entry_point.load()
+        if callable(target):
+            register_rule(entry_point.name)(target)
+        loaded.append(entry_point.name)
+    return loaded
+
+
+def available_rules() -> tuple:
+    """Return every rule name: the built-in rules, then custom rules in registration order."""
+    return RuleValidator._RULES + tuple(_CUSTOM_RULES)
+
+
+def select_rules(enable=None, disable=None) -> tuple:
+    """
+    Choose which rules run.
+
+    Args:
+        enable: Rule names to run. Every available rule when None.
+        disable: Rule names to skip.
+
+    Returns:
+        The selected rule names, in :func:`available_rules` order.
+
+    Raises:
+        RuleSelectionError: If a name matches no available rule. A typo in
+            --disable would otherwise leave the rule running unnoticed.
+    """
+    available = available_rules()
+    unknown = sorted({*(enable or ()), *(disable or ())} - set(available))
+    if unknown:
+        raise RuleSelectionError(
+            f"Unknown rule{'s' if len(unknown) != 1 else ''}: {', '.join(unknown)}. "
+            f"Available rules: {', '.join(available)}"
+        )
+    chosen = set(enable) if enable is not None else set(available)
+    chosen -= set(disable or ())
+    return tuple(rule for rule in available if rule in chosen)
+
 
 class RuleValidator:
-    def __init__(self, schema: dict):
+    def __init__(self, schema: dict, rules=None, timings=None):
+        """
+        Args:
+            schema: The node schema to check.
+            rules: Rule names to run, from :func:`select_rules`. Every built-in
+                and registered custom rule when None.
+            timings: Optional dict, updated with the seconds each rule took.
+                Pass the same dict for every schema to total across a bundle.
+        """
         self.schema = schema
+        self.rules = tuple(rules) if rules is not None else available_rules()
+        self.timings = timings
 
     _RULES = (
         "data_file_link_core_metadata",
@@ -36,9 +191,14 @@ class RuleValidator:
         """
         schema_id = self.schema.get("id", "<unknown id>")
         violations = []
-        for rule in self._RULES:
+        for rule in self.rules:
+            start = time.perf_counter()
             try:
-                getattr(self, rule)()
+                with tracing.span(rule, 'rule', schema=schema_id):
+                    if rule in _CUSTOM_RULES:
+                        _CUSTOM_RULES[rule](self.schema)
+                    else:
+                        getattr(self, rule)()
             except Exception as exc:
                 # Two of the older rules re-wrap their own ValueError in a
                 # RuntimeError. That wrapper adds a layer the reader has to
@@ -49,6 +209,9 @@ class RuleValidator:
                     "rule": rule,
                     "message": str(cause),
                 })
+            finally:
+                if self.timings is not None:
+                    self.timings[rule] = self.timings.get(rule, 0.0) + time.perf_counter() - start
         return violations
 
     def _get_links(self):
@@ -78,12 +241,12 @@ class RuleValidator:
             return found
 
         links = flatten(self.schema.get("links", []))
-        logger.debug(f"Fetched links: {links}")
+        logger.debug("Fetched links: %s", links)
         return links
 
     def _get_props(self):
         props = self.schema.get("properties", [])
-        logger.debug(f"Fetched properties: {props}")
+        logger.debug("Fetched properties: %s", props)
         return props
 
     def data_file_link_core_metadata(self):
@@ -94,21 +257,19 @@ class RuleValidator:
         """
         try:
             category = self.schema.get("category")
-            logger.debug(
-                f"Checking if schema category is 'data_file'. Found: {category}"
-            )
+            logger.debug("Checking if schema category is 'data_file'. Found: %s", category)
             schema_id = self.schema.get("id", "<unknown id>")
             if category == "data_file":
                 links = self._get_links()
-                logger.debug(f"Got links for data_file: {links}")
+                logger.debug("Got links for data_file: %s", links)
                 for link in links:
                     if link.get("name") == link_suffix("core_metadata_collection"):
                         logger.debug(
-                            f"Found core_metadata_collection link for data_file node (id: {schema_id})."
+                            "Found core_metadata_collection link for data_file node (id: %s).", schema_id
                         )
                         return True
                 logger.warning(
-                    f"No core_metadata_collection link found for data_file node (id: {schema_id})."
+                    "No core_metadata_collection link found for data_file node (id: %s).", schema_id
                 )
                 raise ValueError(
                     f"Schema '{schema_id}' with category 'data_file' must include a link with "
@@ -136,27 +297,25 @@ class RuleValidator:
             schema_id = self.schema.get("id", "<unknown id>")
             for link in links:
                 link_name_list.append(link.get("name"))
-            logger.debug(f"Collected link names for schema '{schema_id}': {link_name_list}")
+            logger.debug("Collected link names for schema '%s': %s", schema_id, link_name_list)
 
             props = self._get_props()
             prop_keys = list(props.keys())
-            logger.debug(f"Collected property keys for schema '{schema_id}': {prop_keys}")
+            logger.debug("Collected property keys for schema '%s': %s", schema_id, prop_keys)
             # Report every missing link at once. Naming one at a time meant a
             # node with three missing link properties took three runs to fix.
             missing = [name for name in link_name_list if name not in prop_keys]
             if missing:
                 named = ", ".join(f"'{name}'" for name in missing)
                 logger.error(
-                    f"Properties for links {named} do not exist in properties of schema '{schema_id}'."
+                    "Properties for links %s do not exist in properties of schema '%s'.", named, schema_id
                 )
                 raise ValueError(
                     f"In schema '{schema_id}', property for link {named} "
                     f"is missing from the 'properties' section. "
                     f"Please add a property named {named} to resolve this."
                 )
-            logger.debug(
-                f"All link names have corresponding properties for schema '{schema_id}'."
-            )
+            logger.debug("All link names have corresponding properties for schema '%s'.", schema_id)
             return True
         except Exception as ex:
             schema_id = self.schema.get("id", "<unknown id>")
@@ -175,31 +334,26 @@ class RuleValidator:
         for key, value in props.items():
             # Skip schema-level $ref
             if key == "$ref":
-                logger.debug(
-                    f"Skipping property '{key}' because it is a schema reference."
-                )
+                logger.debug("Skipping property '%s' because it is a schema reference.", key)
                 continue
 
             # Require property definition to be a dict
             if not isinstance(value, dict):
-                logger.debug(
-                    f"Skipping property '{key}' because it is not a dictionary."
-                )
+                logger.debug("Skipping property '%s' because it is not a dictionary.", key)
                 continue
 
             # Skip if property definition contains a $ref (i.e., is an alias/reference),
             # either top-level or wrapped in allOf/anyOf/oneOf
             if has_ref(value):
                 logger.debug(
-                    f"Skipping property '{key}' because it contains a '$ref' "
-                    "(top-level or inside allOf/anyOf/oneOf)."
+                    "Skipping property '%s' because it contains a '$ref' (top-level or inside allOf/anyOf/oneOf).", key
                 )
                 continue
 
             # Require at least 'type' or 'enum' to be present
             if "type" not in value and "enum" not in value:
                 logger.error(
-                    f"Property '{key}' in schema '{schema_id}' is missing a 'type' or 'enum' field."
+                    "Property '%s' in schema '%s' is missing a 'type' or 'enum' field.", key, schema_id
                 )
                 raise ValueError(
                     f"Property '{key}' must have a value for 'type' or 'enum' in schema '{schema_id}'."
@@ -54,6 +54,19 @@ links:
 """
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory, monkeypatch):
+    """
+    Point gen3schemadev's on-disk cache at a fresh directory for every test.
+
+    Without this the suite would read and write the developer's real cache, so a
+    test could pass only because an earlier run had left an entry behind.
+    """
+    path = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("GEN3SCHEMADEV_CACHE_DIR", str(path))
+    return str(path)
+
+
 @pytest.fixture
 def input_file(tmp_path):
     """Write the minimal input dictionary and return its path."""
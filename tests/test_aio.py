@@ -0,0 +1,189 @@
+"""
+Tests for `gen3schemadev.aio`, the asyncio counterparts of the library API.
+
+Background: the dictionary-review service runs on an event loop. The blocking
+API stalled every other request while one large dictionary was validated, and
+the metaschema check blocked on a subprocess per node. These tests check the
+async functions give the same answers, leave the loop free, stream results
+and clean up after cancellation.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+import yaml
+
+from conftest import MINIMAL_INPUT
+from gen3schemadev import aio, api
+from gen3schemadev.utils import bundle_yamls, read_json
+
+OFFICIAL_DICTIONARY = os.path.join(
+    os.path.dirname(__file__), "gen3_schema/examples/json", "gen3_develop_schema.json"
+)
+EXAMPLE_INPUT = os.path.join(os.path.dirname(__file__), "input_example.yml")
+
+
+def fake_checks(monkeypatch, commands):
+    """
+    Replace the check-jsonschema command with ``commands[schema id]``.
+
+    The schema files are still written, so temporary-file clean-up is
+    exercised; only the program run changes. Returns the list the started
+    processes are appended to.
+    """
+    write = aio._write_check_files
+    started = []
+
+    def write_check_files(tmp_dir, schema, metaschema, verbose=False):
+        write(tmp_dir, schema, metaschema, verbose)
+        started.append(tmp_dir)
+        return commands[schema["id"]]
+
+    monkeypatch.setattr(aio, "_write_check_files", write_check_files)
+    return started
+
+
+def python_command(code):
+    return [sys.executable, "-c", code]
+
+
+def test_results_match_the_blocking_api():
+    """
+    Input: the minimal and the example input models, generated and validated
+    through both APIs.
+
+    Expected: identical files, resolutions and reports, with the metaschema
+    check run for the minimal model.
+
+    Why it matters: the async API is a different schedule for the same work;
+    any difference in answers would be a bug in one of them.
+    """
+    with open(EXAMPLE_INPUT) as handle:
+        inputs = [yaml.safe_load(MINIMAL_INPUT), yaml.safe_load(handle)]
+
+    for index, input_data in enumerate(inputs):
+        files = asyncio.run(aio.generate(input_data))
+        assert files == api.generate(input_data)
+        bundled = aio.bundle(files)
+        assert asyncio.run(aio.resolve(bundled)) == api.resolve(bundled)
+        metaschema = index == 0
+        report = asyncio.run(aio.validate(bundled, metaschema=metaschema))
+        assert report == api.validate(bundled, metaschema=metaschema)
+        assert report["valid"], report
+
+
+def test_loop_stays_responsive_during_validation():
+    """
+    Input: the official Gen3 dictionary validated while a second coroutine
+    ticks every 10 ms.
+
+    Expected: the ticker keeps running throughout validation.
+
+    Why it matters: a blocked loop means every other request on the service
+    waits for the slowest validation.
+    """
+    bundled = read_json(OFFICIAL_DICTIONARY)
+
+    async def main():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick_task = asyncio.create_task(ticker())
+        report = await aio.validate(bundled, metaschema=False)
+        done.set()
+        await tick_task
+        return report, ticks
+
+    report, ticks = asyncio.run(main())
+
+    assert report["resolved"]
+    assert ticks > 0
+
+
+def test_metaschema_results_stream_in_completion_order(monkeypatch):
+    """
+    Input: two nodes whose checks take 0.5 s and no time, listed slow first,
+    checked two at a time.
+
+    Expected: the quick node's result is yielded first, and the slow node's
+    failure carries the tool's output.
+
+    Why it matters: a service streaming progress should not sit on finished
+    results behind one slow node.
+    """
+    resolved = {"slow.yaml": {"id": "slow"}, "fast.yaml": {"id": "fast"}}
+    fake_checks(monkeypatch, {
+        "slow": python_command("import time; time.sleep(0.5); print('slow failed'); raise SystemExit(1)"),
+        "fast": python_command("pass"),
+    })
+
+    async def collect():
+        return [result async for result in aio.iter_metaschema_checks(resolved, metaschema={}, concurrency=2)]
+
+    results = asyncio.run(collect())
+
+    assert [name for name, _ in results] == ["fast.yaml", "slow.yaml"]
+    assert results[0][1] is None
+    assert results[1][1].endswith("slow failed")
+
+
+def test_cancellation_kills_running_checks(monkeypatch):
+    """
+    Input: a metaschema check whose tool would run for 60 seconds, cancelled
+    as soon as it starts.
+
+    Expected: cancellation returns promptly, the process is killed and the
+    check's temporary directory is removed.
+
+    Why it matters: a client that disconnects must not leave processes and
+    files behind on the server.
+    """
+    started = fake_checks(monkeypatch, {"node": python_command("import time; time.sleep(60)")})
+    processes = []
+    create = asyncio.create_subprocess_exec
+
+    async def tracking_create(*args, **kwargs):
+        process = await create(*args, **kwargs)
+        processes.append(process)
+        return process
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", tracking_create)
+
+    async def main():
+        task = asyncio.create_task(aio.check_metaschema({"id": "node"}, {}))
+        while not processes:
+            await asyncio.sleep(0.01)
+        began = time.monotonic()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return time.monotonic() - began
+
+    elapsed = asyncio.run(main())
+
+    assert elapsed < 5
+    assert processes[0].returncode is not None
+    assert not os.path.exists(started[0])
+
+
+def test_bundle_directory_matches_bundle_yamls(generated):
+    """
+    Input: a generated dictionary directory.
+
+    Expected: the async bundle equals bundle_yamls, key order included.
+
+    Why it matters: bundles are compared and hashed downstream; a different
+    key order would look like a change.
+    """
+    bundled = asyncio.run(aio.bundle_directory(generated))
+
+    assert list(bundled.items()) == list(bundle_yamls(generated).items())
@@ -0,0 +1,190 @@
+"""
+Tests for `gen3schemadev.api`, the dict-in, dict-out library API.
+
+Background: the API is called from a multi-threaded web service. The command
+line's side effects - changing directory, writing temporary files next to the
+working directory, configuring logging - are harmless in a one-shot process
+but corrupt each other's work when several requests run at once. These tests
+run the API concurrently and check every result against a serial run.
+"""
+
+import copy
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+import yaml
+
+from conftest import MINIMAL_INPUT
+from gen3schemadev import api
+from gen3schemadev.schema.input_schema import DataModel
+from gen3schemadev.validators import metaschema_validator
+
+EXAMPLE_INPUT = os.path.join(os.path.dirname(__file__), "input_example.yml")
+
+
+def load_inputs():
+    with open(EXAMPLE_INPUT) as handle:
+        return [yaml.safe_load(MINIMAL_INPUT), yaml.safe_load(handle)]
+
+
+def pipeline(input_data, metaschema=False):
+    files = api.generate(input_data)
+    bundled = api.bundle(files)
+    return {
+        "files": files,
+        "bundle": bundled,
+        "resolved": api.resolve(bundled),
+        "report": api.validate(bundled, metaschema=metaschema),
+    }
+
+
+def test_pipeline_round_trip():
+    """
+    Input: the minimal input model.
+
+    Expected: generate returns node and framework files, bundle returns them
+    sorted, and validate reports a valid dictionary with its resolved nodes.
+
+    Why it matters: this is the whole of what a service calls.
+    """
+    result = pipeline(load_inputs()[0], metaschema=True)
+
+    assert {"subject.yaml", "biospecimen.yaml", "_definitions.yaml"} <= set(result["files"])
+    assert list(result["bundle"]) == sorted(result["bundle"])
+    report = result["report"]
+    assert report["valid"], report
+    assert report["resolved"] == result["resolved"]
+    assert report["metaschema_errors"] == {}
+
+
+def test_generated_dictionaries_share_nothing_with_the_input_or_each_other():
+    """
+    Input: one validated model with custom definitions, generated twice, and
+    the first result mutated throughout.
+
+    Expected: the second result and the model's definitions are unchanged.
+
+    Why it matters: generate promises that no two calls share mutable state;
+    a caller post-processing one dictionary must not alter the next.
+    """
+    data = yaml.safe_load(MINIMAL_INPUT)
+    data["definitions"] = {
+        "custom_enum": {"description": "A custom vocabulary.", "enum": ["a", "b"]},
+        "ubiquitous_properties": {"state": {"default": "validated"}},
+    }
+    model = DataModel.model_validate(data)
+    definitions_before = copy.deepcopy(model.definitions)
+
+    first = api.generate(model)
+    second_before = copy.deepcopy(api.generate(model))
+    second = api.generate(model)
+
+    def mutate(value):
+        if isinstance(value, dict):
+            for item in list(value.values()):
+                mutate(item)
+            value["mutated"] = True
+        elif isinstance(value, list):
+            for item in value:
+                mutate(item)
+            value.append("mutated")
+
+    mutate(first)
+
+    assert second == second_before
+    assert model.definitions == definitions_before
+
+
+def test_validate_reports_every_stage_without_exiting():
+    """
+    Input: a bundle with a rule violation and a dangling reference.
+
+    Expected: both are reported in one result, and valid is False; nothing
+    is printed or raised.
+
+    Why it matters: a service has to return the problems, not have its
+    process exit.
+    """
+    bundled = api.bundle(api.generate(load_inputs()[0]))
+    bundled["subject.yaml"]["properties"]["untyped"] = {"description": "No type given."}
+    bundled["biospecimen.yaml"]["properties"]["sample_type"] = {"$ref": "_definitions.yaml#/missing"}
+
+    report = api.validate(bundled, metaschema=False)
+
+    assert not report["valid"]
+    assert [v["rule"] for v in report["rule_violations"]] == ["props_must_have_type"]
+    assert "missing" in report["resolution_error"]
+    assert report["resolved"] is None
+
+
+def test_concurrent_calls_match_serial_runs(tmp_path, monkeypatch):
+    """
+    Input: the full pipeline on two different inputs, 24 times each, across
+    eight threads, from a working directory the test watches.
+
+    Expected: every result equals the serial result for its input, inputs are
+    not modified, the working directory is unchanged, nothing is written to
+    it, and logging is left unconfigured.
+
+    Why it matters: shared state between calls shows up as one request's
+    dictionary leaking into another's, which a serial test never sees.
+    """
+    monkeypatch.chdir(tmp_path)
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    inputs = load_inputs()
+    expected = [pipeline(input_data) for input_data in inputs]
+    pristine = copy.deepcopy(inputs)
+
+    jobs = [index % len(inputs) for index in range(48)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda index: pipeline(inputs[index]), jobs))
+
+    for index, result in zip(jobs, results):
+        assert result == expected[index]
+    assert inputs == pristine
+    assert os.getcwd() == str(tmp_path)
+    assert os.listdir(tmp_path) == []
+    assert root.handlers == handlers
+
+
+def test_concurrent_metaschema_checks_use_private_files(tmp_path, monkeypatch):
+    """
+    Input: 40 different schemas checked against the metaschema from eight
+    threads at once, with check-jsonschema replaced by a double that reports
+    the id of the schema file it was given.
+
+    Expected: each call sees its own schema, and no files are left behind in
+    the working directory or anywhere else.
+
+    Why it matters: the temporary files used to live in one shared directory
+    under the working directory, and were never removed.
+    """
+    monkeypatch.chdir(tmp_path)
+    seen_paths = []
+
+    def fake_check(cmd, **kwargs):
+        schema_path = cmd[-1]
+        seen_paths.append(schema_path)
+        with open(schema_path) as handle:
+            schema_id = json.load(handle)["id"]
+        return MagicMock(returncode=1, stdout=f"checked {schema_id}", stderr="")
+
+    def check(index):
+        with pytest.raises(RuntimeError) as info:
+            metaschema_validator.validate_schema_with_metaschema({"id": f"node_{index}"}, {"type": "object"})
+        return str(info.value)
+
+    with patch.object(metaschema_validator.subprocess, "run", side_effect=fake_check):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            messages = list(pool.map(check, range(40)))
+
+    for index, message in enumerate(messages):
+        assert message.endswith(f"checked node_{index}")
+    assert len(set(seen_paths)) == 40
+    assert not any(os.path.exists(path) for path in seen_paths)
+    assert os.listdir(tmp_path) == []
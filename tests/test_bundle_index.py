@@ -0,0 +1,161 @@
+"""
+Tests for the bundle index and `BundleReader`.
+
+Background: read_json parses the whole bundle even when a command needs one
+node of it. An index of where each entry lies lets a memory-mapped reader
+parse only the requested nodes and the definitions they reference.
+"""
+
+import json
+import os
+
+import pytest
+
+from gen3schemadev.bundle_index import BundleIndexError, BundleReader, build_index, index_path, write_index
+from gen3schemadev.refs import definition_closure
+from gen3schemadev.templates import render_templates
+from gen3schemadev.utils import read_json, resolve_bundle
+
+OFFICIAL_DICTIONARY = os.path.join(
+    os.path.dirname(__file__), "gen3_schema/examples/json", "gen3_develop_schema.json"
+)
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+def test_sub_bundle_matches_the_definition_closure(tmp_path, indexed):
+    """
+    Input: single nodes of the official dictionary read through a
+    BundleReader, with and without an index beside the bundle.
+
+    Expected: each sub-bundle equals the definition closure of the fully
+    parsed bundle, and the names are in bundle order.
+
+    Why it matters: a node read lazily must resolve exactly as it does from
+    the whole bundle.
+    """
+    path = str(tmp_path / "schema.json")
+    with open(OFFICIAL_DICTIONARY) as source, open(path, "w") as target:
+        target.write(source.read())
+    if indexed:
+        write_index(build_index(path), index_path(path))
+    bundle = read_json(path)
+
+    with BundleReader(path) as reader:
+        assert reader.names() == list(bundle)
+        for name in ("case.yaml", "aligned_reads_index.yaml", "program.yaml"):
+            assert reader.sub_bundle([name]) == definition_closure(bundle, [name])
+
+
+def test_non_ascii_bundles_are_indexed_by_byte(tmp_path):
+    """
+    Input: a bundle with multi-byte characters before and inside entries,
+    written without escaping them.
+
+    Expected: every entry reads back equal to the parsed bundle.
+
+    Why it matters: the index holds byte offsets into the mapped file; counting
+    characters instead would cut entries after the first accented letter.
+    """
+    bundle = {
+        "_definitions.yaml": {"note": {"description": "Daten über Proben"}, "ids": {"type": "string"}},
+        "sample.yaml": {"id": "sample", "title": "Échantillon 🧪", "p": {"$ref": "_definitions.yaml#/ids"}},
+    }
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps(bundle, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    with BundleReader(str(path)) as reader:
+        assert {name: reader[name] for name in reader.names()} == bundle
+        assert reader.sub_bundle(["sample.yaml"])["_definitions.yaml"] == {"ids": {"type": "string"}}
+
+
+def test_a_rewritten_bundle_is_not_misread(tmp_path):
+    """
+    Input: an index written for one bundle, beside a different bundle of the
+    same size.
+
+    Expected: reading an entry whose range moved raises BundleIndexError.
+
+    Why it matters: the index is trusted on size alone to stay cheap; the
+    key check on every read is what stops it returning the wrong entry.
+    """
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps({"aaa.yaml": {"id": "a"}, "bb.yaml": {"id": "bb"}}))
+    write_index(build_index(str(path)), index_path(str(path)))
+    path.write_text(json.dumps({"aa.yaml": {"id": "aa"}, "bbb.yaml": {"id": "b"}}))
+
+    with BundleReader(str(path)) as reader:
+        with pytest.raises(BundleIndexError):
+            reader.get("bb.yaml")
+
+
+def test_templates_only_reads_the_named_nodes(run_cli, generated, tmp_path):
+    """
+    Input: bundle --index on a generated dictionary, then templates --only
+    subject.
+
+    Expected: the index is written beside the bundle, only subject's
+    templates are written, and they match those rendered from the whole
+    resolved bundle.
+
+    Why it matters: one node's template should cost one node's parsing and
+    resolution, and be exactly what a full run writes.
+    """
+    path = str(tmp_path / "schema.json")
+    assert run_cli("bundle", "-i", generated, "-f", path, "--index")[0] == 0
+    assert os.path.exists(tmp_path / "schema.index.json")
+    out = tmp_path / "templates"
+
+    code, output = run_cli("templates", "--schema", path, "-o", str(out), "--only", "subject")
+
+    assert code == 0, output
+    assert sorted(os.listdir(out)) == ["subject.hints.tsv", "subject.tsv"]
+    expected = render_templates(resolve_bundle(read_json(path)))
+    assert (out / "subject.tsv").read_text() == expected["subject.tsv"]
+
+
+def test_templates_only_rejects_unknown_nodes(run_cli, generated, tmp_path):
+    """
+    Input: templates --only naming a node the bundle does not have.
+
+    Expected: exit code 1, the unknown name in the message, nothing written.
+
+    Why it matters: a typo should not produce an empty output directory and
+    a zero exit.
+    """
+    path = str(tmp_path / "schema.json")
+    assert run_cli("bundle", "-i", generated, "-f", path)[0] == 0
+    out = tmp_path / "templates"
+
+    code, output = run_cli("templates", "--schema", path, "-o", str(out), "--only", "subjekt")
+
+    assert code == 1
+    assert "subjekt" in output
+    assert not out.exists()
+
+
+def test_templates_only_says_when_an_index_is_not_used(run_cli, generated, tmp_path):
+    """
+    Input: bundle --index, then the bundle rewritten with an extra entry so
+    its size no longer matches, then templates --only subject.
+
+    Expected: the templates are written, and the output names the index and
+    why it was ignored.
+
+    Why it matters: the CLI shows only errors unless --debug is given, so a
+    logged warning left users believing the index they shipped still spared
+    them reading the whole bundle.
+    """
+    path = str(tmp_path / "schema.json")
+    assert run_cli("bundle", "-i", generated, "-f", path, "--index")[0] == 0
+    bundle = read_json(path)
+    bundle["extra.yaml"] = {"id": "extra"}
+    with open(path, "w") as handle:
+        json.dump(bundle, handle)
+
+    code, output = run_cli("templates", "--schema", path, "-o", str(tmp_path / "templates"), "--only", "subject")
+
+    assert code == 0, output
+    assert (
+        f"WARNING: ignoring the bundle index {index_path(path)}: "
+        "it indexes a different version of the bundle."
+    ) in output
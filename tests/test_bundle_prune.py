@@ -0,0 +1,87 @@
+"""
+Tests for `bundle --prune` and `gen3schemadev.refs.prune_bundle`.
+
+Background: the packaged _definitions.yaml and _terms.yaml carry many entries
+a given dictionary never references, and every bundle shipped them and every
+resolution resolved them. Pruning keeps only the entries reachable from the
+nodes through $refs.
+"""
+
+import json
+import os
+
+from gen3schemadev.refs import prune_bundle
+from gen3schemadev.utils import read_json, resolve_bundle
+
+OFFICIAL_DICTIONARY = os.path.join(
+    os.path.dirname(__file__), "gen3_schema/examples/json", "gen3_develop_schema.json"
+)
+
+
+def test_pruned_bundle_resolves_like_the_whole_one():
+    """
+    Input: the official Gen3 dictionary, pruned.
+
+    Expected: every node resolves exactly as before, entries were removed
+    from both reference files, and the removed keys are the ones missing.
+
+    Why it matters: pruning is only safe if no node can tell the difference.
+    """
+    bundle = read_json(OFFICIAL_DICTIONARY)
+
+    pruned, removed = prune_bundle(bundle)
+
+    assert resolve_bundle(pruned) == resolve_bundle(bundle)
+    assert removed["_definitions.yaml"] and removed["_terms.yaml"]
+    for name, keys in removed.items():
+        assert set(pruned[name]) == set(bundle[name]) - set(keys)
+    assert [name for name in pruned] == [name for name in bundle]
+
+
+def test_entries_used_only_by_other_entries_are_kept():
+    """
+    Input: a node referencing one definition, which references a second by
+    a bare '#/' ref, and a third definition nothing references.
+
+    Expected: the first two are kept and only the third is removed.
+
+    Why it matters: a definition reached only through another definition is
+    still needed to resolve the node.
+    """
+    bundle = {
+        "_definitions.yaml": {
+            "wrapper": {"$ref": "#/inner"},
+            "inner": {"type": "string"},
+            "unused": {"type": "integer"},
+        },
+        "_terms.yaml": {"note": {"description": "Unused."}},
+        "node.yaml": {"id": "node", "properties": {"p": {"$ref": "_definitions.yaml#/wrapper"}}},
+    }
+
+    pruned, removed = prune_bundle(bundle)
+
+    assert pruned["_definitions.yaml"] == {"wrapper": {"$ref": "#/inner"}, "inner": {"type": "string"}}
+    assert removed == {"_definitions.yaml": ["unused"], "_terms.yaml": ["note"]}
+
+
+def test_bundle_prune_writes_a_smaller_valid_bundle(run_cli, generated, tmp_path):
+    """
+    Input: bundle --prune on a generated dictionary, then validate -b.
+
+    Expected: the report names what was removed, the bundle is smaller than
+    an unpruned one, and it validates.
+
+    Why it matters: the pruned bundle is what gets deployed; it must still
+    pass every check the full one does.
+    """
+    full, pruned = str(tmp_path / "full.json"), str(tmp_path / "pruned.json")
+    assert run_cli("bundle", "-i", generated, "-f", full)[0] == 0
+
+    code, output = run_cli("bundle", "-i", generated, "-f", pruned, "--prune")
+
+    assert code == 0, output
+    assert "entries of _terms.yaml that nothing references" in output
+    assert os.path.getsize(pruned) < os.path.getsize(full)
+    assert set(json.loads(open(pruned).read())) == set(json.loads(open(full).read()))
+    code, output = run_cli("validate", "-b", pruned)
+    assert code == 0, output
@@ -0,0 +1,147 @@
+"""
+Tests for the `build` command.
+
+Background: CI ran `generate`, then `bundle`, then `validate -b` - three
+interpreter start-ups, with the dictionary written as YAML, read back, dumped as
+JSON, read back again and, until recently, written once more to a temporary file
+for the resolver. `build` does all three in one process, handing the dictionary
+from stage to stage in memory, and writes each artefact once at the end.
+"""
+
+import json
+
+import gen3schemadev.cli as cli
+import gen3schemadev.generation as generation
+from gen3schemadev.utils import bundle_yamls
+
+
+def test_build_writes_what_generate_then_bundle_writes(run_cli, input_file, tmp_path, snapshot):
+    """
+    Input: the minimal input, built once with `build` and once with
+    `generate` followed by `bundle`.
+
+    Expected: identical YAML directories and byte-identical bundles.
+
+    Why it matters: build is a faster route to the same artefacts. If its
+    bundle differed by a single byte, the committed bundle would churn depending
+    on which route a contributor happened to take.
+    """
+    code, out = run_cli(
+        "build", "-i", input_file, "-o", str(tmp_path / "built"),
+        "--bundle", str(tmp_path / "built.json"),
+    )
+    assert code == 0, out
+
+    assert run_cli("generate", "-i", input_file, "-o", str(tmp_path / "generated"))[0] == 0
+    assert run_cli(
+        "bundle", "-i", str(tmp_path / "generated"), "-f", str(tmp_path / "bundled.json")
+    )[0] == 0
+
+    assert snapshot(str(tmp_path / "built")) == snapshot(str(tmp_path / "generated"))
+    assert (tmp_path / "built.json").read_bytes() == (tmp_path / "bundled.json").read_bytes()
+
+
+def test_build_writes_each_file_once_and_only_at_the_end(run_cli, input_file, tmp_path, monkeypatch):
+    """
+    Input: a build with every YAML write recorded.
+
+    Expected: each dictionary file is written exactly once, and none is read
+    back from disk.
+
+    Why it matters: avoiding the write-then-read round trips is the point of
+    the command. A regression that reintroduced one would still pass every
+    output check, so the I/O itself is asserted.
+    """
+    written = []
+    real_write = generation.write_yaml
+
+    def recording_write(content, path):
+        written.append(path)
+        real_write(content, path)
+
+    def no_reads(path):
+        raise AssertionError(f"build read {path} back from disk")
+
+    monkeypatch.setattr(generation, "write_yaml", recording_write)
+    monkeypatch.setattr(generation, "load_yaml", no_reads)
+    monkeypatch.setattr(cli, "bundle_yamls", no_reads)
+
+    code, out = run_cli(
+        "build", "-i", input_file, "-o", str(tmp_path / "out"),
+        "--bundle", str(tmp_path / "out.json"),
+    )
+
+    assert code == 0, out
+    assert len(written) == len(set(written))
+    assert sorted(p.rsplit("/", 1)[-1] for p in written) == sorted(
+        bundle_yamls(str(tmp_path / "out"))
+    )
+
+
+def test_a_failing_build_writes_nothing(run_cli, input_file, tmp_path):
+    """
+    Input: an input whose custom definitions reference a definition that
+    does not exist, so the generated dictionary cannot be resolved.
+
+    Expected: build exits non-zero and neither the directory nor the bundle exists.
+
+    Why it matters: the old three-step pipeline left a generated directory and
+    bundle behind even when validation then failed, so a later step could pick
+    up a dictionary that never passed.
+    """
+    with open(input_file, "a") as handle:
+        handle.write(
+            "definitions:\n"
+            "  broken:\n"
+            "    $ref: \"_definitions.yaml#/does_not_exist\"\n"
+        )
+
+    code, out = run_cli(
+        "build", "-i", input_file, "-o", str(tmp_path / "out"),
+        "--bundle", str(tmp_path / "out.json"),
+    )
+
+    assert code == 1
+    assert "could not be resolved" in out
+    assert not (tmp_path / "out").exists()
+    assert not (tmp_path / "out.json").exists()
+
+
+def test_build_refuses_to_overwrite_without_consent(run_cli, input_file, generated, tmp_path, snapshot):
+    """
+    Input: build into a directory that already holds a generated dictionary.
+
+    Expected: the same refusal generate gives, with nothing changed.
+
+    Why it matters: build writes the same files generate does, so it must be
+    bound by the same never-overwrite-by-default promise.
+    """
+    before = snapshot(generated)
+
+    code, out = run_cli(
+        "build", "-i", input_file, "-o", generated, "--bundle", str(tmp_path / "out.json"),
+    )
+
+    assert code == 1
+    assert "Refusing to overwrite" in out
+    assert snapshot(generated) == before
+    assert not (tmp_path / "out.json").exists()
+
+
+def test_build_can_emit_a_compiled_artefact(run_cli, input_file, tmp_path):
+    """
+    Input: build with --compiled.
+
+    Expected: the artefact's bundle is the bundle build wrote.
+
+    Why it matters: build has already resolved the dictionary to validate it,
+    so the artefact costs nothing extra to produce.
+    """
+    code, out = run_cli(
+        "build", "-i", input_file, "-o", str(tmp_path / "out"),
+        "--bundle", str(tmp_path / "out.json"), "--compiled", str(tmp_path / "out.compiled.json"),
+    )
+
+    assert code == 0, out
+    compiled = json.loads((tmp_path / "out.compiled.json").read_text())
+    assert compiled["bundle"] == json.loads((tmp_path / "out.json").read_text())
@@ -0,0 +1,268 @@
+"""
+Tests for the compiled dictionary artefact.
+
+Background: every command rebuilt its picture of the dictionary from text -
+generate from the input, bundle from the YAML directory, validate by bundling
+again and then resolving. A compiled artefact holds the bundle, the resolved
+node schemas, the reference graph and per-file hashes in one versioned file,
+so a pipeline does the expensive work once and later steps load it. For
+consumers that read the plain bundle, bundle --resolved writes the resolved
+schemas to a sidecar beside it instead.
+"""
+
+import json
+import os
+
+import pytest
+
+import gen3schemadev.cli as cli
+from gen3schemadev.compiled import (
+    COMPILED_VERSION,
+    CompiledArtefactError,
+    compile_bundle,
+    load_bundle,
+    read_compiled,
+    resolved_sidecar,
+    sidecar_path,
+    write_compiled,
+    write_sidecar,
+)
+from gen3schemadev.refs import ref_graph
+from gen3schemadev.utils import bundle_yamls, resolve_bundle, resolve_schema
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_YAMLS = os.path.join(REPO_ROOT, "tests/gen3_schema/examples/yaml")
+
+
+def test_compiled_artefact_round_trips_through_disk(tmp_path):
+    """
+    Input: the example dictionary compiled and written to disk.
+
+    Expected: reading it back gives the same bundle and resolved schemas as
+    bundling and resolving from the YAML directory.
+
+    Why it matters: the artefact is only useful if a later step can trust it
+    to be exactly what it would have computed itself.
+    """
+    bundle = bundle_yamls(EXAMPLE_YAMLS)
+    path = str(tmp_path / "dict.compiled.json")
+    write_compiled(compile_bundle(bundle), path)
+
+    compiled = read_compiled(path)
+
+    assert compiled["version"] == COMPILED_VERSION
+    assert compiled["bundle"] == bundle
+    assert compiled["resolved"] == resolve_schema(schema_dir=EXAMPLE_YAMLS)
+    assert set(compiled["hashes"]) == set(bundle)
+
+
+def test_ref_graph_names_the_file_of_bare_refs():
+    """
+    Input: a definition using a bare '#/...' ref and a node referencing it.
+
+    Expected: both edges are recorded with their file made explicit.
+
+    Why it matters: a bare ref means "in this file". Recording it as bare
+    would make the graph ambiguous the moment it is read without its source.
+    """
+    bundle = {
+        "_definitions.yaml": {
+            "a": {"type": "string"},
+            "b": {"$ref": "#/a"},
+        },
+        "subject.yaml": {"properties": {"x": {"$ref": "_definitions.yaml#/b"}}},
+    }
+
+    graph = ref_graph(bundle)
+
+    assert graph["_definitions.yaml"] == ["_definitions.yaml#/a"]
+    assert graph["subject.yaml"] == ["_definitions.yaml#/b"]
+
+
+def test_an_edited_artefact_is_refused(tmp_path):
+    """
+    Input: a compiled artefact whose bundle was edited after compilation.
+
+    Expected: CompiledArtefactError on load.
+
+    Why it matters: the resolved schemas would still describe the old bundle,
+    so validate would quietly check a dictionary that no longer exists.
+    """
+    path = tmp_path / "dict.compiled.json"
+    write_compiled(compile_bundle(bundle_yamls(EXAMPLE_YAMLS)), str(path))
+    data = json.loads(path.read_text())
+    data["bundle"]["subject.yaml"]["description"] = "edited by hand"
+    path.write_text(json.dumps(data))
+
+    with pytest.raises(CompiledArtefactError):
+        read_compiled(str(path))
+
+
+def test_another_artefact_version_is_refused(tmp_path):
+    """
+    Input: an artefact claiming a different format version.
+
+    Expected: CompiledArtefactError naming the version.
+
+    Why it matters: a layout change must fail loudly, not half-load.
+    """
+    compiled = compile_bundle(bundle_yamls(EXAMPLE_YAMLS))
+    compiled["version"] = COMPILED_VERSION + 1
+    path = str(tmp_path / "future.json")
+    write_compiled(compiled, path)
+
+    with pytest.raises(CompiledArtefactError, match=str(COMPILED_VERSION + 1)):
+        read_compiled(path)
+
+
+def test_load_bundle_accepts_a_plain_bundle(tmp_path):
+    """
+    Input: an ordinary bundle file.
+
+    Expected: load_bundle returns it with no resolved schemas.
+
+    Why it matters: commands that take a bundle keep working on plain bundles;
+    the compiled form is an option, not a requirement.
+    """
+    path = tmp_path / "plain.json"
+    path.write_text(json.dumps({"subject.yaml": {"id": "subject"}}))
+
+    assert load_bundle(str(path)) == ({"subject.yaml": {"id": "subject"}}, None)
+
+
+def test_validate_uses_the_compiled_resolution(run_cli, generated, tmp_path, monkeypatch):
+    """
+    Input: bundle --compiled on a generated dictionary, then validate -b on
+    the artefact.
+
+    Expected: validate succeeds without resolving anything.
+
+    Why it matters: skipping resolution is the whole point of loading the
+    artefact in CI rather than the plain bundle.
+    """
+    bundle_path = str(tmp_path / "schema.json")
+    compiled_path = str(tmp_path / "schema.compiled.json")
+    code, _ = run_cli("bundle", "-i", generated, "-f", bundle_path, "--compiled", compiled_path)
+    assert code == 0
+
+    def no_resolution(*args, **kwargs):
+        raise AssertionError("validate resolved a compiled artefact")
+
+    monkeypatch.setattr(cli, "resolve_bundle_cached", no_resolution)
+    code, out = run_cli("validate", "-b", compiled_path)
+
+    assert code == 0, out
+    assert "compiled artefact" in out
+
+
+def test_generate_writes_a_compiled_artefact(run_cli, input_file, tmp_path):
+    """
+    Input: generate with --compiled.
+
+    Expected: the artefact's bundle equals bundling the generated directory.
+
+    Why it matters: the artefact must describe what bundle would ship, not an
+    approximation of it.
+    """
+    out = str(tmp_path / "dictionary")
+    compiled_path = str(tmp_path / "dict.compiled.json")
+
+    code, _ = run_cli("generate", "-i", input_file, "-o", out, "--compiled", compiled_path)
+
+    assert code == 0
+    compiled = read_compiled(compiled_path)
+    assert compiled["bundle"] == bundle_yamls(out)
+    assert compiled["resolved"] == resolve_bundle(bundle_yamls(out))
+
+
+def test_validate_uses_a_matching_resolved_sidecar(run_cli, generated, tmp_path, monkeypatch):
+    """
+    Input: bundle --resolved on a generated dictionary, then validate -b on
+    the plain bundle.
+
+    Expected: the sidecar sits beside the bundle, holds what resolving the
+    bundle gives, and validate succeeds without resolving anything.
+
+    Why it matters: consumers keep reading the plain bundle unchanged, and
+    validate still skips the resolution the sidecar already did.
+    """
+    bundle_path = str(tmp_path / "schema.json")
+    code, _ = run_cli("bundle", "-i", generated, "-f", bundle_path, "--resolved")
+    assert code == 0
+    sidecar = tmp_path / "schema.resolved.json"
+    assert sidecar_path(bundle_path) == str(sidecar)
+    assert json.loads(sidecar.read_text())["resolved"] == resolve_bundle(bundle_yamls(generated))
+
+    def no_resolution(*args, **kwargs):
+        raise AssertionError("validate resolved a bundle with a matching sidecar")
+
+    monkeypatch.setattr(cli, "resolve_bundle_cached", no_resolution)
+    code, out = run_cli("validate", "-b", bundle_path)
+
+    assert code == 0, out
+    assert f"resolved sidecar: {sidecar}" in out
+
+
+def test_a_stale_sidecar_is_ignored(tmp_path):
+    """
+    Input: a bundle edited after its sidecar was written.
+
+    Expected: load_bundle returns the edited bundle with no resolved schemas.
+
+    Why it matters: a sidecar describing the old bundle would let validate
+    pass a dictionary it never checked.
+    """
+    bundle = {"subject.yaml": {"id": "subject"}}
+    path = str(tmp_path / "schema.json")
+    write_sidecar(resolved_sidecar(bundle, {"subject.yaml": {"id": "subject"}}), sidecar_path(path))
+    bundle["subject.yaml"]["title"] = "Edited"
+    with open(path, "w") as handle:
+        json.dump(bundle, handle)
+
+    assert load_bundle(path) == (bundle, None)
+
+
+def test_a_sidecar_of_a_reordered_bundle_is_stale(tmp_path):
+    """
+    Input: a sidecar written for a bundle, beside the same bundle with its
+    properties in another order.
+
+    Expected: the sidecar is not used.
+
+    Why it matters: the resolved schemas keep the bundle's property order,
+    so the sidecar's would be in the old one.
+    """
+    bundle = {"subject.yaml": {"id": "subject", "properties": {"a": {"type": "string"}, "b": {"type": "string"}}}}
+    path = str(tmp_path / "schema.json")
+    write_sidecar(resolved_sidecar(bundle, {"subject.yaml": bundle["subject.yaml"]}), sidecar_path(path))
+    bundle["subject.yaml"]["properties"] = {"b": {"type": "string"}, "a": {"type": "string"}}
+    with open(path, "w") as handle:
+        json.dump(bundle, handle)
+
+    assert load_bundle(path) == (bundle, None)
+
+
+def test_validate_says_when_a_sidecar_is_not_used(run_cli, generated, tmp_path):
+    """
+    Input: validate -b on a bundle whose sidecar was written for an earlier
+    version of it, with logging at its default level.
+
+    Expected: validation still succeeds, and the output names the sidecar
+    and why it was ignored.
+
+    Why it matters: the CLI shows only errors unless --debug is given, so a
+    logged warning left users believing the sidecar they shipped still
+    skipped resolution.
+    """
+    path = str(tmp_path / "schema.json")
+    assert run_cli("bundle", "-i", generated, "-f", path)[0] == 0
+    write_sidecar(resolved_sidecar({"stale.yaml": {}}, {}), sidecar_path(path))
+
+    code, out = run_cli("validate", "-b", path)
+
+    assert code == 0, out
+    assert (
+        f"WARNING: ignoring the resolved sidecar {sidecar_path(path)}: "
+        "it was resolved from a different version of the bundle."
+    ) in out
+    assert f"Resolving schemas from: {path}" in out
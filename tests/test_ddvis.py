@@ -1,6 +1,9 @@
 import pytest
 from unittest.mock import patch, MagicMock, mock_open, call
+import os
 import subprocess
+import threading
+import time
 
 # Replace 'ddvis_module' with your actual module name (without .py)
 import gen3schemadev.ddvis as m
@@ -73,6 +76,7 @@ def _docker_compose_content():
 @patch.object(m.webbrowser, "open")
 @patch.object(m.subprocess, "run")
 @patch.object(m, "stop_existing_ddvis_container")
+@patch.object(m.os, "replace")
 @patch.object(m.shutil, "copy")
 @patch("builtins.open", new_callable=mock_open)
 @patch.object(m.os, "chdir")
@@ -88,6 +92,7 @@ def test_visualise_with_docker_success(
     mock_chdir,
     mock_open_file,
     mock_copy,
+    mock_replace,
     mock_stop,
     mock_run,
     mock_web_open,
@@ -97,22 +102,26 @@ def test_visualise_with_docker_success(
 
     m.visualise_with_docker("schema.json")
 
-    # .ddvis directory created under CWD and we chdir into it
+    # .ddvis directory created under CWD, without changing into it: the
+    # working directory is shared by every thread in the process
     mock_makedirs.assert_any_call("/work/.ddvis", exist_ok=True)
-    mock_chdir.assert_called_once_with("/work/.ddvis")
+    mock_chdir.assert_not_called()
 
     # docker-compose.yml written with exact content
-    mock_open_file.assert_called_once_with("docker-compose.yml", "w")
+    mock_open_file.assert_called_once_with("/work/.ddvis/docker-compose.yml", "w")
     handle = mock_open_file()
     handle.write.assert_called_once_with(_docker_compose_content())
 
     # schema copied and existing container stopped
-    mock_copy.assert_called_once_with("../schema.json", "schema/")
+    mock_copy.assert_called_once_with("/work/schema.json", "/work/.ddvis/schema/.schema.json.tmp")
+    mock_replace.assert_called_once_with(
+        "/work/.ddvis/schema/.schema.json.tmp", "/work/.ddvis/schema/schema.json"
+    )
     mock_stop.assert_called_once()
 
-    # docker commands run
-    assert call(["docker", "compose", "pull"], check=True) in mock_run.call_args_list
-    assert call(["docker", "compose", "up", "-d"], check=True) in mock_run.call_args_list
+    # docker commands run in the .ddvis directory
+    assert call(["docker", "compose", "pull"], check=True, cwd="/work/.ddvis") in mock_run.call_args_list
+    assert call(["docker", "compose", "up", "-d"], check=True, cwd="/work/.ddvis") in mock_run.call_args_list
 
     # Browser opened with correct URL using original filename
     mock_web_open.assert_called_once_with("http://localhost:8080/#schema/schema.json")
@@ -138,14 +147,6 @@ def test_visualise_with_docker_makedirs_fail(mock_makedirs, mock_exists, mock_wh
     m.visualise_with_docker("schema.json")
 
 
-@patch.object(m.shutil, "which", return_value="/usr/local/bin/docker")
-@patch.object(m.os.path, "exists", return_value=True)
-@patch.object(m.os, "makedirs")
-@patch.object(m.os, "chdir", side_effect=Exception("chdir fail"))
-def test_visualise_with_docker_chdir_fail(mock_chdir, mock_makedirs, mock_exists, mock_which):
-    m.visualise_with_docker("schema.json")
-
-
 @patch.object(m.shutil, "which", return_value="/usr/local/bin/docker")
 @patch.object(m.os.path, "exists", return_value=True)
 @patch.object(m.os, "makedirs")
@@ -191,6 +192,7 @@ def test_visualise_with_docker_docker_compose_fail(mock_run, mock_stop, mock_cop
 @patch.object(m.webbrowser, "open", side_effect=Exception("browser fail"))
 @patch.object(m.subprocess, "run")
 @patch.object(m, "stop_existing_ddvis_container")
+@patch.object(m.os, "replace")
 @patch.object(m.shutil, "copy")
 @patch("builtins.open", new_callable=mock_open)
 @patch.object(m.os, "chdir")
@@ -199,12 +201,145 @@ def test_visualise_with_docker_docker_compose_fail(mock_run, mock_stop, mock_cop
 @patch.object(m.shutil, "which")
 @patch.object(m.os, "getcwd", return_value="/work")
 def test_visualise_with_docker_browser_fail(mock_getcwd, mock_which, mock_exists, mock_makedirs, mock_chdir,
-                                            mock_open_file, mock_copy, mock_stop, mock_run, mock_web_open):
+                                            mock_open_file, mock_copy, mock_replace, mock_stop, mock_run,
+                                            mock_web_open):
     mock_which.return_value = "/usr/local/bin/docker"
     mock_exists.return_value = True
 
     m.visualise_with_docker("schema.json")
 
     # Even if browser fails, function should have reached that point
-    assert call(["docker", "compose", "pull"], check=True) in mock_run.call_args_list
-    assert call(["docker", "compose", "up", "-d"], check=True) in mock_run.call_args_list
+    assert call(["docker", "compose", "pull"], check=True, cwd="/work/.ddvis") in mock_run.call_args_list
+    assert call(["docker", "compose", "up", "-d"], check=True, cwd="/work/.ddvis") in mock_run.call_args_list
+
+
+# -----------------------
+# container reuse and --watch tests
+# -----------------------
+
+def _inspect(stdout, returncode=0):
+    return MagicMock(stdout=stdout, returncode=returncode)
+
+
+@patch.object(m.subprocess, "run")
+def test_ddvis_is_current_when_running_on_this_directory(mock_run, tmp_path):
+    mock_run.return_value = _inspect(f"true|quay.io/umccr/ddvis|{tmp_path}\n")
+
+    assert m.ddvis_is_current(str(tmp_path))
+
+
+@pytest.mark.parametrize("stdout, returncode", [
+    ("false|quay.io/umccr/ddvis|{dir}", 0),     # stopped
+    ("true|nginx:latest|{dir}", 0),             # another image under the name
+    ("true|quay.io/umccr/ddvis|/elsewhere", 0),  # started from another directory
+    ("", 1),                                    # no such container
+])
+@patch.object(m.subprocess, "run")
+def test_ddvis_is_not_current(mock_run, stdout, returncode, tmp_path):
+    mock_run.return_value = _inspect(stdout.format(dir=tmp_path), returncode)
+
+    assert not m.ddvis_is_current(str(tmp_path))
+
+
+@patch.object(m.subprocess, "run", side_effect=FileNotFoundError)
+def test_ddvis_is_not_current_without_docker(mock_run, tmp_path):
+    assert not m.ddvis_is_current(str(tmp_path))
+
+
+@patch.object(m.webbrowser, "open")
+@patch.object(m, "stop_existing_ddvis_container")
+@patch.object(m, "ddvis_is_current", return_value=True)
+@patch.object(m.subprocess, "run")
+@patch.object(m.shutil, "which", return_value="/usr/local/bin/docker")
+def test_running_container_is_reused(mock_which, mock_run, mock_current, mock_stop, mock_web_open, tmp_path,
+                                     monkeypatch):
+    """A current container gets the new schema copied in: no pull, no stop, no restart."""
+    (tmp_path / "schema.json").write_text('{"v": 2}')
+    monkeypatch.chdir(tmp_path)
+
+    m.visualise_with_docker("schema.json")
+
+    mock_current.assert_called_once_with(str(tmp_path / ".ddvis" / "schema"))
+    mock_run.assert_not_called()
+    mock_stop.assert_not_called()
+    assert (tmp_path / ".ddvis" / "schema" / "schema.json").read_text() == '{"v": 2}'
+    mock_web_open.assert_called_once_with("http://localhost:8080/#schema/schema.json")
+
+
+def test_watch_recopies_changed_schema(tmp_path, capsys):
+    source = tmp_path / "schema.json"
+    source.write_text('{"v": 1}')
+    served = tmp_path / "served"
+    served.mkdir()
+    stop = threading.Event()
+    watcher = threading.Thread(target=m.watch_schema, args=(str(source), str(served), 0.01, stop))
+    watcher.start()
+    try:
+        source.write_text('{"v": 22}')
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            copied = served / "schema.json"
+            if copied.exists() and copied.read_text() == '{"v": 22}':
+                break
+            # Keep touching the file in case the watcher started after the write.
+            os.utime(source, ns=(time.time_ns(), time.time_ns()))
+            time.sleep(0.02)
+    finally:
+        stop.set()
+        watcher.join()
+
+    assert (served / "schema.json").read_text() == '{"v": 22}'
+    assert [path.name for path in served.iterdir()] == ["schema.json"]
+    # Printed, not logged: the CLI logs only errors unless --debug is given.
+    assert f"Schema changed; copied {source}" in capsys.readouterr().out
+
+
+def _truncated_gzip(path, text):
+    """Write ``text`` gzipped to ``path``, then cut the file short, as a writer caught mid-write leaves it."""
+    import gzip
+    data = gzip.compress(text.encode())
+    path.write_bytes(data[:len(data) // 2])
+    return data
+
+
+def test_copy_of_a_truncated_bundle_leaves_no_temporary_file(tmp_path):
+    source = tmp_path / "schema.json.gz"
+    _truncated_gzip(source, '{"v": 1}' * 1000)
+    served = tmp_path / "served"
+    served.mkdir()
+    (served / "schema.json").write_text('{"v": 0}')
+
+    with pytest.raises(EOFError):
+        m.copy_schema(str(source), str(served))
+
+    assert [path.name for path in served.iterdir()] == ["schema.json"]
+    assert (served / "schema.json").read_text() == '{"v": 0}'
+
+
+def test_watch_survives_a_bundle_caught_mid_write(tmp_path, caplog):
+    source = tmp_path / "schema.json.gz"
+    source.write_bytes(b"")
+    served = tmp_path / "served"
+    served.mkdir()
+    stop = threading.Event()
+    watcher = threading.Thread(target=m.watch_schema, args=(str(source), str(served), 0.01, stop))
+    watcher.start()
+    try:
+        complete = _truncated_gzip(source, '{"v": 2}' * 1000)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and "Error copying changed schema" not in caplog.text:
+            # Keep touching the file in case the watcher started after the write.
+            os.utime(source, ns=(time.time_ns(), time.time_ns()))
+            time.sleep(0.02)
+        assert "Error copying changed schema" in caplog.text
+        assert watcher.is_alive()
+        source.write_bytes(complete)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and not (served / "schema.json").exists():
+            time.sleep(0.02)
+    finally:
+        stop.set()
+        watcher.join()
+
+    assert (served / "schema.json").read_text() == '{"v": 2}' * 1000
+    assert [path.name for path in served.iterdir()] == ["schema.json"]
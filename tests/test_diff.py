@@ -0,0 +1,247 @@
+"""
+Tests for the semantic `diff` between two bundles.
+
+Background: a bundle is one enormous line of JSON, so a textual diff of two
+bundles tells a reviewer only that something changed. `diff` reports what a
+reviewer wants to know - which nodes, properties, enum values, links,
+definitions and terms were added, removed or changed - and uses subtree hashes
+so unchanged parts of the dictionary are never walked.
+"""
+
+import copy
+import json
+
+from gen3schemadev.diff import MerkleHasher, diff_bundles, format_diff, is_empty
+
+
+def _bundle():
+    return {
+        "_definitions.yaml": {"UUID": {"type": "string"}, "ubiquitous_properties": {"type": {"type": "string"}}},
+        "_terms.yaml": {"sex": {"description": "Biological sex"}},
+        "_settings.yaml": {"_dict_version": "1.0.0"},
+        "subject.yaml": {
+            "id": "subject",
+            "title": "Subject",
+            "links": [{"name": "projects", "target_type": "project", "multiplicity": "many_to_one"}],
+            "properties": {
+                "sex": {"enum": ["male", "female"]},
+                "age": {"type": "integer"},
+            },
+        },
+        "sample.yaml": {
+            "id": "sample",
+            "links": [{"exclusive": False, "subgroup": [
+                {"name": "subjects", "target_type": "subject"},
+            ]}],
+            "properties": {"tissue": {"type": "string"}},
+        },
+    }
+
+
+def test_identical_bundles_have_no_differences():
+    """
+    Input: a bundle compared with a deep copy of itself.
+
+    Expected: an empty diff, and a one-line "no differences" report.
+
+    Why it matters: the command is run on every pull request; on one that does
+    not touch the dictionary it must say so plainly rather than print noise.
+    """
+    old = _bundle()
+
+    diff = diff_bundles(old, copy.deepcopy(old))
+
+    assert is_empty(diff)
+    assert format_diff(diff).startswith("No semantic differences")
+
+
+def test_nodes_and_properties_added_removed_and_changed():
+    """
+    Input: a node added, a node removed, and a property added, removed and
+    retyped in a surviving node.
+
+    Expected: each change is reported under the right node and category.
+
+    Why it matters: these are the changes that break data submission, and a
+    reviewer needs each of them named, not a byte count.
+    """
+    old = _bundle()
+    new = copy.deepcopy(old)
+    del new["sample.yaml"]
+    new["aliquot.yaml"] = {"id": "aliquot", "properties": {}}
+    props = new["subject.yaml"]["properties"]
+    props["age"] = {"type": "number"}
+    props["height"] = {"type": "number"}
+    del props["sex"]
+
+    diff = diff_bundles(old, new)
+
+    assert diff["nodes"]["added"] == ["aliquot.yaml"]
+    assert diff["nodes"]["removed"] == ["sample.yaml"]
+    subject = diff["nodes"]["changed"]["subject.yaml"]
+    assert subject["properties"] == {"added": ["height"], "removed": ["sex"], "changed": ["age"]}
+
+
+def test_enum_values_are_itemised():
+    """
+    Input: an enum with one value renamed.
+
+    Expected: the property is reported as changed, with the value added and
+    the value removed listed.
+
+    Why it matters: renaming an enum value invalidates every record that used
+    the old one. "property sex changed" hides that; naming the value does not.
+    """
+    old = _bundle()
+    new = copy.deepcopy(old)
+    new["subject.yaml"]["properties"]["sex"]["enum"] = ["male", "Female"]
+
+    diff = diff_bundles(old, new)
+
+    enums = diff["nodes"]["changed"]["subject.yaml"]["enums"]
+    assert enums == {"sex": {"added": ["Female"], "removed": ["female"]}}
+    text = format_diff(diff)
+    assert "+ Female" in text and "- female" in text
+
+
+def test_links_inside_subgroups_are_compared_by_name():
+    """
+    Input: a link added inside a subgroup, and a top-level link's
+    multiplicity changed.
+
+    Expected: the subgroup link is reported as added, the other as changed.
+
+    Why it matters: subgroups are how Gen3 expresses "one of these parents".
+    Treating the subgroup as one opaque value would report the whole group as
+    changed without saying which link.
+    """
+    old = _bundle()
+    new = copy.deepcopy(old)
+    new["sample.yaml"]["links"][0]["subgroup"].append({"name": "cases", "target_type": "case"})
+    new["subject.yaml"]["links"][0]["multiplicity"] = "many_to_many"
+
+    diff = diff_bundles(old, new)
+
+    assert diff["nodes"]["changed"]["sample.yaml"]["links"]["added"] == ["cases"]
+    assert diff["nodes"]["changed"]["subject.yaml"]["links"]["changed"] == ["projects"]
+
+
+def test_links_regrouped_without_a_link_changing_are_reported():
+    """
+    Input: a node's top-level link wrapped in a subgroup, and another node's
+    subgroup made exclusive.
+
+    Expected: both nodes changed with "~ links regrouped" under them, and no
+    link added, removed or changed.
+
+    Why it matters: comparing links by name sees nothing here, yet what a
+    record may link to has changed; a bare "~ node" would tell the reviewer
+    something changed without saying what.
+    """
+    old = _bundle()
+    new = copy.deepcopy(old)
+    new["subject.yaml"]["links"] = [{"exclusive": False, "required": True, "subgroup": new["subject.yaml"]["links"]}]
+    new["sample.yaml"]["links"][0]["exclusive"] = True
+
+    diff = diff_bundles(old, new)
+
+    for name in ("subject.yaml", "sample.yaml"):
+        links = diff["nodes"]["changed"][name]["links"]
+        assert links == {"added": [], "removed": [], "changed": [], "regrouped": True}
+    text = format_diff(diff)
+    assert "  ~ node subject.yaml\n      ~ links regrouped" in text
+    assert "  ~ node sample.yaml\n      ~ links regrouped" in text
+    assert diff_bundles(old, copy.deepcopy(old))["nodes"]["changed"] == {}
+
+
+def test_definitions_terms_and_settings_are_reported_once():
+    """
+    Input: a shared definition changed, a term added and the settings changed.
+
+    Expected: each is reported in its own section, and no node is reported
+    as changed.
+
+    Why it matters: a shared definition reaches many nodes once resolved. The
+    diff works on the bundle as written, so the one edit is shown once.
+    """
+    old = _bundle()
+    new = copy.deepcopy(old)
+    new["_definitions.yaml"]["UUID"]["pattern"] = "^[0-9a-f-]+$"
+    new["_terms.yaml"]["age"] = {"description": "Age"}
+    new["_settings.yaml"]["_dict_version"] = "1.1.0"
+
+    diff = diff_bundles(old, new)
+
+    assert diff["definitions"]["changed"] == ["UUID"]
+    assert diff["terms"]["added"] == ["age"]
+    assert diff["files"]["changed"] == ["_settings.yaml"]
+    assert diff["nodes"]["changed"] == {}
+
+
+def test_unchanged_nodes_are_not_descended(monkeypatch):
+    """
+    Input: two bundles where only one of two nodes changed, with the per-node
+    comparison recorded.
+
+    Expected: only the changed node is walked.
+
+    Why it matters: the diff is only cheap on large dictionaries if an
+    unchanged node costs one hash comparison, not a walk of every property.
+    """
+    import gen3schemadev.diff as diff_module
+
+    walked = []
+    real_node_diff = diff_module._node_diff
+
+    def recording_node_diff(old, new, same):
+        walked.append(old["id"])
+        return real_node_diff(old, new, same)
+
+    monkeypatch.setattr(diff_module, "_node_diff", recording_node_diff)
+    old = _bundle()
+    new = copy.deepcopy(old)
+    new["sample.yaml"]["properties"]["tissue"]["type"] = "integer"
+
+    diff_bundles(old, new)
+
+    assert walked == ["sample"]
+
+
+def test_subtree_hashes_distinguish_order_and_type():
+    """
+    Input: pairs of values that are equal except for list order or for a
+    string standing in for a number.
+
+    Expected: each pair hashes differently; mappings differing only in key
+    order hash equally.
+
+    Why it matters: list order (enums, links) and types are meaningful in a
+    schema, key order is not. A hash that blurred either would hide a change.
+    """
+    hasher = MerkleHasher()
+
+    assert not hasher.same({"a": [1, 2]}, {"a": [2, 1]})
+    assert not hasher.same({"a": "1"}, {"a": 1})
+    assert hasher.same({"a": 1, "b": 2}, {"b": 2, "a": 1})
+
+
+def test_cli_diff_prints_json(run_cli, tmp_path):
+    """
+    Input: `diff --json` on two bundle files that differ by one property.
+
+    Expected: exit code 0 and a JSON document naming that property.
+
+    Why it matters: the JSON form is what CI bots post on pull requests, so it
+    must be parseable on its own.
+    """
+    old = _bundle()
+    new = copy.deepcopy(old)
+    new["subject.yaml"]["properties"]["height"] = {"type": "number"}
+    (tmp_path / "old.json").write_text(json.dumps(old))
+    (tmp_path / "new.json").write_text(json.dumps(new))
+
+    code, out = run_cli("diff", str(tmp_path / "old.json"), str(tmp_path / "new.json"), "--json")
+
+    assert code == 0
+    diff = json.loads(out)
+    assert diff["nodes"]["changed"]["subject.yaml"]["properties"]["added"] == ["height"]
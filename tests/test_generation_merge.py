@@ -0,0 +1,148 @@
+"""
+Tests for the copy-on-write merge behind `definitions:` and presets.
+
+Background: `_deep_merge` deep-copied the whole base mapping at every level of
+recursion, and `load_preset` deep-copied a document it had only just parsed.
+The merge now copies only the mappings on paths the overlay modifies and shares
+everything else of the base, so its promises - the inputs are never mutated,
+nothing of the overlay is shared, and the result is what a full copy would have
+produced - are asserted directly.
+"""
+
+import copy
+
+from gen3schemadev.generation import _deep_merge, load_preset
+
+
+def _template():
+    return {
+        "UUID": {"type": "string", "pattern": "^[a-f0-9-]+$"},
+        "ubiquitous_properties": {
+            "type": {"type": "string"},
+            "state": {"enum": ["validated", "submitted"]},
+        },
+        "to_one": {"anyOf": [{"type": "object"}]},
+    }
+
+
+def test_merge_never_mutates_either_input():
+    """
+    Input: a template and an overlay that adds, replaces and nests into keys.
+
+    Expected: both are exactly as they were after the merge, and the result
+    has the overlay's values.
+
+    Why it matters: the template is shared by every caller of the merge; an
+    overlay leaking into it would appear in the next dictionary built.
+    """
+    base = _template()
+    overlay = {
+        "ubiquitous_properties": {"state": {"enum": ["released"]}, "extra": {"type": "integer"}},
+        "UUID": "replaced",
+        "new_enum": {"enum": ["a", "b"]},
+    }
+    base_before, overlay_before = copy.deepcopy(base), copy.deepcopy(overlay)
+
+    merged = _deep_merge(base, overlay)
+
+    assert base == base_before
+    assert overlay == overlay_before
+    assert merged["UUID"] == "replaced"
+    assert merged["new_enum"] == {"enum": ["a", "b"]}
+    assert merged["ubiquitous_properties"] == {
+        "type": {"type": "string"},
+        "state": {"enum": ["released"]},
+        "extra": {"type": "integer"},
+    }
+
+
+def test_only_modified_paths_are_copied():
+    """
+    Input: an overlay touching one key inside ubiquitous_properties.
+
+    Expected: the mappings on that path are new objects; every untouched
+    subtree is the very object from the base.
+
+    Why it matters: copying untouched subtrees is the cost this change
+    removes. Asserting identity keeps it from creeping back.
+    """
+    base = _template()
+
+    merged = _deep_merge(base, {"ubiquitous_properties": {"extra": {"type": "integer"}}})
+
+    assert merged is not base
+    assert merged["ubiquitous_properties"] is not base["ubiquitous_properties"]
+    assert merged["UUID"] is base["UUID"]
+    assert merged["to_one"] is base["to_one"]
+    assert merged["ubiquitous_properties"]["state"] is base["ubiquitous_properties"]["state"]
+
+
+def test_nothing_from_the_overlay_is_shared():
+    """
+    Input: an overlay adding a definition and replacing a nested value.
+
+    Expected: equal values in the result, but none of the overlay's mappings
+    or lists.
+
+    Why it matters: the overlay is the input model's definitions. Shared, a
+    caller editing one generated dictionary would edit the input, and every
+    dictionary generated from it afterwards.
+    """
+    overlay = {"custom": {"enum": ["a", "b"]}, "ubiquitous_properties": {"state": {"enum": ["x"]}}}
+
+    merged = _deep_merge(_template(), overlay)
+
+    assert merged["custom"] == overlay["custom"] and merged["custom"] is not overlay["custom"]
+    assert merged["custom"]["enum"] is not overlay["custom"]["enum"]
+    state = merged["ubiquitous_properties"]["state"]
+    assert state == {"enum": ["x"]}
+    assert state is not overlay["ubiquitous_properties"]["state"]
+
+
+def test_merge_matches_a_full_copy_merge():
+    """
+    Input: the packaged _definitions.yaml merged with a large custom overlay,
+    by the new merge and by the deep-copying one it replaced.
+
+    Expected: equal results.
+
+    Why it matters: the generated _definitions.yaml must not change by a byte
+    because the merge got cheaper.
+    """
+    from gen3schemadev.schema.gen3_template import generate_def_template
+
+    def full_copy_merge(base, overlay):
+        result = copy.deepcopy(base)
+        for key, value in overlay.items():
+            if isinstance(value, dict) and isinstance(result.get(key), dict):
+                result[key] = full_copy_merge(result[key], value)
+            else:
+                result[key] = copy.deepcopy(value)
+        return result
+
+    overlay = {f"enum_{i}": {"enum": [f"v{j}" for j in range(20)]} for i in range(200)}
+    overlay["ubiquitous_properties"] = {"state": {"default": "validated"}}
+
+    assert _deep_merge(generate_def_template(), overlay) == full_copy_merge(
+        generate_def_template(), overlay
+    )
+
+
+def test_each_load_preset_call_returns_an_independent_document():
+    """
+    Input: the project preset loaded twice, the first copy mutated.
+
+    Expected: the second copy is unaffected.
+
+    Why it matters: load_preset no longer copies what it returns, which is only
+    safe while each call parses afresh. merge_onto_preset mutates its preset,
+    so one node's merge would otherwise leak into the next.
+    """
+    first = load_preset("project")
+    first["properties"]["code"]["description"] = "mutated"
+    first["uniqueKeys"].append(["mutated"])
+
+    second = load_preset("project")
+
+    assert second["properties"]["code"].get("description") != "mutated"
+    assert ["mutated"] not in second["uniqueKeys"]
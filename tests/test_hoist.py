@@ -0,0 +1,200 @@
+"""
+Tests for `generate --hoist` and `gen3schemadev.hoist`.
+
+Background: generated nodes repeat identical property bodies - the same enum
+list and description in every node declaring the property - which inflates
+the YAML and the bundle. Hoisting moves each repeated body into
+_definitions.yaml once and references it, leaving the resolved dictionary
+exactly as it was.
+"""
+
+import os
+
+from gen3schemadev.hoist import hoist_properties
+from gen3schemadev.utils import bundle_yamls, read_json, resolve_bundle
+
+OFFICIAL_DICTIONARY = os.path.join(
+    os.path.dirname(__file__), "gen3_schema/examples/json", "gen3_develop_schema.json"
+)
+
+STATUS = {
+    "description": "Where the record is in the curation workflow, from submission to release.",
+    "enum": ["submitted", "in_review", "curated", "released", "withdrawn"],
+}
+
+# Two nodes sharing a long enum property, and a third using it under
+# another name.
+REPEATED_INPUT = """version: 0.1.0
+url: https://example.biocommons.org.au
+nodes:
+  - name: subject
+    category: clinical
+    description: "An individual organism taking part in the study."
+    properties:
+      - name: curation_status
+        description: "Where the record is in the curation workflow, from submission to release."
+        type: enum
+        enums: [submitted, in_review, curated, released, withdrawn]
+  - name: sample
+    category: biospecimen
+    description: "A sample taken from a subject."
+    properties:
+      - name: curation_status
+        description: "Where the record is in the curation workflow, from submission to release."
+        type: enum
+        enums: [submitted, in_review, curated, released, withdrawn]
+  - name: assay
+    category: analysis
+    description: "An assay run on a sample."
+    properties:
+      - name: review_status
+        description: "Where the record is in the curation workflow, from submission to release."
+        type: enum
+        enums: [submitted, in_review, curated, released, withdrawn]
+links:
+  - parent: project
+    multiplicity: one_to_many
+    child: subject
+  - parent: subject
+    multiplicity: one_to_many
+    child: sample
+  - parent: sample
+    multiplicity: one_to_many
+    child: assay
+"""
+
+
+def small_dictionary(**definitions):
+    return {
+        "_definitions.yaml": {"datetime": {"type": "string", "format": "date-time"}, **definitions},
+        "_terms.yaml": {},
+        "a.yaml": {"id": "a", "properties": {"status": dict(STATUS), "kind": {"type": "string"}}},
+        "b.yaml": {"id": "b", "properties": {"status": dict(STATUS), "kind": {"type": "string"}}},
+        "c.yaml": {"id": "c", "properties": {"state": dict(STATUS)}},
+    }
+
+
+def test_hoisting_leaves_the_resolved_dictionary_unchanged():
+    """
+    Input: the official Gen3 dictionary and a small one with a body repeated
+    three times, hoisted.
+
+    Expected: each resolves exactly as before; the bundle is smaller; the
+    input is not modified.
+
+    Why it matters: hoisting is only a saving if nothing downstream of
+    resolution can tell it happened.
+    """
+    for load in (lambda: read_json(OFFICIAL_DICTIONARY), small_dictionary):
+        bundle = load()
+
+        hoisted, report = hoist_properties(bundle)
+
+        assert bundle == load()
+        assert resolve_bundle(hoisted) == resolve_bundle(bundle)
+        assert report["entries"]
+        assert report["bundle_bytes"][1] < report["bundle_bytes"][0]
+
+
+def test_what_is_hoisted_and_what_it_is_called():
+    """
+    Input: a body repeated under two property names, a small repeated body,
+    and a definition already named after the property.
+
+    Expected: the large body is hoisted once under a suffixed name and every
+    copy references it; the small body stays inline.
+
+    Why it matters: a $ref line costs bytes too, and a hoisted entry must
+    never overwrite a definition the dictionary already has.
+    """
+    hoisted, report = hoist_properties(small_dictionary(status={"type": "integer"}))
+
+    (name,) = report["entries"]
+    assert name.startswith("status_") and report["entries"][name] == 3
+    assert hoisted["_definitions.yaml"]["status"] == {"type": "integer"}
+    assert hoisted["_definitions.yaml"][name] == STATUS
+    assert hoisted["c.yaml"]["properties"]["state"] == {"$ref": f"_definitions.yaml#/{name}"}
+    assert hoisted["a.yaml"]["properties"]["kind"] == {"type": "string"}
+
+
+def test_a_hoisted_entry_never_takes_a_term_name():
+    """
+    Input: a repeated body under the property name status, with a
+    _terms.yaml entry also called status that a node references.
+
+    Expected: the entry gets a suffixed name, the term reference still
+    resolves to the term, and the dictionary resolves as before.
+
+    Why it matters: references are looked up in _terms.yaml and
+    _definitions.yaml merged, with definitions winning, so a definition
+    named status would replace the term everywhere.
+    """
+    bundle = small_dictionary()
+    bundle["_terms.yaml"] = {"status": {"description": "Where a record is in its lifecycle."}}
+    bundle["a.yaml"]["properties"]["described"] = {"$ref": "_terms.yaml#/status"}
+
+    hoisted, report = hoist_properties(bundle)
+
+    (name,) = report["entries"]
+    assert name.startswith("status_")
+    assert "status" not in hoisted["_definitions.yaml"]
+    assert resolve_bundle(hoisted) == resolve_bundle(bundle)
+
+
+def test_a_body_matching_a_definition_references_it():
+    """
+    Input: a repeated body identical to an existing definition.
+
+    Expected: the copies reference that definition and no entry is added.
+
+    Why it matters: two identical definitions are the duplication hoisting
+    is meant to remove.
+    """
+    hoisted, report = hoist_properties(small_dictionary(curation=dict(STATUS)))
+
+    assert report["entries"] == {"curation": 3}
+    assert hoisted["_definitions.yaml"] == small_dictionary(curation=dict(STATUS))["_definitions.yaml"]
+
+
+def test_generate_hoist_writes_an_equivalent_dictionary(run_cli, tmp_path):
+    """
+    Input: an input repeating one enum property across three nodes,
+    generated with and without --hoist.
+
+    Expected: the hoisted run reports its saving, its nodes reference the
+    shared entry, it validates, and both dictionaries resolve identically.
+
+    Why it matters: --hoist is an output optimisation, not a different
+    dictionary.
+    """
+    input_path = tmp_path / "input.yaml"
+    input_path.write_text(REPEATED_INPUT)
+    plain, hoisted = str(tmp_path / "plain"), str(tmp_path / "hoisted")
+
+    assert run_cli("generate", "-i", str(input_path), "-o", plain)[0] == 0
+    code, output = run_cli("generate", "-i", str(input_path), "-o", hoisted, "--hoist")
+
+    assert code == 0, output
+    assert "Hoisted 1 property definitions, used by 3 properties" in output
+    assert "bytes (-" in output
+    sample = bundle_yamls(hoisted)["sample.yaml"]
+    assert sample["properties"]["curation_status"] == {"$ref": "_definitions.yaml#/curation_status"}
+    assert run_cli("validate", "-y", hoisted)[0] == 0
+    assert resolve_bundle(bundle_yamls(hoisted)) == resolve_bundle(bundle_yamls(plain))
+
+
+def test_hoist_cannot_be_combined_with_only(run_cli, input_file, tmp_path):
+    """
+    Input: generate --hoist --only subject.
+
+    Expected: a usage error, and nothing written.
+
+    Why it matters: --only leaves _definitions.yaml alone, so the nodes it
+    wrote would reference entries that were never written.
+    """
+    out = tmp_path / "dictionary"
+
+    code, _ = run_cli("generate", "-i", input_file, "-o", str(out), "--hoist", "--only", "subject")
+
+    assert code == 2
+    assert not out.exists()
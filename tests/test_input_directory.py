@@ -0,0 +1,182 @@
+"""
+Tests for loading the input data model from a directory of files.
+
+Background: a large model kept in a single input YAML is slow to parse and a
+constant merge-conflict hotspot, because every edit to every node lands in the
+same file. `generate -i` now also accepts a directory - dictionary.yaml,
+nodes/*.yaml, links.yaml, definitions.yaml - which is assembled into exactly
+the mapping a single file would have produced. Each file's parse is cached by
+content hash, so editing one node re-parses one small file.
+"""
+
+import os
+
+import pytest
+import yaml
+
+from gen3schemadev import inputs
+from gen3schemadev.inputs import InputFileError, InputLayoutError, load_input
+
+
+def _split(single_file, directory):
+    """Split a single-file input into the directory layout, one node per file."""
+    data = yaml.safe_load(open(single_file))
+    os.makedirs(os.path.join(directory, "nodes"))
+    with open(os.path.join(directory, "dictionary.yaml"), "w") as handle:
+        yaml.safe_dump({"version": data["version"], "url": data["url"]}, handle)
+    for position, node in enumerate(data["nodes"]):
+        # Numbered so sorted filename order reproduces the original node order.
+        path = os.path.join(directory, "nodes", f"{position:02d}_{node['name']}.yaml")
+        with open(path, "w") as handle:
+            yaml.safe_dump(node, handle, sort_keys=False)
+    with open(os.path.join(directory, "links.yaml"), "w") as handle:
+        yaml.safe_dump(data["links"], handle, sort_keys=False)
+    return data
+
+
+def test_directory_input_assembles_the_same_model_as_a_single_file(input_file, tmp_path):
+    """
+    Input: the minimal input, and the same input split into dictionary.yaml,
+    one file per node, and links.yaml.
+
+    Expected: both load to the identical mapping.
+
+    Why it matters: everything downstream - validation, generation, --check -
+    runs on this mapping. If the split and unsplit forms differed in any way,
+    moving to a directory would silently change the generated dictionary.
+    """
+    directory = tmp_path / "input"
+    original = _split(input_file, str(directory))
+
+    assert load_input(str(directory)) == original
+
+
+def test_generate_from_a_directory_matches_generate_from_a_file(
+    run_cli, input_file, tmp_path, snapshot
+):
+    """
+    Input: generate run once from the single file and once from its split form.
+
+    Expected: the two output directories are byte-identical.
+
+    Why it matters: the split is a storage decision, not a modelling one. The
+    only acceptable difference between the two is none at all.
+    """
+    directory = tmp_path / "input"
+    _split(input_file, str(directory))
+
+    code, _ = run_cli("generate", "-i", input_file, "-o", str(tmp_path / "from_file"))
+    assert code == 0
+    code, _ = run_cli("generate", "-i", str(directory), "-o", str(tmp_path / "from_dir"))
+    assert code == 0
+
+    assert snapshot(str(tmp_path / "from_file")) == snapshot(str(tmp_path / "from_dir"))
+
+
+def test_unchanged_files_are_not_parsed_again(input_file, tmp_path, monkeypatch):
+    """
+    Input: a directory input loaded twice, with one node file edited in between.
+
+    Expected: the second load parses only the edited file.
+
+    Why it matters: this is the point of the cache. On a 40,000-line model the
+    edit-generate loop should cost one small parse, not the whole model.
+    """
+    directory = tmp_path / "input"
+    _split(input_file, str(directory))
+    load_input(str(directory))
+
+    node_file = directory / "nodes" / "01_biospecimen.yaml"
+    node_file.write_text(node_file.read_text().replace("A sample", "One sample"))
+
+    parsed = []
+    real_load = yaml.load
+
+    def counting_load(stream, Loader):
+        parsed.append(stream)
+        return real_load(stream, Loader=Loader)
+
+    monkeypatch.setattr(inputs.yaml, "load", counting_load)
+    data = load_input(str(directory))
+
+    assert len(parsed) == 1
+    assert data["nodes"][1]["description"].startswith("One sample")
+
+
+def test_integer_keys_are_never_served_from_the_cache_as_strings(tmp_path):
+    """
+    Input: a YAML file with an integer mapping key, loaded twice.
+
+    Expected: both loads return the integer key.
+
+    Why it matters: JSON turns integer keys into strings. Caching such a parse
+    would make the second run see a different input from the first, so
+    documents that do not survive the round trip are not cached at all.
+    """
+    path = tmp_path / "odd.yaml"
+    path.write_text("1: one\n")
+
+    assert load_input(str(path)) == {1: "one"}
+    assert load_input(str(path)) == {1: "one"}
+
+
+def test_an_unusable_cache_location_falls_back_to_parsing(input_file, tmp_path, monkeypatch, run_cli):
+    """
+    Input: GEN3SCHEMADEV_CACHE_DIR pointing beneath a regular file, where no
+    directory can be created, then generate.
+
+    Expected: generate succeeds, parsing the input without the cache.
+
+    Why it matters: the cache is only a shortcut; a read-only home directory
+    or a misconfigured CI cache must not stop generation with a traceback.
+    """
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setenv("GEN3SCHEMADEV_CACHE_DIR", str(blocker / "cache"))
+
+    code, output = run_cli("generate", "-i", input_file, "-o", str(tmp_path / "out"))
+
+    assert code == 0, output
+    assert (tmp_path / "out" / "subject.yaml").exists()
+
+
+def test_a_broken_node_file_is_named_in_the_error(input_file, tmp_path, run_cli):
+    """
+    Input: a directory input where one node file is not valid YAML.
+
+    Expected: the error names that file, and generate exits non-zero.
+
+    Why it matters: "input is not valid YAML" is useless when the input is
+    forty files. The reader needs the one that failed.
+    """
+    directory = tmp_path / "input"
+    _split(input_file, str(directory))
+    broken = directory / "nodes" / "00_subject.yaml"
+    broken.write_text("name: subject\n  category: : clinical\n")
+
+    with pytest.raises(InputFileError) as excinfo:
+        load_input(str(directory))
+    assert excinfo.value.path == str(broken)
+
+    code, out = run_cli("generate", "-i", str(directory), "-o", str(tmp_path / "out"))
+    assert code == 1
+    assert "00_subject.yaml is not valid YAML" in out
+
+
+def test_a_directory_without_dictionary_yaml_is_refused(tmp_path, run_cli):
+    """
+    Input: a directory holding only nodes/.
+
+    Expected: InputLayoutError, and a CLI message saying what the layout needs.
+
+    Why it matters: pointing -i at the wrong directory should say so, rather
+    than failing later with a validation error about a missing 'version'.
+    """
+    (tmp_path / "input" / "nodes").mkdir(parents=True)
+
+    with pytest.raises(InputLayoutError):
+        load_input(str(tmp_path / "input"))
+
+    code, out = run_cli("generate", "-i", str(tmp_path / "input"), "-o", str(tmp_path / "out"))
+    assert code == 1
+    assert "dictionary.yaml" in out
@@ -0,0 +1,201 @@
+"""
+Tests for `gen3schemadev.jsonio`: the decoding backend and compressed bundles.
+
+Background: bundles are read and written on every pipeline run. Decoding may
+use a faster library when one is installed, but what is written must stay
+byte-identical, and a bundle named .json.gz or .json.xz is compressed and
+decompressed transparently.
+"""
+
+import json
+import os
+import tracemalloc
+
+import pytest
+
+from gen3schemadev import jsonio
+from gen3schemadev.ddvis import copy_schema
+from gen3schemadev.utils import read_json, write_json
+
+OFFICIAL_DICTIONARY = os.path.join(
+    os.path.dirname(__file__), "gen3_schema/examples/json", "gen3_develop_schema.json"
+)
+
+
+def test_write_json_matches_json_dump(tmp_path):
+    """
+    Input: the official dictionary, written by write_json and by json.dump
+    with the same options.
+
+    Expected: the two files are byte-identical.
+
+    Why it matters: deterministic bundles are compared byte for byte, so
+    changing how they are encoded must not change a single byte.
+    """
+    bundle = read_json(OFFICIAL_DICTIONARY)
+    ours, theirs = tmp_path / "ours.json", tmp_path / "theirs.json"
+
+    write_json(bundle, str(ours))
+    with open(theirs, "w") as handle:
+        json.dump(bundle, handle)
+
+    assert ours.read_bytes() == theirs.read_bytes()
+
+
+@pytest.mark.parametrize("data", [
+    {},
+    {"é": "ü", "nan": float("nan"), "nested": {"b": [1, 2.5, None, True]}},
+    {1: "int key", "a": 2},
+    [{"a": 1}, "b"],
+])
+def test_write_json_matches_json_dump_for_any_document(tmp_path, data):
+    """
+    Input: an empty dict, non-ASCII and NaN values, non-string keys and a list.
+
+    Expected: write_json writes exactly what json.dump does.
+
+    Why it matters: the writer encodes a dict entry by entry; joining the
+    entries must reproduce json.dump's bytes in every case, not only for a
+    typical bundle.
+    """
+    path = tmp_path / "out.json"
+
+    write_json(data, str(path))
+
+    assert path.read_text() == json.dumps(data)
+
+
+@pytest.mark.parametrize("suffix", [".json", ".json.gz"])
+def test_writing_a_bundle_does_not_hold_it_in_memory(tmp_path, suffix):
+    """
+    Input: the official dictionary repeated twenty times (3 MB of JSON),
+    written plain and compressed.
+
+    Expected: the peak memory allocated while writing is under a quarter of
+    the encoded size.
+
+    Why it matters: encoding the whole bundle before writing it took twice
+    its size in memory; a writer bounded by the largest node stays flat as
+    dictionaries grow.
+    """
+    bundle = read_json(OFFICIAL_DICTIONARY)
+    large = {f"{name}.{copy}": schema for copy in range(20) for name, schema in bundle.items()}
+    size = len(json.dumps(large))
+    path = str(tmp_path / f"large{suffix}")
+
+    tracemalloc.start()
+    try:
+        jsonio.write_file(large, path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert peak < size / 4
+    assert read_json(path) == large
+
+
+@pytest.mark.parametrize("suffix", [".json.gz", ".json.xz"])
+def test_compressed_bundles_round_trip(tmp_path, suffix):
+    """
+    Input: the official dictionary written twice to a compressed path.
+
+    Expected: it reads back equal, the file is smaller than the plain JSON,
+    and both writes are byte-identical.
+
+    Why it matters: a compressed bundle must mean the same as a plain one,
+    and rebuilding it must not change its checksum.
+    """
+    bundle = read_json(OFFICIAL_DICTIONARY)
+    first, second, plain = tmp_path / f"a{suffix}", tmp_path / f"b{suffix}", tmp_path / "a.json"
+
+    write_json(bundle, str(first))
+    write_json(bundle, str(second))
+    write_json(bundle, str(plain))
+
+    assert read_json(str(first)) == bundle
+    assert first.read_bytes() == second.read_bytes()
+    assert first.stat().st_size < plain.stat().st_size / 4
+
+
+def test_a_rejected_document_is_decoded_by_the_standard_library(monkeypatch):
+    """
+    Input: a backend that rejects every document, as orjson rejects NaN.
+
+    Expected: loads still returns what json.loads would.
+
+    Why it matters: the backend is a speed-up; installing it must never make
+    a bundle that used to load fail to.
+    """
+    def refuse(data):
+        raise ValueError("not for me")
+
+    monkeypatch.setattr(jsonio, "_selected", ("fast", refuse))
+
+    assert jsonio.loads(b'{"a": NaN}')["a"] != 0
+    with pytest.raises(json.JSONDecodeError):
+        jsonio.loads("{")
+
+
+def test_split_ext_keeps_the_compression_suffix():
+    """
+    Input: plain and compressed bundle paths.
+
+    Expected: the extension includes the compression suffix.
+
+    Why it matters: files beside a bundle, like its resolved sidecar, are
+    named from its root, which must not end in ".json".
+    """
+    assert jsonio.split_ext("out/schema.json.gz") == ("out/schema", ".json.gz")
+    assert jsonio.split_ext("out/schema.json") == ("out/schema", ".json")
+    assert jsonio.plain_name("schema.json.xz") == "schema.json"
+
+
+def test_bundle_validate_and_visualise_a_compressed_bundle(run_cli, generated, tmp_path):
+    """
+    Input: bundle -f schema.json.gz --resolved --index, then validate -b and
+    visualise -i --static on it.
+
+    Expected: all succeed; the sidecar is used; no index is written, with a
+    note saying why.
+
+    Why it matters: a compressed bundle should work wherever a plain one does,
+    and the index, which addresses bytes of the file, cannot apply to it.
+    """
+    path = str(tmp_path / "schema.json.gz")
+
+    code, output = run_cli("bundle", "-i", generated, "-f", path, "--resolved", "--index")
+
+    assert code == 0, output
+    assert "cannot be read in place" in output
+    assert os.path.exists(tmp_path / "schema.resolved.json.gz")
+    assert not os.path.exists(tmp_path / "schema.index.json")
+
+    code, output = run_cli("validate", "-b", path)
+    assert code == 0, output
+    assert "resolved sidecar" in output
+
+    html = tmp_path / "graph.html"
+    code, output = run_cli("visualise", "-i", path, "--static", str(html))
+    assert code == 0, output
+    assert "subject" in html.read_text()
+
+
+def test_ddvis_is_given_the_decompressed_bundle(tmp_path):
+    """
+    Input: a .json.gz bundle copied into the DDVis schema directory.
+
+    Expected: the directory holds schema.json, equal to the bundle.
+
+    Why it matters: DDVis fetches plain JSON and cannot read the compressed
+    file.
+    """
+    bundle = read_json(OFFICIAL_DICTIONARY)
+    path = tmp_path / "schema.json.gz"
+    write_json(bundle, str(path))
+    schema_dir = tmp_path / "schema"
+    schema_dir.mkdir()
+
+    copy_schema(str(path), str(schema_dir))
+
+    assert os.listdir(schema_dir) == ["schema.json"]
+    assert json.loads((schema_dir / "schema.json").read_text()) == bundle
@@ -0,0 +1,116 @@
+"""
+Tests for `--keep-going` and `build_dictionary(keep_going=True)`.
+
+Background: build_dictionary stops at the first node that fails to build, so
+an input with five broken nodes took five runs to fix, each one reloading and
+rebuilding everything. With keep_going every node is built and the failures
+are reported together, and - as before - nothing is written unless every node
+built.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from gen3schemadev import aio, generation
+from gen3schemadev.converter import populate_template
+from gen3schemadev.generation import NodeBuildError, build_dictionary
+from gen3schemadev.schema.gen3_template import generate_gen3_template, get_metaschema
+from gen3schemadev.schema.input_schema import DataModel
+from gen3schemadev.utils import load_yaml
+
+
+@pytest.fixture
+def broken_nodes(monkeypatch):
+    """Make the named nodes fail to build, as a malformed node would."""
+    broken = set()
+
+    def populate(name, *args, **kwargs):
+        if name in broken:
+            raise ValueError(f"cannot build {name}\nsecond line of detail")
+        return populate_template(name, *args, **kwargs)
+
+    monkeypatch.setattr(generation, "populate_template", populate)
+    return broken
+
+
+def test_every_failure_is_collected(input_file, broken_nodes):
+    """
+    Input: a model whose two nodes both fail to build.
+
+    Expected: without keep_going, the first node's own ValueError; with it,
+    one NodeBuildError naming both nodes and their errors in input order.
+
+    Why it matters: the default must not change, and the keep-going error
+    must say everything a second run would have.
+    """
+    model = DataModel.model_validate(load_yaml(input_file))
+    template = generate_gen3_template(get_metaschema())
+    broken_nodes.update({"subject", "biospecimen"})
+
+    with pytest.raises(ValueError, match="cannot build subject"):
+        build_dictionary(model, template)
+    with pytest.raises(NodeBuildError) as caught:
+        build_dictionary(model, template, keep_going=True)
+
+    assert [name for name, _ in caught.value.failures] == ["subject", "biospecimen"]
+    assert all(isinstance(error, ValueError) for _, error in caught.value.failures)
+
+
+def test_keep_going_builds_a_healthy_model_unchanged(input_file):
+    """
+    Input: a model that builds cleanly, with and without keep_going.
+
+    Expected: identical files.
+
+    Why it matters: keep_going changes how failures are reported, never what
+    a successful build produces.
+    """
+    model = DataModel.model_validate(load_yaml(input_file))
+    template = generate_gen3_template(get_metaschema())
+
+    assert build_dictionary(model, template, keep_going=True) == build_dictionary(model, template)
+
+
+@pytest.mark.parametrize("command", ["generate", "build"])
+def test_cli_reports_every_failing_node_and_writes_nothing(run_cli, input_file, tmp_path, broken_nodes, command):
+    """
+    Input: generate and build --keep-going on an input with two broken nodes.
+
+    Expected: exit code 1, one message naming both nodes with the first line
+    of each error, and no output directory or bundle.
+
+    Why it matters: the point is to fix every node after a single run, and
+    the all-or-nothing write guarantee must hold in this mode too.
+    """
+    broken_nodes.update({"subject", "biospecimen"})
+    out = tmp_path / "dictionary"
+    extra = ("--bundle", str(tmp_path / "schema.json")) if command == "build" else ()
+
+    code, output = run_cli(command, "-i", input_file, "-o", str(out), "--keep-going", *extra)
+
+    assert code == 1
+    assert f"2 nodes in {input_file} failed to build: subject, biospecimen" in output
+    assert "  subject: ValueError: cannot build subject" in output
+    assert "  biospecimen: ValueError: cannot build biospecimen" in output
+    assert "second line of detail" not in output
+    assert not out.exists()
+    assert not os.path.exists(tmp_path / "schema.json")
+
+
+def test_aio_generate_passes_keep_going_through(input_file, broken_nodes):
+    """
+    Input: aio.generate with keep_going on an input with two broken nodes.
+
+    Expected: one NodeBuildError naming both, as api.generate raises.
+
+    Why it matters: aio.generate promises the same arguments and results as
+    api.generate.
+    """
+    broken_nodes.update({"subject", "biospecimen"})
+
+    with pytest.raises(NodeBuildError) as caught:
+        asyncio.run(aio.generate(load_yaml(input_file), keep_going=True))
+
+    assert [name for name, _ in caught.value.failures] == ["subject", "biospecimen"]
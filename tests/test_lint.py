@@ -0,0 +1,189 @@
+"""
+Tests for the single-walk lint pass.
+
+Background: validate walked the bundle once per diagnostic, building a path
+string for every node it passed and concatenating result lists on the way back
+up. The lint pass walks each schema once, hands every value to each registered
+check and renders a path only for a value it reports. Its findings must be
+exactly those of the functions it replaces - same tuples, same order - or the
+messages validate prints would change.
+"""
+
+import os
+
+import pytest
+
+from gen3schemadev.lint import (
+    Check,
+    DanglingRefCheck,
+    LintPass,
+    NullDescriptionCheck,
+    format_path,
+    lint_bundle,
+)
+from gen3schemadev.refs import find_dangling_refs, find_null_descriptions
+from gen3schemadev.utils import bundle_yamls, read_json
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES = os.path.join(REPO_ROOT, "tests/gen3_schema/examples")
+
+
+def _null_descriptions(bundle):
+    return [(name, hit) for name, schema in bundle.items() for hit in find_null_descriptions(schema)]
+
+
+def _awkward_bundle():
+    """Nulls and dangling refs at every depth, inside lists and in document order."""
+    return {
+        "_definitions.yaml": {
+            "a": {"description": None, "$ref": "#/missing"},
+            "description": None,
+            "b": {"anyOf": [{"description": None}, {"$ref": "_terms.yaml#/nope"}]},
+            "ok": {"$ref": "#/a"},
+        },
+        "_terms.yaml": {"sex": {"description": "Biological sex"}},
+        "subject.yaml": {
+            "properties": {
+                "x": {"$ref": "_definitions.yaml#/b/anyOf/7"},
+                "y": [[{"description": None}]],
+            },
+            "description": None,
+        },
+    }
+
+
+@pytest.mark.parametrize("bundle", [
+    pytest.param(_awkward_bundle(), id="awkward"),
+    pytest.param(bundle_yamls(os.path.join(EXAMPLES, "yaml")), id="example-yaml"),
+    pytest.param(read_json(os.path.join(EXAMPLES, "json/gen3_develop_schema.json")), id="gen3-develop"),
+])
+def test_findings_match_the_functions_they_replace(bundle):
+    """
+    Input: a deliberately awkward bundle, the example dictionary and the
+    official Gen3 dictionary.
+
+    Expected: identical null-description and dangling-ref findings, in the
+    same order, as find_null_descriptions and find_dangling_refs.
+
+    Why it matters: validate prints these findings. Switching to one walk must
+    not change a single line of its output.
+    """
+    findings = lint_bundle(bundle)
+
+    assert findings["null_descriptions"] == _null_descriptions(bundle)
+    assert findings["dangling_refs"] == find_dangling_refs(bundle)
+
+
+def test_the_awkward_bundle_finds_everything():
+    """
+    Input: the awkward bundle above.
+
+    Expected: every placeholder and every dangling ref, with paths in the
+    .key / [i] notation.
+
+    Why it matters: guards the equality test above against both sides
+    finding nothing.
+    """
+    findings = lint_bundle(_awkward_bundle())
+
+    assert findings["null_descriptions"] == [
+        ("_definitions.yaml", "a.description"),
+        ("_definitions.yaml", "description"),
+        ("_definitions.yaml", "b.anyOf[0].description"),
+        ("subject.yaml", "properties.y[0][0].description"),
+        ("subject.yaml", "description"),
+    ]
+    assert [(source, path) for source, path, _ in findings["dangling_refs"]] == [
+        ("_definitions.yaml", "a"),
+        ("_definitions.yaml", "b.anyOf[1]"),
+        ("subject.yaml", "properties.x"),
+    ]
+
+
+def test_each_value_is_visited_once_and_paths_render_lazily(monkeypatch):
+    """
+    Input: a clean bundle walked with two checks registered.
+
+    Expected: each check sees every value exactly once, and no path is
+    rendered.
+
+    Why it matters: one walk and no wasted path strings are the two costs
+    this pass exists to remove.
+    """
+    import gen3schemadev.lint as lint
+
+    class Counter(Check):
+        types = (dict, list, str, int)
+
+        def __init__(self):
+            self.seen = 0
+
+        def visit(self, value, path, source):
+            self.seen += 1
+
+        def results(self):
+            return self.seen
+
+    rendered = []
+    real_format = lint.format_path
+    monkeypatch.setattr(lint, "format_path", lambda path: rendered.append(path) or real_format(path))
+
+    first, second = Counter(), Counter()
+    bundle = {"a.yaml": {"properties": {"x": {"type": "string"}, "y": [1, 2]}}}
+    LintPass([first, second, NullDescriptionCheck(), DanglingRefCheck()]).run(bundle)
+
+    # a.yaml root, properties, x, x.type, y, y[0], y[1]
+    assert first.results() == second.results() == 7
+    assert rendered == []
+
+
+def test_deep_nesting_does_not_hit_the_recursion_limit():
+    """
+    Input: a schema nested far deeper than Python's recursion limit.
+
+    Expected: the walk completes and finds the null at the bottom.
+
+    Why it matters: the walk is iterative, so unlike the recursive functions
+    it cannot fail on pathological input.
+    """
+    node = {"description": None}
+    for _ in range(5000):
+        node = {"k": node}
+
+    findings = lint_bundle({"deep.yaml": node})
+
+    assert findings["null_descriptions"] == [("deep.yaml", ".".join(["k"] * 5000 + ["description"]))]
+
+
+def test_format_path():
+    """
+    Input: lazily built paths mixing keys and indices.
+
+    Expected: the .key / [i] notation the existing diagnostics use.
+
+    Why it matters: these strings appear in messages users follow to a line.
+    """
+    root_key = (None, "properties", False)
+    assert format_path(None) == ""
+    assert format_path(root_key) == "properties"
+    assert format_path(((root_key, "anyOf", False), 0, True)) == "properties.anyOf[0]"
+    assert format_path((None, 3, True)) == "[3]"
+
+
+def test_a_check_missing_a_method_fails_at_construction():
+    """
+    Input: a Check subclass that implements visit but not results.
+
+    Expected: instantiating it raises TypeError.
+
+    Why it matters: the mistake should surface where the check is written,
+    not as a NotImplementedError after the whole bundle has been walked.
+    """
+    class Incomplete(Check):
+        types = (dict,)
+
+        def visit(self, value, path, source):
+            pass
+
+    with pytest.raises(TypeError, match="results"):
+        Incomplete()
@@ -0,0 +1,69 @@
+"""
+Tests for resolving nodes across a process pool.
+
+Background: once `_definitions.yaml` is resolved against `_terms.yaml`, every
+node resolves independently, yet they were resolved one at a time. The
+parallel mode hands the resolved references to each worker once and spreads
+the nodes over a pool. Nothing about the output may differ from serial
+resolution - not a value, and not the order of the mapping.
+"""
+
+import os
+
+from gen3schemadev.utils import read_json, resolve_bundle
+
+OFFICIAL_DICTIONARY = os.path.join(
+    os.path.dirname(__file__), "gen3_schema/examples/json", "gen3_develop_schema.json"
+)
+
+
+def test_parallel_resolution_is_identical_to_serial():
+    """
+    Input: the official 29-node Gen3 dictionary, resolved serially and with
+    two and three workers.
+
+    Expected: equal mappings with the same key order.
+
+    Why it matters: validate and the compiled artefact consume this output;
+    key order reaches the artefact's bytes, so it must match too.
+    """
+    bundle = read_json(OFFICIAL_DICTIONARY)
+    serial = resolve_bundle(bundle)
+
+    for workers in (2, 3):
+        parallel = resolve_bundle(bundle, workers=workers)
+        assert parallel == serial
+        assert list(parallel) == list(serial)
+
+
+def test_a_single_worker_does_not_start_a_pool(monkeypatch):
+    """
+    Input: resolution with workers=1.
+
+    Expected: no process pool is created.
+
+    Why it matters: a pool costs more to start than a small dictionary takes
+    to resolve, so asking for one worker must mean the plain loop.
+    """
+    import gen3schemadev.utils as utils
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a process pool was started for one worker")
+
+    monkeypatch.setattr(utils, "ProcessPoolExecutor", no_pool)
+
+    assert resolve_bundle(read_json(OFFICIAL_DICTIONARY), workers=1)
+
+
+def test_validate_accepts_jobs(run_cli, generated):
+    """
+    Input: validate --jobs 2 --no-cache on a generated dictionary.
+
+    Expected: validation succeeds.
+
+    Why it matters: --no-cache makes sure the parallel path actually runs,
+    rather than a cached resolution from an earlier test.
+    """
+    code, out = run_cli("validate", "-y", generated, "--jobs", "2", "--no-cache")
+
+    assert code == 0, out
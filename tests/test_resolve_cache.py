@@ -0,0 +1,194 @@
+"""
+Tests for the on-disk cache of resolved schemas.
+
+Background: resolution is the most expensive step of `validate`, and pipelines
+repeat it on bundles that have not changed. The resolved schemas are cached
+under a hash of the bundle and the resolver version, compressed, and evicted
+least-recently-used first once the cache outgrows its size limit.
+"""
+
+import gzip
+import os
+
+import pytest
+
+import gen3schemadev.resolve_cache as resolve_cache
+from gen3schemadev.resolve_cache import cache_key, evict, resolve_bundle_cached
+from gen3schemadev.utils import bundle_yamls, cache_dir, resolve_bundle
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_YAMLS = os.path.join(REPO_ROOT, "tests/gen3_schema/examples/yaml")
+
+
+@pytest.fixture
+def counted_resolutions(monkeypatch):
+    """Count calls to the underlying resolver."""
+    calls = []
+
+    def counting_resolve(bundle, **kwargs):
+        calls.append(bundle)
+        return resolve_bundle(bundle, **kwargs)
+
+    monkeypatch.setattr(resolve_cache, "resolve_bundle", counting_resolve)
+    return calls
+
+
+def test_an_unchanged_bundle_is_resolved_once(counted_resolutions):
+    """
+    Input: the example bundle resolved twice through the cache.
+
+    Expected: the resolver runs once, and both calls return the same schemas
+    resolve_bundle does.
+
+    Why it matters: skipping the second resolution is the whole point. The
+    result must be indistinguishable from resolving afresh.
+    """
+    bundle = bundle_yamls(EXAMPLE_YAMLS)
+
+    first = resolve_bundle_cached(bundle)
+    second = resolve_bundle_cached(bundle_yamls(EXAMPLE_YAMLS))
+
+    assert len(counted_resolutions) == 1
+    assert first == second == resolve_bundle(bundle)
+
+
+def test_reordered_properties_miss(counted_resolutions):
+    """
+    Input: a bundle resolved through the cache, then the same bundle with one
+    node's properties in reverse order.
+
+    Expected: the second call resolves afresh and returns the new order.
+
+    Why it matters: property order decides template column order and is
+    stored in compiled artefacts; a hit keyed on sorted content would hand
+    back the old order.
+    """
+    bundle = bundle_yamls(EXAMPLE_YAMLS)
+    resolve_bundle_cached(bundle)
+    node = next(name for name in bundle if not name.startswith("_") and len(bundle[name].get("properties", {})) > 1)
+    bundle[node]["properties"] = dict(reversed(list(bundle[node]["properties"].items())))
+
+    reordered = resolve_bundle_cached(bundle)
+
+    assert len(counted_resolutions) == 2
+    key = bundle[node]["id"] + ".yaml"
+    assert list(reordered[key]["properties"]) == list(resolve_bundle(bundle)[key]["properties"])
+
+
+def test_a_changed_bundle_or_resolver_misses(counted_resolutions, monkeypatch):
+    """
+    Input: a bundle resolved, then edited; then the resolver version changed.
+
+    Expected: each change causes a fresh resolution.
+
+    Why it matters: a stale hit would validate a dictionary that no longer
+    exists, or keep the output of a resolver bug after the fix was installed.
+    """
+    bundle = bundle_yamls(EXAMPLE_YAMLS)
+    resolve_bundle_cached(bundle)
+
+    bundle["subject.yaml"]["description"] = "edited"
+    resolve_bundle_cached(bundle)
+    monkeypatch.setattr(resolve_cache, "resolver_version", lambda: "a newer resolver")
+    resolve_bundle_cached(bundle)
+
+    assert len(counted_resolutions) == 3
+
+
+def test_no_cache_neither_reads_nor_writes(counted_resolutions):
+    """
+    Input: the same bundle resolved twice with use_cache=False.
+
+    Expected: two resolutions and an empty cache directory.
+
+    Why it matters: --no-cache is the escape hatch when the cache is
+    suspected; it must bypass it completely.
+    """
+    bundle = bundle_yamls(EXAMPLE_YAMLS)
+
+    resolve_bundle_cached(bundle, use_cache=False)
+    resolve_bundle_cached(bundle, use_cache=False)
+
+    assert len(counted_resolutions) == 2
+    assert os.listdir(cache_dir("resolved")) == []
+
+
+def test_a_corrupt_entry_is_a_miss(counted_resolutions):
+    """
+    Input: a cache entry truncated on disk.
+
+    Expected: the bundle is resolved again and the entry rewritten.
+
+    Why it matters: a run killed while writing, or a full disk, must not turn
+    into a validate failure that only clearing the cache fixes.
+    """
+    bundle = bundle_yamls(EXAMPLE_YAMLS)
+    resolve_bundle_cached(bundle)
+    entry = os.path.join(cache_dir("resolved"), cache_key(bundle) + ".json.gz")
+    with open(entry, "wb") as handle:
+        handle.write(b"\x1f\x8b not really gzip")
+
+    assert resolve_bundle_cached(bundle) == resolve_bundle(bundle)
+    assert len(counted_resolutions) == 2
+    with gzip.open(entry) as handle:
+        assert handle.read()
+
+
+def test_eviction_removes_least_recently_used_first():
+    """
+    Input: three entries of known size and age, and a limit that fits two.
+
+    Expected: only the oldest is removed.
+
+    Why it matters: the cache must stay bounded on CI runners that keep their
+    cache between jobs, without throwing away the entry about to be reused.
+    """
+    directory = cache_dir("resolved")
+    for age, name in enumerate(["newest", "middle", "oldest"]):
+        path = os.path.join(directory, f"{name}.json.gz")
+        with open(path, "wb") as handle:
+            handle.write(b"x" * 100)
+        os.utime(path, (1000 - age, 1000 - age))
+
+    removed = evict(max_bytes=250)
+
+    assert [os.path.basename(p) for p in removed] == ["oldest.json.gz"]
+    assert sorted(os.listdir(directory)) == ["middle.json.gz", "newest.json.gz"]
+
+
+def test_validate_reuses_the_cached_resolution(run_cli, generated, monkeypatch):
+    """
+    Input: validate -y run twice on the same dictionary.
+
+    Expected: both succeed, the second without resolving.
+
+    Why it matters: this is the repeated-pipeline case the cache exists for.
+    """
+    assert run_cli("validate", "-y", generated)[0] == 0
+
+    def no_resolution(bundle, **kwargs):
+        raise AssertionError("validate resolved an unchanged bundle")
+
+    monkeypatch.setattr(resolve_cache, "resolve_bundle", no_resolution)
+    code, out = run_cli("validate", "-y", generated)
+
+    assert code == 0, out
+
+
+def test_an_unusable_cache_location_resolves_without_it(counted_resolutions, tmp_path, monkeypatch):
+    """
+    Input: GEN3SCHEMADEV_CACHE_DIR pointing beneath a regular file, where no
+    directory can be created.
+
+    Expected: the bundle is resolved, as resolve_bundle resolves it.
+
+    Why it matters: the cache is only a shortcut; a read-only home directory
+    must not make validate fail with a traceback.
+    """
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setenv("GEN3SCHEMADEV_CACHE_DIR", str(blocker / "cache"))
+    bundle = bundle_yamls(EXAMPLE_YAMLS)
+
+    assert resolve_bundle_cached(bundle) == resolve_bundle(bundle)
+    assert evict(1) == []
@@ -0,0 +1,194 @@
+"""
+Tests for custom rules, rule selection and per-rule timings.
+
+Background: the rules validate runs were a hardcoded tuple, so an
+organisation's own conventions - naming schemes, mandatory `term` references -
+could only be checked by forking, and an expensive rule could not be skipped
+in a pre-commit hook. Rules can now come from a module (--rules-module) or an
+installed package (the `gen3schemadev.rules` entry point group), be chosen with
+--enable/--disable, and be timed with --rule-timings.
+"""
+
+import textwrap
+
+import pytest
+
+import gen3schemadev.validators.rule_validator as rule_validator
+from gen3schemadev.validators.rule_validator import (
+    RuleSelectionError,
+    RuleValidator,
+    available_rules,
+    load_plugin_rules,
+    register_rule,
+    select_rules,
+)
+
+BUILT_IN = RuleValidator._RULES
+
+
+@pytest.fixture(autouse=True)
+def isolated_registry(monkeypatch):
+    """Give each test an empty custom-rule registry."""
+    monkeypatch.setattr(rule_validator, "_CUSTOM_RULES", {})
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    """A rules module requiring every node id to start with 'sub'."""
+    path = tmp_path / "org_rules.py"
+    path.write_text(textwrap.dedent('''
+        from gen3schemadev.validators.rule_validator import register_rule
+
+        @register_rule("ids_start_with_sub")
+        def ids_start_with_sub(schema):
+            if not schema.get("id", "").startswith("sub"):
+                raise ValueError(f"Node id '{schema.get('id')}' must start with 'sub'.")
+    '''))
+    return str(path)
+
+
+def test_a_rules_module_adds_a_rule_that_is_reported_like_the_built_ins(run_cli, generated, rules_file):
+    """
+    Input: validate with --rules-module naming a file with one custom rule
+    that only `subject` passes.
+
+    Expected: exit code 1, with the violation reported under the custom rule's
+    name for the other node, and not for subject.
+
+    Why it matters: a custom rule is only useful if its failures fail the run
+    and read exactly like a built-in rule's.
+    """
+    code, out = run_cli("validate", "-y", generated, "--rules-module", rules_file)
+
+    assert code == 1
+    assert "[ids_start_with_sub] Node id 'biospecimen' must start with 'sub'." in out
+    assert "Node id 'subject'" not in out
+
+
+def test_disable_skips_a_rule(run_cli, generated, rules_file):
+    """
+    Input: the same custom rule, disabled.
+
+    Expected: validation passes.
+
+    Why it matters: pre-commit hooks need to skip slow or noisy rules without
+    editing the module that defines them.
+    """
+    code, out = run_cli(
+        "validate", "-y", generated, "--rules-module", rules_file, "--disable", "ids_start_with_sub"
+    )
+
+    assert code == 0, out
+
+
+def test_an_unknown_rule_name_is_refused(run_cli, generated):
+    """
+    Input: --disable naming a rule that does not exist.
+
+    Expected: exit code 1 naming the unknown rule and listing the real ones.
+
+    Why it matters: a misspelt --disable would otherwise leave the rule
+    running, and the user would believe it was off.
+    """
+    code, out = run_cli("validate", "-y", generated, "--disable", "link_props_exists")
+
+    assert code == 1
+    assert "Unknown rule: link_props_exists" in out
+    assert "link_props_exist" in out
+
+
+def test_rule_timings_lists_every_rule_that_ran(run_cli, generated):
+    """
+    Input: validate --rule-timings with one built-in rule disabled.
+
+    Expected: a table row for each rule that ran, and none for the disabled one.
+
+    Why it matters: the table exists to find the slow rule; a row for a rule
+    that never ran would send the reader after the wrong one.
+    """
+    code, out = run_cli(
+        "validate", "-y", generated, "--rule-timings", "--disable", "props_must_have_type"
+    )
+
+    assert code == 0, out
+    rows = {line.split()[0] for line in out.splitlines() if line and line.split()[0] in BUILT_IN}
+    assert rows == set(BUILT_IN) - {"props_must_have_type"}
+
+
+def test_timings_accumulate_across_schemas():
+    """
+    Input: two schemas validated with one shared timings dict.
+
+    Expected: a total for every rule, with rules restricted to the selection.
+
+    Why it matters: the table reports time across the whole dictionary, which
+    is where a rule that is cheap per node but runs on hundreds adds up.
+    """
+    timings = {}
+    rules = ("props_must_have_type", "link_props_exist")
+    for schema in ({"id": "a", "properties": {}}, {"id": "b", "properties": {}}):
+        RuleValidator(schema, rules=rules, timings=timings).validate()
+
+    assert set(timings) == set(rules)
+    assert all(seconds >= 0 for seconds in timings.values())
+
+
+def test_select_rules_keeps_the_declared_order():
+    """
+    Input: a custom rule registered, then selections with --enable/--disable.
+
+    Expected: built-in rules first, custom after, filtered by the selection.
+
+    Why it matters: rules run and report in a stable order, so two runs of the
+    same dictionary produce the same output.
+    """
+    @register_rule()
+    def custom(schema):
+        pass
+
+    assert available_rules() == BUILT_IN + ("custom",)
+    assert select_rules(enable=["custom", "link_props_exist"]) == ("link_props_exist", "custom")
+    assert select_rules(disable=list(BUILT_IN)) == ("custom",)
+
+
+def test_a_custom_rule_cannot_take_a_built_in_name():
+    """
+    Input: a custom rule registered as 'link_props_exist'.
+
+    Expected: RuleSelectionError.
+
+    Why it matters: a plugin must not be able to quietly replace a Gen3
+    business rule with a weaker one.
+    """
+    with pytest.raises(RuleSelectionError):
+        register_rule("link_props_exist")(lambda schema: None)
+
+
+def test_entry_point_rules_are_registered_under_their_entry_point_name(monkeypatch):
+    """
+    Input: an installed package exposing a rule function through the
+    gen3schemadev.rules entry point group.
+
+    Expected: the rule is available under the entry point's name and runs.
+
+    Why it matters: an organisation packages its rules once and every
+    repository that installs the package gets them, without a flag.
+    """
+    def must_have_title(schema):
+        if "title" not in schema:
+            raise ValueError("Node has no title.")
+
+    class FakeEntryPoint:
+        name = "must_have_title"
+
+        def load(self):
+            return must_have_title
+
+    monkeypatch.setattr(
+        rule_validator, "entry_points",
+        lambda group: [FakeEntryPoint()] if group == "gen3schemadev.rules" else [],
+    )
+
+    assert load_plugin_rules() == ["must_have_title"]
+    violations = RuleValidator({"id": "x", "properties": {}}, rules=["must_have_title"]).validate()
+    assert violations == [{"schema": "x", "rule": "must_have_title", "message": "Node has no title."}]
@@ -0,0 +1,283 @@
+"""
+Tests for `simulate`, which writes synthetic linked submission data.
+
+Background: load-testing a Gen3 instance or an ETL needs a lot of metadata
+that looks like a real submission: every record linked to an existing parent,
+every value one the dictionary accepts. simulate generates it from the
+dictionary, parents first, a batch at a time.
+"""
+
+import csv
+import json
+import os
+import random
+import re
+
+import jsonschema
+import pytest
+
+from gen3schemadev.simulator import (
+    RegexGenerator,
+    SimulationError,
+    column_generator,
+    topological_order,
+)
+
+OFFICIAL_DICTIONARY = os.path.join(
+    os.path.dirname(__file__), "gen3_schema/examples/json", "gen3_develop_schema.json"
+)
+
+
+@pytest.fixture
+def bundle(run_cli, generated, tmp_path):
+    """The minimal dictionary, bundled."""
+    path = str(tmp_path / "schema.json")
+    assert run_cli("bundle", "-i", generated, "-f", path)[0] == 0
+    return path
+
+
+def read_tsv(path):
+    with open(path, newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle, delimiter="\t"))
+
+
+def test_parents_come_before_children():
+    """
+    Input: a link graph listed child first, with project links that are never
+    generated.
+
+    Expected: every parent precedes its children; ties are alphabetical.
+
+    Why it matters: a child written before its parent links to records that
+    do not exist yet when the files are submitted in order.
+    """
+    graph = {
+        "aliquot": [("samples", "sample")],
+        "sample": [("subjects", "subject")],
+        "subject": [("projects", "project")],
+        "study": [("projects", "project")],
+    }
+
+    assert topological_order(graph) == ["study", "subject", "sample", "aliquot"]
+
+
+def test_link_cycle_is_reported():
+    """
+    Input: two nodes that link to each other.
+
+    Expected: SimulationError naming both.
+
+    Why it matters: a cycle has no parent-first order; looping or silently
+    dropping nodes would both be wrong.
+    """
+    with pytest.raises(SimulationError, match="a, b"):
+        topological_order({"a": [("bs", "b")], "b": [("as", "a")]})
+
+
+def test_links_name_existing_parent_records(run_cli, bundle, tmp_path):
+    """
+    Input: simulate 25 records per node of the minimal dictionary.
+
+    Expected: one TSV per node with 25 rows, each biospecimen linking to a
+    subject that was written, and subjects linking to the given project.
+
+    Why it matters: links to records that do not exist make the whole
+    submission fail.
+    """
+    out = tmp_path / "sim"
+    code, output = run_cli(
+        "simulate", "--schema", bundle, "--records", "25", "-o", str(out), "--project-code", "P1"
+    )
+
+    assert code == 0, output
+    subjects = read_tsv(out / "subject.tsv")
+    biospecimens = read_tsv(out / "biospecimen.tsv")
+    assert len(subjects) == len(biospecimens) == 25
+    assert {row["projects.code"] for row in subjects} == {"P1"}
+    assert {row["subjects.submitter_id"] for row in biospecimens} <= {row["submitter_id"] for row in subjects}
+    assert {row["species"] for row in subjects} <= {"Human", "Mouse"}
+
+
+def test_output_passes_validate_data(run_cli, bundle, tmp_path):
+    """
+    Input: simulated data for the minimal dictionary, with --records 1e2.
+
+    Expected: validate-data accepts every record, in every node file.
+
+    Why it matters: synthetic data the dictionary rejects tests the rejection
+    path, not the load it was generated for.
+    """
+    out = tmp_path / "sim"
+    assert run_cli("simulate", "--schema", bundle, "--records", "1e2", "-o", str(out))[0] == 0
+
+    code, output = run_cli("validate-data", "--schema", bundle, str(out))
+
+    assert code == 0, output
+    assert "300 records in 3 files" in output
+
+
+def test_official_dictionary_output_passes_validate_data(run_cli, tmp_path):
+    """
+    Input: simulated data for the official Gen3 dictionary, whose nodes have
+    exclusive link subgroups.
+
+    Expected: validate-data accepts every record; a node links through one
+    member of an exclusive subgroup and has no column for the others.
+
+    Why it matters: the members not linked through are still link
+    properties - filled in as ordinary columns they are invalid values.
+    """
+    out = tmp_path / "sim"
+    assert run_cli("simulate", "--schema", OFFICIAL_DICTIONARY, "--records", "20", "-o", str(out))[0] == 0
+
+    code, output = run_cli("validate-data", "--schema", OFFICIAL_DICTIONARY, str(out))
+
+    assert code == 0, output
+    header = read_tsv(out / "submitted_copy_number.tsv")[0]
+    assert "read_groups" not in header and "read_groups.submitter_id" not in header
+
+
+@pytest.mark.parametrize("option, value", [("--batch-size", "0"), ("--records", "inf"), ("--records", "nan")])
+def test_unusable_counts_are_rejected(run_cli, bundle, tmp_path, option, value):
+    """
+    Input: a batch size of 0, and record counts of inf and nan.
+
+    Expected: a usage error naming the option, and nothing written.
+
+    Why it matters: each used to end in a traceback, or in a loop that never
+    advances.
+    """
+    args = {"--records": "10", "--batch-size": "5", option: value}
+    out = tmp_path / "sim"
+
+    code, _ = run_cli("simulate", "--schema", bundle, "-o", str(out), *[x for kv in args.items() for x in kv])
+
+    assert code == 2
+    assert not out.exists()
+
+
+def test_seed_makes_output_reproducible(run_cli, bundle, tmp_path):
+    """
+    Input: simulate twice with the same seed and a small batch size.
+
+    Expected: byte-identical files.
+
+    Why it matters: a load test that fails has to be re-runnable on the same
+    data.
+    """
+    for name in ("one", "two"):
+        args = ("--records", "30", "--seed", "7", "--batch-size", "4", "-o", str(tmp_path / name))
+        assert run_cli("simulate", "--schema", bundle, *args)[0] == 0
+
+    for node in ("subject", "biospecimen"):
+        assert (tmp_path / "one" / f"{node}.tsv").read_bytes() == (tmp_path / "two" / f"{node}.tsv").read_bytes()
+
+
+@pytest.mark.parametrize("pattern", [
+    r"^[0-9a-f]{32}$",
+    r"^(GSM|SRR)\d{4,6}-[A-Z]+$",
+    r"^[^/]+\.txt$",
+    r"^x?y*(ab|cd)$",
+])
+def test_pattern_values_match_the_pattern(pattern):
+    """
+    Input: patterns of the kinds dictionaries use for ids and checksums.
+
+    Expected: every generated value matches.
+
+    Why it matters: a pattern property filled with placeholder text fails
+    validation on every record.
+    """
+    generate = RegexGenerator(pattern)
+    rng = random.Random(0)
+
+    assert all(re.fullmatch(pattern, generate(rng)) for _ in range(200))
+
+
+def test_values_respect_type_and_bounds():
+    """
+    Input: bounded integer and number properties, and a nullable enum.
+
+    Expected: integers within bounds, numbers within bounds, enum members only.
+
+    Why it matters: out-of-range values are rejected just like wrong types.
+    """
+    rng = random.Random(0)
+    integers = column_generator("age", {"type": "integer", "minimum": 18, "maximum": 21})(rng, 0, 500)
+    numbers = column_generator("bmi", {"type": ["number", "null"], "minimum": 10.5, "maximum": 11})(rng, 0, 500)
+    enums = column_generator("sex", {"oneOf": [{"enum": ["F", "M"]}, {"type": "null"}]})(rng, 0, 500)
+
+    assert {int(value) for value in integers} == {18, 19, 20, 21}
+    assert all(10.5 <= float(value) <= 11 for value in numbers)
+    assert set(enums) == {"F", "M"}
+
+
+def test_a_negative_maximum_alone_bounds_the_range():
+    """
+    Input: an integer and a number property with a negative maximum and no
+    minimum.
+
+    Expected: every value is at most the maximum.
+
+    Why it matters: a range starting at zero is empty there, and randint
+    raised on it.
+    """
+    rng = random.Random(0)
+    integers = column_generator("offset", {"type": "integer", "maximum": -5})(rng, 0, 200)
+    numbers = column_generator("delta", {"type": "number", "maximum": -0.5})(rng, 0, 200)
+
+    assert all(int(value) <= -5 for value in integers)
+    assert all(float(value) <= -0.5 for value in numbers)
+
+
+@pytest.mark.parametrize("schema", [
+    {"type": "integer", "minimum": 1, "exclusiveMinimum": True, "maximum": 3, "exclusiveMaximum": True},
+    {"type": "integer", "exclusiveMinimum": 2.5, "maximum": 4},
+    {"type": "number", "minimum": 0, "exclusiveMinimum": True, "maximum": 0.02},
+    {"type": "number", "exclusiveMinimum": 0.001, "exclusiveMaximum": 0.009},
+    {"type": "number", "minimum": 0.5, "maximum": 0.5},
+])
+def test_values_respect_exclusive_bounds(schema):
+    """
+    Input: exclusive bounds as draft 4 flags and as later drafts' numbers,
+    a range narrower than two decimal places, and a single-value range.
+
+    Expected: every value satisfies the schema it was generated from.
+
+    Why it matters: exclusive bounds were ignored, so a schema could reject
+    its own simulated data.
+    """
+    validator = jsonschema.Draft4Validator if isinstance(schema.get("exclusiveMinimum"), bool) \
+        else jsonschema.Draft7Validator
+    convert = int if schema["type"] == "integer" else float
+
+    values = column_generator("x", schema)(random.Random(0), 0, 300)
+
+    assert all(validator(schema).is_valid(convert(value)) for value in values)
+
+
+@pytest.mark.parametrize("bounds, expected", [
+    ({"minimum": 5, "maximum": 3}, "no integer is >= 5 and <= 3"),
+    ({"minimum": 1, "maximum": 2, "exclusiveMinimum": True, "exclusiveMaximum": True}, "no integer is > 1 and < 2"),
+])
+def test_empty_bounds_name_the_node_and_property(run_cli, bundle, tmp_path, bounds, expected):
+    """
+    Input: simulate on a dictionary with an integer property whose bounds
+    admit no value.
+
+    Expected: exit code 1 and a message naming the node, the property and
+    the bounds; no traceback.
+
+    Why it matters: randint raised a bare ValueError partway through the
+    run, with nothing to say which of hundreds of properties was at fault.
+    """
+    with open(bundle) as handle:
+        schemas = json.load(handle)
+    schemas["subject.yaml"]["properties"]["age"] = {"type": "integer", **bounds}
+    with open(bundle, "w") as handle:
+        json.dump(schemas, handle)
+
+    code, output = run_cli("simulate", "--schema", bundle, "--records", "5", "-o", str(tmp_path / "sim"))
+
+    assert code == 1
+    assert f"Node 'subject' property 'age': {expected}" in output
@@ -0,0 +1,140 @@
+"""
+Tests for `visualise --static`, the Docker-free HTML rendering of the node graph.
+
+Background: `visualise` runs DDVis in Docker, which is slow and impossible in
+a locked-down CI. --static lays the graph out in Python and writes one
+self-contained HTML file that can be attached to a pull request.
+"""
+
+import copy
+import json
+import os
+import re
+
+from gen3schemadev.staticvis import MAX_PER_ROW, build_graph, layered_layout, render_html
+from gen3schemadev.utils import read_json
+
+OFFICIAL_DICTIONARY = os.path.join(
+    os.path.dirname(__file__), "gen3_schema/examples/json", "gen3_develop_schema.json"
+)
+
+
+def test_every_node_is_below_its_parents():
+    """
+    Input: the official Gen3 dictionary.
+
+    Expected: every node is drawn on a lower row than each of its parents,
+    with program at the top.
+
+    Why it matters: a dictionary is read top-down from program; a child drawn
+    above its parent makes the graph unreadable.
+    """
+    nodes, links = build_graph(read_json(OFFICIAL_DICTIONARY))
+    positions = layered_layout(nodes, links)
+
+    assert set(positions) == set(nodes)
+    assert positions["program"][1] == min(y for _, y in positions.values())
+    for child, parent, _, _ in links:
+        assert positions[child][1] > positions[parent][1], (child, parent)
+
+
+def test_link_cycle_still_places_every_node():
+    """
+    Input: two nodes linking to each other, and a third linking to one of them.
+
+    Expected: all three are placed, on distinct positions.
+
+    Why it matters: the rendering is for reviewing dictionaries, including
+    broken ones; a cycle must not hang the layout or drop nodes.
+    """
+    positions = layered_layout(["a", "b", "c"], [("a", "b"), ("b", "a"), ("c", "a")])
+
+    assert len(set(positions.values())) == 3
+
+
+def test_wide_layers_wrap_onto_rows():
+    """
+    Input: 500 nodes, all children of one root.
+
+    Expected: no row holds more than MAX_PER_ROW nodes, and no two nodes share
+    a position.
+
+    Why it matters: 500 siblings on one line is a picture nobody can read.
+    """
+    nodes = ["root"] + [f"n{i:03d}" for i in range(500)]
+    links = [(node, "root") for node in nodes[1:]]
+
+    positions = layered_layout(nodes, links)
+
+    rows = {}
+    for x, y in positions.values():
+        rows[y] = rows.get(y, 0) + 1
+    assert max(rows.values()) <= MAX_PER_ROW
+    assert len(set(positions.values())) == len(nodes)
+
+
+def test_cli_writes_self_contained_html(run_cli, tmp_path):
+    """
+    Input: visualise --static on the official dictionary cloned to 500+ nodes.
+
+    Expected: exit code 0 and one HTML file with an inline SVG box per node,
+    referencing no external scripts, stylesheets or images.
+
+    Why it matters: the file is attached to pull requests and opened offline;
+    anything fetched from elsewhere may be blocked or gone.
+    """
+    bundle = read_json(OFFICIAL_DICTIONARY)
+    for name, schema in list(bundle.items()):
+        if name.startswith("_") or "id" not in schema:
+            continue
+        for copy_number in range(1, 20):
+            clone = copy.deepcopy(schema)
+            clone["id"] = f"{schema['id']}_{copy_number}"
+            bundle[f"{clone['id']}.yaml"] = clone
+    source = tmp_path / "big.json"
+    source.write_text(json.dumps(bundle))
+    out = tmp_path / "graph" / "out.html"
+
+    code, output = run_cli("visualise", "-i", str(source), "--static", str(out))
+
+    assert code == 0, output
+    page = out.read_text(encoding="utf-8")
+    assert page.count('class="node"') == len(build_graph(bundle)[0]) > 500
+    assert not re.search(r'(src|href)="(https?:)?//', page)
+
+
+def test_rendering_escapes_dictionary_text():
+    """
+    Input: a node whose title and description contain HTML.
+
+    Expected: the text appears escaped.
+
+    Why it matters: dictionary text is untrusted input to a page opened in a
+    browser.
+    """
+    bundle = {"x.yaml": {"id": "x", "title": "<b>X</b>", "description": "<script>alert(1)</script>"}}
+
+    page = render_html(bundle, "t")
+
+    assert "<script>" not in page
+    assert "&lt;b&gt;X&lt;/b&gt;" in page
+
+
+def test_watch_is_rejected_with_static(run_cli, tmp_path):
+    """
+    Input: visualise --static OUT.html --watch.
+
+    Expected: a usage error (exit code 2) and no file written.
+
+    Why it matters: --watch copies the bundle into DDVis, which --static never
+    starts; ignoring it would leave the user waiting for reloads that never
+    come.
+    """
+    source = tmp_path / "schema.json"
+    source.write_text(json.dumps({"x.yaml": {"id": "x"}}))
+    out = tmp_path / "out.html"
+
+    code, _ = run_cli("visualise", "-i", str(source), "--static", str(out), "--watch")
+
+    assert code == 2
+    assert not out.exists()
@@ -0,0 +1,153 @@
+"""
+Tests for `templates`, which writes a submission TSV template per node.
+
+Background: submitters need a TSV header per node naming exactly the columns
+Gen3 expects, and these were derived from the resolved YAMLs by hand.
+templates derives them from the dictionary, with hints beside them, and only
+rewrites the files whose content changed so it is cheap to run in CI.
+"""
+
+import os
+
+import pytest
+
+from gen3schemadev.templates import render_templates, template_columns
+from gen3schemadev.utils import read_json, resolve_bundle
+
+OFFICIAL_DICTIONARY = os.path.join(
+    os.path.dirname(__file__), "gen3_schema/examples/json", "gen3_develop_schema.json"
+)
+
+
+@pytest.fixture
+def bundle(run_cli, generated, tmp_path):
+    """The minimal dictionary, bundled."""
+    path = str(tmp_path / "schema.json")
+    assert run_cli("bundle", "-i", generated, "-f", path)[0] == 0
+    return path
+
+
+def test_columns_put_links_and_required_properties_first():
+    """
+    Input: a node with an optional property declared before a required one,
+    an optional and a required link, and system properties.
+
+    Expected: type, submitter_id, the required link, the optional link, the
+    required property, the optional property; no system properties.
+
+    Why it matters: submitters fill templates left to right, and the columns
+    Gen3 rejects a record without should be the first they see.
+    """
+    schema = {
+        "id": "sample",
+        "systemProperties": ["id", "project_id"],
+        "links": [
+            {"name": "visits", "target_type": "visit", "required": False},
+            {"name": "subjects", "target_type": "subject", "required": True},
+        ],
+        "required": ["submitter_id", "type", "sample_type"],
+        "properties": {
+            "type": {"enum": ["sample"]},
+            "id": {"type": "string"},
+            "project_id": {"type": "string"},
+            "submitter_id": {"type": "string"},
+            "notes": {"type": "string"},
+            "sample_type": {"enum": ["Blood", "Tissue"]},
+            "subjects": {"type": "array"},
+            "visits": {"type": "array"},
+        },
+    }
+
+    columns = [column for column, _, _ in template_columns(schema)]
+
+    assert columns == [
+        "type", "submitter_id", "subjects.submitter_id", "visits.submitter_id", "sample_type", "notes",
+    ]
+
+
+def test_every_member_of_an_exclusive_subgroup_gets_a_link_column():
+    """
+    Input: submitted_copy_number from the official dictionary, which links
+    to exactly one of aliquots or read_groups.
+
+    Expected: a link column for each member, hinted as a link, and no plain
+    column for either.
+
+    Why it matters: the submitter chooses the parent per record; a bare
+    read_groups column described as "array or object" cannot be filled in.
+    """
+    resolved = resolve_bundle(read_json(OFFICIAL_DICTIONARY))
+
+    rendered = render_templates({"submitted_copy_number.yaml": resolved["submitted_copy_number.yaml"]})
+
+    header = rendered["submitted_copy_number.tsv"].rstrip("\n").split("\t")
+    assert {"aliquots.submitter_id", "read_groups.submitter_id"} <= set(header)
+    assert "read_groups" not in header and "aliquots" not in header
+    hints = rendered["submitted_copy_number.hints.tsv"]
+    assert "read_groups.submitter_id\tno\tlink\t" in hints
+
+
+def test_templates_for_every_node(run_cli, bundle, tmp_path):
+    """
+    Input: templates for the minimal dictionary.
+
+    Expected: a header-only TSV per node, with link columns such as
+    subjects.submitter_id and projects.code, and a hints file listing enum
+    values.
+
+    Why it matters: the template is submitted as filled in, so it must hold
+    nothing but the header; the hints are what make it fillable.
+    """
+    out = tmp_path / "templates"
+
+    code, output = run_cli("templates", "--schema", bundle, "-o", str(out))
+
+    assert code == 0, output
+    subject = (out / "subject.tsv").read_text().splitlines()
+    assert len(subject) == 1
+    assert subject[0].split("\t")[:4] == ["type", "submitter_id", "projects.code", "submitter_subject_id"]
+    assert "subjects.submitter_id" in (out / "biospecimen.tsv").read_text().split("\t")
+    hints = (out / "subject.hints.tsv").read_text()
+    assert "species\tno\tenum\tHuman, Mouse" in hints
+
+
+def test_unchanged_templates_are_not_rewritten(run_cli, bundle, tmp_path):
+    """
+    Input: templates run twice, with one template edited in between.
+
+    Expected: the second run rewrites only the edited file and leaves the
+    others' mtimes untouched.
+
+    Why it matters: CI runs this on every commit; rewriting every file would
+    churn mtimes and invalidate caches for no change.
+    """
+    out = tmp_path / "templates"
+    assert run_cli("templates", "--schema", bundle, "-o", str(out))[0] == 0
+    for path in out.iterdir():
+        os.utime(path, (1, 1))
+    (out / "subject.tsv").write_text("stale\n")
+    os.utime(out / "subject.tsv", (1, 1))
+
+    code, output = run_cli("templates", "--schema", bundle, "-o", str(out), "-j", "4")
+
+    assert code == 0, output
+    rewritten = sorted(path.name for path in out.iterdir() if path.stat().st_mtime != 1)
+    assert rewritten == ["subject.tsv"]
+    assert (out / "subject.tsv").read_text().startswith("type\tsubmitter_id")
+    assert "Wrote 1 template files" in output
+
+
+def test_rendering_is_deterministic(bundle):
+    """
+    Input: the same resolved dictionary rendered twice.
+
+    Expected: identical output, keyed in sorted order.
+
+    Why it matters: skipping unchanged files relies on the same dictionary
+    always rendering the same bytes.
+    """
+    resolved = resolve_bundle(read_json(bundle))
+
+    first = render_templates(resolved)
+    assert first == render_templates(resolved)
+    assert list(first) == sorted(first)
@@ -0,0 +1,166 @@
+"""
+Tests for `gen3schemadev.tracing` and the --trace option.
+
+Background: finding out why a run was slow meant --debug and tens of
+thousands of log lines, and the logging itself was part of the cost: hot paths
+formatted whole dicts into f-strings even when nothing was logged. Tracing
+records each stage and node as a timed span, costs nothing when off, and
+--trace writes the spans as a Chrome trace-event file.
+"""
+
+import json
+import logging
+import threading
+
+import pytest
+
+from gen3schemadev import tracing
+from gen3schemadev.validators.rule_validator import RuleValidator
+
+
+def test_untraced_spans_do_nothing():
+    """
+    Input: a span with a callable field, opened while no trace is recording.
+
+    Expected: the shared no-op span is returned and the callable never runs.
+
+    Why it matters: spans sit on per-node hot paths; an untraced run must not
+    pay for them.
+    """
+    calls = []
+
+    with tracing.span("resolve", "node", node=lambda: calls.append(1)) as span:
+        span.set(count=lambda: calls.append(2))
+
+    assert span is tracing._NULL_SPAN
+    assert calls == []
+    assert not tracing.enabled()
+
+
+def test_recording_collects_spans_from_every_thread():
+    """
+    Input: spans opened on the main thread and on two worker threads while
+    recording, one of them raising.
+
+    Expected: every span is recorded as a complete event with its thread,
+    lazy fields are evaluated, and the raising span carries the error type.
+
+    Why it matters: templates and the async API do their work on threads; a
+    trace that only saw the main thread would show them as idle.
+    """
+    def work(name):
+        with tracing.span(name, "node", node=lambda: name.upper()):
+            pass
+
+    with tracing.recording() as tracer:
+        threads = [threading.Thread(target=work, args=(f"n{i}",)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with pytest.raises(KeyError):
+            with tracing.span("broken") as span:
+                span.set(done=3)
+                raise KeyError("x")
+
+    events = {event["name"]: event for event in tracer.to_chrome()["traceEvents"]}
+    assert set(events) == {"n0", "n1", "broken"}
+    assert events["n0"]["args"] == {"node": "N0"}
+    assert events["broken"]["args"] == {"done": 3, "error": "KeyError"}
+    assert len({events[name]["tid"] for name in events}) == 3
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events.values())
+    assert not tracing.enabled()
+
+
+def test_rule_checks_do_not_format_unlogged_messages():
+    """
+    Input: a schema whose properties and links count every time they are
+    turned into text, validated with logging at ERROR.
+
+    Expected: they are never turned into text.
+
+    Why it matters: the rule checks used to format whole property dicts into
+    debug messages that were then discarded - work done for every node on
+    every run.
+    """
+    formatted = []
+
+    class Counting(dict):
+        def __repr__(self):
+            formatted.append(1)
+            return dict.__repr__(self)
+
+        __str__ = __repr__
+
+    schema = {
+        "id": "node",
+        "category": "clinical",
+        "links": [],
+        "properties": Counting({"name": {"type": "string"}}),
+    }
+    logger = logging.getLogger("gen3schemadev")
+    level = logger.level
+    logger.setLevel(logging.ERROR)
+    try:
+        RuleValidator(schema).validate()
+    finally:
+        logger.setLevel(level)
+
+    assert formatted == []
+
+
+def test_validate_writes_chrome_trace(run_cli, generated, tmp_path):
+    """
+    Input: validate -y on a generated dictionary with --trace.
+
+    Expected: exit code 0 and a trace-event file holding the command, its
+    stages, a resolve and a metaschema span per node, and a span per rule.
+
+    Why it matters: this file is what gets opened in the trace viewer; a
+    stage missing from it is time nobody can account for.
+    """
+    trace = tmp_path / "trace" / "out.json"
+
+    code, output = run_cli("validate", "-y", generated, "--no-cache", "--trace", str(trace))
+
+    assert code == 0, output
+    events = json.loads(trace.read_text())["traceEvents"]
+    by_name = {}
+    for event in events:
+        assert {"name", "cat", "ph", "ts", "dur", "pid", "tid", "args"} <= set(event)
+        by_name.setdefault((event["name"], event["cat"]), []).append(event)
+    assert ("validate", "command") in by_name
+    assert ("lint", "stage") in by_name
+    assert by_name[("resolve", "stage")][0]["args"]["cache"] == "off"
+    resolved_nodes = {event["args"]["node"] for event in by_name[("resolve", "node")]}
+    checked_nodes = {event["args"]["node"] for event in by_name[("metaschema", "node")]}
+    assert {"subject", "biospecimen"} <= resolved_nodes
+    assert {"subject.yaml", "biospecimen.yaml"} <= checked_nodes
+    assert ("props_must_have_type", "rule") in by_name
+    assert f"Wrote trace of {len(events)} spans" in output
+
+
+def test_failing_run_still_writes_its_trace(run_cli, input_file, tmp_path):
+    """
+    Input: validate with --trace on a directory that fails the rule checks.
+
+    Expected: exit code 1, and the trace is written with the failing rule's
+    span marked as an error.
+
+    Why it matters: a failing run is often the one worth tracing.
+    """
+    dictionary = tmp_path / "broken"
+    code, _ = run_cli("generate", "-i", input_file, "-o", str(dictionary))
+    assert code == 0
+    subject = dictionary / "subject.yaml"
+    subject.write_text(subject.read_text().replace("properties:", "properties:\n  untyped: {}", 1))
+    trace = tmp_path / "out.json"
+
+    code, _ = run_cli("validate", "-y", str(dictionary), "--trace", str(trace))
+
+    assert code == 1
+    events = json.loads(trace.read_text())["traceEvents"]
+    assert any(
+        event["name"] == "props_must_have_type" and event["args"].get("error") == "ValueError"
+        for event in events
+    )
@@ -0,0 +1,192 @@
+"""
+Tests for `validate --changed-since REV` and `validate --staged`.
+
+Background: in a pre-commit hook, validate -y checked every node even when
+one file had changed. These options ask git what changed and validate only
+the nodes a change can affect: the edited nodes, the nodes linking to them,
+and the nodes using a changed definition.
+"""
+
+import os
+import re
+import subprocess
+
+import pytest
+
+from gen3schemadev.changes import affected_nodes, changed_keys
+from gen3schemadev.utils import bundle_yamls
+
+EXAMPLE_INPUT = os.path.join(os.path.dirname(__file__), "input_example.yml")
+
+
+def git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", "-C", str(repo), *args],
+        check=True, capture_output=True,
+    )
+
+
+def edit(path, old, new):
+    with open(path) as handle:
+        text = handle.read()
+    assert old in text
+    with open(path, "w") as handle:
+        handle.write(text.replace(old, new, 1))
+
+
+def checked_nodes(output):
+    return sorted(re.findall(r"Metaschema validation complete for: (\S+)", output))
+
+
+@pytest.fixture
+def repo(run_cli, tmp_path):
+    """A git repository holding the example dictionary, committed."""
+    git(tmp_path, "init", "-q")
+    dictionary = tmp_path / "dictionary"
+    assert run_cli("generate", "-i", EXAMPLE_INPUT, "-o", str(dictionary))[0] == 0
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "baseline")
+    return dictionary
+
+
+def test_nothing_changed_validates_nothing(run_cli, repo):
+    """
+    Input: --changed-since HEAD on a clean work tree.
+
+    Expected: exit code 0, a message saying there is nothing to validate, and
+    no node checked.
+
+    Why it matters: a commit touching no dictionary file should not pay for
+    a validate run at all.
+    """
+    code, output = run_cli("validate", "-y", str(repo), "--changed-since", "HEAD")
+
+    assert code == 0, output
+    assert "nothing to validate" in output
+    assert checked_nodes(output) == []
+
+
+def test_edited_node_is_checked_with_its_children(run_cli, repo):
+    """
+    Input: an edit to assay.yaml, validated with --changed-since HEAD.
+
+    Expected: exit code 0, and only assay and lipidomics_file, which links
+    to assay, pass the metaschema check.
+
+    Why it matters: the hook is fast only if unaffected nodes are skipped,
+    and correct only if a node whose parent changed is not.
+    """
+    edit(repo / "assay.yaml", "description:", "title: Edited\ndescription:")
+
+    code, output = run_cli("validate", "-y", str(repo), "--changed-since", "HEAD")
+
+    assert code == 0, output
+    assert checked_nodes(output) == ["assay.yaml", "lipidomics_file.yaml"]
+    assert "affecting 2 of" in output
+
+
+def test_changed_definition_checks_the_nodes_using_it(run_cli, repo):
+    """
+    Input: a change to the to_many entry of _definitions.yaml.
+
+    Expected: only assay, the one node referencing to_many, is checked.
+
+    Why it matters: a definition edit changes every node using it though no
+    node file changed; those nodes are the ones that can break.
+    """
+    edit(repo / "_definitions.yaml", "to_many:\n", "to_many:\n  title: Edited\n")
+
+    code, output = run_cli("validate", "-y", str(repo), "--changed-since", "HEAD")
+
+    assert code == 0, output
+    assert checked_nodes(output) == ["assay.yaml"]
+
+
+def test_staged_sees_only_staged_changes(run_cli, repo):
+    """
+    Input: an edit to sample.yaml that is staged and one to assay.yaml that
+    is not, validated with --staged.
+
+    Expected: sample and its children are checked; the unstaged edit to
+    assay alone would not have selected sample.
+
+    Why it matters: pre-commit validates what is about to be committed.
+    """
+    edit(repo / "sample.yaml", "description:", "title: Edited\ndescription:")
+    git(repo, "add", "sample.yaml")
+    edit(repo / "program.yaml", "description:", "title: Edited\ndescription:")
+
+    code, output = run_cli("validate", "-y", str(repo), "--staged")
+
+    assert code == 0, output
+    assert "sample.yaml" in checked_nodes(output)
+    assert "1 files staged for commit" in output
+    assert "program.yaml" not in checked_nodes(output)
+
+
+def test_rule_violation_in_changed_node_fails(run_cli, repo):
+    """
+    Input: an untyped property added to sample.yaml, validated with
+    --changed-since HEAD.
+
+    Expected: exit code 1 with the rule violation reported.
+
+    Why it matters: narrowing the run must not narrow what is checked in
+    the nodes it keeps.
+    """
+    edit(repo / "sample.yaml", "properties:", "properties:\n  untyped: {}")
+
+    code, output = run_cli("validate", "-y", str(repo), "--changed-since", "HEAD")
+
+    assert code == 1
+    assert "FAILED: 1 rule violation" in output
+
+
+@pytest.mark.parametrize("problem", ["not a repository", "bundled file", "bad revision"])
+def test_unavailable_history_is_an_error(run_cli, repo, tmp_path_factory, problem):
+    """
+    Input: --changed-since outside a git repository, on a bundled file, or
+    with a revision that does not exist.
+
+    Expected: exit code 1 and a message saying the changes could not be
+    found, with nothing validated.
+
+    Why it matters: silently validating nothing would let the hook pass
+    every commit.
+    """
+    if problem == "not a repository":
+        elsewhere = tmp_path_factory.mktemp("elsewhere") / "dictionary"
+        assert run_cli("generate", "-i", EXAMPLE_INPUT, "-o", str(elsewhere))[0] == 0
+        args = ["-y", str(elsewhere), "--changed-since", "HEAD"]
+    elif problem == "bundled file":
+        bundled = tmp_path_factory.mktemp("bundled") / "schema.json"
+        assert run_cli("bundle", "-i", str(repo), "-f", str(bundled))[0] == 0
+        args = ["-b", str(bundled), "--changed-since", "HEAD"]
+    else:
+        args = ["-y", str(repo), "--changed-since", "no-such-rev"]
+
+    code, output = run_cli("validate", *args)
+
+    assert code == 1
+    assert "Could not work out which files changed" in output
+    assert checked_nodes(output) == []
+
+
+def test_definition_changes_propagate_through_other_definitions(repo):
+    """
+    Input: a changed key referenced by another definition, and a changed key
+    no node uses.
+
+    Expected: nodes using the referencing definition are affected; the
+    unused key affects none.
+
+    Why it matters: a node using a definition built from the changed one
+    is changed too.
+    """
+    bundle = bundle_yamls(str(repo))
+    bundle["_definitions.yaml"]["wrapped"] = {"$ref": "#/to_many"}
+    bundle["sample.yaml"]["properties"]["wrapped"] = {"$ref": "_definitions.yaml#/wrapped"}
+
+    assert affected_nodes(bundle, [], {"to_many"}) == ["assay.yaml", "sample.yaml"]
+    assert affected_nodes(bundle, [], {"not_used_anywhere"}) == []
+    assert changed_keys({"a": 1, "b": 2}, {"a": 1, "b": 3, "c": 4}) == {"b", "c"}
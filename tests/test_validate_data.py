@@ -0,0 +1,217 @@
+"""
+Tests for `validate-data`, which checks submission records against the dictionary.
+
+Background: metadata was checked before submission with ad-hoc scripts, each
+reimplementing part of the dictionary's rules. validate-data checks TSV and
+JSON records against the resolved node schemas themselves, one record at a
+time, and reports each problem with the file and line it came from.
+"""
+
+import json
+
+import pytest
+
+from gen3schemadev.utils import read_json, resolve_bundle
+from gen3schemadev.validators.data_validator import (
+    NodeValidators,
+    find_data_files,
+    iter_records,
+    validate_data,
+)
+
+SUBJECT_TSV = (
+    "type\tsubmitter_id\tprojects.code\tsubmitter_subject_id\tspecies\n"
+    "subject\tsub-1\tP1\tS1\tHuman\n"
+    "subject\tsub-2\tP1\tS2\tHuman\n"
+)
+
+
+@pytest.fixture
+def bundle(run_cli, generated, tmp_path):
+    """The minimal dictionary, bundled."""
+    path = str(tmp_path / "schema.json")
+    assert run_cli("bundle", "-i", generated, "-f", path)[0] == 0
+    return path
+
+
+@pytest.fixture
+def resolved(bundle):
+    return resolve_bundle(read_json(bundle))
+
+
+def test_valid_records_pass(run_cli, bundle, tmp_path):
+    """
+    Input: a TSV of valid subjects and a JSON-lines file of valid biospecimens.
+
+    Expected: exit code 0 and a count of the records checked.
+
+    Why it matters: a validator that flags correct data gets switched off.
+    """
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "subject.tsv").write_text(SUBJECT_TSV)
+    (data / "biospecimen.jsonl").write_text(
+        json.dumps({"type": "biospecimen", "submitter_id": "b1", "subjects": {"submitter_id": "sub-1"}})
+        + "\n"
+    )
+
+    code, out = run_cli("validate-data", "--schema", bundle, str(data))
+
+    assert code == 0, out
+    assert "3 records in 2 files" in out
+
+
+def test_errors_name_the_file_the_line_and_the_field(run_cli, bundle, tmp_path):
+    """
+    Input: a TSV whose third line has an enum value outside the dictionary and
+    lacks a required property.
+
+    Expected: exit code 1, with each error reported as file:line and naming
+    the field.
+
+    Why it matters: "row invalid" in a million-row export is not actionable;
+    file, line and field are.
+    """
+    path = tmp_path / "subject.tsv"
+    path.write_text(
+        "type\tsubmitter_id\tsubmitter_subject_id\tspecies\n"
+        "subject\tsub-1\tS1\tHuman\n"
+        "subject\tsub-2\t\tDog\n"
+    )
+
+    code, out = run_cli("validate-data", "--schema", bundle, str(path))
+
+    assert code == 1
+    assert f"{path}:3: [subject] species: 'Dog' is not one of ['Human', 'Mouse']" in out
+    assert f"{path}:3: [subject] 'submitter_subject_id' is a required property" in out
+    assert f"{path}:2:" not in out
+
+
+def test_tsv_cells_are_typed_from_the_schema(resolved):
+    """
+    Input: TSV rows with link columns, an integer-typed cell and empty cells.
+
+    Expected: links become objects (or a list for #1/#2 parents), empty cells
+    are dropped and strings stay strings.
+
+    Why it matters: every TSV cell is text. Validating the raw text would
+    reject every number and every link in a correct file.
+    """
+    nodes = NodeValidators(resolved)
+
+    one = nodes.convert_row("biospecimen", {
+        "type": "biospecimen", "submitter_id": "b1", "subjects.submitter_id": "s1", "sample_type": "",
+    })
+    two = nodes.convert_row("biospecimen", {
+        "type": "biospecimen", "subjects.submitter_id#1": "s1", "subjects.submitter_id#2": "s2",
+    })
+
+    assert one == {"type": "biospecimen", "submitter_id": "b1", "subjects": {"submitter_id": "s1"}}
+    assert two["subjects"] == [{"submitter_id": "s1"}, {"submitter_id": "s2"}]
+
+
+def test_records_are_streamed_and_errors_are_bounded(resolved, tmp_path):
+    """
+    Input: a JSON-lines file of 5000 invalid records, validated with
+    max_errors=10.
+
+    Expected: every record counted, every error counted, ten kept - and the
+    file is read lazily rather than loaded.
+
+    Why it matters: exports run to millions of rows. Memory must not grow
+    with the file, whether it is valid or systematically wrong.
+    """
+    path = tmp_path / "subject.jsonl"
+    with open(path, "w") as handle:
+        for i in range(5000):
+            handle.write(json.dumps({"type": "subject", "submitter_id": f"s{i}"}) + "\n")
+
+    records = iter_records(str(path))
+    assert next(records)[0] == "1"  # a generator, not a list
+
+    [result] = validate_data(resolved, [str(path)], max_errors=10)
+
+    assert result["records"] == 5000
+    assert result["error_count"] == 5000
+    assert len(result["errors"]) == 10
+
+
+def test_node_type_falls_back_to_the_file_name_and_unknown_types_are_reported(resolved, tmp_path):
+    """
+    Input: records without a type in subject.jsonl, and a record of a type
+    the dictionary does not define.
+
+    Expected: the first are validated as subjects; the second is reported.
+
+    Why it matters: exports are often one file per node with no type column,
+    and a record of an unknown type must not pass merely for being unchecked.
+    """
+    (tmp_path / "subject.jsonl").write_text(
+        json.dumps({"submitter_id": "s1", "submitter_subject_id": "S1"}) + "\n"
+    )
+    (tmp_path / "other.jsonl").write_text(json.dumps({"type": "sample"}) + "\n")
+
+    results = validate_data(resolved, find_data_files([str(tmp_path)]))
+
+    by_name = {r["path"].rsplit("/", 1)[-1]: r for r in results}
+    assert by_name["subject.jsonl"]["errors"] == []
+    assert by_name["other.jsonl"]["errors"] == [("1", "sample", "unknown node type 'sample'")]
+
+
+def test_a_type_that_is_not_a_string_is_reported_on_its_record(resolved, tmp_path):
+    """
+    Input: records whose type is a list, an object and a number, then a valid
+    subject.
+
+    Expected: one "'type' must be a string" error per bad record, and the
+    valid record after them is still checked.
+
+    Why it matters: submission files are untrusted; a malformed type must be
+    an error on that record, not a traceback that ends the whole run.
+    """
+    path = tmp_path / "records.jsonl"
+    path.write_text("".join(json.dumps(r) + "\n" for r in (
+        {"type": ["subject"]},
+        {"type": {"name": "subject"}},
+        {"type": 3},
+        {"type": "subject", "submitter_id": "s1", "submitter_subject_id": "S1"},
+    )))
+
+    [result] = validate_data(resolved, [str(path)])
+
+    assert result["records"] == 4
+    assert result["errors"] == [(str(line), None, "'type' must be a string") for line in (1, 2, 3)]
+
+
+def test_a_process_pool_gives_the_same_results(resolved, tmp_path):
+    """
+    Input: three files validated in process and across two workers.
+
+    Expected: identical results, in the same order.
+
+    Why it matters: the pool is a speed option; it must not change the report.
+    """
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.jsonl").write_text(
+            json.dumps({"type": "subject", "submitter_id": name}) + "\nnot json\n"
+        )
+    files = find_data_files([str(tmp_path)])
+
+    assert validate_data(resolved, files, workers=2) == validate_data(resolved, files)
+
+
+def test_no_data_files_is_an_error(run_cli, bundle, tmp_path):
+    """
+    Input: an empty directory.
+
+    Expected: exit code 1 saying nothing was found.
+
+    Why it matters: "0 records checked, all valid" would let a mistyped path
+    pass a pre-submission check.
+    """
+    (tmp_path / "empty").mkdir()
+
+    code, out = run_cli("validate-data", "--schema", bundle, str(tmp_path / "empty"))
+
+    assert code == 1
+    assert "No data files found" in out
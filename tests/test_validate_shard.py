@@ -0,0 +1,204 @@
+"""
+Tests for `validate --shard i/N` and `validate --merge-reports`.
+
+Background: the largest combined dictionaries take minutes to validate, and
+CI has a matrix of runners. Each runner validates one deterministic slice of
+the nodes and writes a partial report; the merge step prints what a single
+validate run would have printed, so the split is invisible in the result.
+"""
+
+import json
+import os
+
+import pytest
+
+from gen3schemadev.refs import definition_closure
+from gen3schemadev.sharding import estimated_cost, parse_shard, partition
+from gen3schemadev.utils import read_json, resolve_bundle
+
+OFFICIAL_DICTIONARY = os.path.join(
+    os.path.dirname(__file__), "gen3_schema/examples/json", "gen3_develop_schema.json"
+)
+EXAMPLE_INPUT = os.path.join(os.path.dirname(__file__), "input_example.yml")
+
+# Progress lines, which differ between a single run and a merge by design.
+PROGRESS = ("Starting validation process...", "Resolving schemas from:", "Merging ")
+
+
+def run_shards(run_cli, target_args, count, tmp_path):
+    reports = []
+    for index in range(1, count + 1):
+        report = tmp_path / "reports" / f"shard-{index}.json"
+        run_cli("validate", *target_args, "--shard", f"{index}/{count}", "--report", str(report))
+        reports.append(str(report))
+    return reports
+
+
+def result_lines(output):
+    return [line for line in output.splitlines() if not line.startswith(PROGRESS)]
+
+
+def test_partition_is_deterministic_complete_and_balanced():
+    """
+    Input: the official Gen3 dictionary dealt to 4 shards, twice, the second
+    time from a bundle with its keys in reverse order.
+
+    Expected: the same partition both times; every node in exactly one shard,
+    the framework files in none; no shard's estimated cost more than a third
+    above the lightest.
+
+    Why it matters: every CI runner computes the partition independently;
+    two runners disagreeing would skip nodes or check them twice.
+    """
+    bundle = read_json(OFFICIAL_DICTIONARY)
+    reordered = dict(reversed(list(bundle.items())))
+
+    shards = partition(bundle, 4)
+    again = partition(reordered, 4)
+
+    assert [sorted(shard) for shard in shards] == [sorted(shard) for shard in again]
+    nodes = [name for name in bundle if not name.startswith("_")]
+    assert sorted(name for shard in shards for name in shard) == sorted(nodes)
+    loads = [sum(estimated_cost(bundle[name]) for name in shard) for shard in shards]
+    assert max(loads) <= min(loads) * 4 / 3
+
+
+def test_closure_resolves_like_the_whole_bundle():
+    """
+    Input: each of three shards of the official dictionary, resolved against
+    only the definitions its nodes reference.
+
+    Expected: each node resolves exactly as it does from the whole bundle,
+    and every shard carries fewer definitions than the bundle.
+
+    Why it matters: trimming the definitions is only safe if no node can
+    tell the difference.
+    """
+    bundle = read_json(OFFICIAL_DICTIONARY)
+    whole = resolve_bundle(bundle)
+
+    for shard in partition(bundle, 3):
+        closure = definition_closure(bundle, shard)
+        resolved = resolve_bundle(closure)
+
+        assert resolved == {name: whole[name] for name in resolved}
+        assert len(resolved) == len(shard)
+        assert len(closure["_definitions.yaml"]) < len(bundle["_definitions.yaml"])
+
+
+def test_merged_reports_print_what_a_single_run_prints(run_cli, tmp_path):
+    """
+    Input: the example dictionary validated whole, and as three shards
+    merged.
+
+    Expected: both exit 0, and apart from progress lines print the same
+    result, node for node and in the same order.
+
+    Why it matters: the merged result is what CI shows; it must not depend
+    on how many runners produced it.
+    """
+    dictionary = str(tmp_path / "dictionary")
+    assert run_cli("generate", "-i", EXAMPLE_INPUT, "-o", dictionary)[0] == 0
+    single_code, single = run_cli("validate", "-y", dictionary)
+
+    reports = run_shards(run_cli, ["-y", dictionary], 3, tmp_path)
+    merged_code, merged = run_cli("validate", "--merge-reports", *reversed(reports))
+
+    assert single_code == merged_code == 0
+    assert result_lines(merged) == result_lines(single)
+    assert "Validation process complete." in merged
+
+
+def test_merged_rule_report_matches_a_single_run(run_cli, generated, tmp_path):
+    """
+    Input: a dictionary with rule violations in two different nodes,
+    validated whole and as two merged shards.
+
+    Expected: both exit 1 with the identical violation report.
+
+    Why it matters: a report that counted schemas per shard, or listed
+    violations in shard order, would differ from run to run.
+    """
+    for name in ("subject.yaml", "biospecimen.yaml"):
+        path = os.path.join(generated, name)
+        with open(path) as handle:
+            text = handle.read()
+        with open(path, "w") as handle:
+            handle.write(text.replace("properties:", "properties:\n  untyped: {}", 1))
+
+    single_code, single = run_cli("validate", "-y", generated)
+    reports = run_shards(run_cli, ["-y", generated], 2, tmp_path)
+    merged_code, merged = run_cli("validate", "--merge-reports", *reports)
+
+    assert single_code == merged_code == 1
+    assert "FAILED: 2 rule violations" in merged
+    assert result_lines(merged) == result_lines(single)
+
+
+def test_shard_exits_non_zero_and_still_writes_its_report(run_cli, generated, tmp_path):
+    """
+    Input: one shard of a dictionary containing a rule violation, validated
+    on its own.
+
+    Expected: the shard holding the bad node exits 1 after writing its report.
+
+    Why it matters: a failing shard should turn its CI job red straight away,
+    and the merge step still needs its report.
+    """
+    path = os.path.join(generated, "subject.yaml")
+    with open(path) as handle:
+        text = handle.read()
+    with open(path, "w") as handle:
+        handle.write(text.replace("properties:", "properties:\n  untyped: {}", 1))
+
+    codes = {}
+    for index in (1, 2):
+        report = tmp_path / f"shard-{index}.json"
+        codes[index] = run_cli("validate", "-y", generated, "--shard", f"{index}/2", "--report", str(report))[0]
+        data = json.loads(report.read_text())
+        if any(v["source"] == "subject" for v in data["violations"]):
+            bad = index
+
+    assert codes[bad] == 1
+    assert codes[3 - bad] == 0
+
+
+@pytest.mark.parametrize("problem", ["missing shard", "different bundles"])
+def test_incomplete_or_mixed_reports_are_refused(run_cli, generated, tmp_path, problem):
+    """
+    Input: shard reports missing one shard, or drawn from two different
+    bundles.
+
+    Expected: exit code 1 and a message saying why, with no result printed.
+
+    Why it matters: a merged result that silently skipped a shard, or mixed
+    two commits, would report success for nodes nobody checked.
+    """
+    reports = run_shards(run_cli, ["-y", generated], 3, tmp_path)
+    if problem == "missing shard":
+        reports = reports[:2]
+    else:
+        other = json.loads(open(reports[2]).read())
+        other["bundle_hash"] = "0" * 64
+        with open(reports[2], "w") as handle:
+            json.dump(other, handle)
+
+    code, output = run_cli("validate", "--merge-reports", *reports)
+
+    assert code == 1
+    assert f"Could not merge {len(reports)} shard reports" in output
+    assert "SUCCESS" not in output
+
+
+@pytest.mark.parametrize("text", ["0/3", "4/3", "1", "a/b", "1/0"])
+def test_bad_shard_specs_are_rejected(text):
+    """
+    Input: shard specifications outside 1 <= i <= N.
+
+    Expected: ValueError.
+
+    Why it matters: --shard 0/3 in a matrix counting from zero would
+    otherwise skip the last shard without anyone noticing.
+    """
+    with pytest.raises(ValueError):
+        parse_shard(text)